@@ -688,6 +688,7 @@ export default async function DesignDetailPage({ params }: PageProps) {
                 htmlCode={htmlCode}
                 reactCode={reactCode ?? undefined}
                 colors={currentDesign.colors || undefined}
+                colorVariations={currentDesign.color_variations}
               />
             </LazyRender>
           </div>
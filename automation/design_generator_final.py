@@ -11,19 +11,26 @@ Features:
 
 import os
 import re
+import sys
 import asyncio
 import hashlib
 import random
 import json
-import subprocess
 from datetime import datetime
-from typing import Dict, Any, Set, List, Optional
+from typing import Callable, Dict, Any, Set, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from supabase import create_client, Client
-from playwright.async_api import async_playwright
 
 from indexnow_helper import notify_indexnow_for_design
+import section_composer
+from external_queue import ExternalComboQueue, QueueRefiller, REFILL_LOW_WATERMARK
+from section_composer import Section
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from capture_service import get_capture_service, shutdown_capture_service
+from publish_outbox import PublishOutbox
+from slug_allocator import SlugAllocator
 
 load_dotenv()
 
@@ -45,23 +52,184 @@ COLOR_PALETTES = [
 
 CATEGORIES = ["Landing Page", "Dashboard", "E-commerce", "Portfolio", "Blog", "Components"]
 
+STORAGE_BUCKET = 'designs-bucket'
+STORAGE_FOLDER = 'designs'
+
+ADVANCED_GENERATOR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "advanced_generator.js")
 BATCH_FILE_PATH = os.path.join(os.path.dirname(__file__), "latest_batch.json")
+QUEUE_LOG_PATH = os.path.join(os.path.dirname(__file__), ".external_queue.jsonl")
+QUEUE_CURSOR_PATH = os.path.join(os.path.dirname(__file__), ".external_queue_cursor.json")
+HASH_INDEX_PATH = os.path.join(os.path.dirname(__file__), ".structure_hash_index.json")
+HASH_INDEX_VERSION = 2  # v2: 조합 스펙 해시를 구조 해시와 분리 (specs)
 
 
 class UniversalDesignGenerator:
     """모든 카테고리를 지원하는 디자인 생성기"""
     
-    def __init__(self):
-        self.used_hashes: Set[str] = set()
+    def __init__(self, low_watermark: int = REFILL_LOW_WATERMARK, upload_concurrency: int = 2):
+        self.used_hashes: Set[str] = set()   # designs.structure_hash (get_structure_hash(code))
+        self.used_specs: Set[str] = set()    # designs.spec_hash (내장 조합 스펙 해시)
         self.design_count = 0
         self.last_layout_type = None  # 마지막 생성 레이아웃 타입 추적
         self.external_designs = self._load_external_designs()
+        self.refiller = QueueRefiller(self.external_designs, ADVANCED_GENERATOR_PATH, BATCH_FILE_PATH, low_watermark)
         self.total_existing_designs = 0
         self.existing_slugs: Set[str] = set()
+        self.slugs_complete = True  # 동기화 실패 시 False → slug 는 prefix 조회로 할당
+        self.has_structure_hash_column = False
+        self.has_spec_hash_column = self._column_exists('spec_hash')
         self._load_existing_structure_hashes()
+        self.next_number = self.design_count + 1  # 렌더 단계에서 순서대로 부여하는 디자인 번호
+        self.has_color_variations_column = self._column_exists('color_variations')
+        # 증분 동기화로 전체 slug 를 이미 알고 있으므로 조회 없이 메모리에서 할당
+        self.slugs = SlugAllocator(lambda: supabase)
+        if self.slugs_complete:
+            self.slugs.seed(self.existing_slugs)
+        self.outbox = PublishOutbox(
+            "design_generator_final", lambda: supabase,
+            on_published=self._on_published, upload_concurrency=upload_concurrency,
+            slugs=self.slugs,
+        )
     
+    def _read_hash_index(self) -> Dict[str, Any]:
+        """로컬 구조 해시 인덱스(.structure_hash_index.json) 로드."""
+        empty: Dict[str, Any] = {"hashes": [], "specs": [], "slugs": [], "high_water": None, "boundary_ids": [], "row_count": 0}
+        if not os.path.exists(HASH_INDEX_PATH):
+            return empty
+        try:
+            with open(HASH_INDEX_PATH, 'r', encoding='utf-8') as index_file:
+                data = json.load(index_file)
+            if not isinstance(data, dict) or data.get('version') != HASH_INDEX_VERSION:
+                print("⚠️ Hash index format changed; rebuilding from Supabase.")
+                return empty
+            return {**empty, **data}
+        except Exception as exc:
+            print(f"⚠️ Failed to read hash index, rebuilding: {exc}")
+            return empty
+
+    def _write_hash_index(self, high_water: Optional[str], boundary_ids: Set[str]) -> None:
+        """동기화된 해시/slug와 워터마크를 원자적으로 저장."""
+        payload = {
+            "version": HASH_INDEX_VERSION,
+            "high_water": high_water,
+            "boundary_ids": sorted(boundary_ids),
+            "row_count": self.total_existing_designs,
+            "hashes": sorted(self.used_hashes),
+            "specs": sorted(self.used_specs),
+            "slugs": sorted(self.existing_slugs),
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+        tmp_path = f"{HASH_INDEX_PATH}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as index_file:
+                json.dump(payload, index_file, ensure_ascii=False)
+            os.replace(tmp_path, HASH_INDEX_PATH)
+        except Exception as exc:
+            print(f"⚠️ Failed to persist hash index: {exc}")
+
     def _load_existing_structure_hashes(self) -> None:
-        """Supabase에 저장된 기존 구조 해시를 불러와 중복 생성을 방지."""
+        """로컬 해시 인덱스 + 워터마크 이후 새 행만 Supabase에서 증분 동기화.
+
+        code 컬럼 대신 저장된 structure_hash 를 읽으므로 시작 비용은 새 행 수에만 비례.
+        structure_hash 가 비어 있는 새 행(다른 생성기가 넣은 행)만 code 를 내려받아 계산.
+        """
+        index = self._read_hash_index()
+        self.used_hashes.update(index["hashes"])
+        self.used_specs.update(index["specs"])
+        self.existing_slugs.update(index["slugs"])
+        since: Optional[str] = index["high_water"]
+        since_ids: Set[str] = set(index["boundary_ids"])
+        high_water, boundary_ids = since, set(since_ids)
+
+        print(f"📦 Syncing structure hashes (cached: {len(self.used_hashes)}, since: {since or 'beginning'})...")
+        start = 0
+        batch_size = 500
+        synced = 0
+        missing_ids: List[str] = []
+        columns = 'id, slug, created_at, structure_hash' + (', spec_hash' if self.has_spec_hash_column else '')
+        try:
+            while True:
+                query = supabase.table('designs').select(columns)
+                if since:
+                    query = query.gte('created_at', since)
+                response = (
+                    query
+                    .order('created_at')
+                    .order('id')
+                    .range(start, start + batch_size - 1)
+                    .execute()
+                )
+                rows = response.data or []
+                for row in rows:
+                    row_id = row.get('id')
+                    created_at = row.get('created_at')
+                    if since and created_at == since and row_id in since_ids:
+                        continue
+                    synced += 1
+                    slug_val = (row.get('slug') or '').strip()
+                    if slug_val:
+                        self.existing_slugs.add(slug_val)
+                    if row.get('structure_hash'):
+                        self.used_hashes.add(row['structure_hash'])
+                    elif row_id:
+                        missing_ids.append(row_id)
+                    if row.get('spec_hash'):
+                        self.used_specs.add(row['spec_hash'])
+                    if created_at:
+                        if created_at != high_water:
+                            high_water = created_at
+                            boundary_ids = set()
+                        boundary_ids.add(row_id)
+                if len(rows) < batch_size:
+                    break
+                start += batch_size
+            self.has_structure_hash_column = True
+        except Exception as exc:
+            print(f"⚠️ Incremental hash sync failed ({exc}). Run supabase_add_structure_hash.sql; falling back to full scan.")
+            self._load_structure_hashes_from_code()
+            return
+
+        self._hash_rows_from_code(missing_ids)
+        self.total_existing_designs = self._count_designs(index["row_count"] + synced)
+        self.design_count = self.total_existing_designs
+        self._write_hash_index(high_water, boundary_ids)
+        print(f"✅ Synced {synced} new row(s), {len(self.used_hashes)} hash(es) known"
+              f" ({len(missing_ids)} computed from code)")
+
+    def _hash_rows_from_code(self, row_ids: List[str], chunk_size: int = 50) -> None:
+        """structure_hash 가 비어 있는 행만 code 를 받아 해시 계산."""
+        for offset in range(0, len(row_ids), chunk_size):
+            chunk = row_ids[offset:offset + chunk_size]
+            try:
+                response = supabase.table('designs').select('id, code').in_('id', chunk).execute()
+            except Exception as exc:
+                print(f"⚠️ Failed to fetch code for {len(chunk)} unhashed row(s): {exc}")
+                continue
+            for row in response.data or []:
+                html = row.get('code') or ''
+                if html:
+                    self.used_hashes.add(self.get_structure_hash(html))
+
+    def _column_exists(self, column: str) -> bool:
+        """선택 컬럼 존재 여부를 시작 시 한 번만 확인."""
+        try:
+            supabase.table('designs').select(column).limit(1).execute()
+            return True
+        except Exception:
+            print(f"⚠️ designs.{column} column missing; skipping it on insert.")
+            return False
+
+    def _count_designs(self, fallback: int) -> int:
+        try:
+            response = supabase.table('designs').select('id', count='exact').limit(1).execute()
+            if response.count is not None:
+                return response.count
+        except Exception as exc:
+            print(f"⚠️ Failed to count designs: {exc}")
+        return fallback
+
+    def _load_structure_hashes_from_code(self) -> None:
+        """structure_hash 컬럼이 없을 때의 전체 스캔 (code 컬럼 전체 다운로드)."""
         print("📦 Loading existing structure hashes from Supabase...")
         start = 0
         batch_size = 500
@@ -70,19 +238,19 @@ class UniversalDesignGenerator:
                 response = (
                     supabase
                     .table('designs')
-                    .select('id, code')
+                    .select('id, slug, code')
                     .range(start, start + batch_size - 1)
                     .execute()
                 )
                 rows = response.data or []
                 for row in rows:
+                    slug_val = (row.get('slug') or '').strip()
+                    if slug_val:
+                        self.existing_slugs.add(slug_val)
                     html = row.get('code') or ''
                     if not html:
                         continue
                     self.used_hashes.add(self.get_structure_hash(html))
-                    slug_val = (row.get('slug') or '').strip()
-                    if slug_val:
-                        self.existing_slugs.add(slug_val)
                 self.total_existing_designs += len(rows)
                 if len(rows) < batch_size:
                     break
@@ -90,89 +258,53 @@ class UniversalDesignGenerator:
             print(f"✅ Loaded {len(self.used_hashes)} existing hash(es)")
         except Exception as exc:
             print(f"⚠️ Failed to load existing hashes: {exc}")
+            self.slugs_complete = False
         finally:
             self.design_count = self.total_existing_designs
 
-    def _load_external_designs(self) -> Dict[str, List[Dict[str, Any]]]:
-        """advanced_generator.js가 만든 batch를 불러와 카테고리별 큐 형태로 보관."""
-        queues: Dict[str, List[Dict[str, Any]]] = {cat: [] for cat in CATEGORIES}
-        if not os.path.exists(BATCH_FILE_PATH):
-            return queues
+    @classmethod
+    def backfill_structure_hashes(cls, batch_size: int = 100) -> int:
+        """structure_hash 가 비어 있는 기존 행을 한 번 채우는 일회성 백필."""
+        print("🧮 Backfilling structure_hash for existing designs...")
+        last_id: Optional[str] = None
+        updated = 0
+        while True:
+            query = (
+                supabase
+                .table('designs')
+                .select('id, code')
+                .is_('structure_hash', 'null')
+                .order('id')
+                .limit(batch_size)
+            )
+            if last_id:
+                query = query.gt('id', last_id)
+            rows = query.execute().data or []
+            for row in rows:
+                html = row.get('code') or ''
+                if not html:
+                    continue
+                supabase.table('designs').update(
+                    {"structure_hash": cls.get_structure_hash(html)}
+                ).eq('id', row['id']).execute()
+                updated += 1
+            if len(rows) < batch_size:
+                break
+            last_id = rows[-1]['id']
+            print(f"   … {updated} row(s) hashed")
+        print(f"✅ Backfilled {updated} row(s)")
+        return updated
+
+    def _load_external_designs(self) -> ExternalComboQueue:
+        """append-only 조합 큐를 열고, advanced_generator.js 가 남긴 batch 가 있으면 적재."""
+        queue = ExternalComboQueue(QUEUE_LOG_PATH, QUEUE_CURSOR_PATH, CATEGORIES)
         try:
-            with open(BATCH_FILE_PATH, 'r', encoding='utf-8') as batch_file:
-                data = json.load(batch_file)
-                if not isinstance(data, list):
-                    return queues
-                for item in data:
-                    category = item.get('category')
-                    if category in queues:
-                        queues[category].append(item)
+            added = queue.ingest_batch_file(BATCH_FILE_PATH)
+            if sum(added.values()):
+                print(f"📥 Queued {sum(added.values())} external combo(s) from latest_batch.json")
         except Exception as exc:
             print(f"⚠️ Failed to load external design batch: {exc}")
-        return queues
-
-    def _persist_external_designs(self) -> None:
-        """현재 큐 상태를 latest_batch.json에 다시 저장."""
-        flattened: List[Dict[str, Any]] = []
-        for bucket in self.external_designs.values():
-            flattened.extend(bucket)
-        try:
-            with open(BATCH_FILE_PATH, 'w', encoding='utf-8') as batch_file:
-                json.dump(flattened, batch_file, ensure_ascii=False, indent=2)
-        except Exception as exc:
-            print(f"⚠️ Failed to persist external design batch: {exc}")
-
-    def _refresh_external_designs(self, required_category: Optional[str] = None) -> bool:
-        """필요 시 advanced_generator.js를 실행해 외부 큐를 보충."""
-        script_dir = os.path.dirname(__file__)
-        script_path = os.path.join(script_dir, "advanced_generator.js")
-
-        if not os.path.exists(script_path):
-            print("⚠️ advanced_generator.js not found; cannot auto-refresh external combos.")
-            return False
-
-        for attempt in range(1, 6):
-            print(f"🔁 External queue empty. Triggering advanced generator (attempt {attempt}/5)...")
-            try:
-                subprocess.run(["node", script_path], cwd=script_dir, check=True)
-            except FileNotFoundError:
-                print("❌ Node.js is missing. Install Node 18+ to enable auto-refresh.")
-                return False
-            except subprocess.CalledProcessError as exc:
-                print(f"⚠️ Advanced generator failed (exit {exc.returncode}). {exc}")
-                continue
-
-            try:
-                with open(BATCH_FILE_PATH, 'r', encoding='utf-8') as batch_file:
-                    generated = json.load(batch_file)
-                    if not isinstance(generated, list):
-                        generated = []
-            except Exception as exc:
-                print(f"⚠️ Failed to read generated combos: {exc}")
-                return False
-
-            added = 0
-            for entry in generated:
-                category = entry.get('category')
-                if category in self.external_designs:
-                    self.external_designs[category].append(entry)
-                    added += 1
-
-            if added:
-                self._persist_external_designs()
-                print(f"✨ Added {added} new external combo(s) to the queue.")
-            else:
-                print("⚠️ Advanced generator returned 0 usable combos.")
-
-            if not required_category:
-                return added > 0
-
-            bucket = self.external_designs.get(required_category)
-            if bucket:
-                return True
-
-        print("⚠️ Could not replenish external combos automatically.")
-        return False
+        return queue
 
     def _apply_style_variant(self, html: str, style: Dict[str, Any]) -> str:
         """Tailwind 스타일 클래스를 <main> 컨테이너에 주입."""
@@ -190,36 +322,24 @@ class UniversalDesignGenerator:
         updated, count = re.subn(r'<main\s+class="([^"]+)"', _inject, html, count=1)
         return updated if count else html
 
-    def _pop_external_design(self, category: str) -> Optional[Dict[str, Any]]:
-        """카테고리 큐에서 하나 꺼내 스타일 적용 후 반환."""
-        bucket = self.external_designs.get(category)
-        if not bucket:
-            refreshed = self._refresh_external_designs(required_category=category)
-            bucket = self.external_designs.get(category)
-            if not bucket:
-                if not refreshed:
-                    print(f"⚠️ No external combos available for {category}; falling back to built-in templates.")
+    async def _pop_external_design(self, category: str) -> Optional[Dict[str, Any]]:
+        """카테고리 큐에서 하나 꺼내 스타일 적용 후 반환 (잔량이 적으면 백그라운드 보충 시작)."""
+        if not self.external_designs.size(category):
+            if not await self.refiller.ensure(category):
+                print(f"⚠️ No external combos available for {category}; falling back to built-in templates.")
                 return None
-        entry = bucket.pop(0)
+        entry = self.external_designs.pop(category)
+        self.refiller.maybe_refill()
         styled_html = self._apply_style_variant(entry.get('html', ''), entry.get('style'))
         entry['html'] = styled_html
-        self._persist_external_designs()
         return entry
 
     def _slugify(self, value: str) -> str:
         slug = re.sub(r'[^a-z0-9]+', '-', value.lower()).strip('-')
         return slug or 'design'
 
-    def _generate_slug(self, category: str) -> str:
-        base_title = f"{category} Design {self.design_count + 1}"
-        base_slug = self._slugify(base_title)
-        candidate = base_slug
-        suffix = 2
-        while candidate in self.existing_slugs:
-            candidate = f"{base_slug}-{suffix}"
-            suffix += 1
-        self.existing_slugs.add(candidate)
-        return candidate
+    def _generate_slug(self, category: str, number: int) -> str:
+        return self.slugs.allocate(self._slugify(f"{category} Design {number}"))
 
     def get_description_by_layout(self, category: str, layout_type: str) -> str:
         """레이아웃 타입별 고유한 설명 생성 (3줄) - 여러 변형 중 랜덤 선택"""
@@ -467,7 +587,8 @@ class UniversalDesignGenerator:
         # 변형 중 랜덤 선택
         return random.choice(variations)
     
-    def get_structure_hash(self, html: str) -> str:
+    @staticmethod
+    def get_structure_hash(html: str) -> str:
         """구조 해시 (색상 제외)"""
         # 색상값 제거
         normalized = re.sub(r'#[0-9a-fA-F]{3,6}', 'COLOR', html)
@@ -476,17 +597,9 @@ class UniversalDesignGenerator:
         layouts = re.findall(r'grid-template-columns:[^;]+|flex-direction:[^;]+|display:\s*(?:grid|flex)', normalized)
         return hashlib.md5((''.join(tags) + ''.join(layouts)).encode()).hexdigest()
     
-    def is_unique_structure(self, html: str) -> bool:
-        """구조가 고유한지 확인"""
-        hash_val = self.get_structure_hash(html)
-        if hash_val in self.used_hashes:
-            return False
-        self.used_hashes.add(hash_val)
-        return True
-    
     # ===== Landing Page =====
-    def generate_landing_page(self, colors: dict) -> str:
-        """랜딩 페이지 생성"""
+    def _landing_page_leads(self) -> Dict[str, Callable[[dict], Section]]:
+        """랜딩 페이지 리드 섹션 (레이아웃 타입 → 렌더 함수)"""
         layouts = [
             ("landing_hero_centered", self._landing_hero_centered),
             ("landing_split_screen", self._landing_split_screen),
@@ -496,20 +609,12 @@ class UniversalDesignGenerator:
             ("landing_mobile_first", self._landing_mobile_first),
             ("landing_bento_grid", self._landing_bento_grid),
         ]
-        layout_type, layout_func = random.choice(layouts)
-        self.last_layout_type = layout_type
-        return layout_func(colors)
+        return dict(layouts)
     
-    def _landing_hero_centered(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Landing Page</title>
-    <style>
+    def _landing_hero_centered(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', -apple-system, sans-serif; }}
+        .sc-lead {{ font-family: 'Inter', -apple-system, sans-serif; }}
         .hero {{ min-height: 100vh; display: flex; align-items: center; justify-content: center; 
                  background: linear-gradient(135deg, {colors['primary']} 0%, {colors['secondary']} 100%); 
                  color: white; text-align: center; padding: 40px; }}
@@ -527,10 +632,9 @@ class UniversalDesignGenerator:
         .feature-card {{ background: white; padding: 50px; border-radius: 24px; text-align: center; 
                         box-shadow: 0 4px 20px rgba(0,0,0,0.08); }}
         .feature-card h3 {{ font-size: 28px; margin: 20px 0 12px; }}
-        .feature-icon {{ font-size: 64px; }}
-    </style>
-</head>
-<body>
+        .feature-icon {{ font-size: 64px; }}"""
+        html = """
+    <div class="sc-lead">
     <section class="hero">
         <div>
             <h1>Transform Your Business</h1>
@@ -560,19 +664,13 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </section>
-</body>
-</html>"""
-
-    def _landing_split_screen(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Landing Split</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _landing_split_screen(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Helvetica Neue', sans-serif; }}
+        .sc-lead {{ font-family: 'Helvetica Neue', sans-serif; }}
         .split {{ display: grid; grid-template-columns: 1fr 1fr; min-height: 100vh; }}
         .left {{ background: {colors['primary']}; color: white; padding: 80px 60px; 
                  display: flex; flex-direction: column; justify-content: center; }}
@@ -587,10 +685,9 @@ class UniversalDesignGenerator:
                   border-radius: 12px; font-size: 16px; }}
         .input:focus {{ outline: none; border-color: {colors['primary']}; }}
         .submit {{ width: 100%; padding: 18px; background: {colors['secondary']}; color: white; 
-                   border: none; border-radius: 12px; font-size: 18px; font-weight: 700; cursor: pointer; }}
-    </style>
-</head>
-<body>
+                   border: none; border-radius: 12px; font-size: 18px; font-weight: 700; cursor: pointer; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="split">
         <div class="left">
             <h1>Welcome to the Future</h1>
@@ -610,19 +707,13 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _landing_fullscreen_video(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Video Landing</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _landing_fullscreen_video(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'SF Pro Display', sans-serif; }}
+        .sc-lead {{ font-family: 'SF Pro Display', sans-serif; }}
         nav {{ position: fixed; top: 0; left: 0; right: 0; z-index: 1000; 
                background: rgba(0,0,0,0.5); backdrop-filter: blur(20px); padding: 20px 60px; 
                display: flex; justify-content: space-between; }}
@@ -636,10 +727,9 @@ class UniversalDesignGenerator:
         .hero p {{ font-size: clamp(20px, 3vw, 32px); max-width: 900px; margin: 0 auto 50px; }}
         .scroll {{ position: absolute; bottom: 40px; color: white; font-size: 14px; 
                    animation: bounce 2s infinite; }}
-        @keyframes bounce {{ 0%, 100% {{ transform: translateY(0); }} 50% {{ transform: translateY(-10px); }} }}
-    </style>
-</head>
-<body>
+        @keyframes bounce {{ 0%, 100% {{ transform: translateY(0); }} 50% {{ transform: translateY(-10px); }} }}"""
+        html = """
+    <div class="sc-lead">
     <nav>
         <div class="logo">BRAND</div>
         <div class="nav-links">
@@ -656,19 +746,13 @@ class UniversalDesignGenerator:
         </div>
         <div class="scroll">↓ Scroll to explore</div>
     </section>
-</body>
-</html>"""
-
-    def _landing_asymmetric(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Asymmetric Landing</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _landing_asymmetric(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Poppins', sans-serif; }}
+        .sc-lead {{ font-family: 'Poppins', sans-serif; }}
         .container {{ display: grid; grid-template-columns: 2fr 1fr; gap: 60px; 
                       padding: 100px 60px; max-width: 1600px; margin: 0 auto; }}
         .main-content h1 {{ font-size: 72px; font-weight: 900; margin-bottom: 30px; 
@@ -678,10 +762,9 @@ class UniversalDesignGenerator:
         .sidebar {{ position: sticky; top: 100px; }}
         .sidebar-card {{ background: linear-gradient(135deg, {colors['primary']}20, {colors['secondary']}20); 
                         padding: 40px; border-radius: 24px; margin-bottom: 24px; }}
-        .sidebar-card h3 {{ font-size: 24px; margin-bottom: 12px; }}
-    </style>
-</head>
-<body>
+        .sidebar-card h3 {{ font-size: 24px; margin-bottom: 12px; }}"""
+        html = f"""
+    <div class="sc-lead">
     <div class="container">
         <div class="main-content">
             <h1>Modern Solutions for Modern Problems</h1>
@@ -703,29 +786,22 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _landing_minimal(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Minimal Landing</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _landing_minimal(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', sans-serif; padding: 80px 40px; max-width: 1400px; margin: 0 auto; }}
+        .sc-lead {{ font-family: 'Inter', sans-serif; padding: 80px 40px; max-width: 1400px; margin: 0 auto; }}
         .header {{ text-align: center; margin-bottom: 100px; }}
         .header h1 {{ font-size: 96px; font-weight: 900; color: {colors['primary']}; }}
         .header p {{ font-size: 24px; color: #666; margin-top: 20px; }}
         .grid {{ display: grid; grid-template-columns: repeat(4, 1fr); gap: 40px; }}
         .card {{ aspect-ratio: 1; background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); 
                  border-radius: 20px; display: flex; align-items: center; justify-content: center; 
-                 color: white; font-size: 48px; font-weight: 900; }}
-    </style>
-</head>
-<body>
+                 color: white; font-size: 48px; font-weight: 900; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="header">
         <h1>Simplicity</h1>
         <p>Less is more. Focus on what matters.</p>
@@ -736,27 +812,20 @@ class UniversalDesignGenerator:
         <div class="card">3</div>
         <div class="card">4</div>
     </div>
-</body>
-</html>"""
-
-    def _landing_bento_grid(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Bento Grid Landing</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _landing_bento_grid(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'SF Pro Display', sans-serif; padding: 60px; background: #fafafa; }}
+        .sc-lead {{ font-family: 'SF Pro Display', sans-serif; padding: 60px; background: #fafafa; }}
         .bento-grid {{ display: grid; grid-template-columns: repeat(4, 1fr); gap: 20px; max-width: 1600px; margin: 0 auto; }}
         .bento-item {{ background: white; border-radius: 24px; padding: 40px; box-shadow: 0 4px 20px rgba(0,0,0,0.08); }}
         .bento-item.large {{ grid-column: span 2; grid-row: span 2; background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); color: white; }}
         .bento-item h2 {{ font-size: 36px; font-weight: 900; margin-bottom: 16px; }}
-        .bento-item p {{ font-size: 18px; line-height: 1.6; opacity: 0.9; }}
-    </style>
-</head>
-<body>
+        .bento-item p {{ font-size: 18px; line-height: 1.6; opacity: 0.9; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="bento-grid">
         <div class="bento-item large">
             <h2>Transform Your Business</h2>
@@ -767,19 +836,13 @@ class UniversalDesignGenerator:
         <div class="bento-item"><h2>24/7</h2><p>Support</p></div>
         <div class="bento-item"><h2>$2B+</h2><p>Processed</p></div>
     </div>
-</body>
-</html>"""
-
-    def _landing_mobile_first(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Mobile App Landing</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _landing_mobile_first(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', sans-serif; }}
+        .sc-lead {{ font-family: 'Inter', sans-serif; }}
         .mobile-hero {{ min-height: 100vh; display: flex; align-items: center;
                        background: linear-gradient(180deg, {colors['primary']}, {colors['secondary']});
                        color: white; padding: 60px 20px; }}
@@ -813,10 +876,9 @@ class UniversalDesignGenerator:
         .ratings {{ padding: 60px 20px; background: {colors['primary']}10; text-align: center; }}
         .rating-stars {{ font-size: 48px; margin-bottom: 16px; }}
         .rating-text {{ font-size: 24px; font-weight: 700; color: {colors['primary']}; }}
-        .rating-count {{ color: #666; margin-top: 8px; }}
-    </style>
-</head>
-<body>
+        .rating-count {{ color: #666; margin-top: 8px; }}"""
+        html = """
+    <div class="sc-lead">
     <section class="mobile-hero">
         <div class="hero-content">
             <div class="app-icon"></div>
@@ -874,11 +936,11 @@ class UniversalDesignGenerator:
         <div class="rating-text">4.9 out of 5</div>
         <div class="rating-count">Based on 50,000+ reviews</div>
     </section>
-</body>
-</html>"""
+    </div>"""
+        return Section(css, html)
     
     # ===== Dashboard =====
-    def generate_dashboard(self, colors: dict) -> str:
+    def _dashboard_leads(self) -> Dict[str, Callable[[dict], Section]]:
         layouts = [
             ("dashboard_sidebar", self._dashboard_sidebar),
             ("dashboard_top_nav", self._dashboard_top_nav),
@@ -887,20 +949,12 @@ class UniversalDesignGenerator:
             ("dashboard_kanban", self._dashboard_kanban),
             ("dashboard_table_view", self._dashboard_table_view),
         ]
-        layout_type, layout_func = random.choice(layouts)
-        self.last_layout_type = layout_type
-        return layout_func(colors)
+        return dict(layouts)
     
-    def _dashboard_sidebar(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Dashboard</title>
-    <style>
+    def _dashboard_sidebar(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', sans-serif; background: #f8f9fa; }}
+        .sc-lead {{ font-family: 'Inter', sans-serif; background: #f8f9fa; }}
         .layout {{ display: grid; grid-template-columns: 280px 1fr; height: 100vh; }}
         .sidebar {{ background: linear-gradient(180deg, {colors['primary']}, {colors['secondary']}); 
                     color: white; padding: 40px 0; }}
@@ -912,10 +966,9 @@ class UniversalDesignGenerator:
         .stat-card {{ background: white; padding: 32px; border-radius: 16px; 
                       box-shadow: 0 4px 16px rgba(0,0,0,0.06); }}
         .stat-value {{ font-size: 42px; font-weight: 900; color: {colors['primary']}; }}
-        .stat-label {{ font-size: 14px; color: #666; margin-top: 8px; }}
-    </style>
-</head>
-<body>
+        .stat-label {{ font-size: 14px; color: #666; margin-top: 8px; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="layout">
         <div class="sidebar">
             <div class="sidebar-logo">Dashboard</div>
@@ -945,19 +998,13 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _dashboard_top_nav(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Dashboard</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _dashboard_top_nav(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'SF Pro Display', sans-serif; background: #fafbfc; }}
+        .sc-lead {{ font-family: 'SF Pro Display', sans-serif; background: #fafbfc; }}
         .top-nav {{ background: white; padding: 20px 50px; display: flex; 
                     justify-content: space-between; box-shadow: 0 1px 3px rgba(0,0,0,0.1); }}
         .nav-brand {{ font-size: 24px; font-weight: 800; color: {colors['primary']}; }}
@@ -968,10 +1015,9 @@ class UniversalDesignGenerator:
         .container {{ max-width: 1400px; margin: 0 auto; padding: 50px 40px; }}
         .dashboard-grid {{ display: grid; grid-template-columns: 2fr 1fr; gap: 30px; }}
         .chart-card {{ background: white; padding: 40px; border-radius: 20px; 
-                       box-shadow: 0 2px 12px rgba(0,0,0,0.08); }}
-    </style>
-</head>
-<body>
+                       box-shadow: 0 2px 12px rgba(0,0,0,0.08); }}"""
+        html = f"""
+    <div class="sc-lead">
     <div class="top-nav">
         <div class="nav-brand">Analytics Pro</div>
         <div class="nav-tabs">
@@ -996,19 +1042,13 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _dashboard_cards(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Dashboard Cards</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _dashboard_cards(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Montserrat', sans-serif; background: #f5f7fa; padding: 60px 40px; }}
+        .sc-lead {{ font-family: 'Montserrat', sans-serif; background: #f5f7fa; padding: 60px 40px; }}
         .container {{ max-width: 1600px; margin: 0 auto; }}
         h1 {{ font-size: 56px; font-weight: 900; margin-bottom: 50px; text-align: center; }}
         .grid {{ display: grid; grid-template-columns: repeat(3, 1fr); gap: 30px; }}
@@ -1017,10 +1057,9 @@ class UniversalDesignGenerator:
                         box-shadow: 0 10px 40px rgba(0,0,0,0.08); }}
         .metric-card h4 {{ font-size: 16px; color: #666; margin-bottom: 16px; text-transform: uppercase; }}
         .metric-card .value {{ font-size: 56px; font-weight: 900; color: #1a1a1a; }}
-        .metric-card .change {{ font-size: 18px; color: #10b981; font-weight: 700; margin-top: 12px; }}
-    </style>
-</head>
-<body>
+        .metric-card .change {{ font-size: 18px; color: #10b981; font-weight: 700; margin-top: 12px; }}"""
+        html = f"""
+    <div class="sc-lead">
     <div class="container">
         <h1>Metrics Overview</h1>
         <div class="grid">
@@ -1041,19 +1080,13 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _dashboard_analytics(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Analytics Dashboard</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _dashboard_analytics(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', sans-serif; background: #0f1117; color: white; padding: 40px; }}
+        .sc-lead {{ font-family: 'Inter', sans-serif; background: #0f1117; color: white; padding: 40px; }}
         .header {{ display: flex; justify-content: space-between; align-items: center; margin-bottom: 40px; }}
         .header h1 {{ font-size: 48px; font-weight: 900; }}
         .time-filter {{ display: flex; gap: 12px; }}
@@ -1065,10 +1098,9 @@ class UniversalDesignGenerator:
         .stats-row {{ display: grid; grid-template-columns: repeat(4, 1fr); gap: 20px; }}
         .stat-box {{ background: #1a1d29; padding: 30px; border-radius: 16px; border: 1px solid #2a2e3a; }}
         .stat-box h3 {{ font-size: 14px; color: #9ca3af; margin-bottom: 12px; }}
-        .stat-box .number {{ font-size: 36px; font-weight: 900; color: {colors['primary']}; }}
-    </style>
-</head>
-<body>
+        .stat-box .number {{ font-size: 36px; font-weight: 900; color: {colors['primary']}; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="header">
         <h1>Analytics</h1>
         <div class="time-filter">
@@ -1097,19 +1129,13 @@ class UniversalDesignGenerator:
             <div class="number">32.8%</div>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _dashboard_kanban(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Kanban Board</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _dashboard_kanban(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'SF Pro Display', sans-serif; background: #f9fafb; padding: 40px; }}
+        .sc-lead {{ font-family: 'SF Pro Display', sans-serif; background: #f9fafb; padding: 40px; }}
         .board {{ display: grid; grid-template-columns: repeat(4, 1fr); gap: 24px; }}
         .column {{ background: #e5e7eb; padding: 20px; border-radius: 12px; }}
         .column-header {{ font-size: 16px; font-weight: 700; margin-bottom: 16px; display: flex; 
@@ -1120,10 +1146,9 @@ class UniversalDesignGenerator:
         .task-card h4 {{ font-size: 15px; font-weight: 600; margin-bottom: 8px; }}
         .task-meta {{ display: flex; gap: 12px; font-size: 13px; color: #6b7280; }}
         .priority {{ padding: 4px 8px; background: {colors['primary']}20; color: {colors['primary']};
-                    border-radius: 4px; font-weight: 600; }}
-    </style>
-</head>
-<body>
+                    border-radius: 4px; font-weight: 600; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="board">
         <div class="column">
             <div class="column-header">To Do <span class="count">5</span></div>
@@ -1158,19 +1183,13 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _dashboard_table_view(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Data Table Dashboard</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _dashboard_table_view(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', sans-serif; background: white; padding: 40px; }}
+        .sc-lead {{ font-family: 'Inter', sans-serif; background: white; padding: 40px; }}
         .header {{ display: flex; justify-content: space-between; margin-bottom: 30px; }}
         .header h1 {{ font-size: 36px; font-weight: 900; }}
         .actions {{ display: flex; gap: 12px; }}
@@ -1183,10 +1202,9 @@ class UniversalDesignGenerator:
         td {{ padding: 16px; border-bottom: 1px solid #e5e7eb; }}
         .status {{ padding: 4px 12px; border-radius: 12px; font-size: 13px; font-weight: 600; }}
         .status.active {{ background: #d1fae5; color: #065f46; }}
-        .status.pending {{ background: #fef3c7; color: #92400e; }}
-    </style>
-</head>
-<body>
+        .status.pending {{ background: #fef3c7; color: #92400e; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="header">
         <h1>User Management</h1>
         <div class="actions">
@@ -1228,11 +1246,11 @@ class UniversalDesignGenerator:
             </tr>
         </tbody>
     </table>
-</body>
-</html>"""
+    </div>"""
+        return Section(css, html)
     
     # ===== E-commerce =====
-    def generate_ecommerce(self, colors: dict) -> str:
+    def _ecommerce_leads(self) -> Dict[str, Callable[[dict], Section]]:
         layouts = [
             ("ecommerce_product_grid", self._ecommerce_product_grid),
             ("ecommerce_product_detail", self._ecommerce_product_detail),
@@ -1242,20 +1260,12 @@ class UniversalDesignGenerator:
             ("ecommerce_wishlist", self._ecommerce_wishlist),
             ("ecommerce_search_results", self._ecommerce_search_results),
         ]
-        layout_type, layout_func = random.choice(layouts)
-        self.last_layout_type = layout_type
-        return layout_func(colors)
+        return dict(layouts)
     
-    def _ecommerce_product_grid(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Shop</title>
-    <style>
+    def _ecommerce_product_grid(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', sans-serif; }}
+        .sc-lead {{ font-family: 'Inter', sans-serif; }}
         nav {{ padding: 24px 60px; border-bottom: 1px solid #e0e0e0; display: flex; 
                justify-content: space-between; }}
         .logo {{ font-size: 28px; font-weight: 900; color: {colors['primary']}; }}
@@ -1268,10 +1278,9 @@ class UniversalDesignGenerator:
                          background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); }}
         .product-info {{ padding: 24px; background: white; }}
         .product-name {{ font-size: 20px; font-weight: 700; margin-bottom: 8px; }}
-        .product-price {{ font-size: 24px; font-weight: 900; color: {colors['primary']}; }}
-    </style>
-</head>
-<body>
+        .product-price {{ font-size: 24px; font-weight: 900; color: {colors['primary']}; }}"""
+        html = """
+    <div class="sc-lead">
     <nav>
         <div class="logo">Shop</div>
         <div style="display: flex; gap: 40px;">
@@ -1312,19 +1321,13 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _ecommerce_product_detail(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Product Detail</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _ecommerce_product_detail(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Helvetica Neue', sans-serif; padding: 80px 60px; }}
+        .sc-lead {{ font-family: 'Helvetica Neue', sans-serif; padding: 80px 60px; }}
         .product-layout {{ display: grid; grid-template-columns: 1fr 1fr; gap: 80px; 
                           max-width: 1400px; margin: 0 auto; }}
         .gallery {{ aspect-ratio: 1; background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); 
@@ -1333,10 +1336,9 @@ class UniversalDesignGenerator:
         .price {{ font-size: 48px; font-weight: 900; color: {colors['primary']}; margin: 32px 0; }}
         .description {{ font-size: 18px; color: #666; line-height: 1.8; margin-bottom: 40px; }}
         .add-to-cart {{ width: 100%; padding: 24px; background: {colors['secondary']}; color: white; 
-                        border: none; border-radius: 16px; font-size: 20px; font-weight: 700; cursor: pointer; }}
-    </style>
-</head>
-<body>
+                        border: none; border-radius: 16px; font-size: 20px; font-weight: 700; cursor: pointer; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="product-layout">
         <div class="gallery"></div>
         <div class="product-info">
@@ -1350,19 +1352,13 @@ class UniversalDesignGenerator:
             <button class="add-to-cart">Add to Cart</button>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _ecommerce_cart_checkout(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Shopping Cart</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _ecommerce_cart_checkout(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', sans-serif; background: #f9fafb; padding: 60px 40px; }}
+        .sc-lead {{ font-family: 'Inter', sans-serif; background: #f9fafb; padding: 60px 40px; }}
         .cart-container {{ max-width: 1200px; margin: 0 auto; display: grid; grid-template-columns: 2fr 1fr; gap: 40px; }}
         .cart-items {{ background: white; padding: 40px; border-radius: 16px; }}
         .cart-item {{ display: flex; gap: 24px; padding: 24px 0; border-bottom: 1px solid #e5e7eb; }}
@@ -1372,10 +1368,9 @@ class UniversalDesignGenerator:
         .summary {{ background: white; padding: 40px; border-radius: 16px; height: fit-content; }}
         .summary h2 {{ font-size: 28px; margin-bottom: 24px; }}
         .summary-row {{ display: flex; justify-content: space-between; padding: 12px 0; }}
-        .checkout-btn {{ width: 100%; padding: 18px; background: {colors['primary']}; color: white; border: none; border-radius: 12px; font-size: 18px; font-weight: 700; margin-top: 20px; cursor: pointer; }}
-    </style>
-</head>
-<body>
+        .checkout-btn {{ width: 100%; padding: 18px; background: {colors['primary']}; color: white; border: none; border-radius: 12px; font-size: 18px; font-weight: 700; margin-top: 20px; cursor: pointer; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="cart-container">
         <div class="cart-items">
             <h1 style="font-size: 36px; margin-bottom: 32px;">Shopping Cart (3)</h1>
@@ -1400,23 +1395,17 @@ class UniversalDesignGenerator:
             <h2>Order Summary</h2>
             <div class="summary-row"><span>Subtotal</span><span>$248.00</span></div>
             <div class="summary-row"><span>Shipping</span><span>$10.00</span></div>
-            <div class="summary-row" style="font-size: 24px; font-weight: 900; border-top: 2px solid #e5e7eb; margin-top: 16px; padding-top: 20px;"><span>Total</span><span>${{258.00}}</span></div>
+            <div class="summary-row" style="font-size: 24px; font-weight: 900; border-top: 2px solid #e5e7eb; margin-top: 16px; padding-top: 20px;"><span>Total</span><span>${258.00}</span></div>
             <button class="checkout-btn">Proceed to Checkout</button>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _ecommerce_category_page(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Shop by Category</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _ecommerce_category_page(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'SF Pro Display', sans-serif; }}
+        .sc-lead {{ font-family: 'SF Pro Display', sans-serif; }}
         .hero {{ background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); padding: 120px 60px; text-align: center; color: white; }}
         .hero h1 {{ font-size: 64px; font-weight: 900; margin-bottom: 16px; }}
         .filters {{ padding: 40px 60px; background: #f9fafb; display: flex; gap: 16px; justify-content: center; flex-wrap: wrap; }}
@@ -1424,10 +1413,9 @@ class UniversalDesignGenerator:
         .filter-btn.active {{ background: {colors['primary']}; color: white; border-color: {colors['primary']}; }}
         .products {{ padding: 60px; display: grid; grid-template-columns: repeat(3, 1fr); gap: 40px; }}
         .product {{ background: white; border-radius: 16px; overflow: hidden; box-shadow: 0 4px 12px rgba(0,0,0,0.08); }}
-        .product-img {{ width: 100%; aspect-ratio: 1; background: linear-gradient(135deg, {colors['primary']}40, {colors['secondary']}40); }}
-    </style>
-</head>
-<body>
+        .product-img {{ width: 100%; aspect-ratio: 1; background: linear-gradient(135deg, {colors['primary']}40, {colors['secondary']}40); }}"""
+        html = f"""
+    <div class="sc-lead">
     <div class="hero">
         <h1>Women's Collection</h1>
         <p style="font-size: 20px;">Discover the latest trends</p>
@@ -1461,19 +1449,13 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _ecommerce_hero_sale(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Flash Sale</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _ecommerce_hero_sale(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Poppins', sans-serif; }}
+        .sc-lead {{ font-family: 'Poppins', sans-serif; }}
         .sale-hero {{ background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); min-height: 600px; 
                      display: flex; align-items: center; justify-content: center; color: white; text-align: center; padding: 60px; }}
         .sale-hero h1 {{ font-size: 96px; font-weight: 900; margin-bottom: 24px; }}
@@ -1481,10 +1463,9 @@ class UniversalDesignGenerator:
         .time-box {{ background: rgba(255,255,255,0.2); backdrop-filter: blur(10px); padding: 24px 32px; border-radius: 16px; }}
         .time-number {{ font-size: 56px; font-weight: 900; }}
         .time-label {{ font-size: 14px; margin-top: 8px; opacity: 0.9; }}
-        .cta {{ padding: 24px 64px; background: white; color: {colors['primary']}; border: none; border-radius: 16px; font-size: 24px; font-weight: 900; cursor: pointer; }}
-    </style>
-</head>
-<body>
+        .cta {{ padding: 24px 64px; background: white; color: {colors['primary']}; border: none; border-radius: 16px; font-size: 24px; font-weight: 900; cursor: pointer; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="sale-hero">
         <div>
             <h1>50% OFF</h1>
@@ -1497,28 +1478,21 @@ class UniversalDesignGenerator:
             <button class="cta">Shop Now</button>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _ecommerce_wishlist(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>My Wishlist</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _ecommerce_wishlist(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', sans-serif; padding: 80px 60px; }}
+        .sc-lead {{ font-family: 'Inter', sans-serif; padding: 80px 60px; }}
         .wishlist-header {{ text-align: center; margin-bottom: 60px; }}
         .wishlist-header h1 {{ font-size: 56px; font-weight: 900; color: {colors['primary']}; margin-bottom: 16px; }}
         .wishlist-grid {{ display: grid; grid-template-columns: repeat(4, 1fr); gap: 32px; max-width: 1600px; margin: 0 auto; }}
         .wishlist-item {{ position: relative; border-radius: 16px; overflow: hidden; box-shadow: 0 4px 16px rgba(0,0,0,0.1); }}
         .wishlist-img {{ width: 100%; aspect-ratio: 1; background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); }}
-        .heart {{ position: absolute; top: 16px; right: 16px; background: white; width: 48px; height: 48px; border-radius: 50%; display: flex; align-items: center; justify-content: center; font-size: 24px; }}
-    </style>
-</head>
-<body>
+        .heart {{ position: absolute; top: 16px; right: 16px; background: white; width: 48px; height: 48px; border-radius: 50%; display: flex; align-items: center; justify-content: center; font-size: 24px; }}"""
+        html = f"""
+    <div class="sc-lead">
     <div class="wishlist-header">
         <h1>My Wishlist</h1>
         <p style="font-size: 18px; color: #666;">8 items saved</p>
@@ -1557,19 +1531,13 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _ecommerce_search_results(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Search Results</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _ecommerce_search_results(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'SF Pro Display', sans-serif; padding: 40px 60px; }}
+        .sc-lead {{ font-family: 'SF Pro Display', sans-serif; padding: 40px 60px; }}
         .search-bar {{ max-width: 800px; margin: 0 auto 60px; }}
         .search-input {{ width: 100%; padding: 24px; border: 2px solid {colors['primary']}; border-radius: 16px; font-size: 20px; }}
         .results-header {{ margin-bottom: 40px; }}
@@ -1577,10 +1545,9 @@ class UniversalDesignGenerator:
         .results-header p {{ color: #666; }}
         .results-grid {{ display: grid; grid-template-columns: repeat(3, 1fr); gap: 32px; }}
         .result-item {{ display: flex; gap: 24px; background: white; padding: 24px; border-radius: 16px; border: 1px solid #e5e7eb; }}
-        .result-img {{ width: 120px; height: 120px; background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); border-radius: 12px; flex-shrink: 0; }}
-    </style>
-</head>
-<body>
+        .result-img {{ width: 120px; height: 120px; background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); border-radius: 12px; flex-shrink: 0; }}"""
+        html = f"""
+    <div class="sc-lead">
     <div class="search-bar">
         <input class="search-input" placeholder="Search products..." value="premium">
     </div>
@@ -1614,11 +1581,11 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
+    </div>"""
+        return Section(css, html)
     
     # ===== Portfolio =====
-    def generate_portfolio(self, colors: dict) -> str:
+    def _portfolio_leads(self) -> Dict[str, Callable[[dict], Section]]:
         layouts = [
             ("portfolio_grid_masonry", self._portfolio_masonry),
             ("portfolio_minimal_about", self._portfolio_minimal),
@@ -1628,20 +1595,12 @@ class UniversalDesignGenerator:
             ("portfolio_split_showcase", self._portfolio_split_showcase),
             ("portfolio_gallery_hover", self._portfolio_gallery_hover),
         ]
-        layout_type, layout_func = random.choice(layouts)
-        self.last_layout_type = layout_type
-        return layout_func(colors)
+        return dict(layouts)
     
-    def _portfolio_masonry(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Portfolio</title>
-    <style>
+    def _portfolio_masonry(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', sans-serif; padding: 80px 40px; }}
+        .sc-lead {{ font-family: 'Inter', sans-serif; padding: 80px 40px; }}
         .header {{ text-align: center; margin-bottom: 80px; }}
         .header h1 {{ font-size: 72px; font-weight: 900; }}
         .masonry {{ column-count: 3; column-gap: 32px; }}
@@ -1652,10 +1611,9 @@ class UniversalDesignGenerator:
         .portfolio-item.tall .portfolio-image {{ aspect-ratio: 0.7; }}
         .portfolio-caption {{ padding: 20px 0; }}
         .portfolio-caption h3 {{ font-size: 24px; margin-bottom: 8px; }}
-        .portfolio-caption p {{ color: #666; }}
-    </style>
-</head>
-<body>
+        .portfolio-caption p {{ color: #666; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="header">
         <h1>My Work</h1>
         <p style="font-size: 20px; color: #666; margin-top: 16px;">Creative projects and designs</p>
@@ -1690,29 +1648,22 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _portfolio_minimal(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Portfolio Minimal</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _portfolio_minimal(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Helvetica Neue', sans-serif; }}
+        .sc-lead {{ font-family: 'Helvetica Neue', sans-serif; }}
         .project {{ height: 100vh; display: flex; align-items: center; justify-content: center; 
                     border-bottom: 1px solid #e0e0e0; }}
         .project:nth-child(odd) {{ background: {colors['primary']}; color: white; }}
         .project:nth-child(even) {{ background: white; }}
         .project-content {{ text-align: center; }}
         .project-content h2 {{ font-size: 96px; font-weight: 900; margin-bottom: 24px; }}
-        .project-content p {{ font-size: 24px; opacity: 0.8; }}
-    </style>
-</head>
-<body>
+        .project-content p {{ font-size: 24px; opacity: 0.8; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="project">
         <div class="project-content">
             <h2>Project One</h2>
@@ -1725,19 +1676,13 @@ class UniversalDesignGenerator:
             <p>Mobile App Development</p>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _portfolio_case_study(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Case Study</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _portfolio_case_study(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', sans-serif; }}
+        .sc-lead {{ font-family: 'Inter', sans-serif; }}
         .hero {{ background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); padding: 120px 60px; color: white; text-align: center; }}
         .hero h1 {{ font-size: 72px; font-weight: 900; margin-bottom: 24px; }}
         .hero .meta {{ font-size: 18px; opacity: 0.9; }}
@@ -1745,10 +1690,9 @@ class UniversalDesignGenerator:
         .content h2 {{ font-size: 48px; font-weight: 900; margin-bottom: 24px; }}
         .content p {{ font-size: 20px; line-height: 1.8; color: #666; margin-bottom: 40px; }}
         .image-grid {{ display: grid; grid-template-columns: repeat(2, 1fr); gap: 32px; margin: 60px 0; }}
-        .case-image {{ aspect-ratio: 16/9; background: {colors['primary']}20; border-radius: 16px; }}
-    </style>
-</head>
-<body>
+        .case-image {{ aspect-ratio: 16/9; background: {colors['primary']}20; border-radius: 16px; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="hero">
         <h1>Brand Redesign Project</h1>
         <div class="meta">Client: Tech Startup • Year: 2024 • Role: Lead Designer</div>
@@ -1763,19 +1707,13 @@ class UniversalDesignGenerator:
         <h2>Solution</h2>
         <p>We developed a sophisticated visual identity that bridges professionalism with innovation.</p>
     </div>
-</body>
-</html>"""
-
-    def _portfolio_timeline(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Work Timeline</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _portfolio_timeline(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'SF Pro Display', sans-serif; padding: 80px 40px; background: #f9fafb; }}
+        .sc-lead {{ font-family: 'SF Pro Display', sans-serif; padding: 80px 40px; background: #f9fafb; }}
         .timeline {{ max-width: 1000px; margin: 0 auto; position: relative; }}
         .timeline::before {{ content: ''; position: absolute; left: 50%; top: 0; bottom: 0; width: 4px; background: {colors['primary']}; }}
         .timeline-item {{ display: flex; margin-bottom: 80px; }}
@@ -1783,10 +1721,9 @@ class UniversalDesignGenerator:
         .timeline-item:nth-child(even) {{ flex-direction: row-reverse; }}
         .timeline-content {{ flex: 1; background: white; padding: 40px; border-radius: 16px; margin: 0 40px; box-shadow: 0 4px 16px rgba(0,0,0,0.1); }}
         .timeline-year {{ font-size: 48px; font-weight: 900; color: {colors['primary']}; margin-bottom: 16px; }}
-        .timeline-content h3 {{ font-size: 28px; margin-bottom: 12px; }}
-    </style>
-</head>
-<body>
+        .timeline-content h3 {{ font-size: 28px; margin-bottom: 12px; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="timeline">
         <div class="timeline-item">
             <div class="timeline-content">
@@ -1803,29 +1740,22 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _portfolio_fullwidth(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Portfolio Fullwidth</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _portfolio_fullwidth(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Poppins', sans-serif; }}
+        .sc-lead {{ font-family: 'Poppins', sans-serif; }}
         .project-full {{ min-height: 100vh; padding: 100px 60px; }}
         .project-full:nth-child(odd) {{ background: {colors['primary']}; color: white; }}
         .project-full:nth-child(even) {{ background: white; }}
         .project-container {{ max-width: 1400px; margin: 0 auto; }}
         .project-container h1 {{ font-size: 96px; font-weight: 900; margin-bottom: 32px; }}
         .project-container p {{ font-size: 24px; opacity: 0.9; max-width: 600px; margin-bottom: 48px; }}
-        .project-image {{ width: 100%; aspect-ratio: 16/9; background: rgba(0,0,0,0.1); border-radius: 24px; }}
-    </style>
-</head>
-<body>
+        .project-image {{ width: 100%; aspect-ratio: 16/9; background: rgba(0,0,0,0.1); border-radius: 24px; }}"""
+        html = """
+    <div class="sc-lead">
     <section class="project-full">
         <div class="project-container">
             <h1>Digital Experience</h1>
@@ -1840,29 +1770,22 @@ class UniversalDesignGenerator:
             <div class="project-image"></div>
         </div>
     </section>
-</body>
-</html>"""
-
-    def _portfolio_split_showcase(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Split Portfolio</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _portfolio_split_showcase(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', sans-serif; }}
+        .sc-lead {{ font-family: 'Inter', sans-serif; }}
         .split {{ display: grid; grid-template-columns: repeat(2, 1fr); height: 100vh; }}
         .split-item {{ position: relative; overflow: hidden; cursor: pointer; }}
         .split-bg {{ width: 100%; height: 100%; background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); transition: transform 0.4s; }}
         .split-item:hover .split-bg {{ transform: scale(1.05); }}
         .split-content {{ position: absolute; bottom: 60px; left: 60px; color: white; }}
         .split-content h2 {{ font-size: 56px; font-weight: 900; margin-bottom: 16px; }}
-        .split-content p {{ font-size: 20px; opacity: 0.95; }}
-    </style>
-</head>
-<body>
+        .split-content p {{ font-size: 20px; opacity: 0.95; }}"""
+        html = f"""
+    <div class="sc-lead">
     <div class="split">
         <div class="split-item">
             <div class="split-bg"></div>
@@ -1879,19 +1802,13 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _portfolio_gallery_hover(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Hover Gallery</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _portfolio_gallery_hover(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'SF Pro Display', sans-serif; padding: 60px; background: #000; color: white; }}
+        .sc-lead {{ font-family: 'SF Pro Display', sans-serif; padding: 60px; background: #000; color: white; }}
         .gallery {{ display: grid; grid-template-columns: repeat(3, 1fr); gap: 24px; }}
         .gallery-item {{ aspect-ratio: 1; background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); 
                         border-radius: 20px; position: relative; overflow: hidden; cursor: pointer; }}
@@ -1899,10 +1816,9 @@ class UniversalDesignGenerator:
                     justify-content: center; opacity: 0; transition: opacity 0.3s; }}
         .gallery-item:hover .overlay {{ opacity: 1; }}
         .overlay-content {{ text-align: center; }}
-        .overlay-content h3 {{ font-size: 32px; font-weight: 900; margin-bottom: 8px; }}
-    </style>
-</head>
-<body>
+        .overlay-content h3 {{ font-size: 32px; font-weight: 900; margin-bottom: 8px; }}"""
+        html = """
+    <div class="sc-lead">
     <h1 style="font-size: 72px; margin-bottom: 60px; text-align: center;">Selected Works</h1>
     <div class="gallery">
         <div class="gallery-item">
@@ -1930,11 +1846,11 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
+    </div>"""
+        return Section(css, html)
     
     # ===== Blog =====
-    def generate_blog(self, colors: dict) -> str:
+    def _blog_leads(self) -> Dict[str, Callable[[dict], Section]]:
         layouts = [
             ("blog_magazine_grid", self._blog_grid),
             ("blog_card_modern", self._blog_magazine),
@@ -1944,20 +1860,12 @@ class UniversalDesignGenerator:
             ("blog_masonry_cards", self._blog_masonry_cards),
             ("blog_timeline_feed", self._blog_timeline_feed),
         ]
-        layout_type, layout_func = random.choice(layouts)
-        self.last_layout_type = layout_type
-        return layout_func(colors)
+        return dict(layouts)
     
-    def _blog_grid(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Blog</title>
-    <style>
+    def _blog_grid(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', sans-serif; padding: 80px 40px; }}
+        .sc-lead {{ font-family: 'Inter', sans-serif; padding: 80px 40px; }}
         .container {{ max-width: 1200px; margin: 0 auto; }}
         h1 {{ font-size: 64px; font-weight: 900; text-align: center; margin-bottom: 60px; }}
         .post-grid {{ display: grid; grid-template-columns: repeat(3, 1fr); gap: 40px; }}
@@ -1968,10 +1876,9 @@ class UniversalDesignGenerator:
         .post-content {{ padding: 32px; }}
         .post-meta {{ font-size: 14px; color: #999; margin-bottom: 12px; }}
         .post-title {{ font-size: 24px; font-weight: 700; margin-bottom: 12px; }}
-        .post-excerpt {{ color: #666; line-height: 1.7; }}
-    </style>
-</head>
-<body>
+        .post-excerpt {{ color: #666; line-height: 1.7; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="container">
         <h1>Blog</h1>
         <div class="post-grid">
@@ -2001,19 +1908,13 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _blog_magazine(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Magazine Blog</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _blog_magazine(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Georgia', serif; }}
+        .sc-lead {{ font-family: 'Georgia', serif; }}
         .hero-post {{ height: 80vh; background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); 
                       color: white; display: flex; align-items: flex-end; padding: 80px 60px; }}
         .hero-content h1 {{ font-size: 72px; font-weight: 900; margin-bottom: 20px; }}
@@ -2024,10 +1925,9 @@ class UniversalDesignGenerator:
                       padding-bottom: 60px; border-bottom: 2px solid #e0e0e0; }}
         .post-item-image {{ aspect-ratio: 1; background: {colors['primary']}20; border-radius: 16px; }}
         .post-item h2 {{ font-size: 48px; margin-bottom: 20px; }}
-        .post-item p {{ font-size: 20px; color: #666; line-height: 1.7; }}
-    </style>
-</head>
-<body>
+        .post-item p {{ font-size: 20px; color: #666; line-height: 1.7; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="hero-post">
         <div class="hero-content">
             <h1>Featured Article</h1>
@@ -2052,27 +1952,20 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _blog_minimal_typography(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Minimal Blog</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _blog_minimal_typography(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Merriweather', serif; max-width: 800px; margin: 0 auto; padding: 120px 40px; }}
+        .sc-lead {{ font-family: 'Merriweather', serif; max-width: 800px; margin: 0 auto; padding: 120px 40px; }}
         article {{ margin-bottom: 120px; }}
         .date {{ font-size: 14px; color: {colors['primary']}; text-transform: uppercase; letter-spacing: 2px; margin-bottom: 16px; }}
         h1 {{ font-size: 64px; font-weight: 900; line-height: 1.1; margin-bottom: 32px; }}
         .excerpt {{ font-size: 24px; line-height: 1.6; color: #666; margin-bottom: 32px; }}
-        .read-more {{ color: {colors['primary']}; font-weight: 700; font-size: 18px; text-decoration: none; }}
-    </style>
-</head>
-<body>
+        .read-more {{ color: {colors['primary']}; font-weight: 700; font-size: 18px; text-decoration: none; }}"""
+        html = """
+    <div class="sc-lead">
     <article>
         <div class="date">January 15, 2024</div>
         <h1>The Art of Minimalism</h1>
@@ -2085,29 +1978,22 @@ class UniversalDesignGenerator:
         <div class="excerpt">A comprehensive guide to creating user experiences that truly resonate with your audience.</div>
         <a href="#" class="read-more">Read Article →</a>
     </article>
-</body>
-</html>"""
-
-    def _blog_featured_hero(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Featured Blog</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _blog_featured_hero(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', sans-serif; }}
+        .sc-lead {{ font-family: 'Inter', sans-serif; }}
         .featured {{ min-height: 100vh; background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); 
                     display: flex; align-items: center; justify-content: center; padding: 60px; color: white; }}
         .featured-content {{ max-width: 900px; text-align: center; }}
         .category {{ font-size: 16px; text-transform: uppercase; letter-spacing: 3px; margin-bottom: 24px; opacity: 0.9; }}
         .featured-content h1 {{ font-size: 88px; font-weight: 900; line-height: 1.1; margin-bottom: 32px; }}
         .featured-content p {{ font-size: 24px; line-height: 1.6; opacity: 0.95; margin-bottom: 48px; }}
-        .read-btn {{ padding: 20px 60px; background: white; color: {colors['primary']}; border: none; border-radius: 12px; font-size: 20px; font-weight: 700; cursor: pointer; }}
-    </style>
-</head>
-<body>
+        .read-btn {{ padding: 20px 60px; background: white; color: {colors['primary']}; border: none; border-radius: 12px; font-size: 20px; font-weight: 700; cursor: pointer; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="featured">
         <div class="featured-content">
             <div class="category">Design Trends</div>
@@ -2116,19 +2002,13 @@ class UniversalDesignGenerator:
             <button class="read-btn">Read Full Story</button>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _blog_sidebar_list(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Blog with Sidebar</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _blog_sidebar_list(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'SF Pro Display', sans-serif; padding: 60px; background: #f9fafb; }}
+        .sc-lead {{ font-family: 'SF Pro Display', sans-serif; padding: 60px; background: #f9fafb; }}
         .layout {{ display: grid; grid-template-columns: 2fr 1fr; gap: 60px; max-width: 1400px; margin: 0 auto; }}
         .article {{ background: white; padding: 40px; border-radius: 16px; margin-bottom: 32px; }}
         .article h2 {{ font-size: 36px; margin-bottom: 16px; }}
@@ -2136,10 +2016,9 @@ class UniversalDesignGenerator:
         .article p {{ font-size: 18px; color: #444; line-height: 1.7; }}
         .sidebar {{ position: sticky; top: 60px; }}
         .sidebar-widget {{ background: white; padding: 32px; border-radius: 16px; margin-bottom: 24px; }}
-        .sidebar-widget h3 {{ font-size: 20px; margin-bottom: 20px; color: {colors['primary']}; }}
-    </style>
-</head>
-<body>
+        .sidebar-widget h3 {{ font-size: 20px; margin-bottom: 20px; color: {colors['primary']}; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="layout">
         <main>
             <article class="article">
@@ -2162,29 +2041,22 @@ class UniversalDesignGenerator:
             </div>
         </aside>
     </div>
-</body>
-</html>"""
-
-    def _blog_masonry_cards(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Masonry Blog</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _blog_masonry_cards(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', sans-serif; padding: 60px 40px; }}
+        .sc-lead {{ font-family: 'Inter', sans-serif; padding: 60px 40px; }}
         .masonry-grid {{ column-count: 3; column-gap: 32px; max-width: 1600px; margin: 0 auto; }}
         .blog-card {{ break-inside: avoid; background: white; border-radius: 16px; overflow: hidden; 
                      box-shadow: 0 4px 16px rgba(0,0,0,0.1); margin-bottom: 32px; }}
         .card-image {{ width: 100%; aspect-ratio: 16/9; background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); }}
         .card-content {{ padding: 32px; }}
         .card-content h3 {{ font-size: 24px; margin-bottom: 12px; }}
-        .card-content p {{ color: #666; line-height: 1.6; }}
-    </style>
-</head>
-<body>
+        .card-content p {{ color: #666; line-height: 1.6; }}"""
+        html = """
+    <div class="sc-lead">
     <h1 style="font-size: 64px; text-align: center; margin-bottom: 80px;">Latest Articles</h1>
     <div class="masonry-grid">
         <div class="blog-card">
@@ -2208,19 +2080,13 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _blog_timeline_feed(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Timeline Blog</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _blog_timeline_feed(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Helvetica Neue', sans-serif; padding: 80px 40px; background: #fafafa; }}
+        .sc-lead {{ font-family: 'Helvetica Neue', sans-serif; padding: 80px 40px; background: #fafafa; }}
         .timeline {{ max-width: 900px; margin: 0 auto; }}
         .post {{ background: white; padding: 48px; border-radius: 20px; margin-bottom: 40px; 
                 box-shadow: 0 4px 20px rgba(0,0,0,0.08); border-left: 6px solid {colors['primary']}; }}
@@ -2229,10 +2095,9 @@ class UniversalDesignGenerator:
         .post p {{ font-size: 18px; color: #555; line-height: 1.7; margin-bottom: 24px; }}
         .tags {{ display: flex; gap: 12px; }}
         .tag {{ padding: 8px 16px; background: {colors['primary']}20; color: {colors['primary']}; 
-               border-radius: 20px; font-size: 14px; font-weight: 600; }}
-    </style>
-</head>
-<body>
+               border-radius: 20px; font-size: 14px; font-weight: 600; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="timeline">
         <article class="post">
             <div class="post-date">2 hours ago</div>
@@ -2253,11 +2118,11 @@ class UniversalDesignGenerator:
             </div>
         </article>
     </div>
-</body>
-</html>"""
+    </div>"""
+        return Section(css, html)
     
     # ===== Components =====
-    def generate_components(self, colors: dict) -> str:
+    def _components_leads(self) -> Dict[str, Callable[[dict], Section]]:
         layouts = [
             ("components_buttons", self._components_showcase),
             ("components_cards", self._components_library),
@@ -2267,20 +2132,12 @@ class UniversalDesignGenerator:
             ("components_pricing_tables", self._components_pricing),
             ("components_testimonials", self._components_testimonials),
         ]
-        layout_type, layout_func = random.choice(layouts)
-        self.last_layout_type = layout_type
-        return layout_func(colors)
+        return dict(layouts)
     
-    def _components_showcase(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Components</title>
-    <style>
+    def _components_showcase(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', sans-serif; padding: 80px 40px; background: #f5f7fa; }}
+        .sc-lead {{ font-family: 'Inter', sans-serif; padding: 80px 40px; background: #f5f7fa; }}
         .container {{ max-width: 1200px; margin: 0 auto; }}
         .component-section {{ background: white; padding: 60px; border-radius: 24px; 
                              margin-bottom: 40px; box-shadow: 0 4px 20px rgba(0,0,0,0.08); }}
@@ -2292,10 +2149,9 @@ class UniversalDesignGenerator:
         .btn-outline {{ background: transparent; border: 2px solid {colors['primary']}; color: {colors['primary']}; }}
         .card-showcase {{ display: grid; grid-template-columns: repeat(3, 1fr); gap: 24px; }}
         .card {{ padding: 40px; border-radius: 16px; background: #fafafa; }}
-        .card h3 {{ font-size: 24px; margin-bottom: 12px; }}
-    </style>
-</head>
-<body>
+        .card h3 {{ font-size: 24px; margin-bottom: 12px; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="container">
         <h1 style="font-size: 56px; margin-bottom: 60px; text-align: center;">Component Library</h1>
         
@@ -2326,19 +2182,13 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _components_library(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>UI Kit</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _components_library(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'SF Pro Display', sans-serif; background: linear-gradient(135deg, {colors['primary']}10, {colors['secondary']}10); 
+        .sc-lead {{ font-family: 'SF Pro Display', sans-serif; background: linear-gradient(135deg, {colors['primary']}10, {colors['secondary']}10); 
                 padding: 100px 60px; }}
         .grid {{ display: grid; grid-template-columns: repeat(2, 1fr); gap: 40px; max-width: 1400px; margin: 0 auto; }}
         .ui-block {{ background: white; padding: 60px; border-radius: 24px; box-shadow: 0 20px 60px rgba(0,0,0,0.1); }}
@@ -2346,10 +2196,9 @@ class UniversalDesignGenerator:
         .input-field {{ width: 100%; padding: 18px; border: 2px solid #e0e0e0; border-radius: 12px; 
                        font-size: 16px; margin-bottom: 20px; }}
         .input-field:focus {{ outline: none; border-color: {colors['primary']}; }}
-        .toggle {{ width: 60px; height: 32px; background: {colors['primary']}; border-radius: 16px; }}
-    </style>
-</head>
-<body>
+        .toggle {{ width: 60px; height: 32px; background: {colors['primary']}; border-radius: 16px; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="grid">
         <div class="ui-block">
             <h3>Form Inputs</h3>
@@ -2369,29 +2218,22 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _components_forms(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Form Components</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _components_forms(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', sans-serif; padding: 80px 60px; background: #f9fafb; }}
+        .sc-lead {{ font-family: 'Inter', sans-serif; padding: 80px 60px; background: #f9fafb; }}
         .form-container {{ max-width: 600px; margin: 0 auto; background: white; padding: 60px; border-radius: 24px; box-shadow: 0 10px 40px rgba(0,0,0,0.1); }}
         .form-container h2 {{ font-size: 36px; margin-bottom: 40px; color: {colors['primary']}; }}
         .form-group {{ margin-bottom: 24px; }}
         .form-group label {{ display: block; font-weight: 600; margin-bottom: 8px; color: #333; }}
         .form-group input, .form-group textarea {{ width: 100%; padding: 16px; border: 2px solid #e5e7eb; border-radius: 12px; font-size: 16px; }}
         .form-group input:focus, .form-group textarea:focus {{ outline: none; border-color: {colors['primary']}; }}
-        .submit-btn {{ width: 100%; padding: 18px; background: {colors['primary']}; color: white; border: none; border-radius: 12px; font-size: 18px; font-weight: 700; cursor: pointer; }}
-    </style>
-</head>
-<body>
+        .submit-btn {{ width: 100%; padding: 18px; background: {colors['primary']}; color: white; border: none; border-radius: 12px; font-size: 18px; font-weight: 700; cursor: pointer; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="form-container">
         <h2>Contact Us</h2>
         <form>
@@ -2410,19 +2252,13 @@ class UniversalDesignGenerator:
             <button class="submit-btn">Send Message</button>
         </form>
     </div>
-</body>
-</html>"""
-
-    def _components_navigation(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Navigation Components</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _components_navigation(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'SF Pro Display', sans-serif; }}
+        .sc-lead {{ font-family: 'SF Pro Display', sans-serif; }}
         .nav {{ background: {colors['primary']}; padding: 20px 60px; display: flex; justify-content: space-between; align-items: center; }}
         .nav-brand {{ font-size: 28px; font-weight: 900; color: white; }}
         .nav-links {{ display: flex; gap: 40px; }}
@@ -2432,10 +2268,9 @@ class UniversalDesignGenerator:
         .tab {{ padding: 16px 32px; background: none; border: none; font-size: 16px; font-weight: 600; color: #666; cursor: pointer; border-bottom: 3px solid transparent; }}
         .tab.active {{ color: {colors['primary']}; border-bottom-color: {colors['primary']}; }}
         .breadcrumb {{ padding: 40px 60px; display: flex; gap: 12px; font-size: 14px; }}
-        .breadcrumb a {{ color: {colors['primary']}; text-decoration: none; }}
-    </style>
-</head>
-<body>
+        .breadcrumb a {{ color: {colors['primary']}; text-decoration: none; }}"""
+        html = """
+    <div class="sc-lead">
     <nav class="nav">
         <div class="nav-brand">Brand</div>
         <div class="nav-links">
@@ -2456,19 +2291,13 @@ class UniversalDesignGenerator:
     <div class="breadcrumb">
         <a href="#">Home</a> / <a href="#">Products</a> / <span>Item</span>
     </div>
-</body>
-</html>"""
-
-    def _components_modals(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Modal Components</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _components_modals(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', sans-serif; padding: 60px; background: #f3f4f6; display: flex; align-items: center; justify-content: center; min-height: 100vh; }}
+        .sc-lead {{ font-family: 'Inter', sans-serif; padding: 60px; background: #f3f4f6; display: flex; align-items: center; justify-content: center; min-height: 100vh; }}
         .modal {{ background: white; padding: 48px; border-radius: 24px; box-shadow: 0 20px 60px rgba(0,0,0,0.2); max-width: 500px; }}
         .modal-header {{ text-align: center; margin-bottom: 32px; }}
         .modal-icon {{ width: 80px; height: 80px; background: {colors['primary']}20; border-radius: 50%; display: flex; align-items: center; justify-content: center; margin: 0 auto 24px; font-size: 40px; }}
@@ -2477,10 +2306,9 @@ class UniversalDesignGenerator:
         .modal-actions {{ display: flex; gap: 16px; margin-top: 32px; }}
         .btn {{ flex: 1; padding: 16px; border: none; border-radius: 12px; font-size: 16px; font-weight: 700; cursor: pointer; }}
         .btn-primary {{ background: {colors['primary']}; color: white; }}
-        .btn-secondary {{ background: #e5e7eb; color: #333; }}
-    </style>
-</head>
-<body>
+        .btn-secondary {{ background: #e5e7eb; color: #333; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="modal">
         <div class="modal-header">
             <div class="modal-icon">✓</div>
@@ -2492,19 +2320,13 @@ class UniversalDesignGenerator:
             <button class="btn btn-primary">Continue</button>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _components_pricing(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Pricing Tables</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _components_pricing(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'SF Pro Display', sans-serif; padding: 80px 40px; background: #fafafa; }}
+        .sc-lead {{ font-family: 'SF Pro Display', sans-serif; padding: 80px 40px; background: #fafafa; }}
         .pricing-grid {{ display: grid; grid-template-columns: repeat(3, 1fr); gap: 32px; max-width: 1400px; margin: 0 auto; }}
         .pricing-card {{ background: white; padding: 48px; border-radius: 24px; box-shadow: 0 4px 20px rgba(0,0,0,0.08); text-align: center; }}
         .pricing-card.featured {{ background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); color: white; transform: scale(1.05); }}
@@ -2514,10 +2336,9 @@ class UniversalDesignGenerator:
         .features {{ list-style: none; margin-bottom: 40px; }}
         .features li {{ padding: 12px 0; border-bottom: 1px solid rgba(0,0,0,0.1); }}
         .cta-btn {{ width: 100%; padding: 16px; background: {colors['primary']}; color: white; border: none; border-radius: 12px; font-size: 16px; font-weight: 700; cursor: pointer; }}
-        .featured .cta-btn {{ background: white; color: {colors['primary']}; }}
-    </style>
-</head>
-<body>
+        .featured .cta-btn {{ background: white; color: {colors['primary']}; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="pricing-grid">
         <div class="pricing-card">
             <div class="plan-name">Starter</div>
@@ -2553,19 +2374,13 @@ class UniversalDesignGenerator:
             <button class="cta-btn">Contact Sales</button>
         </div>
     </div>
-</body>
-</html>"""
-
-    def _components_testimonials(self, colors: dict) -> str:
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Testimonials</title>
-    <style>
+    </div>"""
+        return Section(css, html)
+
+    def _components_testimonials(self, colors: dict) -> Section:
+        css = f"""
         * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Inter', sans-serif; padding: 100px 60px; background: linear-gradient(135deg, {colors['primary']}10, {colors['secondary']}10); }}
+        .sc-lead {{ font-family: 'Inter', sans-serif; padding: 100px 60px; background: linear-gradient(135deg, {colors['primary']}10, {colors['secondary']}10); }}
         .testimonials {{ max-width: 1400px; margin: 0 auto; }}
         .testimonials h2 {{ font-size: 56px; font-weight: 900; text-align: center; margin-bottom: 80px; }}
         .testimonial-grid {{ display: grid; grid-template-columns: repeat(3, 1fr); gap: 40px; }}
@@ -2574,10 +2389,9 @@ class UniversalDesignGenerator:
         .testimonial-author {{ display: flex; align-items: center; gap: 16px; }}
         .author-avatar {{ width: 56px; height: 56px; background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); border-radius: 50%; }}
         .author-info h4 {{ font-size: 16px; font-weight: 700; margin-bottom: 4px; }}
-        .author-info p {{ font-size: 14px; color: #666; }}
-    </style>
-</head>
-<body>
+        .author-info p {{ font-size: 14px; color: #666; }}"""
+        html = """
+    <div class="sc-lead">
     <div class="testimonials">
         <h2>What People Say</h2>
         <div class="testimonial-grid">
@@ -2613,64 +2427,77 @@ class UniversalDesignGenerator:
             </div>
         </div>
     </div>
-</body>
-</html>"""
+    </div>"""
+        return Section(css, html)
     
     # ===== 메인 생성 함수 =====
-    def generate_design(self, category: str) -> str:
-        """카테고리별 디자인 생성 (랜덤 색상)"""
-        colors = random.choice(COLOR_PALETTES)
-        
-        generators = {
-            "Landing Page": self.generate_landing_page,
-            "Dashboard": self.generate_dashboard,
-            "E-commerce": self.generate_ecommerce,
-            "Portfolio": self.generate_portfolio,
-            "Blog": self.generate_blog,
-            "Components": self.generate_components,
+    def get_lead_layouts(self, category: str) -> Dict[str, Callable[[dict], Section]]:
+        """카테고리별 리드 섹션 목록"""
+        leads = {
+            "Landing Page": self._landing_page_leads,
+            "Dashboard": self._dashboard_leads,
+            "E-commerce": self._ecommerce_leads,
+            "Portfolio": self._portfolio_leads,
+            "Blog": self._blog_leads,
+            "Components": self._components_leads,
         }
-        
-        return generators[category](colors)
+        return leads[category]()
+
+    def compose_unique_spec(self, category: str, max_attempts: int = 50) -> Optional[Tuple[Dict[str, Any], str]]:
+        """렌더링 없이 조합 스펙만 뽑아 스펙 해시 set 조회로 중복 검사"""
+        lead_types = list(self.get_lead_layouts(category))
+        for _ in range(max_attempts):
+            spec = section_composer.sample_spec(category, lead_types)
+            spec_hash = section_composer.spec_hash(spec)
+            if spec_hash not in self.used_specs:
+                self.used_specs.add(spec_hash)
+                return spec, spec_hash
+        return None
+
+    def generate_design(self, category: str, spec: Dict[str, Any]) -> section_composer.Skeleton:
+        """조합 스펙을 색상 슬롯 스켈레톤으로 한 번 렌더링 (팔레트는 호출자가 채움)"""
+        lead_fn = self.get_lead_layouts(category)[spec["lead"]]
+        self.last_layout_type = spec["lead"]
+        return section_composer.render_skeleton(spec, lead_fn, f"{category} Design")
     
     async def capture_screenshot(self, html_code: str) -> bytes:
         """스크린샷 생성"""
         print("📸 Capturing screenshot...")
-        async with async_playwright() as p:
-            browser = await p.chromium.launch()
-            page = await browser.new_page(viewport={'width': 1920, 'height': 1400})
-            await page.set_content(html_code)
-            await page.wait_for_timeout(1000)
-            screenshot = await page.screenshot(full_page=True, type='png')
-            await browser.close()
+        capture = await get_capture_service()
+        screenshot = await capture.screenshot(html_code, viewport={'width': 1920, 'height': 1400})
         print("✅ Screenshot captured")
         return screenshot
     
-    def upload_to_storage(self, image_data: bytes, filename: str) -> str:
-        """Supabase Storage 업로드"""
-        print(f"📤 Uploading: {filename}")
-        file_path = f"designs/{filename}"
-        supabase.storage.from_('designs-bucket').upload(
-            file_path, image_data, file_options={"content-type": "image/png"}
+    def publish(self, job: Dict[str, Any]) -> str:
+        """스크린샷 + 레코드를 outbox 에 적재 (업로드/DB 저장/IndexNow 는 드레인 워커)"""
+        print(f"📮 Queued for publish: {job['design_data']['title']}")
+        return self.outbox.enqueue(
+            job["design_data"], job.pop("screenshot"),
+            bucket=STORAGE_BUCKET, image_path=f"{STORAGE_FOLDER}/{job['filename']}",
         )
-        public_url = supabase.storage.from_('designs-bucket').get_public_url(file_path)
-        print(f"✅ Uploaded")
-        return public_url
     
-    def save_to_database(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Database 저장"""
-        print(f"💾 Saving: {data['title']}")
-        response = supabase.table('designs').insert(data).execute()
-        print("✅ Saved to database")
-        return response.data[0]
+    def _on_published(self, entry: Dict[str, Any]) -> None:
+        """outbox 게시 완료 훅: IndexNow 알림 + 결과 출력"""
+        record = entry["record"]
+        try:
+            notify_indexnow_for_design(entry["id"], record["category"])
+        except Exception as exc:
+            print(f"⚠️ IndexNow notification failed: {exc}")
+        self.design_count += 1
+        print(f"\n🎉 Design created!")
+        print(f"ID: {entry['id']}")
+        print(f"Category: {record['category']}")
+        print(f"URL: {entry['image_url']}\n")
     
-    async def create_unique_design(self, category: str, max_attempts: int = 10) -> Dict[str, Any]:
-        """고유한 디자인 생성 (색상 변형 포함)"""
+    async def prepare_design(self, category: str, max_attempts: int = 50) -> Dict[str, Any]:
+        """렌더 단계: 구조 선택 + HTML 렌더링 + 메타데이터 (번호/슬러그는 호출 순서대로 부여)"""
+        number = self.next_number
         
         print(f"\n{'='*70}")
-        print(f"🎨 Creating {category} design #{self.design_count + 1}")
+        print(f"🎨 Creating {category} design #{number}")
         print(f"{'='*70}\n")
         
-        external_entry = self._pop_external_design(category)
+        external_entry = await self._pop_external_design(category)
         html_code = None
         external_description = None
         prompt_context = None
@@ -2686,69 +2513,202 @@ class UniversalDesignGenerator:
                 external_description = None
                 prompt_context = None
 
+        composed_spec = None
+        spec_hash = None
+        color_variations: Optional[Dict[str, Any]] = None
+        base_colors: Optional[Dict[str, str]] = None
         if html_code is None:
-            # 고유한 구조 생성
-            for attempt in range(max_attempts):
-                print(f"🔄 Attempt {attempt + 1}/{max_attempts}")
-                html_code = self.generate_design(category)
-                
-                if self.is_unique_structure(html_code):
-                    print("✅ Unique structure generated")
+            # 고유한 조합 스펙 선택 (렌더링 전 스펙 해시 검사) 후 한 번만 렌더링.
+            # 렌더 결과의 구조 해시가 기존 행(외부/레거시 포함)과 겹치면 다른 스펙으로 다시 뽑음
+            for _ in range(max_attempts):
+                picked = self.compose_unique_spec(category, max_attempts)
+                if picked is None:
+                    break
+                composed_spec, spec_hash = picked
+                skeleton = self.generate_design(category, composed_spec)
+                # 기본 색상은 랜덤, 나머지 팔레트는 목록으로만 저장 (변형은 읽는 쪽이 :root 의 --palette-* 만 교체)
+                base_palette = random.choice(COLOR_PALETTES)
+                html_code = skeleton.fill(base_palette)
+                structure_hash = self.get_structure_hash(html_code)
+                if structure_hash not in self.used_hashes:
                     break
-            else:
+                html_code = None
+            if html_code is None:
                 raise Exception("Failed to generate unique structure")
+            self.used_hashes.add(structure_hash)
+            block_names = [name for name, _ in composed_spec["blocks"]]
+            print(f"✅ Unique composition: {composed_spec['lead']} + {', '.join(block_names)}")
+            base_colors = {slot: base_palette[slot] for slot in section_composer.PALETTE_SLOTS}
+            color_variations = section_composer.color_variations(base_palette, COLOR_PALETTES)
+            print(f"🎨 Rendered once, {len(COLOR_PALETTES)} palette(s) available, base: {base_palette['name']}")
         else:
+            structure_hash = self.get_structure_hash(html_code)
             # 외부 구조는 충돌 검사를 통과했다고 가정하고 해시만 등록
-            self.used_hashes.add(self.get_structure_hash(html_code))
+            self.used_hashes.add(structure_hash)
         
-        # 기본 색상으로 스크린샷
-        screenshot = await self.capture_screenshot(html_code)
+        # 번호는 렌더가 끝난 디자인에만 소비 (실패한 조합은 번호를 남기지 않음)
+        self.next_number += 1
         
-        # 업로드
+        # 업로드 파일명
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{timestamp}_{category.replace(' ', '_').lower()}_{self.design_count}.png"
-        image_url = self.upload_to_storage(screenshot, filename)
-        
-        # 색상 변형 정보 (프론트에서 사용)
-        color_variations = json.dumps([
-            {"name": palette["name"], "colors": palette} 
-            for palette in COLOR_PALETTES
-        ])
+        filename = f"{timestamp}_{category.replace(' ', '_').lower()}_{number}.png"
         
         # 레이아웃 타입에 따른 고유한 설명 생성 (외부 조합 우선)
         layout_hint = self.last_layout_type or "external_layout"
         unique_description = external_description or self.get_description_by_layout(category, layout_hint)
+        if composed_spec:
+            unique_description = f"{unique_description} {section_composer.describe_spec(composed_spec)}"
         
-        # DB 저장
-        slug_value = self._generate_slug(category)
+        # DB 레코드 (image_url 은 업로드 단계에서 채움)
+        slug_value = self._generate_slug(category, number)
         if prompt_context:
             style_label = prompt_context.get('style', {}).get('label')
             prompt_meta = f"External combo {prompt_context.get('id')} | Style: {style_label}"
         else:
-            prompt_meta = f"Structure #{self.design_count} | Hash: {self.get_structure_hash(html_code)[:12]} | Layout: {self.last_layout_type}"
+            prompt_meta = f"Structure #{number - 1} | Hash: {structure_hash[:12]} | Layout: {self.last_layout_type} + {'+'.join(block_names)}"
 
         design_data = {
-            "title": f"{category} Design #{self.design_count + 1}",
+            "title": f"{category} Design #{number}",
             "description": unique_description,
-            "image_url": image_url,
+            "image_url": None,
             "category": category,
             "code": html_code,
             "slug": slug_value,
             "prompt": prompt_meta,
-            # color_variations를 metadata나 별도 필드로 저장할 수 있음
         }
+        if base_colors:
+            design_data["colors"] = list(base_colors.values())
+        if color_variations and self.has_color_variations_column:
+            # 색상 변형 (프론트 상세보기에서 선택 — lib/palette.ts applyPalette 가 code 의 --palette-* 선언만 교체)
+            design_data["color_variations"] = color_variations
+        if self.has_structure_hash_column:
+            design_data["structure_hash"] = structure_hash
+        if spec_hash and self.has_spec_hash_column:
+            design_data["spec_hash"] = spec_hash
         
-        result = self.save_to_database(design_data)
+        return {
+            "number": number,
+            "category": category,
+            "filename": filename,
+            "design_data": design_data,
+        }
 
-        notify_indexnow_for_design(result.get('id'), category)
-        
-        print(f"\n🎉 Design created!")
-        print(f"ID: {result['id']}")
-        print(f"Category: {category}")
-        print(f"URL: {result['image_url']}\n")
+
+PIPELINE_STAGES = ("render", "capture", "publish")
+
+
+class DesignPipeline:
+    """render → capture → publish 단계별 asyncio 파이프라인
+
+    단계 사이는 크기 제한 큐로 연결되어 느린 단계가 앞 단계를 자연스럽게 멈춘다.
+    render 는 번호/슬러그를 요청 순서대로 부여하기 위해 단일 워커로, publish 는
+    먼저 렌더된 디자인부터 outbox 에 적재하도록 순서 버퍼를 거친다. capture 는
+    --concurrency 만큼 동시에 실행되고, 업로드/DB 저장/IndexNow 는 outbox 드레인
+    워커가 적재 순서대로 (업로드는 --concurrency 만큼 동시에) 처리한다.
+    """
+
+    def __init__(self, generator: UniversalDesignGenerator, concurrency: int = 2,
+                 retry_failed: bool = False, max_failures: Optional[int] = None):
+        self.generator = generator
+        self.concurrency = max(1, concurrency)
+        self.limits = {
+            "render": 1,
+            "capture": self.concurrency,
+            "publish": 1,
+        }
+        self.retry_failed = retry_failed
+        self.max_failures = max_failures
+        self.requests: "asyncio.Queue[str]" = asyncio.Queue()
+        self.queues: Dict[str, asyncio.Queue] = {
+            stage: asyncio.Queue(maxsize=self.concurrency * 2) for stage in PIPELINE_STAGES[1:]
+        }
+        self.outstanding = 0
+        self.failures = 0
+        self.results: List[Dict[str, Any]] = []
+        self._done = asyncio.Event()
+        # publish 순서 버퍼: 렌더 순번(seq) → job (실패 시 None)
+        self._next_seq = 0
+        self._commit_seq = 0
+        self._ready: Dict[int, Optional[Dict[str, Any]]] = {}
+
+    def _resolve(self) -> None:
+        self.outstanding -= 1
+        if self.outstanding <= 0:
+            self._done.set()
+
+    def _fail(self, stage: str, job: Dict[str, Any], exc: Exception) -> None:
+        self.failures += 1
+        label = f"#{job['number']}" if 'number' in job else ''
+        print(f"\n❌ Error [{stage}] {job['category']} {label}: {exc}\n")
+        if 'seq' in job and stage != "publish":
+            self._commit(job['seq'], None)
+        if self.retry_failed and (self.max_failures is None or self.failures < self.max_failures):
+            # 새 요청으로 다시 렌더 (번호/슬러그는 새로 부여)
+            self.requests.put_nowait(job['category'])
+        else:
+            self._resolve()
+
+    async def _render(self, job: Dict[str, Any]) -> None:
+        job.update(await self.generator.prepare_design(job['category']))
+        job['seq'] = self._next_seq
+        self._next_seq += 1
+        await self.queues["capture"].put(job)
+
+    async def _capture(self, job: Dict[str, Any]) -> None:
+        job['screenshot'] = await self.generator.capture_screenshot(job['design_data']['code'])
+        await self.queues["publish"].put(job)
+
+    async def _publish(self, job: Dict[str, Any]) -> None:
+        self._commit(job['seq'], job)
+
+    def _commit(self, seq: int, job: Optional[Dict[str, Any]]) -> None:
+        """렌더 순서대로 outbox 적재. 앞 순번이 아직 캡처 중이면 버퍼에 보관."""
+        self._ready[seq] = job
+        while self._commit_seq in self._ready:
+            ready = self._ready.pop(self._commit_seq)
+            self._commit_seq += 1
+            if ready is None:
+                continue
+            try:
+                ready['design_data']['id'] = self.generator.publish(ready)
+            except Exception as exc:
+                self._fail("publish", ready, exc)
+                continue
+            self.results.append(ready['design_data'])
+            self._resolve()
+
+    async def _worker(self, stage: str, inbox: asyncio.Queue) -> None:
+        handler = getattr(self, f"_{stage}")
+        while True:
+            item = await inbox.get()
+            job = {'category': item} if stage == "render" else item
+            try:
+                await handler(job)
+            except Exception as exc:
+                self._fail(stage, job, exc)
+            finally:
+                inbox.task_done()
+
+    async def run(self, categories: List[str]) -> List[Dict[str, Any]]:
+        """categories 순서대로 디자인을 생성하고, outbox 에 적재된 레코드를 반환"""
+        if not categories:
+            return []
+        self.outstanding = len(categories)
+        for category in categories:
+            self.requests.put_nowait(category)
         
-        self.design_count += 1
-        return result
+        workers = []
+        for stage in PIPELINE_STAGES:
+            inbox = self.requests if stage == "render" else self.queues[stage]
+            for _ in range(self.limits[stage]):
+                workers.append(asyncio.create_task(self._worker(stage, inbox)))
+        try:
+            await self._done.wait()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return self.results
 
 
 async def main():
@@ -2759,9 +2719,20 @@ async def main():
     parser.add_argument('--count', type=int, default=1, help='Number of designs per category')
     parser.add_argument('--total', type=int, help='Total number of designs to create across all categories')
     parser.add_argument('--category', type=str, help='Specific category')
+    parser.add_argument('--concurrency', type=int, default=2,
+                        help='Concurrent designs per pipeline stage (capture/upload/notify)')
+    parser.add_argument('--low-watermark', type=int, default=REFILL_LOW_WATERMARK,
+                        help='Refill external combos in the background when a category drops below this size')
+    parser.add_argument('--backfill-hashes', action='store_true',
+                        help='One-time: fill designs.structure_hash for existing rows, then exit')
     args = parser.parse_args()
+
+    if args.backfill_hashes:
+        UniversalDesignGenerator.backfill_structure_hashes()
+        return
     
-    generator = UniversalDesignGenerator()
+    generator = UniversalDesignGenerator(low_watermark=args.low_watermark,
+                                         upload_concurrency=args.concurrency)
     
     # 카테고리 선택
     if args.category and args.category in CATEGORIES:
@@ -2769,37 +2740,32 @@ async def main():
     else:
         categories = CATEGORIES
 
-    async def wait_between_runs(current: int, target: int) -> None:
-        if current < target:
-            print("⏳ Waiting...\n")
-            await asyncio.sleep(2)
-
-    # 전체 생성 개수 우선
+    # 전체 생성 개수 우선 (실패분은 다시 요청해 목표 개수를 채움)
     if args.total and args.total > 0:
-        total_target = args.total
-        produced = 0
-        while produced < total_target:
-            category = categories[produced % len(categories)]
-            try:
-                await generator.create_unique_design(category)
-                produced += 1
-                await wait_between_runs(produced, total_target)
-            except Exception as e:
-                print(f"\n❌ Error: {e}\n")
-                continue
+        requested = [categories[i % len(categories)] for i in range(args.total)]
+        pipeline = DesignPipeline(generator, args.concurrency, retry_failed=True,
+                                  max_failures=args.total * 3)
     else:
         # 각 카테고리별로 디자인 생성
-        for category in categories:
-            for i in range(args.count):
-                try:
-                    await generator.create_unique_design(category)
-                    await wait_between_runs(i + 1, args.count)
-                except Exception as e:
-                    print(f"\n❌ Error: {e}\n")
-                    continue
+        requested = [category for category in categories for _ in range(args.count)]
+        pipeline = DesignPipeline(generator, args.concurrency)
+
+    try:
+        # 시작 시점에 이미 부족한 카테고리는 캡처 준비와 동시에 보충 시작
+        generator.refiller.maybe_refill()
+        await get_capture_service(args.concurrency)
+        async with generator.outbox:
+            results = await pipeline.run(requested)
+    finally:
+        await generator.refiller.close()
+        await shutdown_capture_service()
     
+    pending = generator.outbox.counts()
     print(f"\n{'='*70}")
-    print(f"🎉 Completed! Total: {generator.design_count} designs")
+    print(f"🎉 Completed! Created: {len(results)}/{len(requested)} | Published: {generator.outbox.published} | Total: {generator.design_count} designs")
+    if pending:
+        print(f"📮 Left in outbox for the next run: {pending}")
+    print(f"🔁 External refill: {json.dumps(generator.refiller.metrics(), ensure_ascii=False)}")
     print(f"{'='*70}\n")
 
 
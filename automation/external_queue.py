@@ -0,0 +1,319 @@
+"""
+External combo queue
+advanced_generator.js 가 만든 구조/스타일 조합을 보관하는 append-only 큐
+
+- 로그: JSONL 한 줄 = 조합 하나 (추가는 파일 끝에 append 만)
+- 커서: 카테고리별 소비 개수만 담은 작은 JSON (pop 마다 이 파일만 교체)
+- 메모리에는 각 조합의 바이트 오프셋만 두고, HTML 본문은 pop 시점에 seek 해서 읽음
+- 비정상 종료로 잘린 마지막 줄은 시작 시 잘라내고 (중간의 깨진 줄은 건너뛰고 경고만), 소비가 끝난 앞부분은 시작 시 압축
+  (압축으로 지운 항목의 키는 헤더의 retired_keys 로 넘겨 같은 조합이 다시 적재되지 않게 함)
+- QueueRefiller: low-watermark 아래로 내려간 카테고리가 생기면 백그라운드에서 보충
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
+
+QUEUE_VERSION = 1
+REFILL_LOW_WATERMARK = 2
+REFILL_ATTEMPTS = 5
+# 소비된 항목이 이 개수 이상이고 로그의 절반을 넘으면 시작 시 로그를 다시 씀
+COMPACT_MIN_CONSUMED = 200
+
+
+def _entry_key(entry: Dict[str, Any]) -> str:
+    """중복 적재 방지용 키 (id 우선, 없으면 HTML 해시)"""
+    if entry.get('id') not in (None, ''):
+        return str(entry['id'])
+    return hashlib.md5(str(entry.get('html', '')).encode('utf-8')).hexdigest()
+
+
+class ExternalComboQueue:
+    """카테고리별 FIFO. pop / append 는 O(1) 파일 I/O."""
+
+    def __init__(self, log_path: str, cursor_path: str, categories: Iterable[str]):
+        self.log_path = log_path
+        self.cursor_path = cursor_path
+        self.categories = list(categories)
+        self.log_id = ""
+        self.offsets: Dict[str, Deque[int]] = {cat: deque() for cat in self.categories}
+        self.consumed: Dict[str, int] = {cat: 0 for cat in self.categories}
+        self.keys: Set[str] = set()
+        self._load()
+
+    # ── 상태 ──────────────────────────────────────────────────────────────
+    def size(self, category: str) -> int:
+        return len(self.offsets.get(category, ()))
+
+    def sizes(self) -> Dict[str, int]:
+        return {cat: len(bucket) for cat, bucket in self.offsets.items()}
+
+    # ── 로드 / 복구 ───────────────────────────────────────────────────────
+    def _read_cursor(self) -> Dict[str, Any]:
+        try:
+            with open(self.cursor_path, 'r', encoding='utf-8') as cursor_file:
+                data = json.load(cursor_file)
+            if isinstance(data, dict) and data.get('version') == QUEUE_VERSION:
+                return data
+        except FileNotFoundError:
+            pass
+        except Exception as exc:
+            print(f"⚠️ External queue cursor unreadable, replaying from start: {exc}")
+        return {}
+
+    def _write_cursor(self) -> None:
+        tmp_path = f"{self.cursor_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as cursor_file:
+            json.dump({"version": QUEUE_VERSION, "log_id": self.log_id, "consumed": self.consumed}, cursor_file)
+            cursor_file.flush()
+            os.fsync(cursor_file.fileno())
+        os.replace(tmp_path, self.cursor_path)
+
+    def _new_log(self, entries: List[bytes], retired_keys: Iterable[str] = ()) -> None:
+        """헤더(log_id, 이미 소비돼 지운 항목의 키) + 남은 항목으로 로그를 원자적으로 교체하고 커서를 0으로."""
+        self.log_id = uuid.uuid4().hex
+        header = {"log_id": self.log_id, "version": QUEUE_VERSION, "retired_keys": sorted(retired_keys)}
+        tmp_path = f"{self.log_path}.tmp"
+        with open(tmp_path, 'wb') as log_file:
+            log_file.write(json.dumps(header).encode('utf-8') + b"\n")
+            log_file.writelines(entries)
+            log_file.flush()
+            os.fsync(log_file.fileno())
+        os.replace(tmp_path, self.log_path)
+        # 로그 교체 후 커서가 이전 log_id 를 가리키면 새 로그 기준 0부터 읽으므로 안전
+        self.consumed = {cat: 0 for cat in self.categories}
+        self._write_cursor()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.log_path):
+            self._new_log([])
+            return
+
+        cursor = self._read_cursor()
+        lines: List[tuple] = []  # (offset, category, raw, key)
+        valid_end = 0
+        self.log_id = ''
+        size = os.path.getsize(self.log_path)
+        with open(self.log_path, 'rb') as log_file:
+            while True:
+                offset = log_file.tell()
+                raw = log_file.readline()
+                if not raw:
+                    break
+                if not raw.endswith(b"\n"):
+                    break  # 쓰다 만 마지막 줄
+                try:
+                    entry = json.loads(raw)
+                except Exception:
+                    entry = None
+                if not isinstance(entry, dict):
+                    if log_file.tell() >= size:
+                        break  # 마지막 줄이 깨짐 → 쓰다 만 줄로 보고 잘라냄
+                    # 중간 줄이 깨짐 → 그 줄만 건너뛰고 뒤의 정상 항목은 계속 읽음
+                    print(f"⚠️ Skipping unreadable external queue line at byte {offset}")
+                    valid_end = log_file.tell()
+                    continue
+                if offset == 0 and entry.get('log_id'):
+                    # 헤더 — 헤더가 없는 예전 로그는 첫 줄도 항목으로 읽음
+                    self.log_id = entry['log_id']
+                    self.keys.update(entry.get('retired_keys', []))
+                    valid_end = log_file.tell()
+                    continue
+                valid_end = log_file.tell()
+                category = entry.get('category')
+                key = _entry_key(entry)
+                self.keys.add(key)
+                if category in self.offsets:
+                    lines.append((offset, category, raw, key))
+
+        if not self.log_id or valid_end == 0:
+            print("⚠️ External queue log header missing; starting a fresh queue.")
+            self._new_log([raw for _, _, raw, _ in lines],
+                          retired_keys=self.keys - {key for _, _, _, key in lines})
+            self._load()
+            return
+        if valid_end < size:
+            print("⚠️ Truncating partially written tail of the external queue log.")
+            with open(self.log_path, 'r+b') as log_file:
+                log_file.truncate(valid_end)
+
+        consumed = cursor.get('consumed', {}) if cursor.get('log_id') == self.log_id else {}
+        skip = {cat: int(consumed.get(cat, 0)) for cat in self.categories}
+        self.consumed = dict(skip)
+        remaining: List[bytes] = []
+        remaining_keys: Set[str] = set()
+        for offset, category, raw, key in lines:
+            if skip[category] > 0:
+                skip[category] -= 1
+                continue
+            self.offsets[category].append(offset)
+            remaining.append(raw)
+            remaining_keys.add(key)
+
+        total_consumed = len(lines) - len(remaining)
+        if total_consumed >= COMPACT_MIN_CONSUMED and total_consumed * 2 >= len(lines):
+            print(f"🧹 Compacting external queue ({total_consumed} consumed / {len(lines)} logged)")
+            self._new_log(remaining, retired_keys=self.keys - remaining_keys)
+            self.offsets = {cat: deque() for cat in self.categories}
+            self.keys = set()
+            self._load()
+            return
+
+        if self.log_id != cursor.get('log_id'):
+            self._write_cursor()
+
+    # ── 큐 연산 ───────────────────────────────────────────────────────────
+    def append(self, entries: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """새 조합을 로그 끝에 추가. 이미 적재된 조합(id/HTML 동일)은 건너뜀."""
+        added = {cat: 0 for cat in self.categories}
+        with open(self.log_path, 'ab') as log_file:
+            for entry in entries:
+                category = entry.get('category')
+                key = _entry_key(entry)
+                if category not in self.offsets or key in self.keys:
+                    continue
+                offset = log_file.tell()
+                log_file.write(json.dumps(entry, ensure_ascii=False).encode('utf-8') + b"\n")
+                self.offsets[category].append(offset)
+                self.keys.add(key)
+                added[category] += 1
+            log_file.flush()
+            os.fsync(log_file.fileno())
+        return added
+
+    def pop(self, category: str) -> Optional[Dict[str, Any]]:
+        """카테고리의 가장 오래된 조합을 꺼내고 소비 커서를 기록."""
+        bucket = self.offsets.get(category)
+        if not bucket:
+            return None
+        offset = bucket.popleft()
+        with open(self.log_path, 'rb') as log_file:
+            log_file.seek(offset)
+            entry = json.loads(log_file.readline())
+        self.consumed[category] += 1
+        self._write_cursor()
+        return entry
+
+    def ingest_batch_file(self, batch_path: str) -> Dict[str, int]:
+        """advanced_generator.js 출력(JSON 배열)을 로그에 적재한 뒤 파일 제거.
+
+        적재 후 삭제 전에 종료돼도 다음 적재에서 id 기준으로 중복이 걸러진다.
+        """
+        if not os.path.exists(batch_path):
+            return {cat: 0 for cat in self.categories}
+        with open(batch_path, 'r', encoding='utf-8') as batch_file:
+            data = json.load(batch_file)
+        added = self.append(data if isinstance(data, list) else [])
+        os.remove(batch_path)
+        return added
+
+
+class QueueRefiller:
+    """카테고리 잔량이 low_watermark 미만이면 advanced_generator.js 를 비동기 서브프로세스로 실행.
+
+    한 번에 하나의 보충만 진행되며, 소비자는 큐가 완전히 비었을 때만 ensure() 로 기다린다.
+    """
+
+    def __init__(self, queue: ExternalComboQueue, script_path: str, batch_path: str,
+                 low_watermark: int = REFILL_LOW_WATERMARK, max_attempts: int = REFILL_ATTEMPTS):
+        self.queue = queue
+        self.script_path = script_path
+        self.batch_path = batch_path
+        self.low_watermark = max(1, low_watermark)
+        self.max_attempts = max_attempts
+        self.enabled = os.path.exists(script_path)
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.failures = 0
+        self.latencies: List[float] = []
+        self.added: Dict[str, int] = {cat: 0 for cat in queue.categories}
+        if not self.enabled:
+            print("⚠️ advanced_generator.js not found; external combos will not be refilled.")
+
+    def low_categories(self) -> List[str]:
+        return [cat for cat, count in self.queue.sizes().items() if count < self.low_watermark]
+
+    def maybe_refill(self) -> Optional[asyncio.Task]:
+        """잔량이 부족한 카테고리가 있으면 보충 작업을 시작 (이미 진행 중이면 그 작업 반환)."""
+        if not self.enabled:
+            return None
+        if self._task and not self._task.done():
+            return self._task
+        low = self.low_categories()
+        if not low:
+            return None
+        print(f"🔁 External queue below {self.low_watermark} for {', '.join(low)}; refilling in background...")
+        self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def ensure(self, category: str) -> bool:
+        """카테고리가 비었을 때 보충이 끝날 때까지 대기 (최대 max_attempts 회 실행)."""
+        for _ in range(self.max_attempts):
+            if self.queue.size(category):
+                return True
+            task = self.maybe_refill()
+            if task is None:
+                break
+            # 소비자가 취소돼도 진행 중인 보충은 끝까지 실행
+            await asyncio.shield(task)
+        return self.queue.size(category) > 0
+
+    async def _run(self) -> int:
+        self.runs += 1
+        started = time.monotonic()
+        proc = None
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "node", self.script_path, cwd=os.path.dirname(self.script_path) or None,
+            )
+            returncode = await proc.wait()
+            if returncode != 0:
+                raise RuntimeError(f"exit {returncode}")
+            added = self.queue.ingest_batch_file(self.batch_path)
+        except FileNotFoundError:
+            print("❌ Node.js is missing. Install Node 18+ to enable auto-refresh.")
+            self.enabled = False
+            self.failures += 1
+            return 0
+        except asyncio.CancelledError:
+            if proc and proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            raise
+        except Exception as exc:
+            self.failures += 1
+            print(f"⚠️ Advanced generator refill failed: {exc}")
+            return 0
+
+        elapsed = time.monotonic() - started
+        self.latencies.append(elapsed)
+        total = 0
+        for category, count in added.items():
+            self.added[category] += count
+            total += count
+        if total:
+            print(f"✨ Added {total} new external combo(s) to the queue in {elapsed:.1f}s.")
+        else:
+            print("⚠️ Advanced generator returned 0 usable combos.")
+        return total
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "avg_latency_s": round(sum(self.latencies) / len(self.latencies), 2) if self.latencies else None,
+            "max_latency_s": round(max(self.latencies), 2) if self.latencies else None,
+            "added": dict(self.added),
+            "queue": self.queue.sizes(),
+        }
+
+    async def close(self) -> None:
+        """진행 중인 보충 서브프로세스를 정리."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
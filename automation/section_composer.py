@@ -0,0 +1,605 @@
+"""
+Section Composer - 재사용 섹션 블록 조합기
+
+- 리드 섹션(기존 카테고리별 레이아웃) + 보조 섹션 블록(피처 그리드, 가격표, 푸터 등)을 조합
+- 각 블록은 구조 파라미터(열 수, 항목 수, 정렬 등)를 받아 CSS/HTML 조각을 반환
+- 구조 해시는 렌더링 전에 조합 스펙(JSON)에서 바로 계산 → 중복 검사는 set 조회 한 번
+- 색상 플레이스홀더로 한 번만 렌더링한 스켈레톤의 슬롯을 CSS 사용자 정의 속성(var(--palette-primary) 등)으로
+  채우고 실제 색상은 :root 선언 한 곳에만 둠 → 나머지 팔레트는 팔레트 목록만 저장하고, 읽는 쪽(lib/palette.ts)이
+  :root 의 --palette-* 값만 바꿔 변형 생성 (문서 본문이 수정돼도 속성 이름으로 찾으므로 안전)
+"""
+
+import hashlib
+import json
+import random
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class Section(NamedTuple):
+    """섹션 하나의 CSS 규칙과 HTML 마크업"""
+    css: str
+    html: str
+
+
+class Skeleton(NamedTuple):
+    """색상 슬롯으로 분할된 렌더링 결과 (짝수 인덱스 = 고정 텍스트, 홀수 인덱스 = 슬롯 이름)"""
+    segments: Tuple[str, ...]
+
+    def fill(self, colors: dict) -> str:
+        """슬롯을 var(--palette-<slot>[-<alpha>]) 로 바꾸고 colors 값을 첫 <style> 의 :root 에 선언."""
+        parts = [self.segments[0]]
+        declared: Dict[str, str] = {}
+        for idx in range(1, len(self.segments), 2):
+            slot, text = self.segments[idx], self.segments[idx + 1]
+            # 슬롯 바로 뒤 2자리 hex 는 알파 접미사 (예: {primary}20) → 알파별 속성으로 분리
+            alpha = _ALPHA_RE.match(text)
+            suffix = alpha.group(0).lower() if alpha else ""
+            name = palette_var(slot, suffix)
+            declared[name] = colors[slot] + suffix
+            parts.append(f"var({name})")
+            parts.append(text[alpha.end():] if alpha else text)
+        root = " ".join(f"{name}: {value};" for name, value in declared.items())
+        return "".join(parts).replace("<style>", f"<style>\n        :root {{ {root} }}", 1)
+
+
+# 팔레트에서 치환되는 색상 슬롯
+PALETTE_SLOTS = ("primary", "secondary", "accent")
+_SLOT_MARK = "\x00"
+_SLOT_RE = re.compile(f"{_SLOT_MARK}(\\w+){_SLOT_MARK}")
+# 문서 안 색상 슬롯 = CSS 사용자 정의 속성 (lib/palette.ts 가 같은 이름으로 값을 바꿈)
+PALETTE_VAR_PREFIX = "--palette-"
+_ALPHA_RE = re.compile(r"[0-9a-fA-F]{2}(?![0-9a-zA-Z])")
+
+# 스펙에 포함되는 보조 블록 수 (리드 단독 조합은 기존 레이아웃과 동일하므로 최소 2개)
+MIN_BLOCKS = 2
+MAX_BLOCKS = 4
+
+
+# ===== 보조 섹션 블록 =====
+def _feature_grid(colors: dict, params: Dict[str, Any], category: str) -> Section:
+    features = [
+        ("⚡", "Instant Setup", "Go live in minutes with sensible defaults and zero config."),
+        ("🔒", "Secure by Default", "SSO, audit logs and encryption at rest out of the box."),
+        ("📈", "Real-time Insights", "Live metrics that update the moment something changes."),
+        ("🧩", "Integrations", "Connect 120+ tools your team already relies on."),
+        ("🌍", "Global Edge", "Served from 40 regions for sub-100ms responses."),
+        ("🤝", "Team Workflows", "Comments, mentions and approvals built into every view."),
+    ][:params["items"]]
+    align = params["align"]
+    cards = "\n".join(
+        f"""            <div class="sc-feature-card">
+                <div class="sc-feature-icon">{icon}</div>
+                <h3>{name}</h3>
+                <p>{text}</p>
+            </div>"""
+        for icon, name, text in features
+    )
+    css = f"""
+        .sc-features {{ padding: 96px 40px; background: #ffffff; }}
+        .sc-features h2 {{ font-size: 40px; font-weight: 800; text-align: {align}; max-width: 1200px; margin: 0 auto 48px; }}
+        .sc-feature-grid {{ display: grid; grid-template-columns: repeat({params['columns']}, 1fr); gap: 28px;
+                           max-width: 1200px; margin: 0 auto; }}
+        .sc-feature-card {{ padding: 36px; border-radius: 20px; background: #f8f9fb; text-align: {align};
+                           border-top: 4px solid {colors['primary']}; }}
+        .sc-feature-card h3 {{ font-size: 22px; margin: 16px 0 8px; }}
+        .sc-feature-card p {{ color: #666; line-height: 1.6; }}
+        .sc-feature-icon {{ font-size: 40px; }}"""
+    html = f"""
+    <section class="sc-features">
+        <h2>Why teams choose this {category.lower()}</h2>
+        <div class="sc-feature-grid">
+{cards}
+        </div>
+    </section>"""
+    return Section(css, html)
+
+
+def _stats_strip(colors: dict, params: Dict[str, Any], category: str) -> Section:
+    stats = [("98%", "Satisfaction"), ("12K+", "Active teams"), ("4.9★", "Average rating"), ("24/7", "Support")][:params["items"]]
+    cards = params["style"] == "cards"
+    items = "\n".join(
+        f"""            <div class="sc-stat{' sc-stat-card' if cards else ''}">
+                <div class="sc-stat-value">{value}</div>
+                <div class="sc-stat-label">{label}</div>
+            </div>"""
+        for value, label in stats
+    )
+    css = f"""
+        .sc-stats {{ padding: 72px 40px; background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); color: white; }}
+        .sc-stats-row {{ display: flex; justify-content: space-around; gap: 24px; flex-wrap: wrap; max-width: 1200px; margin: 0 auto; }}
+        .sc-stat {{ text-align: center; min-width: 180px; }}
+        .sc-stat-card {{ background: rgba(255,255,255,0.15); padding: 32px; border-radius: 20px; }}
+        .sc-stat-value {{ font-size: 48px; font-weight: 900; }}
+        .sc-stat-label {{ opacity: 0.85; margin-top: 6px; letter-spacing: 1px; text-transform: uppercase; font-size: 13px; }}"""
+    html = f"""
+    <section class="sc-stats">
+        <div class="sc-stats-row">
+{items}
+        </div>
+    </section>"""
+    return Section(css, html)
+
+
+def _pricing(colors: dict, params: Dict[str, Any], category: str) -> Section:
+    tiers = [
+        ("Starter", "$0", ["1 project", "Community support", "Basic analytics"]),
+        ("Pro", "$29", ["Unlimited projects", "Priority support", "Advanced analytics"]),
+        ("Team", "$79", ["Everything in Pro", "Roles & permissions", "Audit log"]),
+        ("Enterprise", "Custom", ["Dedicated manager", "SLA 99.99%", "SSO & SCIM"]),
+    ][:params["tiers"]]
+    highlight = len(tiers) // 2 if params["highlight"] == "middle" else len(tiers) - 1
+    cards = []
+    for idx, (name, price, perks) in enumerate(tiers):
+        perk_items = "".join(f"<li>{perk}</li>" for perk in perks)
+        featured = " sc-tier-featured" if idx == highlight else ""
+        cards.append(f"""            <div class="sc-tier{featured}">
+                <h3>{name}</h3>
+                <div class="sc-tier-price">{price}<span>/mo</span></div>
+                <ul>{perk_items}</ul>
+                <button class="sc-tier-btn">Choose {name}</button>
+            </div>""")
+    css = f"""
+        .sc-pricing {{ padding: 96px 40px; background: #fafafa; text-align: center; }}
+        .sc-pricing h2 {{ font-size: 40px; font-weight: 800; margin-bottom: 48px; }}
+        .sc-tier-grid {{ display: grid; grid-template-columns: repeat({len(tiers)}, minmax(220px, 320px));
+                        gap: 24px; justify-content: center; }}
+        .sc-tier {{ background: white; padding: 40px 32px; border-radius: 20px; border: 2px solid #eee; }}
+        .sc-tier-featured {{ border-color: {colors['primary']}; transform: scale(1.04);
+                            box-shadow: 0 20px 50px rgba(0,0,0,0.08); }}
+        .sc-tier-price {{ font-size: 44px; font-weight: 900; margin: 16px 0; color: {colors['primary']}; }}
+        .sc-tier-price span {{ font-size: 16px; color: #999; font-weight: 500; }}
+        .sc-tier ul {{ list-style: none; margin-bottom: 28px; line-height: 2; color: #555; }}
+        .sc-tier-btn {{ width: 100%; padding: 14px; border: none; border-radius: 12px; font-weight: 700;
+                       background: {colors['primary']}; color: white; cursor: pointer; }}"""
+    html = f"""
+    <section class="sc-pricing">
+        <h2>Simple, transparent pricing</h2>
+        <div class="sc-tier-grid">
+{chr(10).join(cards)}
+        </div>
+    </section>"""
+    return Section(css, html)
+
+
+def _testimonials(colors: dict, params: Dict[str, Any], category: str) -> Section:
+    quotes = [
+        ("It replaced three tools for us in the first week.", "Sarah Chen", "Head of Product, Northwind"),
+        ("The attention to detail shows in every single screen.", "Marcus Webb", "Design Lead, Helio"),
+        ("Our conversion rate went up 31% after the switch.", "Priya Nair", "Growth, Lumen Labs"),
+    ][:params["items"]]
+    stacked = params["layout"] == "stack"
+    cards = "\n".join(
+        f"""            <figure class="sc-quote">
+                <blockquote>“{quote}”</blockquote>
+                <figcaption><strong>{name}</strong><span>{role}</span></figcaption>
+            </figure>"""
+        for quote, name, role in quotes
+    )
+    columns = "1fr" if stacked else f"repeat({len(quotes)}, 1fr)"
+    css = f"""
+        .sc-testimonials {{ padding: 96px 40px; background: #ffffff; }}
+        .sc-quote-list {{ display: grid; grid-template-columns: {columns}; gap: 28px;
+                         max-width: {'760px' if stacked else '1200px'}; margin: 0 auto; }}
+        .sc-quote {{ padding: 36px; border-radius: 20px; background: #f7f7fb; border-left: 5px solid {colors['secondary']}; }}
+        .sc-quote blockquote {{ font-size: 20px; line-height: 1.6; margin-bottom: 20px; }}
+        .sc-quote figcaption {{ display: flex; flex-direction: column; gap: 4px; color: #666; font-size: 14px; }}
+        .sc-quote strong {{ color: #111; font-size: 16px; }}"""
+    html = f"""
+    <section class="sc-testimonials">
+        <div class="sc-quote-list">
+{cards}
+        </div>
+    </section>"""
+    return Section(css, html)
+
+
+def _cta_banner(colors: dict, params: Dict[str, Any], category: str) -> Section:
+    split = params["align"] == "split"
+    css = f"""
+        .sc-cta {{ padding: 80px 40px; background: {colors['secondary']}; color: white; }}
+        .sc-cta-inner {{ max-width: 1100px; margin: 0 auto; display: flex; gap: 32px; align-items: center;
+                        {'justify-content: space-between;' if split else 'flex-direction: column; text-align: center;'} }}
+        .sc-cta h2 {{ font-size: 40px; font-weight: 800; }}
+        .sc-cta p {{ opacity: 0.9; margin-top: 10px; font-size: 18px; }}
+        .sc-cta-btn {{ padding: 18px 44px; border-radius: 50px; border: none; font-weight: 700; font-size: 17px;
+                      background: white; color: {colors['secondary']}; cursor: pointer; }}"""
+    html = f"""
+    <section class="sc-cta">
+        <div class="sc-cta-inner">
+            <div>
+                <h2>Ready to ship your next {category.lower()}?</h2>
+                <p>Start free — no credit card required.</p>
+            </div>
+            <button class="sc-cta-btn">Get started free</button>
+        </div>
+    </section>"""
+    return Section(css, html)
+
+
+def _faq(colors: dict, params: Dict[str, Any], category: str) -> Section:
+    questions = [
+        ("Can I cancel anytime?", "Yes. Plans are month-to-month and you can downgrade in one click."),
+        ("Do you offer a free trial?", "Every paid plan starts with a 14-day trial with full access."),
+        ("Is my data secure?", "Data is encrypted in transit and at rest, with SOC 2 Type II controls."),
+        ("Can I import existing work?", "Import from CSV, Figma or our public API in a few minutes."),
+        ("Do you support teams?", "Invite unlimited viewers and manage roles per workspace."),
+    ][:params["items"]]
+    items = "\n".join(
+        f"""            <details class="sc-faq-item">
+                <summary>{question}</summary>
+                <p>{answer}</p>
+            </details>"""
+        for question, answer in questions
+    )
+    css = f"""
+        .sc-faq {{ padding: 96px 40px; background: #fafafa; }}
+        .sc-faq h2 {{ font-size: 36px; font-weight: 800; text-align: center; margin-bottom: 40px; }}
+        .sc-faq-list {{ display: grid; grid-template-columns: repeat({params['columns']}, 1fr); gap: 16px 28px;
+                       max-width: {'720px' if params['columns'] == 1 else '1100px'}; margin: 0 auto; }}
+        .sc-faq-item {{ background: white; padding: 22px 26px; border-radius: 14px; border: 1px solid #eee; }}
+        .sc-faq-item summary {{ font-weight: 700; cursor: pointer; }}
+        .sc-faq-item[open] summary {{ color: {colors['primary']}; }}
+        .sc-faq-item p {{ margin-top: 12px; color: #666; line-height: 1.6; }}"""
+    html = f"""
+    <section class="sc-faq">
+        <h2>Frequently asked questions</h2>
+        <div class="sc-faq-list">
+{items}
+        </div>
+    </section>"""
+    return Section(css, html)
+
+
+def _logo_wall(colors: dict, params: Dict[str, Any], category: str) -> Section:
+    logos = ["Northwind", "Helio", "Lumen", "Vertex", "Acme", "Orbit"][:params["items"]]
+    items = "\n".join(f'            <span class="sc-logo">{logo}</span>' for logo in logos)
+    css = f"""
+        .sc-logos {{ padding: 56px 40px; background: #ffffff; border-top: 1px solid #f0f0f0; border-bottom: 1px solid #f0f0f0; }}
+        .sc-logos p {{ text-align: center; color: #999; font-size: 13px; letter-spacing: 2px; text-transform: uppercase; margin-bottom: 28px; }}
+        .sc-logo-row {{ display: flex; justify-content: center; gap: 56px; flex-wrap: wrap; }}
+        .sc-logo {{ font-size: 22px; font-weight: 800; color: #b5b5c3; }}
+        .sc-logo:hover {{ color: {colors['primary']}; }}"""
+    html = f"""
+    <section class="sc-logos">
+        <p>Trusted by fast-moving teams</p>
+        <div class="sc-logo-row">
+{items}
+        </div>
+    </section>"""
+    return Section(css, html)
+
+
+def _newsletter(colors: dict, params: Dict[str, Any], category: str) -> Section:
+    inline = params["layout"] == "inline"
+    css = f"""
+        .sc-newsletter {{ padding: 80px 40px; background: {colors['primary']}12; text-align: center; }}
+        .sc-newsletter h2 {{ font-size: 32px; font-weight: 800; margin-bottom: 24px; }}
+        .sc-newsletter-form {{ display: flex; gap: 12px; justify-content: center; max-width: 560px; margin: 0 auto;
+                              {'' if inline else 'flex-direction: column;'} }}
+        .sc-newsletter-form input {{ flex: 1; padding: 16px 20px; border-radius: 12px; border: 2px solid #e3e3ea; font-size: 16px; }}
+        .sc-newsletter-form button {{ padding: 16px 32px; border-radius: 12px; border: none; font-weight: 700;
+                                     background: {colors['primary']}; color: white; cursor: pointer; }}"""
+    html = """
+    <section class="sc-newsletter">
+        <h2>Get new releases in your inbox</h2>
+        <form class="sc-newsletter-form">
+            <input type="email" placeholder="you@company.com">
+            <button type="button">Subscribe</button>
+        </form>
+    </section>"""
+    return Section(css, html)
+
+
+def _content_split(colors: dict, params: Dict[str, Any], category: str) -> Section:
+    reverse = params["reverse"]
+    css = f"""
+        .sc-split {{ padding: 96px 40px; background: #ffffff; }}
+        .sc-split-inner {{ display: flex; gap: 64px; align-items: center; max-width: 1200px; margin: 0 auto;
+                          flex-direction: {'row-reverse' if reverse else 'row'}; }}
+        .sc-split-copy {{ flex: 1; }}
+        .sc-split-copy h2 {{ font-size: 40px; font-weight: 800; margin-bottom: 20px; }}
+        .sc-split-copy p {{ color: #555; line-height: 1.8; font-size: 18px; }}
+        .sc-split-visual {{ flex: 1; height: 360px; border-radius: 28px;
+                           background: linear-gradient(135deg, {colors['primary']}, {colors['accent']}); }}"""
+    html = f"""
+    <section class="sc-split">
+        <div class="sc-split-inner">
+            <div class="sc-split-copy">
+                <h2>Built for the way you work</h2>
+                <p>Every part of this {category.lower()} adapts to your workflow — from the first click to the final hand-off.</p>
+            </div>
+            <div class="sc-split-visual"></div>
+        </div>
+    </section>"""
+    return Section(css, html)
+
+
+def _steps(colors: dict, params: Dict[str, Any], category: str) -> Section:
+    steps = ["Sign up", "Connect your data", "Invite the team", "Ship & measure", "Iterate"][:params["steps"]]
+    vertical = params["orientation"] == "vertical"
+    items = "\n".join(
+        f"""            <div class="sc-step">
+                <div class="sc-step-num">{idx}</div>
+                <div class="sc-step-label">{label}</div>
+            </div>"""
+        for idx, label in enumerate(steps, 1)
+    )
+    css = f"""
+        .sc-steps {{ padding: 96px 40px; background: #fafafa; }}
+        .sc-steps h2 {{ font-size: 36px; font-weight: 800; text-align: center; margin-bottom: 48px; }}
+        .sc-step-list {{ display: flex; gap: 28px; max-width: 1100px; margin: 0 auto;
+                        {'flex-direction: column; max-width: 520px;' if vertical else 'justify-content: space-between;'} }}
+        .sc-step {{ display: flex; align-items: center; gap: 16px; {'' if vertical else 'flex-direction: column; text-align: center;'} }}
+        .sc-step-num {{ width: 56px; height: 56px; border-radius: 50%; display: flex; align-items: center; justify-content: center;
+                       background: {colors['primary']}; color: white; font-weight: 800; font-size: 20px; }}
+        .sc-step-label {{ font-weight: 700; font-size: 18px; }}"""
+    html = f"""
+    <section class="sc-steps">
+        <h2>How it works</h2>
+        <div class="sc-step-list">
+{items}
+        </div>
+    </section>"""
+    return Section(css, html)
+
+
+def _data_table(colors: dict, params: Dict[str, Any], category: str) -> Section:
+    headers = ["Name", "Status", "Owner", "Updated", "Value"][:params["columns"]]
+    sample = [
+        ["Atlas rollout", "Active", "J. Park", "2h ago", "$12.4K"],
+        ["Billing v2", "Review", "M. Lopez", "5h ago", "$8.1K"],
+        ["Onboarding", "Active", "A. Kim", "1d ago", "$21.9K"],
+        ["Mobile sync", "Paused", "R. Patel", "2d ago", "$3.2K"],
+        ["Search index", "Done", "L. Chen", "3d ago", "$15.0K"],
+    ][:params["rows"]]
+    head = "".join(f"<th>{h}</th>" for h in headers)
+    body = "\n".join(
+        "                <tr>" + "".join(f"<td>{cell}</td>" for cell in row[:len(headers)]) + "</tr>"
+        for row in sample
+    )
+    css = f"""
+        .sc-table-wrap {{ padding: 64px 40px; background: #ffffff; }}
+        .sc-table {{ width: 100%; max-width: 1200px; margin: 0 auto; border-collapse: collapse; }}
+        .sc-table th {{ text-align: left; padding: 14px 18px; font-size: 13px; text-transform: uppercase;
+                       letter-spacing: 1px; color: #888; border-bottom: 2px solid {colors['primary']}; }}
+        .sc-table td {{ padding: 16px 18px; border-bottom: 1px solid #f0f0f0; }}
+        .sc-table tr:hover td {{ background: #fafbff; }}"""
+    html = f"""
+    <section class="sc-table-wrap">
+        <table class="sc-table">
+            <thead><tr>{head}</tr></thead>
+            <tbody>
+{body}
+            </tbody>
+        </table>
+    </section>"""
+    return Section(css, html)
+
+
+def _activity_feed(colors: dict, params: Dict[str, Any], category: str) -> Section:
+    events = [
+        ("Olivia", "published a new release"),
+        ("Daniel", "commented on Q3 roadmap"),
+        ("Grace", "closed 4 tickets"),
+        ("Noah", "invited 2 teammates"),
+        ("Mia", "exported the weekly report"),
+    ][:params["items"]]
+    items = "\n".join(
+        f"""            <li class="sc-activity-item">
+                <span class="sc-activity-dot"></span>
+                <span><strong>{who}</strong> {what}</span>
+            </li>"""
+        for who, what in events
+    )
+    css = f"""
+        .sc-activity {{ padding: 64px 40px; background: #fafafa; }}
+        .sc-activity h2 {{ font-size: 28px; font-weight: 800; max-width: 900px; margin: 0 auto 24px; }}
+        .sc-activity-list {{ list-style: none; max-width: 900px; margin: 0 auto; display: flex; flex-direction: column; gap: 14px; }}
+        .sc-activity-item {{ display: flex; align-items: center; gap: 14px; background: white; padding: 18px 22px; border-radius: 14px; }}
+        .sc-activity-dot {{ width: 10px; height: 10px; border-radius: 50%; background: {colors['accent']}; }}"""
+    html = f"""
+    <section class="sc-activity">
+        <h2>Recent activity</h2>
+        <ul class="sc-activity-list">
+{items}
+        </ul>
+    </section>"""
+    return Section(css, html)
+
+
+def _footer(colors: dict, params: Dict[str, Any], category: str) -> Section:
+    groups = [
+        ("Product", ["Features", "Pricing", "Changelog"]),
+        ("Company", ["About", "Careers", "Press"]),
+        ("Resources", ["Docs", "Guides", "Community"]),
+        ("Legal", ["Privacy", "Terms", "Security"]),
+    ][:params["columns"]]
+    cols = "\n".join(
+        f"""            <div class="sc-footer-col">
+                <h4>{title}</h4>
+                {''.join(f'<a href="#">{link}</a>' for link in links)}
+            </div>"""
+        for title, links in groups
+    )
+    css = f"""
+        .sc-footer {{ padding: 72px 40px 40px; background: #0f0f14; color: #c9c9d6; }}
+        .sc-footer-grid {{ display: grid; grid-template-columns: 2fr repeat({len(groups)}, 1fr); gap: 40px;
+                          max-width: 1200px; margin: 0 auto; }}
+        .sc-footer-brand {{ font-size: 24px; font-weight: 900; color: {colors['accent']}; }}
+        .sc-footer-col {{ display: flex; flex-direction: column; gap: 10px; }}
+        .sc-footer-col h4 {{ color: white; margin-bottom: 6px; }}
+        .sc-footer-col a {{ color: #9a9aad; text-decoration: none; }}
+        .sc-footer-col a:hover {{ color: {colors['primary']}; }}
+        .sc-footer-bottom {{ max-width: 1200px; margin: 48px auto 0; padding-top: 24px; border-top: 1px solid #2a2a35; font-size: 13px; }}"""
+    html = f"""
+    <footer class="sc-footer">
+        <div class="sc-footer-grid">
+            <div class="sc-footer-brand">Studio</div>
+{cols}
+        </div>
+        <div class="sc-footer-bottom">© 2025 Studio Inc. All rights reserved.</div>
+    </footer>"""
+    return Section(css, html)
+
+
+# 블록 이름 → (설명 라벨, 렌더 함수, 구조 파라미터 공간)
+BLOCKS: Dict[str, Dict[str, Any]] = {
+    "feature_grid": {
+        "label": "feature grid",
+        "render": _feature_grid,
+        "params": {"columns": (2, 3, 4), "items": (3, 4, 6), "align": ("left", "center")},
+    },
+    "stats_strip": {
+        "label": "stats strip",
+        "render": _stats_strip,
+        "params": {"items": (3, 4), "style": ("plain", "cards")},
+    },
+    "pricing": {
+        "label": "pricing table",
+        "render": _pricing,
+        "params": {"tiers": (2, 3, 4), "highlight": ("middle", "last")},
+    },
+    "testimonials": {
+        "label": "testimonials",
+        "render": _testimonials,
+        "params": {"items": (2, 3), "layout": ("grid", "stack")},
+    },
+    "cta_banner": {
+        "label": "call-to-action banner",
+        "render": _cta_banner,
+        "params": {"align": ("center", "split")},
+    },
+    "faq": {
+        "label": "FAQ",
+        "render": _faq,
+        "params": {"items": (3, 4, 5), "columns": (1, 2)},
+    },
+    "logo_wall": {
+        "label": "logo wall",
+        "render": _logo_wall,
+        "params": {"items": (4, 5, 6)},
+    },
+    "newsletter": {
+        "label": "newsletter signup",
+        "render": _newsletter,
+        "params": {"layout": ("inline", "stacked")},
+    },
+    "content_split": {
+        "label": "split content band",
+        "render": _content_split,
+        "params": {"reverse": (False, True)},
+    },
+    "steps": {
+        "label": "how-it-works steps",
+        "render": _steps,
+        "params": {"steps": (3, 4, 5), "orientation": ("horizontal", "vertical")},
+    },
+    "data_table": {
+        "label": "data table",
+        "render": _data_table,
+        "params": {"rows": (3, 5), "columns": (3, 4, 5)},
+    },
+    "activity_feed": {
+        "label": "activity feed",
+        "render": _activity_feed,
+        "params": {"items": (3, 4, 5)},
+    },
+    "footer": {
+        "label": "footer",
+        "render": _footer,
+        "params": {"columns": (2, 3, 4)},
+    },
+}
+
+# 카테고리별로 어울리는 보조 블록 풀 (footer 는 항상 마지막 위치에만 배치)
+CATEGORY_BLOCKS: Dict[str, List[str]] = {
+    "Landing Page": ["feature_grid", "stats_strip", "pricing", "testimonials", "cta_banner", "faq", "logo_wall", "steps", "content_split"],
+    "Dashboard": ["stats_strip", "data_table", "activity_feed", "feature_grid", "cta_banner"],
+    "E-commerce": ["feature_grid", "testimonials", "newsletter", "faq", "logo_wall", "cta_banner", "content_split"],
+    "Portfolio": ["content_split", "testimonials", "stats_strip", "logo_wall", "cta_banner", "newsletter", "steps"],
+    "Blog": ["newsletter", "content_split", "feature_grid", "testimonials", "cta_banner", "faq"],
+    "Components": ["feature_grid", "pricing", "testimonials", "faq", "data_table", "steps", "stats_strip"],
+}
+
+
+def sample_spec(category: str, lead_types: Sequence[str], rng: Optional[random.Random] = None) -> Dict[str, Any]:
+    """카테고리에 맞는 조합 스펙을 무작위 추출 (렌더링 없음)."""
+    rng = rng or random
+    pool = CATEGORY_BLOCKS.get(category, list(BLOCKS))
+    count = rng.randint(MIN_BLOCKS, min(MAX_BLOCKS, len(pool)))
+    names = rng.sample(pool, count)
+    if rng.random() < 0.5:
+        names.append("footer")
+    blocks = [
+        [name, {key: rng.choice(values) for key, values in BLOCKS[name]["params"].items()}]
+        for name in names
+    ]
+    return {"category": category, "lead": rng.choice(list(lead_types)), "blocks": blocks}
+
+
+def spec_hash(spec: Dict[str, Any]) -> str:
+    """조합 스펙의 구조 해시 (정규화된 JSON의 md5)."""
+    canonical = json.dumps(spec, sort_keys=True, separators=(",", ":"))
+    return hashlib.md5(canonical.encode()).hexdigest()
+
+
+def describe_spec(spec: Dict[str, Any]) -> str:
+    """보조 블록 구성을 설명 한 문장으로 변환."""
+    labels = [BLOCKS[name]["label"] for name, _ in spec["blocks"]]
+    if len(labels) > 1:
+        joined = ", ".join(labels[:-1]) + f" and {labels[-1]}"
+    else:
+        joined = labels[0]
+    return f"Extended with a {joined} section composed for this layout."
+
+
+def render_page(spec: Dict[str, Any], lead: Section, colors: dict, title: str) -> str:
+    """리드 섹션 + 보조 블록을 하나의 HTML 문서로 조합."""
+    sections = [lead] + [
+        BLOCKS[name]["render"](colors, params, spec["category"])
+        for name, params in spec["blocks"]
+    ]
+    css = "".join(section.css for section in sections)
+    body = "".join(section.html for section in sections)
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <style>
+        body {{ font-family: 'Inter', -apple-system, sans-serif; }}{css}
+    </style>
+</head>
+<body>{body}
+</body>
+</html>"""
+
+
+def placeholder_colors() -> Dict[str, str]:
+    """렌더링 시 실제 색상 대신 넣을 슬롯 마커."""
+    return {slot: f"{_SLOT_MARK}{slot}{_SLOT_MARK}" for slot in PALETTE_SLOTS}
+
+
+def render_skeleton(spec: Dict[str, Any], lead_fn: Callable[[dict], Section], title: str) -> Skeleton:
+    """스펙을 색상 플레이스홀더로 한 번만 렌더링해 스켈레톤으로 분할."""
+    colors = placeholder_colors()
+    html = render_page(spec, lead_fn(colors), colors, title)
+    return Skeleton(tuple(_SLOT_RE.split(html)))
+
+
+def palette_var(slot: str, alpha: str = "") -> str:
+    """슬롯(+알파 접미사)의 CSS 사용자 정의 속성 이름."""
+    return f"{PALETTE_VAR_PREFIX}{slot}-{alpha}" if alpha else f"{PALETTE_VAR_PREFIX}{slot}"
+
+
+def color_variations(base: Dict[str, str], palettes: Sequence[Dict[str, str]]) -> Dict[str, Any]:
+    """designs.color_variations 값 — 문서 사본 없이 기본 팔레트 이름과 팔레트 목록만."""
+    return {
+        "base": base["name"],
+        "palettes": [
+            {"name": palette["name"], "colors": {slot: palette[slot] for slot in PALETTE_SLOTS}}
+            for palette in palettes
+        ],
+    }
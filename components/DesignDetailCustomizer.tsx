@@ -1,7 +1,9 @@
 "use client";
 
+import { useMemo, useState } from 'react';
 import DesignPreview from './DesignPreview';
 import CodeBlock from './CodeBlock';
+import { applyPalette, hasPaletteSlots, normalizeColorVariations } from '@/lib/palette';
 
 interface DesignDetailCustomizerProps {
   title: string;
@@ -9,12 +11,15 @@ interface DesignDetailCustomizerProps {
   htmlCode?: string | null;
   reactCode?: string | null;
   colors?: string[] | null;
+  colorVariations?: unknown;
 }
 
 /*
- * NOTE: Color swapping helpers are temporarily disabled because palette-based
- * replacements were producing broken previews. When we revisit the feature,
- * restore the utilities below and the stateful logic that used them.
+ * NOTE: Free-form color swapping helpers are temporarily disabled because
+ * replacing arbitrary hex tokens was producing broken previews. Designs that
+ * ship `color_variations` declare their palette as CSS custom properties
+ * (--palette-*) instead, so switching palettes only rewrites those
+ * declarations (see lib/palette.ts).
  *
  * const HEX_COLOR_REGEX = /#(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{6})\b/g;
  * type PaletteColor = { raw: string; hex: string };
@@ -28,26 +33,62 @@ export default function DesignDetailCustomizer({
   htmlCode,
   reactCode,
   colors,
+  colorVariations,
 }: DesignDetailCustomizerProps) {
   const safeHtml = htmlCode && htmlCode.trim().length ? htmlCode : null;
 
-  // Color swapping is temporarily disabled to avoid visual glitches.
-  // const palette = useMemo<PaletteColor[]>(() => ...);
-  // const [selectedColor, setSelectedColor] = useState<string | null>(...);
-  // const detectedAccent = useMemo(...);
-  // useEffect(...);
-  // const transformedHtml = useMemo(...);
-  // const transformedReact = useMemo(...);
+  const variations = useMemo(
+    () => (hasPaletteSlots(safeHtml) ? normalizeColorVariations(colorVariations) : null),
+    [safeHtml, colorVariations]
+  );
+  const [paletteName, setPaletteName] = useState<string | null>(null);
+  const selectedPalette = variations?.palettes.find((palette) => palette.name === paletteName) ?? null;
+
+  const transformedHtml = useMemo(
+    () => (safeHtml && selectedPalette ? applyPalette(safeHtml, selectedPalette.colors) : safeHtml),
+    [safeHtml, selectedPalette]
+  );
 
-  const previewHtml = safeHtml ?? undefined;
-  const codeForBlock = safeHtml ?? '';
+  const previewHtml = transformedHtml ?? undefined;
+  const codeForBlock = transformedHtml ?? '';
+  const activeName = selectedPalette?.name ?? variations?.base;
 
   return (
     <section className="space-y-6 sm:space-y-8">
-      {/* Color selection UI temporarily disabled; revisit once preview stability is resolved. */}
+      {variations && variations.palettes.length > 1 && (
+        <div className="flex flex-wrap items-center gap-3">
+          <p className="text-xs uppercase tracking-[0.3em] text-gray-400">Palette</p>
+          {variations.palettes.map((palette) => {
+            const active = palette.name === activeName;
+            return (
+              <button
+                key={palette.name}
+                type="button"
+                onClick={() => setPaletteName(palette.name)}
+                aria-pressed={active}
+                className={`flex items-center gap-2 rounded-full border px-3 py-1.5 text-xs transition-colors ${
+                  active ? 'border-gray-900 text-gray-900' : 'border-gray-200 text-gray-500 hover:border-gray-400'
+                }`}
+              >
+                <span className="flex -space-x-1">
+                  {(['primary', 'secondary', 'accent'] as const).map((slot) => (
+                    <span
+                      key={slot}
+                      className="h-3.5 w-3.5 rounded-full border border-white"
+                      style={{ backgroundColor: palette.colors[slot] }}
+                    />
+                  ))}
+                </span>
+                {palette.name}
+              </button>
+            );
+          })}
+        </div>
+      )}
+
       <DesignPreview imageUrl={imageUrl} title={title} colors={colors ?? undefined} htmlCode={previewHtml} />
 
-      {safeHtml && (
+      {transformedHtml && (
         <CodeBlock htmlCode={codeForBlock} reactCode={reactCode ?? undefined} />
       )}
     </section>
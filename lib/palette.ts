@@ -0,0 +1,42 @@
+export type PaletteSlot = 'primary' | 'secondary' | 'accent';
+
+export type PaletteColors = Record<PaletteSlot, string>;
+
+export type ColorVariations = {
+  base: string;
+  palettes: Array<{ name: string; colors: PaletteColors }>;
+};
+
+// automation/section_composer.py 가 :root 에 선언하는 색상 슬롯
+// (--palette-<slot> 또는 알파 접미사가 붙은 --palette-<slot>-<aa>)
+const PALETTE_VAR_REGEX = /(--palette-(primary|secondary|accent)(?:-([0-9a-fA-F]{2}))?\s*:\s*)#[0-9a-fA-F]{6}(?:[0-9a-fA-F]{2})?/g;
+
+export function hasPaletteSlots(html?: string | null) {
+  return !!html && /--palette-(?:primary|secondary|accent)\b/.test(html);
+}
+
+// 본문은 var(--palette-*) 로만 색상을 참조하므로 선언 값만 바꾸면 변형이 됨
+export function applyPalette(html: string, colors: PaletteColors) {
+  return html.replace(
+    PALETTE_VAR_REGEX,
+    (_match, prefix: string, slot: PaletteSlot, alpha?: string) => `${prefix}${colors[slot]}${alpha ?? ''}`
+  );
+}
+
+export function normalizeColorVariations(value: unknown): ColorVariations | null {
+  if (!value || typeof value !== 'object') {
+    return null;
+  }
+  const { base, palettes } = value as Partial<ColorVariations>;
+  if (typeof base !== 'string' || !Array.isArray(palettes)) {
+    return null;
+  }
+  const valid = palettes.filter(
+    (palette) =>
+      palette &&
+      typeof palette.name === 'string' &&
+      palette.colors &&
+      (['primary', 'secondary', 'accent'] as const).every((slot) => typeof palette.colors[slot] === 'string')
+  );
+  return valid.length ? { base, palettes: valid } : null;
+}
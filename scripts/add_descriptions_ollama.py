@@ -1,9 +1,10 @@
+import asyncio
 import os
 from supabase import create_client
-import requests
+import httpx
 import json
-import time
 from dotenv import load_dotenv
+from ollama_client import get_ollama_client, ollama_session
 
 load_dotenv()
 
@@ -33,7 +34,7 @@ def extract_clean_title(title):
         return parts[0].strip()
     return title
 
-def generate_description_with_ollama(design):
+async def generate_description_with_ollama(design):
     title = design.get('title', 'Untitled')
     clean_title = extract_clean_title(title)
     category = design.get('category', 'general')
@@ -44,29 +45,21 @@ def generate_description_with_ollama(design):
     prompt = f"Generate a detailed, SEO-optimized description for this UI design:\n\nDesign Name: {clean_title}\nCategory: {category}\nColors: {color_list}\n\nWrite a 150-250 word description that:\n1. Describes what type of interface this is\n2. Highlights key visual and functional features\n3. Explains the design approach and style\n4. Mentions the color scheme and its effect\n5. Describes who would benefit from this design\n6. Uses keywords naturally for SEO\n\nWrite in a professional, engaging tone. DO NOT include markdown formatting. Write plain text only."
 
     try:
-        response = requests.post(
-            f"{ollama_url}/api/generate",
-            json={
-                "model": ollama_model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "top_p": 0.9
-                }
+        description = await get_ollama_client(ollama_url).generate(
+            ollama_model,
+            prompt,
+            options={
+                "temperature": 0.7,
+                "top_p": 0.9
             },
-            timeout=60
+            pass_name="describe",
         )
-        
-        if response.status_code == 200:
-            result = response.json()
-            description = result.get('response', '').strip()
-            description = description.replace('**', '').replace('##', '').replace('*', '')
-            return description if len(description) > 100 else None
-        else:
-            print(f"  ⚠️ Ollama API 오류: {response.status_code}")
-            return None
-            
+        description = description.replace('**', '').replace('##', '').replace('*', '')
+        return description if len(description) > 100 else None
+
+    except httpx.HTTPStatusError as e:
+        print(f"  ⚠️ Ollama API 오류: {e.response.status_code}")
+        return None
     except Exception as e:
         print(f"  ⚠️ Ollama 생성 실패: {str(e)}")
         return None
@@ -105,7 +98,7 @@ def update_design_description(design_id, description):
         print(f"  ❌ 업데이트 실패: {str(e)}")
         return False
 
-def main():
+async def main():
     print("🚀 Ollama로 디자인 설명 생성 시작...")
     print(f"📡 Ollama URL: {ollama_url}")
     print(f"🤖 Model: {ollama_model}")
@@ -127,7 +120,7 @@ def main():
         print(f"[{i}/{total}] {title}")
         print(f"  ID: {design_id[:8]}...")
         
-        description = generate_description_with_ollama(design)
+        description = await generate_description_with_ollama(design)
         
         if description:
             print("  ✅ Ollama 생성 성공")
@@ -148,7 +141,7 @@ def main():
                 fail_count += 1
         
         if i < total:
-            time.sleep(2)
+            await asyncio.sleep(2)
     
     print()
     print("=" * 50)
@@ -159,5 +152,9 @@ def main():
     print(f"  - 실패: {fail_count}개")
     print("=" * 50)
 
+async def run():
+    async with ollama_session():
+        await main()
+
 if __name__ == "__main__":
-    main()
+    asyncio.run(run())
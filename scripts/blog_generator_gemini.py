@@ -27,6 +27,8 @@ from dotenv import load_dotenv
 from google import genai
 from supabase import Client, create_client
 
+from slug_allocator import SlugAllocator, is_slug_conflict
+
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -139,16 +141,19 @@ def ensure_payload_shape(payload: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def ensure_unique_slug(base_title: str) -> str:
-    base = slugify(base_title)
-    candidate = base
-    suffix = 2
-    while True:
-        response = supabase.table("posts").select("id").eq("slug", candidate).limit(1).execute()
-        if not response.data:
-            return candidate
-        candidate = f"{base}-{suffix}"
-        suffix += 1
+# posts.slug 는 unique — base 당 한 번 조회하고, insert 충돌 시 재할당
+slugs = SlugAllocator(lambda: supabase, table="posts")
+
+
+def insert_post(record: Dict[str, Any], max_attempts: int = 3) -> None:
+    for attempt in range(max_attempts):
+        try:
+            insert_post(record)
+            return
+        except Exception as exc:
+            if not is_slug_conflict(exc) or attempt == max_attempts - 1:
+                raise
+            record["slug"] = slugs.reallocate(record["slug"])
 
 
 def build_prompt(topic_hint: str | None, category: str) -> str:
@@ -183,7 +188,7 @@ def generate_post(topic_hint: str | None) -> Dict[str, Any]:
 
     return {
         "id": str(uuid.uuid4()),
-        "slug": ensure_unique_slug(payload["title"]),
+        "slug": slugs.allocate(slugify(payload["title"])),
         "title": payload["title"],
         "excerpt": payload["excerpt"],
         "content": payload["content"],
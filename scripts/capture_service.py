@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Shared Playwright Capture Service
+프로세스 전체에서 Chromium 하나를 띄워두고 재사용하는 스크린샷 서비스
+
+- 브라우저는 첫 캡처 때 한 번만 실행 (디자인마다 launch 하지 않음)
+- 브라우저 컨텍스트/페이지 풀을 재사용하고, 동시 캡처 수는 세마포어로 제한
+- 고정 wait_for_timeout 대신 load 이벤트 + document.fonts.ready 대기
+- 모든 생성기 엔트리포인트가 공유, 종료 시 shutdown_capture_service() 로 정리
+
+사용:
+    async with capture_session() as capture:
+        png = await capture.screenshot(html, viewport={"width": 1400, "height": 900})
+
+        async with capture.page() as page:   # 캡처 전 DOM 보정이 필요한 경우
+            await capture.load(page, html, wait_until="networkidle")
+            ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+
+log = logging.getLogger(__name__)
+
+CAPTURE_CONCURRENCY = int(os.getenv("CAPTURE_CONCURRENCY", "2"))
+DEFAULT_VIEWPORT: Dict[str, int] = {"width": 1400, "height": 900}
+LOAD_TIMEOUT_MS = 15_000
+
+
+class CaptureService:
+    """웜 Chromium 하나 + 재사용 페이지 풀"""
+
+    def __init__(self, concurrency: int = CAPTURE_CONCURRENCY):
+        self.concurrency = max(1, concurrency)
+        self._playwright = None
+        self._browser: Optional[Browser] = None
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._idle: List[Page] = []
+        self._start_lock = asyncio.Lock()
+        self.captures = 0
+        self.capture_seconds = 0.0
+
+    async def start(self) -> "CaptureService":
+        async with self._start_lock:
+            if self._browser is None:
+                t0 = time.monotonic()
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch()
+                log.info("[capture] Chromium 실행 (%.1fs, 동시 캡처 %d)", time.monotonic() - t0, self.concurrency)
+        return self
+
+    async def _new_page(self) -> Page:
+        if self._browser is None:
+            await self.start()
+        context: BrowserContext = await self._browser.new_context(viewport=DEFAULT_VIEWPORT)
+        return await context.new_page()
+
+    async def _discard(self, page: Page) -> None:
+        try:
+            await page.context.close()
+        except Exception:
+            pass
+
+    @asynccontextmanager
+    async def page(self, viewport: Optional[Dict[str, int]] = None) -> AsyncIterator[Page]:
+        """풀에서 페이지 하나를 빌려옴. 블록 안에서 예외가 나면 해당 페이지는 폐기."""
+        await self._slots.acquire()
+        page: Optional[Page] = None
+        healthy = False
+        try:
+            while self._idle and page is None:
+                candidate = self._idle.pop()
+                if candidate.is_closed():
+                    await self._discard(candidate)
+                else:
+                    page = candidate
+            if page is None:
+                page = await self._new_page()
+            await page.set_viewport_size(viewport or DEFAULT_VIEWPORT)
+            yield page
+            healthy = True
+        finally:
+            if page is not None:
+                if healthy and not page.is_closed():
+                    self._idle.append(page)
+                else:
+                    await self._discard(page)
+            self._slots.release()
+
+    async def load(self, page: Page, html: str, wait_until: str = "load",
+                   timeout: int = LOAD_TIMEOUT_MS) -> None:
+        """HTML 주입 후 로딩/웹폰트 완료까지만 대기 (고정 대기 없음)."""
+        try:
+            await page.set_content(html, wait_until=wait_until, timeout=timeout)
+        except Exception as exc:
+            log.warning("[capture] 페이지 로딩 지연 (무시하고 캡처 진행): %s", exc)
+        try:
+            await page.evaluate("document.fonts.ready.then(() => true)")
+        except Exception:
+            pass
+
+    async def screenshot(self, html: str, *, viewport: Optional[Dict[str, int]] = None,
+                         wait_until: str = "load", full_page: bool = True) -> bytes:
+        """HTML 한 장을 PNG로 캡처."""
+        t0 = time.monotonic()
+        async with self.page(viewport) as page:
+            await self.load(page, html, wait_until=wait_until)
+            png = await page.screenshot(type="png", full_page=full_page)
+        self.captures += 1
+        self.capture_seconds += time.monotonic() - t0
+        return png
+
+    async def close(self) -> None:
+        pages, self._idle = self._idle, []
+        for page in pages:
+            await self._discard(page)
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        if self.captures:
+            log.info("[capture] 종료 — %d장, 평균 %.2fs/장",
+                     self.captures, self.capture_seconds / self.captures)
+
+    async def __aenter__(self) -> "CaptureService":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+# ── 프로세스 공유 인스턴스 ────────────────────────────────────────────────────
+_service: Optional[CaptureService] = None
+
+
+async def get_capture_service(concurrency: Optional[int] = None) -> CaptureService:
+    """프로세스 전역 캡처 서비스 (최초 호출 시 Chromium 실행, concurrency 도 최초 호출 값 사용)."""
+    global _service
+    if _service is None:
+        _service = CaptureService(concurrency or CAPTURE_CONCURRENCY)
+    return await _service.start()
+
+
+async def shutdown_capture_service() -> None:
+    """공유 서비스 종료 — 각 엔트리포인트의 종료 훅에서 호출."""
+    global _service
+    if _service is not None:
+        service, _service = _service, None
+        await service.close()
+
+
+@asynccontextmanager
+async def capture_session() -> AsyncIterator[CaptureService]:
+    """공유 캡처 서비스를 열고 블록이 끝나면 정리."""
+    service = await get_capture_service()
+    try:
+        yield service
+    finally:
+        await shutdown_capture_service()
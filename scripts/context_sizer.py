@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Context Sizer — 요청마다 프롬프트 길이에 맞춰 num_ctx 를 고름
+
+모든 호출이 프롬프트 길이와 상관없이 num_ctx=32768(pass1 은 16384)을 요청했고, Ollama 는 그만큼
+KV 캐시를 잡아 CPU 호스트의 RAM 과 프롬프트 처리 시간을 낭비했다.
+  1. 프롬프트 토큰 추정: 모델별 글자/토큰 비율 (초기값 CHARS_PER_TOKEN). 응답의 prompt_eval_count 로
+     지수 이동 평균 보정
+  2. num_ctx = 추정 프롬프트 토큰 × (1 + SAFETY) + 패스별 출력 예산 → CTX_BUCKETS 로 올림
+  3. num_ctx 가 바뀌면 Ollama 가 모델을 다시 올리므로, 이미 더 큰 버킷으로 올라간 모델은 그 크기를 유지.
+     모델이 내려가면(다른 모델로 전환, 계획상 마지막 사용) release() 로 잊고 다음 호출은 필요한 버킷부터
+  4. 필요한 크기가 호출자가 준 상한을 넘거나, 응답의 prompt_eval_count 가 num_ctx 에 닿으면 잘림 경고
+  5. ModelResidency 가 모델을 미리 올릴 때는 warm_size() (그 모델이 요청했던 가장 큰 num_ctx)로 올리고
+     pin() 으로 유지 — 바로 뒤 실제 호출이 다른 num_ctx 로 모델을 다시 올리지 않도록
+  6. 조기 종료로 prompt_eval_count 가 없으면 생성 텍스트의 글자/조각 수로 비율을 보정하고,
+     추정 프롬프트 + 생성 토큰으로 잘림 여부를 판단
+
+사용:
+    num_ctx = client.ctx_sizer.size(model, messages, pass_name="pass2", ceiling=32768)
+    ...
+    client.ctx_sizer.observe(model, messages, num_ctx, data.get("prompt_eval_count"))   # 클라이언트가 호출
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+AUTO_NUM_CTX = os.getenv("OLLAMA_AUTO_NUM_CTX", "1").lower() not in ("0", "false", "off")
+CTX_BUCKETS = (4096, 8192, 12288, 16384, 24576, 32768)
+CHARS_PER_TOKEN = 3.5     # 보정 전 초기값 (HTML/Tailwind 기준)
+SAFETY = 0.10             # 추정 오차 여유
+MESSAGE_OVERHEAD = 8      # 메시지마다 채팅 템플릿이 붙이는 토큰
+CALIBRATION_ALPHA = 0.3
+
+# 패스별 출력 토큰 예산. OLLAMA_OUTPUT_<NAME> 으로 덮어쓰기
+OUTPUT_BUDGETS: Dict[str, int] = {
+    "pass0": 2048,     # CSS 토큰
+    "pass1": 2048,     # 브리프 JSON
+    "pass2": 10240,    # 전체 HTML 초안
+    "pass3": 4096,     # 추론 모델의 <think> + 리뷰 JSON
+    "pass4": 10240,    # 전체 HTML 수정
+}
+DEFAULT_OUTPUT = 4096
+
+
+def output_budget(pass_name: Optional[str]) -> int:
+    env = os.getenv(f"OLLAMA_OUTPUT_{(pass_name or '').upper()}") if pass_name else None
+    if env:
+        return int(env)
+    return OUTPUT_BUDGETS.get(pass_name or "", DEFAULT_OUTPUT)
+
+
+def _prompt_chars(content: Any) -> tuple[int, int]:
+    """(글자 수, 메시지 수) — 메시지 목록 또는 generate 프롬프트 문자열."""
+    if isinstance(content, str):
+        return len(content), 1
+    if isinstance(content, list):
+        return sum(len(str(m.get("content", ""))) for m in content if isinstance(m, dict)), len(content)
+    return len(json.dumps(content, ensure_ascii=False, default=str)), 1
+
+
+class ContextSizer:
+    """모델별 토큰 비율 보정 + 현재 올라가 있는 num_ctx 추적"""
+
+    def __init__(self, enabled: bool = AUTO_NUM_CTX):
+        self.enabled = enabled
+        self.ratios: Dict[str, float] = {}       # 모델 → 글자/토큰
+        self.resident: Dict[str, int] = {}       # 모델 → 마지막으로 요청한 num_ctx
+        self.peak: Dict[str, int] = {}           # 모델 → 지금까지 요청한 가장 큰 num_ctx (미리 올리기용)
+        self.last: Dict[str, int] = {}           # 모델 → 서버에 마지막으로 요청한 num_ctx (= 올라가 있는 크기)
+        self.sized = 0
+        self.saved_tokens = 0                    # 고정 상한 대비 덜 잡은 컨텍스트 합계
+        self.truncations = 0
+
+    def estimate(self, model: str, content: Any) -> int:
+        chars, messages = _prompt_chars(content)
+        return int(chars / self.ratios.get(model, CHARS_PER_TOKEN)) + MESSAGE_OVERHEAD * messages
+
+    def size(self, model: str, content: Any, *, pass_name: Optional[str] = None, ceiling: int = CTX_BUCKETS[-1],
+             output_tokens: Optional[int] = None) -> int:
+        """이번 요청의 num_ctx. 비활성화면 ceiling 그대로."""
+        if not self.enabled:
+            return ceiling
+        prompt = self.estimate(model, content)
+        need = int(prompt * (1 + SAFETY)) + (output_tokens or output_budget(pass_name))
+        if need > ceiling:
+            self.truncations += 1
+            log.warning("[num_ctx] %s %s — 프롬프트 ~%d + 출력 %d 토큰이 상한 %d 를 넘음 (잘릴 수 있음)",
+                        pass_name or "chat", model, prompt, need - int(prompt * (1 + SAFETY)), ceiling)
+            return ceiling
+        bucket = next((b for b in CTX_BUCKETS if b >= need), ceiling)
+        # 이미 더 큰 컨텍스트로 올라간 모델은 줄이지 않음 — num_ctx 변경은 모델 재로드를 부름
+        resident = self.resident.get(model, 0)
+        num_ctx = min(max(bucket, resident), ceiling)
+        self.resident[model] = num_ctx
+        self.sized += 1
+        self.saved_tokens += ceiling - num_ctx
+        return num_ctx
+
+    def note(self, model: str, num_ctx: Optional[int]) -> None:
+        """실제로 요청된 num_ctx 기록 (자동 크기 조절을 쓰지 않는 호출자 포함)."""
+        if num_ctx:
+            self.peak[model] = max(self.peak.get(model, 0), num_ctx)
+            self.last[model] = num_ctx
+
+    def warm_size(self, model: str) -> int:
+        """미리 올릴 때 쓸 num_ctx — 처음 보는 모델은 가장 큰 버킷 (뒤 호출이 무엇이든 들어가도록)."""
+        return self.resident.get(model) or self.peak.get(model) or CTX_BUCKETS[-1]
+
+    def pin(self, model: str, num_ctx: Optional[int]) -> None:
+        """num_ctx 로 올라간 모델 — 이보다 작은 요청은 이 크기를 그대로 써서 재로드를 피함."""
+        if self.enabled and num_ctx:
+            self.resident[model] = max(self.resident.get(model, 0), num_ctx)
+
+    def release(self, model: str) -> None:
+        """모델이 내려갔거나 곧 내려감 — 유지하던 num_ctx 를 잊음."""
+        self.resident.pop(model, None)
+
+    def _calibrate(self, model: str, observed: float) -> None:
+        previous = self.ratios.get(model, CHARS_PER_TOKEN)
+        self.ratios[model] = (1 - CALIBRATION_ALPHA) * previous + CALIBRATION_ALPHA * observed
+
+    def observe(self, model: str, content: Any, num_ctx: Optional[int], prompt_eval_count: Optional[int],
+                *, output_chars: int = 0, output_tokens: int = 0) -> None:
+        """응답의 실제 프롬프트 토큰으로 비율 보정, 컨텍스트에 닿았으면 경고.
+
+        prompt_eval_count 가 없으면(조기 종료) 생성 텍스트 글자 수 / 조각 수(≈ 토큰)로 보정."""
+        if not prompt_eval_count:
+            self._observe_output(model, content, num_ctx, output_chars, output_tokens)
+            return
+        chars, messages = _prompt_chars(content)
+        text_tokens = prompt_eval_count - MESSAGE_OVERHEAD * messages
+        if num_ctx and prompt_eval_count >= num_ctx - 8:
+            self.truncations += 1
+            log.warning("[num_ctx] %s 프롬프트 %d 토큰이 num_ctx %d 에 닿음 — 앞부분이 잘렸을 수 있음",
+                        model, prompt_eval_count, num_ctx)
+            return   # 잘린 값으로는 보정하지 않음
+        if chars <= 0 or text_tokens <= 0:
+            return
+        self._calibrate(model, chars / text_tokens)
+
+    def _observe_output(self, model: str, content: Any, num_ctx: Optional[int], output_chars: int,
+                        output_tokens: int) -> None:
+        if output_tokens <= 0:
+            return
+        if num_ctx and self.estimate(model, content) + output_tokens >= num_ctx:
+            self.truncations += 1
+            log.warning("[num_ctx] %s 추정 프롬프트 %d + 생성 %d 토큰이 num_ctx %d 에 닿음 — 잘렸을 수 있음",
+                        model, self.estimate(model, content), output_tokens, num_ctx)
+        if output_chars > 0:
+            self._calibrate(model, output_chars / output_tokens)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "ratios": {m: round(r, 2) for m, r in self.ratios.items()},
+            "sized": self.sized,
+            "resident": dict(self.resident),
+            "saved_tokens": self.saved_tokens,
+            "truncations": self.truncations,
+        }
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+DNA Sampler — 게시된 카탈로그 전체의 조합 분포를 보고 덜 다뤄진 조합 쪽으로 디자인 DNA 를 뽑음
+
+pick_design_dna 는 로컬 히스토리 최근 4~8개만 피했고, gemini_design_generator 는 후보 조합마다
+Supabase 를 한 번씩 조회했다. 둘 다 카탈로그에 무엇이 부족한지는 보지 못했다.
+  1. 차원(style, structure, category, color, layout …)별 개수와 지정한 차원 묶음의 결합 개수를
+     Counter 로 유지 — 카탈로그는 프로세스당 한 번 페이지 단위로 읽고, 이후 게시분은 observe() 로 증가
+  2. sample(): 후보 CANDIDATES 개를 균등하게 뽑아 (앞 차원에 따라 선택지가 달라지는 차원 지원)
+     각 후보의 가중치 = Π (차원 평균 + 1) / (해당 값 개수 + 1) × Π 1 / (결합 개수 + 1)
+     → 가중 추첨. 후보 하나당 사전 조회 몇 번 (O(1))
+  3. recent(최근 히스토리)와 pending(같은 배치에서 먼저 뽑은 DNA)의 값은 RECENT_PENALTY 배로 낮춰
+     연속 생성끼리 비슷해지지 않게 함
+  4. fresh=True 면 결합 개수가 0 인 후보만 (없으면 가중 추첨으로 폴백) — "이미 있는 조합 건너뛰기" 대체
+
+사용:
+    sampler = CoverageSampler({
+        "style": STYLES,
+        "structure": lambda combo: AFFINITY[combo["style"]],   # 앞서 뽑은 값에 따른 선택지
+        "category": CATEGORIES,
+    }, joints=[("style", "structure", "category")])
+    for row in fetch_catalogue(supabase, "category, prompt"):
+        sampler.observe({...})
+    combo = sampler.sample(recent=history[:6], pending=batch)
+"""
+
+from __future__ import annotations
+
+import random
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+CANDIDATES = 48          # 가중 추첨 전에 균등하게 뽑는 후보 수
+RECENT_PENALTY = 0.25    # 최근/배치 내 값이 겹칠 때마다 곱하는 가중치
+CATALOGUE_PAGE = 1000
+
+Choices = Union[Sequence[str], Callable[[Dict[str, str]], Sequence[str]]]
+
+
+def fetch_catalogue(client: Any, columns: str, table: str = "designs",
+                    page_size: int = CATALOGUE_PAGE) -> List[Dict[str, Any]]:
+    """게시된 디자인 행 전체를 페이지 단위로 (필요한 컬럼만)."""
+    rows: List[Dict[str, Any]] = []
+    start = 0
+    while True:
+        page = client.table(table).select(columns).range(start, start + page_size - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        start += page_size
+
+
+class CoverageSampler:
+    """차원별/결합 개수 행렬 + 부족한 칸 우선 가중 추첨"""
+
+    def __init__(self, dimensions: Mapping[str, Choices], joints: Iterable[Sequence[str]] = ()):
+        self.dimensions = dict(dimensions)
+        self.joints: List[Tuple[str, ...]] = [tuple(group) for group in joints]
+        self.marginals: Dict[str, Counter] = {name: Counter() for name in self.dimensions}
+        self.joint_counts: Dict[Tuple[str, ...], Counter] = {group: Counter() for group in self.joints}
+        self.observed = 0
+
+    def observe(self, combo: Mapping[str, Optional[str]], dims: Optional[Iterable[str]] = None) -> None:
+        """조합 하나를 개수에 반영. dims 를 주면 그 차원(과 그 차원이 포함된 결합)만 셈 —
+        같은 디자인을 두 출처(카탈로그 + 로컬 히스토리)에서 나눠 읽을 때 중복 집계 방지."""
+        counted = set(dims) if dims is not None else set(self.dimensions)
+        for name in counted:
+            value = combo.get(name)
+            if value and name in self.marginals:
+                self.marginals[name][value] += 1
+        for group in self.joints:
+            if counted.intersection(group) and all(combo.get(name) for name in group):
+                self.joint_counts[group][tuple(combo[name] for name in group)] += 1
+        self.observed += 1
+
+    def _choices(self, name: str, combo: Dict[str, str]) -> Sequence[str]:
+        choices = self.dimensions[name]
+        return choices(combo) if callable(choices) else choices
+
+    def _draw(self, rng: random.Random) -> Dict[str, str]:
+        combo: Dict[str, str] = {}
+        for name in self.dimensions:
+            combo[name] = rng.choice(list(self._choices(name, combo)))
+        return combo
+
+    def count(self, combo: Mapping[str, str], group: Sequence[str]) -> int:
+        return self.joint_counts[tuple(group)][tuple(combo[name] for name in group)]
+
+    def weight(self, combo: Mapping[str, str], recent: Sequence[Mapping[str, Any]] = ()) -> float:
+        weight = 1.0
+        for name, counter in self.marginals.items():
+            mean = sum(counter.values()) / max(len(counter), 1)
+            weight *= (mean + 1) / (counter[combo[name]] + 1)
+        for group in self.joints:
+            weight /= self.count(combo, group) + 1
+        for previous in recent:
+            for name in self.dimensions:
+                if previous.get(name) == combo[name]:
+                    weight *= RECENT_PENALTY
+        return weight
+
+    def sample(self, *, recent: Sequence[Mapping[str, Any]] = (), pending: Sequence[Mapping[str, Any]] = (),
+               fresh: bool = False, rng: Optional[random.Random] = None) -> Dict[str, str]:
+        rng = rng or random
+        candidates = [self._draw(rng) for _ in range(CANDIDATES)]
+        taken = {tuple(p.get(name) for name in self.dimensions) for p in pending}
+        candidates = [c for c in candidates if tuple(c.values()) not in taken] or candidates
+        if fresh:
+            unseen = [c for c in candidates if all(self.count(c, group) == 0 for group in self.joints)]
+            candidates = unseen or candidates
+        context = list(pending) + list(recent)
+        weights = [self.weight(c, context) for c in candidates]
+        return rng.choices(candidates, weights=weights, k=1)[0]
+
+    def coverage(self) -> Dict[str, Any]:
+        """차원별 사용된 값 수 / 전체 값 수 (선택지가 앞 차원에 따라 달라지는 차원은 사용된 값 수만)."""
+        summary: Dict[str, Any] = {"observed": self.observed}
+        for name, choices in self.dimensions.items():
+            used = len(self.marginals[name])
+            summary[name] = f"{used}/{len(choices)}" if not callable(choices) else str(used)
+        return summary
@@ -21,7 +21,6 @@ import argparse
 import asyncio
 import json
 import os
-import random
 import re
 import hashlib
 import subprocess
@@ -33,9 +32,13 @@ from typing import Any, Dict, List, Optional
 
 from dotenv import load_dotenv
 from google import genai
-from playwright.async_api import async_playwright
 from supabase import Client, create_client
 
+from capture_service import capture_session, get_capture_service
+from dna_sampler import CoverageSampler, fetch_catalogue
+from publish_outbox import PublishOutbox
+from slug_allocator import SlugAllocator
+
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -210,21 +213,32 @@ def combination_key(structure: str, style: str) -> str:
     return f"{structure}__{style}".lower().replace(" ", "_")
 
 
-def is_combination_used(combo_key: str) -> bool:
-    response = supabase.table("designs").select("id", count="exact").eq("prompt", combo_key).limit(1).execute()
-    return bool(response.data)
+_sampler: Optional[CoverageSampler] = None
+
 
+def get_sampler() -> CoverageSampler:
+    """카탈로그 전체를 한 번 읽어 만든 조합 샘플러 — 후보마다 Supabase 를 조회하지 않음."""
+    global _sampler
+    if _sampler is None:
+        pairs = {combination_key(structure, style): (structure, style) for structure in STRUCTURES for style in STYLES}
+        _sampler = CoverageSampler(
+            {"category": CATEGORIES, "structure": STRUCTURES, "style": STYLES},
+            joints=[("structure", "style")],
+        )
+        try:
+            rows = fetch_catalogue(supabase, "category,prompt")
+        except Exception as exc:
+            print(f"[warn] 카탈로그 조회 실패 — 빈 분포로 시작: {exc}")
+            rows = []
+        for row in rows:
+            structure, style = pairs.get(row.get("prompt") or "", (None, None))
+            _sampler.observe({"category": row.get("category"), "structure": structure, "style": style})
+        print(f"[sampler] 카탈로그 {len(rows)}개 반영 — 사용된 조합 {len(_sampler.joint_counts[('structure', 'style')])}/{len(pairs)}")
+    return _sampler
 
-def ensure_unique_slug(base_title: str) -> str:
-    base = slugify(base_title)
-    candidate = base
-    suffix = 2
-    while True:
-        response = supabase.table("designs").select("id").eq("slug", candidate).limit(1).execute()
-        if not response.data:
-            return candidate
-        candidate = f"{base}-{suffix}"
-        suffix += 1
+
+# base 당 한 번 조회 + 배치 내 예약, 게시 중 충돌은 outbox 가 재할당
+slugs = SlugAllocator(lambda: supabase)
 
 
 def wrap_html_if_needed(html: str) -> str:
@@ -234,35 +248,32 @@ def wrap_html_if_needed(html: str) -> str:
 
 
 async def capture_screenshot(html: str) -> bytes:
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        page = await browser.new_page(viewport={"width": 1400, "height": 900})
-        await page.set_content(html, wait_until="networkidle")
-        await page.wait_for_timeout(800)
-        screenshot = await page.screenshot(full_page=True, type="png")
-        await browser.close()
-    return screenshot
+    capture = await get_capture_service()
+    return await capture.screenshot(html, viewport={"width": 1400, "height": 900}, wait_until="networkidle")
 
 
-def upload_image(image_bytes: bytes, category: str) -> str:
+def image_path_for(category: str) -> str:
     filename = f"{datetime.utcnow():%Y%m%d_%H%M%S}_{category.replace(' ', '_')}_{uuid.uuid4().hex[:6]}.png"
-    object_path = f"{STORAGE_FOLDER}/{filename}"
-    storage = supabase.storage.from_(STORAGE_BUCKET)
-    storage.upload(object_path, image_bytes, {"content-type": "image/png"})
-    return storage.get_public_url(object_path)
+    return f"{STORAGE_FOLDER}/{filename}"
+
+
+def _on_published(entry: Dict[str, Any]) -> None:
+    print(f"[success] 저장 완료: {entry['record']['title']}")
+
+
+outbox = PublishOutbox("gemini_design_generator", lambda: supabase, on_published=_on_published, slugs=slugs)
 
 
 async def generate_single_design(max_attempts: int = 3) -> bool:
+    sampler = get_sampler()
+    tried: List[Dict[str, str]] = []
     for attempt in range(1, max_attempts + 1):
-        category = random.choice(CATEGORIES)
-        structure = random.choice(STRUCTURES)
-        style = random.choice(STYLES)
+        # 아직 없는 (structure, style) 조합 우선, 덜 쓰인 카테고리/구조/스타일 쪽으로 가중
+        combo = sampler.sample(pending=tried, fresh=True)
+        tried.append(combo)
+        category, structure, style = combo["category"], combo["structure"], combo["style"]
         combo_key = combination_key(structure, style)
 
-        if is_combination_used(combo_key):
-            print(f"[skip] 이미 생성된 조합: {combo_key}")
-            continue
-
         prompt = build_prompt(category, structure, style)
         print(f"[request] {category} | {structure} | {style}")
 
@@ -276,14 +287,12 @@ async def generate_single_design(max_attempts: int = 3) -> bool:
             payload = ensure_payload_shape(parse_gemini_json(response))
             html = wrap_html_if_needed(payload["code"])
             screenshot = await capture_screenshot(html)
-            image_url = upload_image(screenshot, category)
-            slug = ensure_unique_slug(payload["title"])
+            slug = slugs.allocate(slugify(payload["title"]))
 
             record = {
                 "id": str(uuid.uuid4()),
                 "title": payload["title"],
                 "description": payload["description"],
-                "image_url": image_url,
                 "category": category,
                 "code": html,
                 "prompt": combo_key,
@@ -294,8 +303,9 @@ async def generate_single_design(max_attempts: int = 3) -> bool:
                 "updated_at": datetime.utcnow().isoformat(),
             }
 
-            supabase.table("designs").insert(record).execute()
-            print(f"[success] 저장 완료: {payload['title']}")
+            outbox.enqueue(record, screenshot, bucket=STORAGE_BUCKET, image_path=image_path_for(category))
+            sampler.observe(combo)
+            print(f"[success] 게시 대기열 등록: {payload['title']}")
             return True
 
         except Exception as exc:  # pragma: no cover - 런타임 네트워크 예외 처리
@@ -310,10 +320,11 @@ async def generate_single_design(max_attempts: int = 3) -> bool:
 
 async def run_batch(count: int) -> None:
     successes = 0
-    for _ in range(count):
-        created = await generate_single_design()
-        if created:
-            successes += 1
+    async with outbox, capture_session():
+        for _ in range(count):
+            created = await generate_single_design()
+            if created:
+                successes += 1
     print(f"총 {successes}/{count}개 생성 완료")
 
 
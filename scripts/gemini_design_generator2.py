@@ -24,7 +24,9 @@ from typing import Any, Dict, Optional
 
 from dotenv import load_dotenv
 from google import genai
-from playwright.async_api import async_playwright, Browser
+from capture_service import CaptureService, capture_session
+from publish_outbox import PublishOutbox
+from slug_allocator import SlugAllocator
 from supabase import Client, create_client
 
 # --- 환경 변수 로드 ---
@@ -201,101 +203,82 @@ def wrap_html_if_needed(html: str) -> str:
     )
 
 
-async def capture_screenshot(browser: Browser, html: str) -> bytes:
-    page = await browser.new_page(viewport={"width": 1400, "height": 900})
-
-    try:
+async def capture_screenshot(capture: CaptureService, html: str) -> bytes:
+    async with capture.page({"width": 1400, "height": 900}) as page:
         try:
-            await page.set_content(html, wait_until="load", timeout=15000)
-        except Exception as load_err:
-            print(f"[warning] 페이지 로딩 지연 (무시하고 캡처 진행): {load_err}")
-
-        await page.wait_for_timeout(3000)
-
-        await page.evaluate("""
-            (() => {
-              const root = document.getElementById('capture-box') || document.body;
-              if (!root) return;
-
-              const selector = [
-                '.min-h-screen',
-                '.h-screen',
-                '.min-h-\\\\[100vh\\\\]',
-                '.h-\\\\[100vh\\\\]'
-              ].join(', ');
-
-              const targets = root.querySelectorAll(selector);
-              targets.forEach(el => {
-                el.classList.remove('min-h-screen', 'h-screen', 'min-h-[100vh]', 'h-[100vh]');
-                el.style.minHeight = 'auto';
-                el.style.height = 'auto';
-              });
-
-              const all = root.querySelectorAll('*');
-              all.forEach(el => {
-                const mh = (el.style && el.style.minHeight) ? el.style.minHeight : '';
-                const h  = (el.style && el.style.height) ? el.style.height : '';
-                if (mh.includes('100vh')) el.style.minHeight = 'auto';
-                if (h.includes('100vh')) el.style.height = 'auto';
-              });
-
-              document.documentElement.style.margin = '0';
-              document.documentElement.style.padding = '0';
-              document.body.style.margin = '0';
-              document.body.style.padding = '0';
-            })();
-        """)
-
-        await page.wait_for_timeout(200)
-
-        dims = await page.evaluate("""
-            (() => {
-              const el = document.getElementById('capture-box') || document.body;
-              const rect = el.getBoundingClientRect();
-              const height = Math.ceil(el.scrollHeight || rect.height || 900);
-              return { height };
-            })();
-        """)
-        height = int(dims.get("height", 900))
-        height = max(900, min(height + 50, 6000))
-        await page.set_viewport_size({"width": 1400, "height": height})
-        await page.wait_for_timeout(200)
-
-        target = await page.query_selector("#capture-box") or await page.query_selector("body")
-        screenshot = await target.screenshot(type="png")
-
-    except Exception as e:
-        print(f"[error] 캡처 중 에러 발생, 기본 바디 캡처로 대체: {e}")
-        target = await page.query_selector("body")
-        screenshot = await target.screenshot(type="png")
-
-    finally:
-        await page.close()
-
+            try:
+                await page.set_content(html, wait_until="load", timeout=15000)
+            except Exception as load_err:
+                print(f"[warning] 페이지 로딩 지연 (무시하고 캡처 진행): {load_err}")
+
+            await page.wait_for_timeout(3000)
+
+            await page.evaluate("""
+                (() => {
+                  const root = document.getElementById('capture-box') || document.body;
+                  if (!root) return;
+
+                  const selector = [
+                    '.min-h-screen',
+                    '.h-screen',
+                    '.min-h-\\\\[100vh\\\\]',
+                    '.h-\\\\[100vh\\\\]'
+                  ].join(', ');
+
+                  const targets = root.querySelectorAll(selector);
+                  targets.forEach(el => {
+                    el.classList.remove('min-h-screen', 'h-screen', 'min-h-[100vh]', 'h-[100vh]');
+                    el.style.minHeight = 'auto';
+                    el.style.height = 'auto';
+                  });
+
+                  const all = root.querySelectorAll('*');
+                  all.forEach(el => {
+                    const mh = (el.style && el.style.minHeight) ? el.style.minHeight : '';
+                    const h  = (el.style && el.style.height) ? el.style.height : '';
+                    if (mh.includes('100vh')) el.style.minHeight = 'auto';
+                    if (h.includes('100vh')) el.style.height = 'auto';
+                  });
+
+                  document.documentElement.style.margin = '0';
+                  document.documentElement.style.padding = '0';
+                  document.body.style.margin = '0';
+                  document.body.style.padding = '0';
+                })();
+            """)
+
+            await page.wait_for_timeout(200)
+
+            dims = await page.evaluate("""
+                (() => {
+                  const el = document.getElementById('capture-box') || document.body;
+                  const rect = el.getBoundingClientRect();
+                  const height = Math.ceil(el.scrollHeight || rect.height || 900);
+                  return { height };
+                })();
+            """)
+            height = int(dims.get("height", 900))
+            height = max(900, min(height + 50, 6000))
+            await page.set_viewport_size({"width": 1400, "height": height})
+            await page.wait_for_timeout(200)
+
+            target = await page.query_selector("#capture-box") or await page.query_selector("body")
+            screenshot = await target.screenshot(type="png")
+
+        except Exception as e:
+            print(f"[error] 캡처 중 에러 발생, 기본 바디 캡처로 대체: {e}")
+            target = await page.query_selector("body")
+            screenshot = await target.screenshot(type="png")
     return screenshot
 
 
-def upload_image(image_bytes: bytes, category: str) -> str:
+def image_path_for(category: str) -> str:
     filename = f"{datetime.utcnow():%Y%m%d_%H%M%S}_{slugify(category)}_{uuid.uuid4().hex[:6]}.png"
-    object_path = f"{STORAGE_FOLDER}/{filename}"
-    supabase.storage.from_(STORAGE_BUCKET).upload(
-        object_path,
-        image_bytes,
-        {"content-type": "image/png"},
-    )
-    return supabase.storage.from_(STORAGE_BUCKET).get_public_url(object_path)
+    return f"{STORAGE_FOLDER}/{filename}"
 
 
-def ensure_unique_slug(base_title: str) -> str:
-    base = slugify(base_title)
-    candidate = base
-    suffix = 2
-    while True:
-        response = supabase.table("designs").select("id").eq("slug", candidate).limit(1).execute()
-        if not response.data:
-            return candidate
-        candidate = f"{base}-{suffix}"
-        suffix += 1
+# base 당 한 번 조회 + 배치 내 예약, 게시 중 충돌은 outbox 가 재할당
+slugs = SlugAllocator(lambda: supabase)
 
 
 def normalize_request_category(value: Optional[str]) -> str:
@@ -378,8 +361,31 @@ def notify_request_completion(request_id: str, design_id: str) -> None:
         print(f"[warning] 알림 API 호출 실패: {exc}")
 
 
+def _on_published(entry: Dict[str, Any]) -> None:
+    """outbox 게시 완료 후: 신청 기반 디자인이면 신청 완료 처리 + 메일 알림"""
+    record = entry["record"]
+    print(f"[success] 저장 완료: {record['title']} ({record['slug']})")
+    request_id = entry["meta"].get("request_id")
+    if request_id:
+        update_request_status(request_id, "completed", linked_design_id=entry["id"])
+        print(f"[success] 신청 완료 처리: {request_id} -> {entry['id']}")
+        notify_request_completion(request_id, entry["id"])
+
+
+def _on_dead(entry: Dict[str, Any]) -> None:
+    """게시를 끝내 실패한 경우 신청을 다시 대기 상태로"""
+    request_id = entry["meta"].get("request_id")
+    if request_id:
+        update_request_status(request_id, "pending")
+        print(f"[info] 게시 실패로 신청 재대기 처리: {request_id}")
+
+
+outbox = PublishOutbox("gemini_design_generator2", lambda: supabase, on_published=_on_published, on_dead=_on_dead,
+                       slugs=slugs)
+
+
 async def generate_single_design(
-    browser: Browser,
+    capture: CaptureService,
     max_attempts: int = 3,
     source_request: Optional[Dict[str, Any]] = None,
 ) -> tuple[bool, Optional[str]]:
@@ -428,9 +434,8 @@ async def generate_single_design(
             elif isinstance(raw_colors, str):
                 safe_colors = [raw_colors]
 
-            screenshot = await capture_screenshot(browser, wrapped_html)
-            image_url = upload_image(screenshot, category)
-            slug = ensure_unique_slug(payload.get("title", "Untitled Design"))
+            screenshot = await capture_screenshot(capture, wrapped_html)
+            slug = slugs.allocate(slugify(payload.get("title", "Untitled Design")))
             design_id = str(uuid.uuid4())
 
             record = {
@@ -439,7 +444,6 @@ async def generate_single_design(
                 "description": payload.get("description", ""),
                 "features": payload.get("features", []),
                 "usage": payload.get("usage", ""),
-                "image_url": image_url,
                 "category": category,
                 "code": html_code,
                 "code_react": react_code,
@@ -452,8 +456,12 @@ async def generate_single_design(
                 "created_at": datetime.utcnow().isoformat(),
             }
 
-            supabase.table("designs").insert(record).execute()
-            print(f"[success] 저장 완료: {record['title']} ({slug})")
+            outbox.enqueue(
+                record, screenshot,
+                bucket=STORAGE_BUCKET, image_path=image_path_for(category),
+                meta={"request_id": source_request["id"]} if source_request else None,
+            )
+            print(f"[success] 게시 대기열 등록: {record['title']} ({slug})")
             return True, design_id
 
         except Exception as exc:
@@ -472,8 +480,7 @@ async def run_batch(count: int, use_requests: bool, requests_only: bool) -> None
     mode = "신청 우선" if use_requests else "랜덤"
     print(f"[system] 디자인 {count}개 생성을 시작합니다... (모드: {mode})")
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
+    async with outbox, capture_session() as capture:
         for i in range(count):
             print(f"\n--- 작업 진행 ({i+1}/{count}) ---")
             source_request: Optional[Dict[str, Any]] = None
@@ -489,16 +496,10 @@ async def run_batch(count: int, use_requests: bool, requests_only: bool) -> None
                     print("[info] 처리할 pending 신청이 없습니다. 요청 모드를 종료합니다.")
                     break
 
-            ok, design_id = await generate_single_design(browser, source_request=source_request)
+            ok, design_id = await generate_single_design(capture, source_request=source_request)
             if ok:
+                # 신청 완료 처리는 outbox 게시 완료 훅(_on_published)에서
                 successes += 1
-                if source_request and design_id:
-                    try:
-                        update_request_status(source_request["id"], "completed", linked_design_id=design_id)
-                        print(f"[success] 신청 완료 처리: {source_request['id']} -> {design_id}")
-                        notify_request_completion(source_request["id"], design_id)
-                    except Exception as exc:
-                        print(f"[warning] 신청 완료 업데이트 실패: {exc}")
             elif source_request:
                 try:
                     update_request_status(source_request["id"], "pending")
@@ -506,7 +507,6 @@ async def run_batch(count: int, use_requests: bool, requests_only: bool) -> None
                 except Exception as exc:
                     print(f"[warning] 신청 재대기 업데이트 실패: {exc}")
             await asyncio.sleep(3)
-        await browser.close()
 
     print(f"\n[결과] 총 {successes}/{count}개 생성 완료")
 
@@ -26,7 +26,10 @@ import httpx
 import tweepy
 from dotenv import load_dotenv
 from google import genai
-from playwright.async_api import async_playwright, Browser
+from capture_service import CaptureService, capture_session
+from llm_cache import cached_generate_content, shutdown_llm_cache
+from publish_outbox import PublishOutbox
+from slug_allocator import SlugAllocator
 from supabase import Client, create_client
 
 # ---------------------------------------------------------------------------
@@ -87,6 +90,16 @@ def get_gemini() -> genai.Client:
     return _gemini_client
 
 
+def _on_published(entry: Dict[str, Any]) -> None:
+    log.info("[게시] %s 저장 완료", entry["record"]["title"])
+
+
+# base 당 한 번 조회 + 배치 내 예약, 게시 중 충돌은 outbox 가 재할당
+slugs = SlugAllocator(get_supabase)
+# 업로드/DB 저장은 outbox 드레인 워커가 묶음 upsert 로 처리
+outbox = PublishOutbox("generator3_v3", get_supabase, on_published=_on_published, slugs=slugs)
+
+
 # ---------------------------------------------------------------------------
 # Rate Limiter
 # ---------------------------------------------------------------------------
@@ -209,14 +222,14 @@ Include <script src="https://cdn.tailwindcss.com"></script> and <link href="http
 # 메인 생성 로직 (API 1회)
 # ---------------------------------------------------------------------------
 
-async def generate_single_design(browser: Browser, source_request: Optional[Dict[str, Any]] = None) -> tuple[bool, Optional[str]]:
+async def generate_single_design(capture: CaptureService, source_request: Optional[Dict[str, Any]] = None) -> tuple[bool, Optional[str]]:
     category = random.choice(CATEGORIES)
     style, structure = pick_compatible_style_structure()
     prompt = UNIFIED_PROMPT_TEMPLATE.format(category=category, structure=structure, style=style, request_context="")
 
     await rate_limiter.acquire()
     try:
-        response = await asyncio.to_thread(get_gemini().models.generate_content, model=GEMINI_MODEL, config={"response_mime_type": "application/json"}, contents=[prompt])
+        response = await asyncio.to_thread(cached_generate_content, get_gemini(), model=GEMINI_MODEL, config={"response_mime_type": "application/json"}, contents=[prompt])
         try:
             payload = json.loads(response.text)
         except json.JSONDecodeError as e:
@@ -224,22 +237,17 @@ async def generate_single_design(browser: Browser, source_request: Optional[Dict
             return False, None
         
         design_id = str(uuid.uuid4())
-        slug = re.sub(r"[^a-z0-9]+", "-", payload['title'].lower()).strip("-")
+        slug = slugs.allocate(re.sub(r"[^a-z0-9]+", "-", payload['title'].lower()).strip("-"))
         html_code = payload.get("html_code", "")
         
         # 캡처 및 업로드
-        page = await browser.new_page(viewport={"width": 1400, "height": 900})
-        await page.set_content(html_code)
-        await page.wait_for_timeout(2000)
-        screenshot = await page.screenshot(type="png")
-        await page.close()
+        async with capture.page({"width": 1400, "height": 900}) as page:
+            await page.set_content(html_code)
+            await page.wait_for_timeout(2000)
+            screenshot = await page.screenshot(type="png")
         
-        # Supabase Storage 업로드
         filename = f"{datetime.utcnow():%Y%m%d_%H%M%S}_{slug}.png"
         object_path = f"{STORAGE_FOLDER}/{filename}"
-        sb = get_supabase()
-        await asyncio.to_thread(sb.storage.from_(STORAGE_BUCKET).upload, object_path, screenshot, {"content-type": "image/png"})
-        image_url = await asyncio.to_thread(sb.storage.from_(STORAGE_BUCKET).get_public_url, object_path)
 
         # SNS용 스레드 생성 (고도화된 가독성 프롬프트)
         thread_prompt = f"""
@@ -261,37 +269,35 @@ async def generate_single_design(browser: Browser, source_request: Optional[Dict
 
         Format: Return ONLY valid JSON with a "tweets" key (list of 3 strings).
         """
-        thread_res = await asyncio.to_thread(get_gemini().models.generate_content, model=GEMINI_MODEL, config={"response_mime_type": "application/json"}, contents=[thread_prompt])
+        thread_res = await asyncio.to_thread(cached_generate_content, get_gemini(), model=GEMINI_MODEL, config={"response_mime_type": "application/json"}, contents=[thread_prompt])
         tweets = json.loads(thread_res.text).get("tweets", [])
 
         # SNS 업로드
         await post_to_x_thread(payload['title'], screenshot, slug, tweets)
         
-        # DB 저장
+        # DB 저장 (outbox 적재 → 업로드 + upsert 는 드레인 워커)
         record = {
             "id": design_id, 
             "title": payload['title'], 
             "slug": slug, 
             "category": category, 
             "code": html_code, 
-            "image_url": image_url,
             "sns_promoted": True, 
             "created_at": datetime.utcnow().isoformat()
         }
-        await asyncio.to_thread(sb.table("designs").insert(record).execute)
+        outbox.enqueue(record, screenshot, bucket=STORAGE_BUCKET, image_path=object_path)
         
-        log.info("[성공] %s 게시 완료", payload['title'])
+        log.info("[성공] %s 게시 대기열 등록", payload['title'])
         return True, design_id
     except Exception as e:
         log.error("[에러] %s", e)
         return False, None
 
 async def run_batch(count: int):
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
+    async with outbox, capture_session() as capture:
         for i in range(count):
-            await generate_single_design(browser)
-        await browser.close()
+            await generate_single_design(capture)
+    shutdown_llm_cache()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -26,7 +26,10 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
-from playwright.async_api import async_playwright, Browser
+from capture_service import CaptureService, capture_session
+from ollama_client import get_ollama_client, ollama_session
+from publish_outbox import PublishOutbox
+from slug_allocator import SlugAllocator
 from supabase import Client, create_client
 
 # ---------------------------------------------------------------------------
@@ -75,35 +78,23 @@ def get_supabase() -> Client:
 
 
 # ---------------------------------------------------------------------------
-# Ollama client
+# Ollama client (공유 keep-alive 풀, 역할별 타임아웃 — 32b 모델은 응답이 느릴 수 있음)
 # ---------------------------------------------------------------------------
-import httpx
 
-OLLAMA_TIMEOUT = 600  # 32b 모델은 응답이 느릴 수 있음
-
-
-async def ollama_generate(model: str, prompt: str, temperature: float = 0.7) -> str:
-    async with httpx.AsyncClient(timeout=OLLAMA_TIMEOUT) as client:
-        log.info("[ollama] → %s (temp=%.1f)", model, temperature)
-        t0 = time.monotonic()
-        resp = await client.post(
-            f"{OLLAMA_URL}/api/generate",
-            json={
-                "model": model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": temperature,
-                    "num_ctx": 16384,
-                    "top_p": 0.9,
-                },
-            },
-        )
-        resp.raise_for_status()
-        elapsed = time.monotonic() - t0
-        text = resp.json().get("response", "").strip()
-        log.info("[ollama] ← %s (%.1fs, %d chars)", model, elapsed, len(text))
-        return text
+async def ollama_generate(model: str, prompt: str, temperature: float = 0.7, pass_name: str = "designer") -> str:
+    log.info("[ollama] → %s (temp=%.1f)", model, temperature)
+    t0 = time.monotonic()
+    text = await get_ollama_client(OLLAMA_URL).generate(
+        model, prompt,
+        options={
+            "temperature": temperature,
+            "num_ctx": 16384,
+            "top_p": 0.9,
+        },
+        pass_name=pass_name,
+    )
+    log.info("[ollama] ← %s (%.1fs, %d chars)", model, time.monotonic() - t0, len(text))
+    return text
 
 
 # ---------------------------------------------------------------------------
@@ -437,17 +428,8 @@ def infer_tags(category: str, structure: str, style: str, title: str) -> List[st
     return tags[:8]
 
 
-def ensure_unique_slug(base_title: str) -> str:
-    base = slugify(base_title)
-    candidate = base
-    suffix = 2
-    sb = get_supabase()
-    while True:
-        resp = sb.table("designs").select("id").eq("slug", candidate).limit(1).execute()
-        if not resp.data:
-            return candidate
-        candidate = f"{base}-{suffix}"
-        suffix += 1
+# base 당 한 번 조회 + 배치 내 예약, 게시 중 충돌은 outbox 가 재할당
+slugs = SlugAllocator(get_supabase)
 
 
 # ---------------------------------------------------------------------------
@@ -485,48 +467,46 @@ def wrap_html(html: str) -> str:
 # Screenshot Capture (tight capture from v2.3.1)
 # ---------------------------------------------------------------------------
 
-async def capture_screenshot(browser: Browser, html: str) -> bytes:
-    page = await browser.new_page(viewport={"width": 1400, "height": 900})
-    try:
+async def capture_screenshot(capture: CaptureService, html: str) -> bytes:
+    async with capture.page({"width": 1400, "height": 900}) as page:
         try:
-            await page.set_content(html, wait_until="load", timeout=15000)
+            try:
+                await page.set_content(html, wait_until="load", timeout=15000)
+            except Exception as e:
+                log.warning("페이지 로딩 지연: %s", e)
+
+            await page.wait_for_timeout(3000)
+
+            await page.evaluate("""(() => {
+                const root = document.getElementById('capture-box') || document.body;
+                root.querySelectorAll('.min-h-screen,.h-screen').forEach(el => {
+                    el.classList.remove('min-h-screen','h-screen');
+                    el.style.minHeight = 'auto';
+                    el.style.height = 'auto';
+                });
+                root.querySelectorAll('*').forEach(el => {
+                    if (el.style?.minHeight?.includes('100vh')) el.style.minHeight = 'auto';
+                    if (el.style?.height?.includes('100vh')) el.style.height = 'auto';
+                });
+                document.documentElement.style.margin = '0';
+                document.body.style.margin = '0';
+            })()""")
+            await page.wait_for_timeout(200)
+
+            dims = await page.evaluate("""(() => {
+                const el = document.getElementById('capture-box') || document.body;
+                return { height: Math.ceil(el.scrollHeight || 900) };
+            })()""")
+            height = max(900, min(int(dims.get("height", 900)) + 50, 6000))
+            await page.set_viewport_size({"width": 1400, "height": height})
+            await page.wait_for_timeout(200)
+
+            target = await page.query_selector("#capture-box") or await page.query_selector("body")
+            screenshot = await target.screenshot(type="png")
         except Exception as e:
-            log.warning("페이지 로딩 지연: %s", e)
-
-        await page.wait_for_timeout(3000)
-
-        await page.evaluate("""(() => {
-            const root = document.getElementById('capture-box') || document.body;
-            root.querySelectorAll('.min-h-screen,.h-screen').forEach(el => {
-                el.classList.remove('min-h-screen','h-screen');
-                el.style.minHeight = 'auto';
-                el.style.height = 'auto';
-            });
-            root.querySelectorAll('*').forEach(el => {
-                if (el.style?.minHeight?.includes('100vh')) el.style.minHeight = 'auto';
-                if (el.style?.height?.includes('100vh')) el.style.height = 'auto';
-            });
-            document.documentElement.style.margin = '0';
-            document.body.style.margin = '0';
-        })()""")
-        await page.wait_for_timeout(200)
-
-        dims = await page.evaluate("""(() => {
-            const el = document.getElementById('capture-box') || document.body;
-            return { height: Math.ceil(el.scrollHeight || 900) };
-        })()""")
-        height = max(900, min(int(dims.get("height", 900)) + 50, 6000))
-        await page.set_viewport_size({"width": 1400, "height": height})
-        await page.wait_for_timeout(200)
-
-        target = await page.query_selector("#capture-box") or await page.query_selector("body")
-        screenshot = await target.screenshot(type="png")
-    except Exception as e:
-        log.error("캡처 에러, body 대체: %s", e)
-        target = await page.query_selector("body")
-        screenshot = await target.screenshot(type="png")
-    finally:
-        await page.close()
+            log.error("캡처 에러, body 대체: %s", e)
+            target = await page.query_selector("body")
+            screenshot = await target.screenshot(type="png")
     return screenshot
 
 
@@ -534,12 +514,9 @@ async def capture_screenshot(browser: Browser, html: str) -> bytes:
 # Supabase upload
 # ---------------------------------------------------------------------------
 
-def upload_image(image_bytes: bytes, slug: str) -> str:
+def image_path_for(slug: str) -> str:
     filename = f"{datetime.utcnow():%Y%m%d_%H%M%S}_{slug}_{uuid.uuid4().hex[:6]}.png"
-    path = f"{STORAGE_FOLDER}/{filename}"
-    sb = get_supabase()
-    sb.storage.from_(STORAGE_BUCKET).upload(path, image_bytes, {"content-type": "image/png"})
-    return sb.storage.from_(STORAGE_BUCKET).get_public_url(path)
+    return f"{STORAGE_FOLDER}/{filename}"
 
 
 # ---------------------------------------------------------------------------
@@ -570,12 +547,33 @@ def update_request_status(req_id: str, status: str, design_id: Optional[str] = N
     get_supabase().table("design_requests").update(payload).eq("id", req_id).execute()
 
 
+# ---------------------------------------------------------------------------
+# Publish outbox (업로드/DB 저장은 드레인 워커가 비동기로)
+# ---------------------------------------------------------------------------
+
+def _on_published(entry: Dict[str, Any]) -> None:
+    record = entry["record"]
+    log.info("[published] ✓ %s (slug=%s)", record["title"], record["slug"])
+    request_id = entry["meta"].get("request_id")
+    if request_id:
+        update_request_status(request_id, "completed", entry["id"])
+
+
+def _on_dead(entry: Dict[str, Any]) -> None:
+    request_id = entry["meta"].get("request_id")
+    if request_id:
+        update_request_status(request_id, "pending")
+
+
+outbox = PublishOutbox("generator4_pro", get_supabase, on_published=_on_published, on_dead=_on_dead, slugs=slugs)
+
+
 # ---------------------------------------------------------------------------
 # Core Pipeline
 # ---------------------------------------------------------------------------
 
 async def generate_design(
-    browser: Browser,
+    capture: CaptureService,
     source_request: Optional[Dict[str, Any]] = None,
 ) -> Tuple[bool, Optional[str]]:
 
@@ -626,7 +624,7 @@ async def generate_design(
             # ── Phase 2: Critic reviews ──
             log.info("[phase2] Critic (%s) 리뷰 중...", CRITIC_MODEL)
             critic_prompt = build_critic_prompt(design)
-            raw_review = await ollama_generate(CRITIC_MODEL, critic_prompt, temperature=0.3)
+            raw_review = await ollama_generate(CRITIC_MODEL, critic_prompt, temperature=0.3, pass_name="critic")
             review = parse_json_safe(raw_review)
 
             total = review.get("total", 0)
@@ -642,7 +640,7 @@ async def generate_design(
                 log.info("[phase3] Score %d < %d, Refiner (%s) 개선 중...",
                          total, QUALITY_THRESHOLD, REFINER_MODEL)
                 refiner_prompt = build_refiner_prompt(design, review, category, structure, style)
-                raw_improved = await ollama_generate(REFINER_MODEL, refiner_prompt, temperature=0.6)
+                raw_improved = await ollama_generate(REFINER_MODEL, refiner_prompt, temperature=0.6, pass_name="refiner")
                 improved = parse_json_safe(raw_improved)
 
                 if improved.get("html_code"):
@@ -651,7 +649,8 @@ async def generate_design(
 
                     # Quick re-review for logging (don't block on this)
                     log.info("[phase3] 개선본 빠른 리뷰...")
-                    raw_re = await ollama_generate(CRITIC_MODEL, build_critic_prompt(design), temperature=0.3)
+                    raw_re = await ollama_generate(CRITIC_MODEL, build_critic_prompt(design), temperature=0.3,
+                                                   pass_name="critic")
                     try:
                         re_review = parse_json_safe(raw_re)
                         total = re_review.get("total", total)
@@ -664,9 +663,8 @@ async def generate_design(
             # ── Save ──
             html_code = design.get("html_code", "")
             wrapped = wrap_html(html_code)
-            screenshot = await capture_screenshot(browser, wrapped)
-            slug = ensure_unique_slug(design.get("title", "Untitled Design"))
-            image_url = upload_image(screenshot, slug)
+            screenshot = await capture_screenshot(capture, wrapped)
+            slug = slugs.allocate(slugify(design.get("title", "Untitled Design")))
             design_id = str(uuid.uuid4())
 
             record = {
@@ -675,7 +673,6 @@ async def generate_design(
                 "description": design.get("description", ""),
                 "features": design.get("features", []),
                 "usage": design.get("usage", ""),
-                "image_url": image_url,
                 "category": category,
                 "code": html_code,
                 "code_react": design.get("react_code", ""),
@@ -701,8 +698,12 @@ async def generate_design(
                 "created_at": datetime.utcnow().isoformat(),
             }
 
-            get_supabase().table("designs").insert(record).execute()
-            log.info("[saved] ✓ %s (slug=%s, score=%d, attempt=%d)", record["title"], slug, total, attempt)
+            outbox.enqueue(
+                record, screenshot,
+                bucket=STORAGE_BUCKET, image_path=image_path_for(slug),
+                meta={"request_id": source_request["id"]} if source_request else None,
+            )
+            log.info("[queued] ✓ %s (slug=%s, score=%d, attempt=%d)", record["title"], slug, total, attempt)
             return True, design_id
 
         except Exception as e:
@@ -722,8 +723,7 @@ async def run_batch(count: int, use_requests: bool, requests_only: bool):
              count, DESIGNER_MODEL, CRITIC_MODEL, REFINER_MODEL)
     log.info("[start] Quality threshold: %d/100", QUALITY_THRESHOLD)
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
+    async with ollama_session(), outbox, capture_session() as capture:
 
         for i in range(count):
             log.info("\n━━━━━━━━━━ [%d/%d] ━━━━━━━━━━", i + 1, count)
@@ -741,22 +741,17 @@ async def run_batch(count: int, use_requests: bool, requests_only: bool):
                     log.info("[done] pending 신청 없음")
                     break
 
-            ok, design_id = await generate_design(browser, source_request=source_request)
+            ok, design_id = await generate_design(capture, source_request=source_request)
 
             if ok:
+                # 신청 완료 처리는 outbox 게시 완료 훅(_on_published)에서
                 successes += 1
-                if source_request and design_id:
-                    try:
-                        update_request_status(source_request["id"], "completed", design_id)
-                    except Exception:
-                        pass
             elif source_request:
                 try:
                     update_request_status(source_request["id"], "pending")
                 except Exception:
                     pass
 
-        await browser.close()
 
     log.info("\n[result] %d/%d 생성 완료", successes, count)
 
@@ -32,7 +32,10 @@ except ImportError:
     _TWEEPY_AVAILABLE = False
 from dotenv import load_dotenv
 from google import genai
-from playwright.async_api import async_playwright, Browser
+from capture_service import CaptureService, capture_session
+from llm_cache import cached_generate_content, shutdown_llm_cache
+from publish_outbox import PublishOutbox
+from slug_allocator import SlugAllocator
 from supabase import Client, create_client
 
 # ── 로깅 ──────────────────────────────────────────────────────────────────────
@@ -519,64 +522,62 @@ Character limit per tweet: 280.
 
 
 # ── 스크린샷 파이프라인 ───────────────────────────────────────────────────────
-async def capture_screenshot(browser: Browser, html: str) -> bytes:
+async def capture_screenshot(capture: CaptureService, html: str) -> bytes:
     """고품질 스크린샷: 폰트 로딩 대기 + vh 정리 + 타이트 크롭"""
-    page = await browser.new_page(viewport={"width": 1400, "height": 900})
-    try:
-        # 페이지 로드
+    async with capture.page({"width": 1400, "height": 900}) as page:
         try:
-            await page.set_content(html, wait_until="networkidle", timeout=20_000)
-        except Exception:
-            await page.set_content(html, wait_until="load", timeout=15_000)
-
-        # 폰트 완전 로딩 대기
-        await page.evaluate("""
-            () => document.fonts.ready
-        """)
-        await page.wait_for_timeout(1500)
-
-        # vh/vw 기반 전체 높이 요소 축소 (빈 공간 방지)
-        await page.evaluate("""\
-            (() => {
-              const root = document.getElementById('capture-box') || document.body;
-              const viewport_selectors = [
-                '.min-h-screen', '.h-screen',
-                '.min-h-\\\\[100vh\\\\]', '.h-\\\\[100vh\\\\]'
-              ].join(', ');
-
-              root.querySelectorAll(viewport_selectors).forEach(el => {
-                el.style.minHeight = 'auto';
-                el.style.height = 'auto';
-              });
-              root.querySelectorAll('*').forEach(el => {
-                const s = el.style;
-                if (s.minHeight?.includes('100vh')) s.minHeight = 'auto';
-                if (s.height?.includes('100vh')) s.height = 'auto';
-              });
-              document.documentElement.style.cssText += 'margin:0;padding:0;';
-              document.body.style.cssText += 'margin:0;padding:0;';
-            })();
-        """)
-        await page.wait_for_timeout(300)
-
-        # 정확한 콘텐츠 높이 계산
-        dims = await page.evaluate("""\
-            (() => {
-              const el = document.getElementById('capture-box') || document.body;
-              return { height: Math.ceil(el.scrollHeight || 900) };
-            })();
-        """)
-        height = max(900, min(int(dims.get("height", 900)) + 40, 7000))
-        await page.set_viewport_size({"width": 1400, "height": height})
-        await page.wait_for_timeout(200)
-
-        target = await page.query_selector("#capture-box") or await page.query_selector("body")
-        screenshot = await target.screenshot(type="png")
-    except Exception as exc:
-        log.error("[screenshot] 에러: %s — 폴백 캡처", exc)
-        screenshot = await page.screenshot(type="png")
-    finally:
-        await page.close()
+            # 페이지 로드
+            try:
+                await page.set_content(html, wait_until="networkidle", timeout=20_000)
+            except Exception:
+                await page.set_content(html, wait_until="load", timeout=15_000)
+
+            # 폰트 완전 로딩 대기
+            await page.evaluate("""
+                () => document.fonts.ready
+            """)
+            await page.wait_for_timeout(1500)
+
+            # vh/vw 기반 전체 높이 요소 축소 (빈 공간 방지)
+            await page.evaluate("""\
+                (() => {
+                  const root = document.getElementById('capture-box') || document.body;
+                  const viewport_selectors = [
+                    '.min-h-screen', '.h-screen',
+                    '.min-h-\\\\[100vh\\\\]', '.h-\\\\[100vh\\\\]'
+                  ].join(', ');
+
+                  root.querySelectorAll(viewport_selectors).forEach(el => {
+                    el.style.minHeight = 'auto';
+                    el.style.height = 'auto';
+                  });
+                  root.querySelectorAll('*').forEach(el => {
+                    const s = el.style;
+                    if (s.minHeight?.includes('100vh')) s.minHeight = 'auto';
+                    if (s.height?.includes('100vh')) s.height = 'auto';
+                  });
+                  document.documentElement.style.cssText += 'margin:0;padding:0;';
+                  document.body.style.cssText += 'margin:0;padding:0;';
+                })();
+            """)
+            await page.wait_for_timeout(300)
+
+            # 정확한 콘텐츠 높이 계산
+            dims = await page.evaluate("""\
+                (() => {
+                  const el = document.getElementById('capture-box') || document.body;
+                  return { height: Math.ceil(el.scrollHeight || 900) };
+                })();
+            """)
+            height = max(900, min(int(dims.get("height", 900)) + 40, 7000))
+            await page.set_viewport_size({"width": 1400, "height": height})
+            await page.wait_for_timeout(200)
+
+            target = await page.query_selector("#capture-box") or await page.query_selector("body")
+            screenshot = await target.screenshot(type="png")
+        except Exception as exc:
+            log.error("[screenshot] 에러: %s — 폴백 캡처", exc)
+            screenshot = await page.screenshot(type="png")
     return screenshot
 
 
@@ -603,23 +604,13 @@ def slugify(value: str) -> str:
     return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-") or "design"
 
 
-def ensure_unique_slug(base: str) -> str:
-    candidate = slugify(base)
-    suffix = 2
-    while True:
-        resp = get_supabase().table("designs").select("id").eq("slug", candidate).limit(1).execute()
-        if not resp.data:
-            return candidate
-        candidate = f"{slugify(base)}-{suffix}"
-        suffix += 1
+# base 당 한 번 조회 + 배치 내 예약, 게시 중 충돌은 outbox 가 재할당
+slugs = SlugAllocator(get_supabase)
 
 
-def upload_image(image_bytes: bytes, category: str) -> str:
+def image_path_for(category: str) -> str:
     filename = f"{datetime.utcnow():%Y%m%d_%H%M%S}_{slugify(category)}_{uuid.uuid4().hex[:6]}.png"
-    path = f"{STORAGE_FOLDER}/{filename}"
-    sb = get_supabase()
-    sb.storage.from_(STORAGE_BUCKET).upload(path, image_bytes, {"content-type": "image/png"})
-    return sb.storage.from_(STORAGE_BUCKET).get_public_url(path)
+    return f"{STORAGE_FOLDER}/{filename}"
 
 
 # ── SNS 업로드 ────────────────────────────────────────────────────────────────
@@ -683,9 +674,32 @@ def update_request_status(rid: str, status: str, design_id: Optional[str] = None
     get_supabase().table("design_requests").update(payload).eq("id", rid).execute()
 
 
+# ── 게시 outbox (업로드/DB 저장은 드레인 워커) ─────────────────────────────────
+def _on_published(entry: Dict[str, Any]) -> None:
+    record = entry["record"]
+    log.info("[✓] 저장 완료: %s (score=%s, slug=%s)", record["title"], record.get("quality_score"), record["slug"])
+    request_id = entry["meta"].get("request_id")
+    if request_id:
+        update_request_status(request_id, "completed", entry["id"])
+
+
+def _on_dead(entry: Dict[str, Any]) -> None:
+    request_id = entry["meta"].get("request_id")
+    if request_id:
+        update_request_status(request_id, "pending")
+
+
+outbox = PublishOutbox(
+    "generator4_v1", get_supabase,
+    on_published=_on_published, on_dead=_on_dead,
+    optional_columns=["quality_score", "design_notes", "usage_notes"],
+    slugs=slugs,
+)
+
+
 # ── 핵심 생성 루프 ────────────────────────────────────────────────────────────
 async def generate_single_design(
-    browser: Browser,
+    capture: CaptureService,
     source_request: Optional[Dict[str, Any]] = None,
     max_attempts: int = 3,
 ) -> tuple[bool, Optional[str]]:
@@ -727,10 +741,12 @@ async def generate_single_design(
 
         try:
             response = await asyncio.to_thread(
-                get_gemini().models.generate_content,
+                cached_generate_content,
+                get_gemini(),
                 model=current_model,
                 config={"response_mime_type": "application/json"},
                 contents=[design_prompt],
+                attempt=attempt,
             )
             raw = response.text.strip()
             # JSON 펜스 제거
@@ -785,21 +801,14 @@ async def generate_single_design(
         # 스크린샷
         wrapped = wrap_html_for_capture(html_code)
         try:
-            screenshot = await capture_screenshot(browser, wrapped)
+            screenshot = await capture_screenshot(capture, wrapped)
         except Exception as exc:
             log.error("[screenshot] 실패: %s", exc)
             return False, None
 
-        # 이미지 업로드
-        try:
-            image_url = await asyncio.to_thread(upload_image, screenshot, category)
-        except Exception as exc:
-            log.error("[upload] 실패: %s", exc)
-            return False, None
-
         # Slug / ID
         design_id = str(uuid.uuid4())
-        slug = ensure_unique_slug(payload.get("title", "Untitled Design"))
+        slug = slugs.allocate(slugify(payload.get("title", "Untitled Design")))
 
         # colors 정규화
         raw_colors = payload.get("colors", [])
@@ -818,7 +827,8 @@ async def generate_single_design(
                 payload.get("title", "Untitled"), category, style, slug, design_notes
             )
             sns_resp = await asyncio.to_thread(
-                get_gemini().models.generate_content,
+                cached_generate_content,
+                get_gemini(),
                 model=current_model,  # 디자인 생성에 성공한 모델 재사용
                 config={"response_mime_type": "application/json"},
                 contents=[sns_prompt],
@@ -830,12 +840,11 @@ async def generate_single_design(
         # X 업로드
         await post_to_x_thread(payload.get("title", ""), screenshot, slug, tweets)
 
-        # DB 저장 — 실제 designs 테이블 스키마에 맞는 컬럼만 사용
+        # DB 저장 — 기본 컬럼 + 선택 컬럼 (없는 컬럼은 outbox 가 한 번 감지해 제외)
         record = {
             "id":           design_id,
             "title":        payload.get("title", "Untitled Design"),
             "description":  payload.get("description", ""),
-            "image_url":    image_url,
             "category":     category,
             "code":         html_code,
             "prompt":       f"{structure}_{style}".lower().replace(" ", "_"),
@@ -843,30 +852,21 @@ async def generate_single_design(
             "slug":         slug,
             "status":       "published",
             "created_at":   datetime.utcnow().isoformat(),
-        }
-        # 옵션 컬럼: 존재할 수도 있는 컬럼은 별도 시도
-        optional_fields = {
             "quality_score": score,
             "design_notes":  design_notes,
             "usage_notes":   payload.get("usage", ""),
         }
         try:
-            await asyncio.to_thread(
-                get_supabase().table("designs").insert({**record, **optional_fields}).execute
+            outbox.enqueue(
+                record, screenshot,
+                bucket=STORAGE_BUCKET, image_path=image_path_for(category),
+                meta={"request_id": source_request["id"]} if source_request else None,
             )
-            log.info("[db] 전체 컬럼 저장 성공")
         except Exception as exc:
-            log.warning("[db] 일부 컬럼 없음, 기본 컬럼만 저장: %s", exc)
-            try:
-                await asyncio.to_thread(
-                    get_supabase().table("designs").insert(record).execute
-                )
-                log.info("[db] 기본 컬럼 저장 성공")
-            except Exception as exc2:
-                log.error("[db] 저장 실패: %s", exc2)
-                return False, None
+            log.error("[outbox] 적재 실패: %s", exc)
+            return False, None
 
-        log.info("[✓] 저장 완료: %s (score=%d, slug=%s)", payload.get("title"), score, slug)
+        log.info("[✓] 게시 대기열 등록: %s (score=%d, slug=%s)", payload.get("title"), score, slug)
         return True, design_id
 
     log.error("[fail] %d회 시도 모두 실패", max_attempts)
@@ -878,8 +878,7 @@ async def run_batch(count: int, use_requests: bool = True) -> None:
     successes = 0
     log.info("[system] %d개 생성 시작 (use_requests=%s)", count, use_requests)
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
+    async with outbox, capture_session() as capture:
         for i in range(count):
             log.info("\n─── 작업 %d/%d ───", i + 1, count)
             source_request: Optional[Dict[str, Any]] = None
@@ -889,11 +888,10 @@ async def run_batch(count: int, use_requests: bool = True) -> None:
                 if source_request:
                     update_request_status(source_request["id"], "in_progress")
 
-            ok, design_id = await generate_single_design(browser, source_request=source_request)
+            ok, design_id = await generate_single_design(capture, source_request=source_request)
             if ok:
+                # 신청 완료 처리는 outbox 게시 완료 훅(_on_published)에서
                 successes += 1
-                if source_request and design_id:
-                    update_request_status(source_request["id"], "completed", design_id)
             elif source_request:
                 update_request_status(source_request["id"], "pending")
 
@@ -901,8 +899,7 @@ async def run_batch(count: int, use_requests: bool = True) -> None:
                 log.info("[wait] 다음 생성까지 15초 대기...")
                 await asyncio.sleep(15)
 
-        await browser.close()
-
+    shutdown_llm_cache()
     log.info("\n[결과] %d / %d 성공", successes, count)
 
 
@@ -6,13 +6,23 @@ UI-Syntax Design Generator — v6.0 (6-Pass Structured Workflow)
   Pass 0 : CSS 디자인 시스템 — 토큰/변수 먼저 확정 (일관성 보장)
   Pass 1 : 섹션별 구조 브리프 — 각 섹션의 내용·레이아웃·컴포넌트 명세
   Pass 2 : HTML 생성 — Pass0 CSS + Pass1 브리프 기반, 섹션 순서 보장
+           (--section-draft: 브리프 섹션마다 동시에 초안 → 조립, 실패한 섹션만 재시도)
+  Pre    : 정적 사전 점수 — 초안 특징으로 리뷰 점수 예측, 목표에 한참 못 미치면 폐기 / 한참 넘으면 리뷰 1회
   [Loop, 최대 --max-refine 회]
     Pass 3 : 심층 리뷰 — 5개 기준 각각 세부 점수화, critical 이슈 우선
+             (문서 전체를 REVIEW_TOKEN_BUDGET 안으로 압축해 전달 — html_compress)
     score >= --min-score 이면 종료
-    Pass 4 : 집중 수정 — critical 이슈 2개만 타깃, 전체 재생성 최소화
+    Pass 4 : 집중 수정 — critical 이슈 2개만 타깃, 이슈가 가리키는 섹션(<style>/nav/section/footer)만
+             주고받아 제자리에 끼워 넣음 (html_sections). 위치를 못 찾으면 전체 문서 수정
   Pass 5 : 최종 검증 — 빠른 스코어 확인 (optional, target_score 근접 시)
   → 스크린샷 → Supabase 저장
 
+기본 모드는 패스를 입력 의존성 DAG 로 실행 (pass_graph.PassGraph) — Pass 0 과 Pass 1 은 동시에,
+  Pass 2 는 둘 다 끝난 뒤. --pass-concurrency 1 이면 기존처럼 직렬.
+
+--phase-major: 디자인 하나씩이 아니라 배치 전체에 Pass 0 → Pass 1 → … 를 차례로 적용.
+  같은 모델 호출이 연달아 나오므로 CPU 전용 환경에서도 모델 로드가 페이즈당 한 번.
+
 모델 권장: qwen2.5-coder:32b (HTML/CSS 생성 최상, Tailwind 정확도 높음)
           devstral:24b (코딩 에이전트 특화, 구조적 출력 강함)
 """
@@ -29,12 +39,25 @@ import re
 import time
 import uuid
 from datetime import datetime
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
-import httpx
 from dotenv import load_dotenv
-from playwright.async_api import async_playwright, Browser
+from capture_service import CaptureService, capture_session
+from dna_sampler import CoverageSampler, fetch_catalogue
+from ollama_client import balanced_json_end, get_ollama_client, shutdown_ollama_client
+from html_compress import REVIEW_TOKEN_BUDGET, compress_for_review
+from html_sections import (
+    element_closed, extract_element, format_fragments, fragments_closed, locate, parse_fragments, splice,
+    split_sections, valid_fragment,
+)
+from llm_usage import usage_tags
+from pass_graph import PASS_CONCURRENCY, PassGraph
+from prescore import PreScorer, extract_features, record_sample
+from publish_outbox import PublishOutbox
+from refine_budget import RefineBudget
+from slug_allocator import SlugAllocator
+from state_store import HISTORY_KEEP, get_state_store
+from stream_stop import html_closed, json_closed, style_closed
 from supabase import Client, create_client
 
 from trend_researcher import get_trends, format_trend_prompt_block
@@ -67,7 +90,20 @@ STORAGE_BUCKET  = os.getenv("SUPABASE_DESIGNS_BUCKET", "designs-bucket")
 STORAGE_FOLDER  = os.getenv("SUPABASE_DESIGNS_FOLDER", "designs")
 
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-OLLAMA_TIMEOUT  = int(os.getenv("OLLAMA_TIMEOUT", "600"))
+# 패스별 타임아웃은 ollama_client.PASS_TIMEOUTS (OLLAMA_TIMEOUT_PASS2=... 로 조정)
+# 스트리밍 + 조기 종료 (</html>, 닫힌 JSON 이후 꼬리 토큰 생략). OLLAMA_STREAM=0 이면 기존 일괄 응답
+OLLAMA_STREAM   = os.getenv("OLLAMA_STREAM", "1") != "0"
+# pass4 를 이슈가 가리키는 섹션만 주고받는 방식으로 (0 이면 항상 전체 문서 재생성)
+SECTION_REFINE  = os.getenv("PASS4_SECTION_REFINE", "1") != "0"
+# pass2 를 브리프 섹션별 동시 호출로 (멀티 슬롯 서버용 — OLLAMA_NUM_PARALLEL 과 맞출 것)
+SECTION_DRAFT   = os.getenv("PASS2_SECTION_DRAFT", "0") == "1"
+SECTION_DRAFT_CONCURRENCY = int(os.getenv("PASS2_SECTION_CONCURRENCY", "3"))
+SECTION_RETRIES = 1   # 실패한 섹션만 다시 요청하는 횟수
+# 정적 사전 점수로 리뷰 전 폐기 / 개선 루프 생략 (prescore.py)
+PRESCORE        = os.getenv("PRESCORE", "1") != "0"
+# --target-score 에서 동시에 돌릴 후보 수 (--candidates). 서버 동시 슬롯(OLLAMA_NUM_PARALLEL) 이상은 의미 없음
+CANDIDATES      = int(os.getenv("TARGET_CANDIDATES", "1"))
+OLLAMA_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "2"))
 
 # ── Pass별 전문 모델 설정 ─────────────────────────────────────────────────────
 # 각 Pass는 역할이 다르므로 최적 모델을 분리 적용
@@ -249,50 +285,29 @@ ANIMATION_ARCHETYPES = [
 ]
 
 # ── 생성 히스토리 (반복 방지) ────────────────────────────────────────────────
-HISTORY_FILE = Path(__file__).parent / ".generator_history.json"
-HISTORY_KEEP = 20
+# 히스토리/학습 메모리/스타일 통계는 state_store(SQLite) — 기존 JSON 파일은 처음 열 때 한 번 가져옴
+HISTORY_RECENT = 20   # DNA 선택 시 참고하는 최근 히스토리 수
 
-def _load_history() -> List[Dict]:
+def _load_history(limit: int = HISTORY_RECENT) -> List[Dict]:
     try:
-        return json.loads(HISTORY_FILE.read_text(encoding="utf-8"))
-    except Exception:
+        return get_state_store().recent_history(limit)
+    except Exception as exc:
+        log.warning("[state] 히스토리 조회 실패: %s", exc)
         return []
 
 def _save_history(entry: Dict) -> None:
-    history = _load_history()
-    history.insert(0, entry)
     try:
-        HISTORY_FILE.write_text(
-            json.dumps(history[:HISTORY_KEEP], indent=2, ensure_ascii=False),
-            encoding="utf-8",
-        )
-    except Exception:
-        pass  # 히스토리 저장 실패는 치명적 오류 아님
+        get_state_store().add_history(entry)
+    except Exception as exc:
+        log.warning("[state] 히스토리 저장 실패 (무시): %s", exc)  # 치명적 오류 아님
 
 
 # ── 자기학습 메모리 ──────────────────────────────────────────────────────────
-LESSONS_FILE = Path(__file__).parent / ".generator_lessons.json"
 LESSONS_TOP_N = 6   # 프롬프트에 주입할 최상위 교훈 수
-LESSONS_MAX   = 200 # 저장할 최대 이슈 키 수 (오래된 것 자동 정리)
 
 def _load_lessons() -> Dict:
-    try:
-        return json.loads(LESSONS_FILE.read_text(encoding="utf-8"))
-    except Exception:
-        return {
-            "stats":       {"attempts": 0, "failures": 0, "successes": 0},
-            "fixes":       {},   # key → {area, severity, fix, count, last_seen}
-            "style_stats": {},   # style → {attempts, total_score, avg_score}
-        }
-
-def _save_lessons(lessons: Dict) -> None:
-    try:
-        LESSONS_FILE.write_text(
-            json.dumps(lessons, indent=2, ensure_ascii=False),
-            encoding="utf-8",
-        )
-    except Exception:
-        pass
+    """학습 메모리 스냅샷 (stats / fixes / style_stats / prescore / refine_stats)."""
+    return get_state_store().lessons()
 
 def _record_result(
     issues: List[Dict],
@@ -301,78 +316,24 @@ def _record_result(
     success: bool,
 ) -> None:
     """생성 결과에서 교훈을 학습하여 저장"""
-    lessons = _load_lessons()
-
-    # 통계 업데이트
-    s = lessons.setdefault("stats", {"attempts": 0, "failures": 0, "successes": 0})
-    s["attempts"]  = s.get("attempts",  0) + 1
-    s["successes"] = s.get("successes", 0) + (1 if success else 0)
-    s["failures"]  = s.get("failures",  0) + (0 if success else 1)
-
-    # 실패 이슈 누적 학습
-    if not success and issues:
-        fixes = lessons.setdefault("fixes", {})
-        for issue in issues:
-            area     = issue.get("area", "general")
-            fix_text = issue.get("fix", "").strip()
-            severity = issue.get("severity", "minor")
-            if not fix_text:
-                continue
-            key = f"{area}:{fix_text[:60]}"
-            if key not in fixes:
-                fixes[key] = {
-                    "area":      area,
-                    "severity":  severity,
-                    "fix":       fix_text,
-                    "count":     0,
-                    "last_seen": "",
-                }
-            fixes[key]["count"]    += 1
-            fixes[key]["last_seen"] = datetime.utcnow().isoformat()
-            # 심각도 업그레이드 (minor → major → critical)
-            sev_rank = {"critical": 2, "major": 1, "minor": 0}
-            if sev_rank.get(severity, 0) > sev_rank.get(fixes[key]["severity"], 0):
-                fixes[key]["severity"] = severity
-
-        # 오래된 항목 정리 (count 낮은 것부터 제거)
-        if len(fixes) > LESSONS_MAX:
-            sorted_keys = sorted(fixes, key=lambda k: fixes[k]["count"])
-            for k in sorted_keys[:len(fixes) - LESSONS_MAX]:
-                del fixes[k]
-
-    # 스타일별 성능 통계
-    style = dna.get("style", "")
-    if style:
-        ss = lessons.setdefault("style_stats", {})
-        if style not in ss:
-            ss[style] = {"attempts": 0, "total_score": 0, "avg_score": 0}
-        ss[style]["attempts"]   += 1
-        ss[style]["total_score"] = ss[style].get("total_score", 0) + score
-        ss[style]["avg_score"]   = ss[style]["total_score"] // ss[style]["attempts"]
-
-    _save_lessons(lessons)
+    try:
+        stats = get_state_store().record_result(issues, score, dna.get("style", ""), success)
+    except Exception as exc:
+        log.warning("[학습] 저장 실패 (무시): %s", exc)
+        return
     log.info(
         "[학습] %s | score=%d | 누적 이슈=%d개 | 성공률=%.0f%%",
         "성공" if success else "실패",
         score,
-        len(lessons.get("fixes", {})),
-        (lessons["stats"]["successes"] / max(lessons["stats"]["attempts"], 1)) * 100,
+        stats["fixes"],
+        (stats["successes"] / max(stats["attempts"], 1)) * 100,
     )
 
 def _get_top_lessons(n: int = LESSONS_TOP_N) -> str:
     """가장 빈출·고심각도 이슈를 학습 교훈 텍스트로 반환"""
-    fixes = _load_lessons().get("fixes", {})
-    if not fixes:
-        return ""
-    sev_weight = {"critical": 3, "major": 2, "minor": 1}
-    sorted_fixes = sorted(
-        fixes.values(),
-        key=lambda x: (sev_weight.get(x.get("severity", "minor"), 1) * 1000 + x.get("count", 0)),
-        reverse=True,
-    )
     lines = [
         f"- [{f['area'].upper()}]({f['severity']}) {f['fix']}  (과거 {f['count']}회 발생)"
-        for f in sorted_fixes[:n]
+        for f in get_state_store().top_fixes(n)
     ]
     return "\n".join(lines)
 
@@ -455,50 +416,70 @@ def fix_html_structure(html: str) -> str:
     return html
 
 
-def pick_design_dna() -> Dict[str, str]:
-    """모든 다양성 차원을 조합해 고유한 디자인 DNA 생성 (히스토리 반복 방지)"""
-    history = _load_history()
-    recent_styles    = {h.get("style", "")          for h in history[:6]}
-    recent_categories= {h.get("category", "")       for h in history[:4]}
-    recent_colors    = {h.get("color_key", "")      for h in history[:8]}
-    recent_layouts   = {h.get("layout_key", "")     for h in history[:5]}
-
-    # 스타일 선택 — 최근 6개 제외
-    style_pool = [s for s in STYLE_STRUCTURE_AFFINITY if s not in recent_styles]
-    if not style_pool:
-        style_pool = list(STYLE_STRUCTURE_AFFINITY.keys())
-    style     = random.choice(style_pool)
-    structure = random.choice(STYLE_STRUCTURE_AFFINITY[style])
-
-    # 카테고리 선택 — 최근 4개 제외
-    cat_pool  = [c for c in CATEGORIES if c not in recent_categories]
-    if not cat_pool:
-        cat_pool = CATEGORIES
-    category  = random.choice(cat_pool)
-
-    # 색상 무드 선택 — 최근 8개 제외
-    color_pool = [c for c in COLOR_MOODS if c not in recent_colors]
-    if not color_pool:
-        color_pool = COLOR_MOODS
-    color_mood = random.choice(color_pool)
-
-    # 레이아웃 아키타입 — 최근 5개 제외
-    layout_pool = [l for l in LAYOUT_ARCHETYPES if l not in recent_layouts]
-    if not layout_pool:
-        layout_pool = LAYOUT_ARCHETYPES
-    layout_arch = random.choice(layout_pool)
-
-    animation = random.choice(ANIMATION_ARCHETYPES)
-
+# ── DNA 샘플러 (카탈로그 커버리지) ───────────────────────────────────────────
+# 카탈로그(designs)에는 category 와 prompt 태그(structure_style)만 있으므로 style/structure/category 는
+# 게시된 디자인 전체에서, color/layout 은 로컬 히스토리(state_store, 최근 HISTORY_KEEP 개)에서 셈
+DNA_RECENT = 6   # 가중치를 낮출 최근 히스토리 수
+DNA_CATALOGUE_DIMS = ("style", "structure", "category")
+DNA_HISTORY_DIMS = ("color_key", "layout_key")
+
+_dna_sampler: Optional[CoverageSampler] = None
+
+def _prompt_tag(structure: str, style: str) -> str:
+    return f"{structure}_{style}".lower().replace(" ", "_")
+
+def get_dna_sampler() -> CoverageSampler:
+    """프로세스당 한 번 카탈로그 + 히스토리를 읽어 만든 샘플러. 이후 게시분은 publish_design 이 반영."""
+    global _dna_sampler
+    if _dna_sampler is not None:
+        return _dna_sampler
+    sampler = CoverageSampler(
+        {
+            "style":      list(STYLE_STRUCTURE_AFFINITY),
+            "structure":  lambda combo: STYLE_STRUCTURE_AFFINITY[combo["style"]],
+            "category":   CATEGORIES,
+            "color_key":  COLOR_MOODS,
+            "layout_key": LAYOUT_ARCHETYPES,
+        },
+        joints=[DNA_CATALOGUE_DIMS, DNA_CATALOGUE_DIMS + DNA_HISTORY_DIMS],
+    )
+    tags = {
+        _prompt_tag(structure, style): (style, structure)
+        for style, structures in STYLE_STRUCTURE_AFFINITY.items() for structure in structures
+    }
+    try:
+        rows = fetch_catalogue(get_supabase(), "category,prompt")
+    except Exception as exc:
+        log.warning("[dna] 카탈로그 조회 실패 — 로컬 히스토리로만 분포 계산: %s", exc)
+        rows = None
+    for row in rows or []:
+        style, structure = tags.get((row.get("prompt") or "").replace("__", "_"), (None, None))
+        sampler.observe({"style": style, "structure": structure, "category": row.get("category")},
+                        dims=DNA_CATALOGUE_DIMS)
+    # 히스토리 항목은 이미 카탈로그에 있으므로 color/layout 만 (카탈로그를 못 읽었으면 전부)
+    history_dims = DNA_HISTORY_DIMS if rows is not None else None
+    for entry in _load_history(limit=HISTORY_KEEP):
+        sampler.observe(entry, dims=history_dims)
+    log.info("[dna] 커버리지 샘플러 — 카탈로그 %d개, %s", len(rows or []), sampler.coverage())
+    _dna_sampler = sampler
+    return sampler
+
+
+def pick_design_dna(pending: Optional[List[Dict]] = None) -> Dict[str, str]:
+    """카탈로그에서 덜 다뤄진 조합 쪽으로 디자인 DNA 선택 (최근 히스토리와 겹치는 값은 가중치 감소)
+
+    pending: 같은 배치에서 먼저 뽑았지만 아직 히스토리에 없는 DNA (최근 항목으로 취급)
+    """
+    combo = get_dna_sampler().sample(pending=pending or [], recent=_load_history(limit=DNA_RECENT))
     return {
-        "category":      category,
-        "style":         style,
-        "structure":     structure,
-        "color_mood":    color_mood,
-        "color_key":     color_mood,
-        "layout_arch":   layout_arch,
-        "layout_key":    layout_arch,
-        "animation":     animation,
+        "category":      combo["category"],
+        "style":         combo["style"],
+        "structure":     combo["structure"],
+        "color_mood":    combo["color_key"],
+        "color_key":     combo["color_key"],
+        "layout_arch":   combo["layout_key"],
+        "layout_key":    combo["layout_key"],
+        "animation":     random.choice(ANIMATION_ARCHETYPES),
     }
 
 
@@ -510,15 +491,8 @@ def pick_style_structure() -> tuple[str, str]:
 def slugify(text: str) -> str:
     return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
 
-def unique_slug(base: str) -> str:
-    candidate = slugify(base)
-    suffix = 2
-    while True:
-        resp = get_supabase().table("designs").select("id").eq("slug", candidate).limit(1).execute()
-        if not resp.data:
-            return candidate
-        candidate = f"{slugify(base)}-{suffix}"
-        suffix += 1
+# base 당 한 번 조회 + 배치 내 예약, 게시 중 충돌은 outbox 가 재할당
+slugs = SlugAllocator(get_supabase)
 
 # ── Ollama API 호출 ───────────────────────────────────────────────────────────
 async def ollama_chat(
@@ -527,8 +501,20 @@ async def ollama_chat(
     model: str,
     temperature: float = 0.85,
     num_ctx: int = 32768,
+    pass_name: Optional[str] = None,
+    stop: Optional[Callable[[str], bool]] = None,
+    output_tokens: Optional[int] = None,
+    attempt: int = 0,
 ) -> str:
-    """Ollama /api/chat 호출 (스트리밍 없이 전체 응답 반환)
+    """Ollama /api/chat 호출 (OLLAMA_STREAM 이면 스트리밍, 아니면 전체 응답 한 번에)
+
+    공유 커넥션 풀(ollama_client)을 사용하며, pass_name 으로 패스별 타임아웃을 고른다.
+    stop(버퍼)가 True 가 되는 순간 스트림을 끊는다 — 결과물이 닫힌 뒤의 설명 토큰은 생성하지 않음.
+    TTFT / tokens/s 는 패스별로 집계되어 종료 시 로그로 출력.
+    num_ctx 는 상한 — 실제 값은 프롬프트 길이 + 출력 예산(output_tokens, 없으면 패스 기본값)으로
+    ctx_sizer 가 버킷 단위로 고른다 (OLLAMA_AUTO_NUM_CTX=0 이면 num_ctx 그대로).
+
+    attempt 는 호출자 재시도 회차 — LLM_CACHE 키에 포함되어 거절한 응답을 캐시에서 다시 받지 않음.
 
     model 은 반드시 명시적으로 전달 — Pass별 전문 모델을 쓰기 위해 기본값 없음.
       Pass 0, 2, 4 → MODEL_CODER  (qwen2.5-coder:32b  — HTML/CSS 코딩 최강)
@@ -541,31 +527,33 @@ async def ollama_chat(
       - 리뷰/검증 (정확성 중요):    0.2~0.3
       - 수정 (지시 준수):           0.6~0.7
     """
-    url = f"{OLLAMA_BASE_URL}/api/chat"
-    payload = {
-        "model": model,
-        "messages": messages,
-        "stream": False,
-        "options": {
-            "temperature": temperature,
-            "top_p": 0.95,
-            "top_k": 40,
-            "num_ctx": num_ctx,        # 32k 컨텍스트 (긴 HTML 전체 처리)
-            "repeat_penalty": 1.1,     # 반복 억제
-        },
+    client = get_ollama_client(OLLAMA_BASE_URL)
+    options = {
+        "temperature": temperature,
+        "top_p": 0.95,
+        "top_k": 40,
+        "num_ctx": client.ctx_sizer.size(model, messages, pass_name=pass_name, ceiling=num_ctx,
+                                         output_tokens=output_tokens),
+        "repeat_penalty": 1.1,     # 반복 억제
     }
-    async with httpx.AsyncClient(timeout=OLLAMA_TIMEOUT) as client:
-        resp = await client.post(url, json=payload)
-        resp.raise_for_status()
-        data = resp.json()
-        return data["message"]["content"].strip()
+    if OLLAMA_STREAM:
+        return await client.chat_stream(model, messages, options=options, pass_name=pass_name, stop=stop,
+                                        attempt=attempt)
+    return await client.chat(model, messages, options=options, pass_name=pass_name, attempt=attempt)
 
 def extract_json(text: str) -> Any:
     """응답 텍스트에서 JSON 블록 추출"""
     # ```json ... ``` 펜스 제거
     cleaned = re.sub(r"^```(?:json)?\s*", "", text.strip(), flags=re.IGNORECASE)
     cleaned = re.sub(r"\s*```$", "", cleaned)
-    return json.loads(cleaned)
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        # 앞뒤 설명이 붙었거나 스트림이 닫는 괄호에서 끊긴 경우 → 첫 균형 잡힌 객체만
+        start, end = cleaned.find("{"), balanced_json_end(cleaned)
+        if end < 0:
+            raise
+        return json.loads(cleaned[start:end])
 
 def extract_html(text: str) -> str:
     """응답 텍스트에서 HTML 블록만 추출"""
@@ -573,8 +561,9 @@ def extract_html(text: str) -> str:
     m = re.search(r"```html\s*([\s\S]+?)\s*```", text, re.IGNORECASE)
     if m:
         return m.group(1).strip()
-    # 없으면 <!DOCTYPE 또는 <html 부터 끝까지
-    m2 = re.search(r"(<!DOCTYPE[\s\S]+|<html[\s\S]+)", text, re.IGNORECASE)
+    # 없으면 <!DOCTYPE 또는 <html 부터 </html> 까지 (닫는 펜스 전에 스트림이 끊긴 경우 포함)
+    m2 = re.search(r"(<!DOCTYPE[\s\S]+?</html>|<html[\s\S]+?</html>|<!DOCTYPE[\s\S]+|<html[\s\S]+)",
+                   text, re.IGNORECASE)
     if m2:
         return m2.group(1).strip()
     return text.strip()
@@ -687,6 +676,8 @@ Output the <style> block only — nothing else."""
         ],
         model=MODEL_CODER,
         temperature=0.7,   # 변수 생성은 일관성 중요 → 낮은 temperature
+        pass_name="pass0",
+        stop=style_closed,
         num_ctx=16384,
     )
 
@@ -796,6 +787,8 @@ Return JSON with these exact keys:
         model=MODEL_BRIEF,
         temperature=0.88,   # 창의적 기획 → 높은 다양성
         num_ctx=16384,
+        pass_name="pass1",
+        stop=json_closed,
     )
     return extract_json(text)
 
@@ -865,10 +858,11 @@ FORBIDDEN:
 - Generic copy like "Welcome to our platform" or "Get started today"
 - Placeholder images or "Image here" text"""
 
-async def pass2_html_draft(brief: Dict[str, Any], category: str, style: str, structure: str,
-                           dna: Optional[Dict[str, str]] = None,
-                           trend_context: str = "",
-                           css_system: str = "") -> str:
+def _pass2_context(brief: Dict[str, Any], category: str, style: str, structure: str,
+                   dna: Optional[Dict[str, str]] = None,
+                   trend_context: str = "",
+                   css_system: str = "") -> str:
+    """Pass 2 프롬프트의 디자인 맥락 블록 — 전체 초안과 섹션별 초안이 같은 내용을 공유."""
     colors      = " | ".join(brief.get("color_palette", []))
     layout_arch = dna.get("layout_arch", structure) if dna else structure
     animation   = dna.get("animation", "hover lifts") if dna else "hover lifts"
@@ -902,14 +896,12 @@ async def pass2_html_draft(brief: Dict[str, Any], category: str, style: str, str
     # 자기학습 교훈 주입
     top_lessons = _get_top_lessons()
     lessons_block = f"""
-━━ PREEMPTIVE FIXES (learned from {_load_lessons()["stats"].get("attempts",0)} past attempts) ━━
+━━ PREEMPTIVE FIXES (learned from {get_state_store().stats()["attempts"]} past attempts) ━━
 {top_lessons}
 → These issues caused low scores before. Solve them BEFORE writing HTML.
 """ if top_lessons else ""
 
-    prompt = f"""\
-Build a complete {category} UI. Read EVERY constraint before writing a single line.
-
+    return f"""\
 ━━ DESIGN SYSTEM (injected — use var(--color-*) throughout) ━━
 The <style> block below contains your complete CSS variable system. USE IT.
 Do NOT hardcode hex colors — reference var(--color-bg), var(--color-primary), etc.
@@ -944,7 +936,25 @@ Animation hints: {brief.get("animation_hints", "")}
 {sections_block}
 {trend_context if trend_context else ""}
 {lessons_block}
-━━ HARD RULES ━━
+"""
+
+
+async def pass2_html_draft(brief: Dict[str, Any], category: str, style: str, structure: str,
+                           dna: Optional[Dict[str, str]] = None,
+                           trend_context: str = "",
+                           css_system: str = "") -> str:
+    context = _pass2_context(brief, category, style, structure, dna=dna, trend_context=trend_context,
+                             css_system=css_system)
+    if SECTION_DRAFT and len(brief.get("sections", [])) >= 2:
+        html = await _pass2_by_section(brief, category, context, css_system)
+        if html:
+            return html
+        log.warning("[pass2] 섹션별 초안 실패 — 전체 문서 한 번에 생성으로 폴백")
+
+    prompt = f"""\
+Build a complete {category} UI. Read EVERY constraint before writing a single line.
+
+{context}━━ HARD RULES ━━
 1. <head> must include Tailwind CDN + Google Fonts link
 2. Inject the CSS system <style> block at the top of <head>
 3. body background = var(--color-bg)
@@ -973,9 +983,127 @@ Write the COMPLETE HTML now — all sections, no truncation."""
         model=MODEL_CODER,
         temperature=0.78,   # HTML 생성: 구조 일관성 > 창의성
         num_ctx=32768,
+        pass_name="pass2",
+        stop=html_closed,
     )
     return extract_html(text)
 
+# ── Pass 2 (섹션 모드): 브리프 섹션마다 따로 초안 → 한 문서로 조립 ──────────────
+_SECTION_TAGS: Dict[str, tuple] = {"nav": ("header", "nav"), "footer": ("footer",)}
+SECTION_MIN_CHARS = 200   # 이보다 짧은 조각은 실패로 보고 재시도
+SECTION_OUTPUT_TOKENS = 3072   # 섹션 조각 하나의 출력 예산 (num_ctx 산정용)
+
+
+def _section_kind(section: Dict[str, Any]) -> str:
+    text = f"{section.get('id', '')} {section.get('type', '')}".lower()
+    if "nav" in text or "header" in text:
+        return "nav"
+    if "footer" in text:
+        return "footer"
+    return "section"
+
+
+def _google_fonts_link(css_system: str) -> str:
+    """CSS 시스템의 --font-heading / --font-body 에서 Google Fonts <link> 생성."""
+    families: List[str] = []
+    for var in ("heading", "body"):
+        match = re.search(rf"--font-{var}\s*:\s*['\"]?([A-Za-z][A-Za-z0-9 ]+?)['\"]?\s*[,;]", css_system)
+        if match and match.group(1).strip() not in families:
+            families.append(match.group(1).strip())
+    if not families:
+        return ""
+    query = "&".join(f"family={name.replace(' ', '+')}:wght@400;500;600;700;800" for name in families)
+    return (f'<link rel="preconnect" href="https://fonts.googleapis.com">\n'
+            f'<link href="https://fonts.googleapis.com/css2?{query}&display=swap" rel="stylesheet">')
+
+
+def _assemble_sections(brief: Dict[str, Any], css_system: str, fragments: List[str]) -> str:
+    style_block = css_system if "<style" in css_system.lower() else f"<style>\n{css_system}\n</style>"
+    body = "\n\n".join(fragments)
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<script src="https://cdn.tailwindcss.com"></script>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>{brief.get("title", "Untitled Design")}</title>
+{_google_fonts_link(css_system)}
+{style_block}
+</head>
+<body>
+{body}
+</body>
+</html>"""
+
+
+async def _pass2_by_section(brief: Dict[str, Any], category: str, context: str, css_system: str) -> str:
+    """브리프 섹션마다 동시에 초안을 받아 조립. 실패한 섹션만 SECTION_RETRIES 회 다시 요청.
+
+    모든 요청이 같은 system + 디자인 맥락 블록으로 시작하므로 서버가 프롬프트 앞부분을 재사용할 수 있다.
+    끝내 실패한 섹션이 있으면 "" → 호출자가 전체 문서 생성으로 폴백.
+    """
+    sections = brief.get("sections", [])
+    slots = asyncio.Semaphore(SECTION_DRAFT_CONCURRENCY)
+    shared = f"""\
+Build ONE part of a {category} UI. The page is assembled from parts written separately from the same brief.
+The <head> (Tailwind CDN, Google Fonts, and the CSS system below) is already in place.
+
+{context}"""
+
+    async def draft(index: int, attempt: int) -> str:
+        section = sections[index]
+        kind = _section_kind(section)
+        tags = _SECTION_TAGS.get(kind, ("section",))
+        others = ", ".join(str(s.get("id", "?")) for i, s in enumerate(sections) if i != index)
+        prompt = f"""{shared}━━ YOUR PART ━━
+[{section.get("id", "?")}] type={section.get("type", "?")}
+Layout: {section.get("layout_note", "")}
+Style: {section.get("style_note", "")}
+Content: {section.get("content", "")}
+
+RULES:
+- Output ONLY one <{tags[0]}> element for this part — no <!DOCTYPE>, <html>, <head>, <body>, or <style>
+- Other parts ({others}) are written separately — do NOT include them
+- Use the CSS variables and utility classes from the design system; inline styles for anything custom
+- Real content only, responsive Tailwind classes, hover states on every button"""
+        async with slots:
+            text = await ollama_chat(
+                [
+                    {"role": "system", "content": HTML_SYSTEM},
+                    {"role": "user",   "content": prompt},
+                ],
+                model=MODEL_CODER,
+                temperature=0.78,
+                num_ctx=16384,
+                pass_name="pass2",
+                stop=element_closed(tags),
+                output_tokens=SECTION_OUTPUT_TOKENS,
+                attempt=attempt,
+            )
+        fragment = extract_element(text, tags)
+        if len(fragment) < SECTION_MIN_CHARS:
+            raise ValueError(f"섹션 {section.get('id', index)} 조각이 비었거나 닫히지 않음 ({len(fragment)} chars)")
+        return fragment
+
+    log.info("[pass2] 섹션별 초안 %d개 (동시 %d) model=%s", len(sections), SECTION_DRAFT_CONCURRENCY, MODEL_CODER)
+    fragments: Dict[int, str] = {}
+    pending = list(range(len(sections)))
+    for attempt in range(SECTION_RETRIES + 1):
+        results = await asyncio.gather(*(draft(i, attempt) for i in pending), return_exceptions=True)
+        failed = []
+        for index, result in zip(pending, results):
+            if isinstance(result, BaseException):
+                log.warning("[pass2] 섹션 %s 실패 (%d회차): %s", sections[index].get("id", index), attempt + 1, result)
+                failed.append(index)
+            else:
+                fragments[index] = result
+        pending = failed
+        if not pending:
+            break
+    if pending:
+        return ""
+    return _assemble_sections(brief, css_system, [fragments[i] for i in range(len(sections))])
+
 # ── Pass 3: 자가 리뷰 ─────────────────────────────────────────────────────────
 REVIEW_SYSTEM = """\
 You are a senior design critic at an award-winning agency (Awwwards judge level).
@@ -984,12 +1112,16 @@ A score of 80+ means it could win Dribbble Popular. Most first drafts score 40-6
 Respond with a single valid JSON object only — no markdown."""
 
 async def pass3_review(html: str, category: str, style: str) -> Dict[str, Any]:
+    # 앞 12000자만 자르지 않고 문서 전체를 토큰 예산 안으로 압축 — 뒤쪽 섹션까지 리뷰
+    review_html, stats = compress_for_review(html, REVIEW_TOKEN_BUDGET)
+    log.info("[pass3] 리뷰용 HTML %d → %d chars (~%d tok%s)", stats["before"], stats["after"], stats["tokens"],
+             ", 일부 생략" if stats["lossy"] else "")
     prompt = f"""\
 Critically review this {category} UI (target style: {style}) as an Awwwards judge.
 
-HTML to review:
+HTML to review (whitespace/comments stripped, long SVG paths and data URIs elided, repeated class lists aliased):
 ```html
-{html[:12000]}
+{review_html}
 ```
 
 Score it STRICTLY on visual beauty and design quality. Be harsh — a score of 75+ means genuinely stunning.
@@ -1046,6 +1178,8 @@ Be HARSH — a real 80+ score means it could be featured on Awwwards. Most desig
         model=MODEL_REVIEW,
         temperature=0.25,   # 리뷰는 일관성/정확성 최우선 → 낮은 temperature
         num_ctx=32768,
+        pass_name="pass3",
+        stop=json_closed,
     )
     # deepseek-r1 등 추론 모델은 <think>...</think> 블록 출력 후 JSON 제공
     # → <think> 블록을 제거하고 JSON만 추출
@@ -1101,6 +1235,11 @@ async def pass4_refined_html(html: str, review: Dict[str, Any], brief: Dict[str,
             f"{k}={v}" for k, v in review["scores"].items()
         )
 
+    if SECTION_REFINE:
+        refined = await _pass4_sections(html, top_fixes, fix_lines, score_detail, brief, category, style)
+        if refined is not None:
+            return refined
+
     css_block = f"\nCSS Design System (use var() references):\n{css_system}\n" if css_system else ""
 
     prompt = f"""\
@@ -1139,13 +1278,70 @@ RULES:
         model=MODEL_CODER,
         temperature=0.65,
         num_ctx=32768,
+        pass_name="pass4",
+        stop=html_closed,
     )
     return extract_html(text)
 
+async def _pass4_sections(html: str, fixes: List[Dict[str, Any]], fix_lines: str, score_detail: str,
+                          brief: Dict[str, Any], category: str, style: str) -> Optional[str]:
+    """이슈가 가리키는 섹션만 보내 수정 조각을 받아 제자리에 끼워 넣음.
+
+    위치를 특정할 수 없는 이슈가 있거나 쓸 만한 조각이 하나도 없으면 None → 전체 문서 수정으로 폴백.
+    CSS 시스템은 이미 문서의 <style> 에 들어 있으므로 따로 보내지 않는다.
+    """
+    sections = split_sections(html)
+    targets = locate(fixes, sections, html)
+    if not targets:
+        return None
+    keys = [section.key for section in targets]
+    prompt = f"""\
+You are surgically fixing a {category} UI (style: {style}).
+Apply ONLY these {len(fixes)} targeted fixes — do NOT change anything else:
+
+{fix_lines}
+
+{score_detail}
+Below are ONLY the parts of the page these fixes touch. The rest of the page stays as-is.
+
+{format_fragments(html, targets)}
+
+Design reference:
+- Brand: {brief.get("title")}
+- Color palette: {" | ".join(brief.get("color_palette", []))}
+{_format_color_roles_for_refinement(brief.get("color_roles", {}))}
+RULES:
+- Return EVERY part above, each wrapped in the same <!-- SECTION:key --> ... <!-- /SECTION:key --> markers
+- Each part must start and end with the same element it started with (e.g. <section ...> ... </section>)
+- Keep ALL existing content inside each part — only apply the fixes
+- CSS changes go into the SECTION:style part if it is included, otherwise use classes/inline styles
+- No explanation, no fences — only the marked parts"""
+
+    log.info("[pass4] 섹션 단위 수정 %s (%d/%d chars) model=%s",
+             keys, sum(s.end - s.start for s in targets), len(html), MODEL_CODER)
+    text = await ollama_chat(
+        [
+            {"role": "system", "content": HTML_SYSTEM},
+            {"role": "user", "content": prompt},
+        ],
+        model=MODEL_CODER,
+        temperature=0.65,
+        num_ctx=16384,
+        pass_name="pass4",
+        stop=fragments_closed(keys),
+    )
+    fragments = parse_fragments(text, keys)
+    accepted = {s.key: fragments[s.key] for s in targets if valid_fragment(s, fragments.get(s.key))}
+    rejected = [key for key in keys if key not in accepted]
+    if rejected:
+        log.warning("[pass4] 검증 실패로 원본 유지한 섹션: %s", rejected)
+    if not accepted:
+        return None
+    return splice(html, targets, accepted)
+
 # ── 스크린샷 촬영 ─────────────────────────────────────────────────────────────
-async def capture_screenshot(browser: Browser, html: str) -> bytes:
-    page = await browser.new_page(viewport={"width": 1400, "height": 900})
-    try:
+async def capture_screenshot(capture: CaptureService, html: str) -> bytes:
+    async with capture.page({"width": 1400, "height": 900}) as page:
         await page.set_content(html, wait_until="networkidle")
         # Tailwind CDN + Google Fonts 로딩 대기
         await page.evaluate("document.fonts.ready")
@@ -1171,65 +1367,147 @@ async def capture_screenshot(browser: Browser, html: str) -> bytes:
         await page.wait_for_timeout(500)
         screenshot = await page.screenshot(type="png", full_page=True)
         return screenshot
-    finally:
-        await page.close()
 
 # ── Supabase Storage 업로드 ───────────────────────────────────────────────────
-def upload_image(image_bytes: bytes, slug: str) -> str:
-    filename = f"{datetime.utcnow():%Y%m%d_%H%M%S}_{slug}.png"
-    path = f"{STORAGE_FOLDER}/{filename}"
-    sb = get_supabase()
-    sb.storage.from_(STORAGE_BUCKET).upload(path, image_bytes, {"content-type": "image/png"})
-    return sb.storage.from_(STORAGE_BUCKET).get_public_url(path)
-
-# ── DB 저장 ───────────────────────────────────────────────────────────────────
-def save_to_db(design_id: str, title: str, slug: str, category: str,
-               description: str, html_code: str, image_url: str,
-               colors: List[str], score: int, prompt_tag: str) -> None:
-    record = {
-        "id":          design_id,
-        "title":       title,
-        "description": description,
-        "image_url":   image_url,
-        "category":    category,
-        "code":        html_code,
-        "prompt":      prompt_tag,
-        "colors":      colors,
-        "slug":        slug,
-        "status":      "published",
-        "created_at":  datetime.utcnow().isoformat(),
+def image_path_for(slug: str) -> str:
+    return f"{STORAGE_FOLDER}/{datetime.utcnow():%Y%m%d_%H%M%S}_{slug}.png"
+
+# ── DB 레코드 ─────────────────────────────────────────────────────────────────
+def build_record(design_id: str, title: str, slug: str, category: str,
+                 description: str, html_code: str,
+                 colors: List[str], score: int, prompt_tag: str) -> Dict[str, Any]:
+    """designs 행 (image_url 은 outbox 가 업로드 후 채움, quality_score 는 optional 컬럼)"""
+    return {
+        "id":            design_id,
+        "title":         title,
+        "description":   description,
+        "category":      category,
+        "code":          html_code,
+        "prompt":        prompt_tag,
+        "colors":        colors,
+        "slug":          slug,
+        "status":        "published",
+        "created_at":    datetime.utcnow().isoformat(),
+        "quality_score": score,
     }
-    # optional 컬럼 시도
-    try:
-        get_supabase().table("designs").insert({**record, "quality_score": score}).execute()
-        log.info("[db] 저장 완료 (quality_score 포함)")
-    except Exception as exc:
-        log.warning("[db] quality_score 컬럼 없음, 기본 저장: %s", exc)
-        try:
-            get_supabase().table("designs").insert(record).execute()
-            log.info("[db] 저장 완료 (기본 컬럼)")
-        except Exception as exc2:
-            log.error("[db] 저장 실패: %s", exc2)
-            raise
+
+# ── 게시 outbox ───────────────────────────────────────────────────────────────
+_outbox: Optional[PublishOutbox] = None
+
+def _on_published(entry: Dict[str, Any]) -> None:
+    record = entry["record"]
+    log.info("[✓] 게시 완료: %s | score=%s | https://ui-syntax.com/design/%s",
+             record["title"], record.get("quality_score"), record["slug"])
+
+def get_outbox() -> PublishOutbox:
+    global _outbox
+    if _outbox is None:
+        _outbox = PublishOutbox(
+            "generator5_ollama", get_supabase,
+            on_published=_on_published,
+            optional_columns=["quality_score"],
+            slugs=slugs,
+        )
+    return _outbox
 
 # ── 디자인 데이터 타입 ──────────────────────────────────────────────────────────
 DesignData = Dict[str, Any]   # 생성된 디자인 데이터 (미저장)
 
+
+def _normalize_draft(html: str) -> str:
+    """Pass 2.5: 구조 검증 + 자동 수정"""
+    is_valid, html_issues = validate_html(html)
+    if html_issues:
+        log.warning("[validate] HTML 구조 이슈 %d개: %s", len(html_issues), " | ".join(html_issues[:3]))
+    html = fix_html_structure(html)
+    if not is_valid:
+        # 재검증
+        is_valid2, remaining = validate_html(html)
+        if remaining:
+            log.warning("[validate] 자동 수정 후에도 남은 이슈: %s", " | ".join(remaining[:2]))
+    return html
+
+
+def _accept_refinement(current: str, refined: str, round_label: str) -> str:
+    """pass4 결과 채택 여부 판단 — 비었거나 원본보다 너무 짧으면 이전 버전 유지."""
+    if not refined.strip():
+        log.warning("%s 개선 HTML 비어있음 — 이전 버전 유지", round_label)
+        return current
+    refined = fix_html_structure(refined)
+    # 개선 버전이 원본보다 너무 짧으면 폐기 (섹션 삭제 방지)
+    if len(refined) < len(current) * 0.6:
+        log.warning("%s 개선 HTML이 원본의 60%% 미만 (%d→%d chars) — 원본 유지",
+                    round_label, len(current), len(refined))
+        return current
+    return refined
+
+
+def _build_design_data(design_id: str, dna: Dict[str, str], brief: Dict[str, Any],
+                       html_final: str, screenshot_bytes: bytes, score: int) -> DesignData:
+    structure, style = dna["structure"], dna["style"]
+    return {
+        "id":          design_id,
+        "title":       brief.get("title", "Untitled Design"),
+        "category":    dna["category"],
+        "description": brief.get("concept", ""),
+        "html_code":   html_final,
+        "screenshot":  screenshot_bytes,
+        "colors":      brief.get("color_palette", []),
+        "score":       score,
+        "prompt_tag":  _prompt_tag(structure, style),
+        # DNA 추가 저장 (히스토리용)
+        "dna":         dna,
+    }
+
 # ── 핵심 생성 루프 (저장 없이 데이터만 반환) ────────────────────────────────────
+class DraftRejected(Exception):
+    """사전 점수로 리뷰 전에 폐기된 초안"""
+
+    def __init__(self, predicted: float):
+        super().__init__(f"prescore {predicted:.0f}")
+        self.predicted = predicted
+
+
+def _record_prescore_sample(html: str, score: int) -> None:
+    """첫 리뷰 점수를 사전 점수 보정 표본으로 저장."""
+    with get_state_store().edit_lessons() as lessons:
+        record_sample(lessons, extract_features(html), score)
+
+
+def _pass_plan(n: int, min_score: int, max_refine: int) -> List[str]:
+    """n개 디자인을 패스 순서대로 돌릴 때의 모델 호출 순서 (모델 미리 올리기/keep_alive 용)."""
+    total_passes = max_refine if min_score > 0 else 1
+    plan = [MODEL_CODER] * n + [MODEL_BRIEF] * n + [MODEL_CODER] * n
+    for _ in range(total_passes):
+        plan += [MODEL_REVIEW] * n + [MODEL_CODER] * n
+    return plan
+
+
 async def generate_one_design(
-    browser: Browser,
+    capture: CaptureService,
     min_score: int = DEFAULT_MIN_SCORE,
     max_refine: int = DEFAULT_MAX_REFINE,
     trend_context: str = "",
+    pass_concurrency: int = PASS_CONCURRENCY,
+    target_score: int = 0,
+    progress: Optional[Dict[str, Any]] = None,
+    dna: Optional[Dict[str, Any]] = None,
 ) -> tuple[bool, Optional[DesignData], int, Dict]:
     """
     디자인을 생성하고 데이터를 반환 — DB/Storage 저장은 하지 않음.
     저장 여부는 호출자(run_batch)가 score를 보고 결정.
+    패스는 PassGraph 로 실행되어 입력이 준비된 패스가 pass_concurrency 개까지 동시에 돈다.
+    초안의 정적 사전 점수가 target_score 보다 한참 낮으면 리뷰 없이
+    (False, None, 예측 점수, {"prescore_rejected": True}) 반환.
+    progress 를 넘기면 dna 와 최근 리뷰/점수를 채워 둔다 — 도중에 취소돼도 호출자가 학습에 사용.
+    dna 를 넘기면 새로 뽑지 않고 사용 (동시 후보끼리 겹치지 않게 호출자가 미리 뽑을 때).
 
     Returns (success, design_data, score, last_review)
     """
     # DNA 기반으로 모든 다양성 차원 한 번에 결정
-    dna = pick_design_dna()
+    dna = dna or pick_design_dna()
+    progress = progress if progress is not None else {}
+    progress["dna"] = dna
     category  = dna["category"]
     style     = dna["style"]
     structure = dna["structure"]
@@ -1241,125 +1519,453 @@ async def generate_one_design(
     log.info("[dna] animation=%s", dna.get("animation", "")[:60])
     log.info("[config] min_score=%d | max_refine=%d", min_score, max_refine)
 
-    try:
-        # Pass 0: CSS 디자인 시스템 (토큰/변수 먼저 확정)
+    # 패스 DAG — pass0(CSS) 와 pass1(브리프) 는 서로의 출력을 쓰지 않으므로 동시에 실행
+    async def css_node() -> str:
         log.info("[pass0] CSS 디자인 시스템 생성 중...")
         css_system = await pass0_css_system(dna)
         log.info("[pass0] CSS 시스템 생성 완료 (%d chars)", len(css_system))
+        return css_system
 
-        # Pass 1: 브리프 (DNA + 트렌드 전달)
+    async def brief_node() -> Dict[str, Any]:
         brief = await pass1_brief(category, style, structure, dna=dna, trend_context=trend_context)
-        title = brief.get("title", "Untitled Design")
-        log.info("[brief] 제목: %s", title)
+        log.info("[brief] 제목: %s", brief.get("title", "Untitled Design"))
+        return brief
 
+    async def draft_node(css: str, brief: Dict[str, Any]) -> str:
         # Pass 2: HTML 초안 (DNA + 트렌드 전달 — 색상/레이아웃/트렌드 강제)
-        html_current = await pass2_html_draft(
-            brief, category, style, structure, dna=dna, trend_context=trend_context,
-            css_system=css_system,
+        html = await pass2_html_draft(
+            brief, category, style, structure, dna=dna, trend_context=trend_context, css_system=css,
         )
-        if not html_current.strip():
-            log.error("[pass2] HTML 초안 비어있음")
-            return False, None, 0, {}
-
+        if not html.strip():
+            raise ValueError("[pass2] HTML 초안 비어있음")
         # Pass 2.5: 구조 검증 + 자동 수정
-        is_valid, html_issues = validate_html(html_current)
-        if html_issues:
-            log.warning("[validate] HTML 구조 이슈 %d개: %s", len(html_issues), " | ".join(html_issues[:3]))
-        html_current = fix_html_structure(html_current)
-        if not is_valid:
-            # 재검증
-            is_valid2, remaining = validate_html(html_current)
-            if remaining:
-                log.warning("[validate] 자동 수정 후에도 남은 이슈: %s", " | ".join(remaining[:2]))
-
-        # 품질 개선 루프
+        return _normalize_draft(html)
+
+    async def prescore_node(draft: str) -> Optional[float]:
+        # 정적 특징 기반 사전 점수 — 목표에 한참 못 미치면 LLM 리뷰 전에 폐기
+        if not PRESCORE:
+            return None
+        scorer = PreScorer(_load_lessons())
+        predicted = scorer.predict(draft, style)
+        log.info("[prescore] 예측 %.0f점 (±%.0f, %s)", predicted, scorer.margin,
+                 "보정됨" if scorer.calibrated else "규칙 기반")
+        if scorer.clearly_below(predicted, target_score):
+            raise DraftRejected(predicted)
+        if scorer.clearly_above(predicted, max(target_score, min_score)):
+            log.info("[prescore] 목표를 충분히 넘을 것으로 예측 — 개선 루프 생략")
+            return predicted
+        return None
+
+    async def refine_node(draft: str, brief: Dict[str, Any], css: str,
+                          prescore: Optional[float]) -> tuple[str, int, Dict]:
+        # 품질 개선 루프 (사전 점수가 충분히 높으면 리뷰 1회만)
+        html_current = draft
         score = 0
-        last_review: Dict = {}
-        total_passes = max_refine if min_score > 0 else 1
-
-        for refine_idx in range(total_passes):
-            round_label = f"[refine {refine_idx + 1}/{total_passes}]" if total_passes > 1 else "[review]"
-
-            review = await pass3_review(html_current, category, style)
-            last_review = review
-            score = review.get("score", 50)
-            log.info("%s 점수: %d/100 | 이슈: %d개 | 강점: %s",
-                     round_label, score,
-                     len(review.get("issues", [])),
-                     review.get("strengths", [])[:2])
-
-            if min_score > 0 and score >= min_score:
-                log.info("%s 목표 점수 달성 (%d >= %d) — 개선 루프 종료", round_label, score, min_score)
-                break
+        best: tuple[str, int, Dict] = (draft, -1, {})
+        total_passes = max_refine if min_score > 0 and prescore is None else 1
+        budget = RefineBudget(_load_lessons(), style, category)
+        last_delta: Optional[float] = None
+        prev_score = 0
+        round_started: Optional[float] = None
 
-            is_last = (refine_idx == total_passes - 1)
-            if is_last or not review.get("issues"):
-                if not review.get("issues"):
-                    log.info("%s 이슈 없음 — 현재 HTML 사용", round_label)
+        try:
+            for refine_idx in range(total_passes):
+                round_label = f"[refine {refine_idx + 1}/{total_passes}]" if total_passes > 1 else "[review]"
+
+                with usage_tags(round=refine_idx):
+                    review = await pass3_review(html_current, category, style)
+                score = review.get("score", 50)
+                if refine_idx == 0:
+                    _record_prescore_sample(html_current, score)
+                progress.update(review=review, score=score)
+                if round_started is not None:
+                    last_delta = score - prev_score
+                    budget.observe(refine_idx - 1, last_delta, time.monotonic() - round_started)
+                if score > best[1]:
+                    best = (html_current, score, review)
+                log.info("%s 점수: %d/100 | 이슈: %d개 | 강점: %s",
+                         round_label, score,
+                         len(review.get("issues", [])),
+                         review.get("strengths", [])[:2])
+
+                if min_score > 0 and score >= min_score:
+                    log.info("%s 목표 점수 달성 (%d >= %d) — 개선 루프 종료", round_label, score, min_score)
+                    break
+
+                is_last = (refine_idx == total_passes - 1)
+                if is_last or not review.get("issues"):
+                    if not review.get("issues"):
+                        log.info("%s 이슈 없음 — 현재 HTML 사용", round_label)
+                    break
+
+                if not budget.should_continue(refine_idx, last_delta):
+                    gain, seconds = budget.last_estimate
+                    log.info("%s [budget] 기대 상승 %.1f점 / %.0f초 — 개선 루프 중단", round_label, gain, seconds)
+                    break
+
+                prev_score = score
+                round_started = time.monotonic()
+                with usage_tags(round=refine_idx):
+                    refined = await pass4_refined_html(html_current, review, brief, category, style, css_system=css)
+                html_current = _accept_refinement(html_current, refined, round_label)
+        finally:
+            # 취소된 후보(best-of-N)의 라운드 기록도 보존
+            if budget.rounds:
+                with get_state_store().edit_lessons() as lessons:
+                    budget.save(lessons)
+
+        html_best, score, last_review = best
+        if html_best is not html_current:
+            log.info("[refine] 최고 점수 라운드(%d점)의 HTML 채택", score)
+        return fix_html_structure(html_best), score, last_review
+
+    async def screenshot_node(refine: tuple[str, int, Dict]) -> bytes:
+        log.info("[screenshot] 캡처 중...")
+        return await capture_screenshot(capture, refine[0])
+
+    graph = PassGraph(pass_concurrency)
+    graph.add("css", css_node)
+    graph.add("brief", brief_node)
+    graph.add("draft", draft_node, "css", "brief")
+    graph.add("prescore", prescore_node, "draft")
+    graph.add("refine", refine_node, "draft", "brief", "css", "prescore")
+    graph.add("screenshot", screenshot_node, "refine")
+
+    with get_ollama_client(OLLAMA_BASE_URL).residency.plan(_pass_plan(1, min_score, max_refine)), \
+            usage_tags(design_id=design_id):
+        try:
+            results = await graph.run()
+        except DraftRejected as rejected:
+            log.info("[prescore] 예측 %.0f점 — 목표 %d점에 한참 못 미쳐 리뷰 없이 폐기", rejected.predicted, target_score)
+            return False, None, int(rejected.predicted), {"prescore_rejected": True}
+        except Exception as exc:
+            log.error("[error] 생성 실패: %s", exc, exc_info=True)
+            return False, None, 0, {}
+
+    html_final, score, last_review = results["refine"]
+    brief = results["brief"]
+    design_data = _build_design_data(design_id, dna, brief, html_final, results["screenshot"], score)
+    log.info("[graph] 패스 소요 %s | 임계 경로 %.1fs (직렬 합계 %.1fs)",
+             ", ".join(f"{name} {sec:.1f}s" for name, sec in graph.timings.items()),
+             graph.critical_path(), sum(graph.timings.values()))
+    log.info("[생성완료] %s | score=%d | layout=%s",
+             brief.get("title", "Untitled Design"), score, dna.get("layout_arch", "")[:40])
+    return True, design_data, score, last_review
+
+
+# ── Best-of-N 후보 (target_score 에 먼저 도달한 후보만 남기고 나머지 취소) ────────
+async def generate_candidates(
+    capture: CaptureService,
+    n: int,
+    target_score: int,
+    min_score: int = DEFAULT_MIN_SCORE,
+    max_refine: int = DEFAULT_MAX_REFINE,
+    trend_context: str = "",
+    pass_concurrency: int = PASS_CONCURRENCY,
+) -> List[tuple[bool, Optional[DesignData], int, Dict]]:
+    """
+    generate_one_design 을 n개 동시에 실행. 한 후보가 target_score 에 도달하면 나머지 태스크를 취소
+    (진행 중인 Ollama 스트림도 연결이 끊겨 서버에서 생성이 중단됨).
+    취소된 후보가 그때까지 받은 리뷰 이슈는 실패로 학습 메모리에 기록.
+
+    Returns 끝까지 완료된 후보들의 (success, design_data, score, last_review) — 완료 순서
+    """
+    progress: List[Dict[str, Any]] = [{} for _ in range(n)]
+    dnas: List[Dict[str, Any]] = []
+    for _ in range(n):
+        dnas.append(pick_design_dna(pending=dnas))   # 후보끼리 같은 조합을 피함
+    tasks = [
+        asyncio.create_task(generate_one_design(
+            capture, min_score=min_score, max_refine=max_refine, trend_context=trend_context,
+            pass_concurrency=pass_concurrency, target_score=target_score, progress=progress[index],
+            dna=dnas[index],
+        ))
+        for index in range(n)
+    ]
+    finished: Dict[int, tuple[bool, Optional[DesignData], int, Dict]] = {}
+    started = time.monotonic()
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = tasks.index(task)
+                finished[index] = task.result()
+                ok, _, score, _ = finished[index]
+                log.info("  [후보 %d/%d] 완료 — %s score=%d (%.0fs)", index + 1, n,
+                         "성공" if ok else "실패", score, time.monotonic() - started)
+            if pending and any(ok and score >= target_score for ok, _, score, _ in finished.values()):
+                log.info("  [후보] 목표 도달 — 진행 중인 후보 %d개 취소", len(pending))
                 break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    for index, state in enumerate(progress):
+        if index in finished:
+            continue
+        review = state.get("review")
+        if review:
+            log.info("  [후보 %d/%d] 취소 — 마지막 리뷰 %d점, 이슈 %d개 학습",
+                     index + 1, n, state.get("score", 0), len(review.get("issues", [])))
+            _record_result(review.get("issues", []), state.get("score", 0), state.get("dna", {}), success=False)
+    return list(finished.values())
+
+
+# ── Phase-major 배치 (같은 모델 호출을 묶어 모델 교체 최소화) ──────────────────
+def _model_switches(calls: List[tuple]) -> int:
+    models = [model for _, model in calls]
+    return sum(1 for prev, cur in zip(models, models[1:]) if prev != cur)
+
+
+async def generate_designs_phase_major(
+    capture: CaptureService,
+    n: int,
+    min_score: int = DEFAULT_MIN_SCORE,
+    max_refine: int = DEFAULT_MAX_REFINE,
+    trend_context: str = "",
+    target_score: int = 0,
+) -> List[tuple[bool, Optional[DesignData], int, Dict]]:
+    """
+    n개 디자인을 패스 단위로 생성 — pass0 을 모두 끝낸 뒤 pass1, pass2 … 순서.
+    CPU 전용 환경에서 CODER/BRIEF/REVIEW 모델 가중치를 디자인마다 다시 올리지 않고
+    페이즈마다 한 번만 올리도록 같은 모델 호출을 연속으로 묶는다.
+    pass2 뒤 사전 점수 검사는 generate_one_design 과 같음 — target_score 에 한참 못 미치는 초안은
+    리뷰 없이 (False, None, 예측 점수, {"prescore_rejected": True}), 충분히 넘는 초안은 리뷰 1회만.
 
-            refined = await pass4_refined_html(html_current, review, brief, category, style, css_system=css_system)
-            if refined.strip():
-                refined = fix_html_structure(refined)
-                # 개선 버전이 원본보다 너무 짧으면 폐기 (섹션 삭제 방지)
-                if len(refined) < len(html_current) * 0.6:
-                    log.warning("%s 개선 HTML이 원본의 60%% 미만 (%d→%d chars) — 원본 유지",
-                                round_label, len(html_current), len(refined))
-                else:
-                    html_current = refined
-            else:
-                log.warning("%s 개선 HTML 비어있음 — 이전 버전 유지", round_label)
+    Returns generate_one_design 과 같은 (success, design_data, score, last_review) 목록
+    """
+    jobs: List[Dict[str, Any]] = []
+    for index in range(n):
+        dna = pick_design_dna(pending=[job["dna"] for job in jobs])
+        jobs.append({"index": index, "id": str(uuid.uuid4()), "dna": dna, "ok": True,
+                     "settled": False, "score": 0, "review": {}})
+        log.info("[batch %d] category=%s | style=%s | layout=%s",
+                 index + 1, dna["category"], dna["style"], dna.get("layout_arch", "")[:40])
+
+    calls: List[tuple] = []   # (디자인 index, 모델) — 디자인 순서 대비 모델 전환 수 비교용
+
+    residency = get_ollama_client(OLLAMA_BASE_URL).residency
+
+    async def phase(name: str, model: str, targets: List[Dict[str, Any]], step,
+                    then: Optional[str] = None) -> None:
+        """then: 다음 페이즈 모델 — 이 페이즈의 마지막 호출 동안 미리 올림"""
+        if not targets:
+            return
+        log.info("[phase] %s — model=%s × %d", name, model, len(targets))
+        with residency.plan([model] * len(targets) + ([then] if then else [])):
+            for job in targets:
+                calls.append((job["index"], model))
+                try:
+                    with usage_tags(design_id=job["id"]):
+                        await step(job)
+                except Exception as exc:
+                    job["ok"] = False
+                    log.error("[phase] %s 실패 (디자인 %d): %s", name, job["index"] + 1, exc, exc_info=True)
+
+    def active() -> List[Dict[str, Any]]:
+        return [job for job in jobs if job["ok"]]
+
+    async def css_step(job):
+        job["css"] = await pass0_css_system(job["dna"])
+
+    async def brief_step(job):
+        dna = job["dna"]
+        job["brief"] = await pass1_brief(dna["category"], dna["style"], dna["structure"],
+                                         dna=dna, trend_context=trend_context)
+        log.info("[brief %d] 제목: %s", job["index"] + 1, job["brief"].get("title", "Untitled Design"))
+
+    async def draft_step(job):
+        dna = job["dna"]
+        html = await pass2_html_draft(job["brief"], dna["category"], dna["style"], dna["structure"],
+                                      dna=dna, trend_context=trend_context, css_system=job["css"])
+        if not html.strip():
+            raise ValueError("HTML 초안 비어있음")
+        job["html"] = _normalize_draft(html)
+
+    await phase("pass0", MODEL_CODER, active(), css_step, then=MODEL_BRIEF)
+    await phase("pass1", MODEL_BRIEF, active(), brief_step, then=MODEL_CODER)
+    await phase("pass2", MODEL_CODER, active(), draft_step, then=MODEL_REVIEW)
+
+    # 정적 사전 점수 — 목표에 한참 못 미치는 초안은 리뷰 페이즈 전에 폐기
+    if PRESCORE:
+        scorer = PreScorer(_load_lessons())
+        for job in active():
+            predicted = scorer.predict(job["html"], job["dna"]["style"])
+            log.info("[prescore %d] 예측 %.0f점 (±%.0f, %s)", job["index"] + 1, predicted, scorer.margin,
+                     "보정됨" if scorer.calibrated else "규칙 기반")
+            if scorer.clearly_below(predicted, target_score):
+                log.info("[prescore %d] 목표 %d점에 한참 못 미쳐 리뷰 없이 폐기", job["index"] + 1, target_score)
+                job["ok"] = False
+                job["rejected"] = predicted
+            elif scorer.clearly_above(predicted, max(target_score, min_score)):
+                log.info("[prescore %d] 목표를 충분히 넘을 것으로 예측 — 개선 루프 생략", job["index"] + 1)
+                job["review_only"] = True
+
+    # 품질 개선 루프 — 라운드마다 리뷰 페이즈 → 수정 페이즈
+    total_passes = max_refine if min_score > 0 else 1
+    lessons = _load_lessons()
+    for job in jobs:
+        job["budget"] = RefineBudget(lessons, job["dna"]["style"], job["dna"]["category"])
+        job["best"] = None
+        job["prev_score"] = None
+    for refine_idx in range(total_passes):
+        round_label = f"[refine {refine_idx + 1}/{total_passes}]" if total_passes > 1 else "[review]"
+        is_last = (refine_idx == total_passes - 1)
+
+        async def review_step(job):
+            started = time.monotonic()
+            with usage_tags(round=refine_idx):
+                review = await pass3_review(job["html"], job["dna"]["category"], job["dna"]["style"])
+            job["review"] = review
+            job["score"] = review.get("score", 50)
+            if refine_idx == 0:
+                _record_prescore_sample(job["html"], job["score"])
+            last_delta = None
+            if job["prev_score"] is not None:
+                last_delta = job["score"] - job["prev_score"]
+                job["budget"].observe(refine_idx - 1, last_delta, job["round_seconds"] + time.monotonic() - started)
+            if job["best"] is None or job["score"] > job["best"][1]:
+                job["best"] = (job["html"], job["score"], review)
+            log.info("%s 디자인 %d 점수: %d/100 | 이슈: %d개",
+                     round_label, job["index"] + 1, job["score"], len(review.get("issues", [])))
+            if ((min_score > 0 and job["score"] >= min_score) or is_last or not review.get("issues")
+                    or job.get("review_only")):
+                job["settled"] = True
+            elif not job["budget"].should_continue(refine_idx, last_delta):
+                gain, seconds = job["budget"].last_estimate
+                log.info("%s [budget] 디자인 %d 기대 상승 %.1f점 / %.0f초 — 개선 중단",
+                         round_label, job["index"] + 1, gain, seconds)
+                job["settled"] = True
+
+        async def refine_step(job):
+            dna = job["dna"]
+            started = time.monotonic()
+            job["prev_score"] = job["score"]
+            with usage_tags(round=refine_idx):
+                refined = await pass4_refined_html(job["html"], job["review"], job["brief"],
+                                                   dna["category"], dna["style"], css_system=job["css"])
+            job["html"] = _accept_refinement(job["html"], refined, round_label)
+            job["round_seconds"] = time.monotonic() - started
+
+        await phase(f"pass3 {round_label}", MODEL_REVIEW, [j for j in active() if not j["settled"]], review_step,
+                    then=MODEL_CODER)
+        await phase(f"pass4 {round_label}", MODEL_CODER, [j for j in active() if not j["settled"]], refine_step,
+                    then=None if is_last else MODEL_REVIEW)
+        if not any(not j["settled"] for j in active()):
+            break
+
+    if any(job["budget"].rounds for job in jobs):
+        with get_state_store().edit_lessons() as lessons:
+            for job in jobs:
+                job["budget"].save(lessons)
+
+    # 스크린샷 — 공유 캡처 서비스가 동시 캡처 수를 제한
+    async def finish(job) -> tuple[bool, Optional[DesignData], int, Dict]:
+        if "rejected" in job:
+            return False, None, int(job["rejected"]), {"prescore_rejected": True}
+        if not job["ok"]:
+            return False, None, 0, {}
+        html_best, score, review = job["best"] or (job["html"], job["score"], job["review"])
+        try:
+            html_final = fix_html_structure(html_best)
+            screenshot_bytes = await capture_screenshot(capture, html_final)
+        except Exception as exc:
+            log.error("[screenshot] 디자인 %d 캡처 실패: %s", job["index"] + 1, exc)
+            return False, None, 0, {}
+        data = _build_design_data(job["id"], job["dna"], job["brief"], html_final, screenshot_bytes, score)
+        log.info("[생성완료] %s | score=%d", data["title"], score)
+        return True, data, score, review
 
-        html_final = fix_html_structure(html_current)
+    results = list(await asyncio.gather(*(finish(job) for job in jobs)))
+    design_major = sorted(calls, key=lambda call: call[0])   # 디자인 하나씩 끝까지 돌렸을 때의 호출 순서
+    log.info("[schedule] 모델 전환 %d회 (디자인 순서였다면 %d회), LLM 호출 %d회",
+             _model_switches(calls), _model_switches(design_major), len(calls))
+    return results
 
-        # 스크린샷
-        log.info("[screenshot] 캡처 중...")
-        screenshot_bytes = await capture_screenshot(browser, html_final)
-
-        design_data: DesignData = {
-            "id":          design_id,
-            "title":       title,
-            "category":    category,
-            "description": brief.get("concept", ""),
-            "html_code":   html_final,
-            "screenshot":  screenshot_bytes,
-            "colors":      brief.get("color_palette", []),
-            "score":       score,
-            "prompt_tag":  f"{structure}_{style}".lower().replace(" ", "_"),
-            # DNA 추가 저장 (히스토리용)
-            "dna":         dna,
-        }
-
-        log.info("[생성완료] %s | score=%d | layout=%s",
-                 title, score, dna.get("layout_arch", "")[:40])
-        return True, design_data, score, last_review
 
-    except Exception as exc:
-        log.error("[error] 생성 실패: %s", exc, exc_info=True)
-        return False, None, 0, {}
+async def run_phase_major(
+    capture: CaptureService,
+    count: int,
+    min_score: int,
+    max_refine: int,
+    target_score: int,
+    max_attempts: int,
+    trend_context: str,
+) -> int:
+    """phase-major 로 count 개를 생성·게시. target_score 가 있으면 미달 슬롯만 모아 다음 라운드 재생성."""
+    slots = [{"done": False, "best": None, "best_score": 0, "best_review": {}} for _ in range(count)]
+    rounds = max_attempts if target_score > 0 else 1
+    successes = 0
 
+    for round_idx in range(rounds):
+        open_slots = [slot for slot in slots if not slot["done"]]
+        if not open_slots:
+            break
+        log.info("\n═══ phase-major 라운드 %d/%d — 디자인 %d개 ═══", round_idx + 1, rounds, len(open_slots))
+        results = await generate_designs_phase_major(
+            capture, len(open_slots), min_score=min_score, max_refine=max_refine, trend_context=trend_context,
+            target_score=target_score,
+        )
+        for slot, (ok, design_data, score, last_review) in zip(open_slots, results):
+            if ok and design_data and score > slot["best_score"]:
+                slot["best"], slot["best_score"], slot["best_review"] = design_data, score, last_review
+            if ok and design_data and (target_score <= 0 or score >= target_score):
+                _record_result(last_review.get("issues", []), score, design_data.get("dna", {}), success=True)
+                slug = await asyncio.to_thread(publish_design, design_data)
+                log.info("  [✓] score=%d — 게시 대기열 등록: https://ui-syntax.com/design/%s", score, slug)
+                slot["done"] = True
+                successes += 1
+            elif ok and design_data:
+                log.info("  [✗] score=%d < %d — 다음 라운드에서 재생성", score, target_score)
+                _record_result(last_review.get("issues", []), score, design_data.get("dna", {}), success=False)
+            elif last_review.get("prescore_rejected"):
+                log.info("  [✗] 사전 점수 %d — 리뷰 없이 폐기, 다음 라운드에서 재생성", score)
+            elif target_score > 0:
+                _record_result([], 0, {}, success=False)
+
+    if target_score > 0:
+        # ── 모든 라운드 소진 — 슬롯별 최고점 디자인 폴백 저장 ──────────────────
+        fallback_threshold = max(target_score - 10, min_score, 60)
+        for slot in slots:
+            if slot["done"]:
+                continue
+            if slot["best"] and slot["best_score"] >= fallback_threshold:
+                log.warning("  [폴백] 목표(%d점) 미달. 최고 %d점 디자인 저장 (임계값: %d)",
+                            target_score, slot["best_score"], fallback_threshold)
+                _record_result(slot["best_review"].get("issues", []), slot["best_score"],
+                               slot["best"].get("dna", {}), success=False)
+                slug = await asyncio.to_thread(publish_design, slot["best"])
+                log.info("  [폴백 저장] https://ui-syntax.com/design/%s", slug)
+                successes += 1
+            else:
+                log.warning("  [포기] 최고 점수=%d < 폴백 임계값=%d — 저장 안 함",
+                            slot["best_score"], fallback_threshold)
+    return successes
 
-def publish_design(data: DesignData) -> str:
-    """Storage 업로드 + DB 저장 + 히스토리 기록. 저장된 slug 반환."""
-    slug = unique_slug(data["title"])
-    log.info("[upload] Storage 업로드 중... (slug=%s)", slug)
-    image_url = upload_image(data["screenshot"], slug)
 
-    save_to_db(
+def publish_design(data: DesignData) -> str:
+    """outbox 적재 (업로드/DB 저장은 드레인 워커) + 히스토리 기록. 예약된 slug 반환."""
+    slug = slugs.allocate(slugify(data["title"]))
+    record = build_record(
         design_id=data["id"],
         title=data["title"],
         slug=slug,
         category=data["category"],
         description=data["description"],
         html_code=data["html_code"],
-        image_url=image_url,
         colors=data["colors"],
         score=data["score"],
         prompt_tag=data["prompt_tag"],
     )
+    get_outbox().enqueue(record, data["screenshot"],
+                         bucket=STORAGE_BUCKET, image_path=image_path_for(slug))
 
-    # 히스토리 저장 — 다음 생성 시 중복 방지용
+    # 히스토리 저장 + 샘플러 개수 반영 — 다음 생성 시 중복 방지용
     dna = data.get("dna", {})
+    if _dna_sampler is not None and dna:
+        _dna_sampler.observe({**dna, "category": data["category"]})
     _save_history({
         "title":      data["title"],
         "slug":       slug,
@@ -1373,8 +1979,7 @@ def publish_design(data: DesignData) -> str:
         "ts":         datetime.utcnow().isoformat(),
     })
 
-    log.info("[✓] 게시 완료: %s | score=%d | https://ui-syntax.com/design/%s",
-             data["title"], data["score"], slug)
+    log.info("[outbox] 게시 대기: %s | score=%d | slug=%s", data["title"], data["score"], slug)
     return slug
 
 # ── 배치 실행 ─────────────────────────────────────────────────────────────────
@@ -1386,6 +1991,9 @@ async def run_batch(
     max_attempts: int = 10,
     use_trends: bool = True,
     refresh_trends_cache: bool = False,
+    phase_major: bool = False,
+    pass_concurrency: int = PASS_CONCURRENCY,
+    candidates: int = CANDIDATES,
 ) -> None:
     """
     count               : 목표 저장 디자인 수
@@ -1396,6 +2004,10 @@ async def run_batch(
     max_attempts        : target_score 달성을 위한 최대 시도 횟수 (무한루프 방지)
     use_trends          : True = 웹 트렌드 수집 후 프롬프트에 주입
     refresh_trends_cache: True = 기존 캐시 무시하고 강제 갱신
+    phase_major         : True = 디자인별이 아니라 패스별로 배치 전체를 처리 (모델 교체 최소화)
+    pass_concurrency    : 디자인 하나 안에서 동시에 실행할 패스 수 (pass0 ∥ pass1)
+    candidates          : target_score 모드에서 동시에 생성할 후보 수 (OLLAMA_NUM_PARALLEL 로 제한)
+                          한 후보가 목표에 도달하면 나머지는 취소
     """
     log.info(
         "[system] Ollama(CODER=%s / BRIEF=%s / REVIEW=%s) | 목표 %d개 | min_score=%d | max_refine=%d | target_score=%d | max_attempts=%d | trends=%s",
@@ -1405,13 +2017,11 @@ async def run_batch(
 
     # Ollama 연결 확인
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            r = await client.get(f"{OLLAMA_BASE_URL}/api/tags")
-            models = [m["name"] for m in r.json().get("models", [])]
-            log.info("[ollama] 사용 가능한 모델: %s", models)
-            for _m in {MODEL_CODER, MODEL_BRIEF, MODEL_REVIEW}:
-                if _m not in models:
-                    log.warning("[ollama] %s 모델이 목록에 없습니다. 그래도 시도합니다.", _m)
+        models = await get_ollama_client(OLLAMA_BASE_URL).tags()
+        log.info("[ollama] 사용 가능한 모델: %s", models)
+        for _m in {MODEL_CODER, MODEL_BRIEF, MODEL_REVIEW}:
+            if _m not in models:
+                log.warning("[ollama] %s 모델이 목록에 없습니다. 그래도 시도합니다.", _m)
     except Exception as exc:
         log.error("[ollama] 연결 실패: %s — Ollama가 실행 중인지 확인하세요", exc)
         return
@@ -1438,38 +2048,127 @@ async def run_batch(
         except Exception as exc:
             log.warning("[trend] 트렌드 로드 실패 (무시하고 진행): %s", exc)
 
+    candidates = max(1, min(candidates, OLLAMA_PARALLEL))
+    if candidates > 1 and target_score > 0:
+        log.info("[system] best-of-%d 후보 동시 생성 (OLLAMA_NUM_PARALLEL=%d)", candidates, OLLAMA_PARALLEL)
+
     successes = 0
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-
-        for i in range(count):
-            log.info("\n═══ 디자인 %d/%d 목표 ═══", i + 1, count)
-
-            if target_score > 0:
-                # ── target_score 달성할 때까지 새 디자인 반복 생성 ──────────
-                attempt = 0
-                best_score = 0
-                best_data: Optional[DesignData]  = None
-                best_review: Dict                = {}
-
-                while attempt < max_attempts:
-                    attempt += 1
-                    log.info("  [시도 %d/%d] 새 디자인 생성 중... (목표: score >= %d)",
-                             attempt, max_attempts, target_score)
+    loads_before = get_ollama_client(OLLAMA_BASE_URL).model_summary()
+    async with get_outbox(), capture_session() as capture:
+        if phase_major:
+            successes = await run_phase_major(
+                capture, count, min_score, max_refine, target_score, max_attempts, trend_context,
+            )
+        else:
+            for i in range(count):
+                log.info("\n═══ 디자인 %d/%d 목표 ═══", i + 1, count)
+
+                if target_score > 0:
+                    # ── target_score 달성할 때까지 새 디자인 반복 생성 ──────────
+                    attempt = 0
+                    best_score = 0
+                    best_data: Optional[DesignData]  = None
+                    best_review: Dict                = {}
+
+                    while attempt < max_attempts:
+                        batch = min(candidates, max_attempts - attempt)
+                        attempt += batch
+                        if batch > 1:
+                            log.info("  [시도 %d–%d/%d] 후보 %d개 동시 생성 중... (목표: score >= %d)",
+                                     attempt - batch + 1, attempt, max_attempts, batch, target_score)
+                            outcomes = await generate_candidates(
+                                capture, batch, target_score, min_score=min_score, max_refine=max_refine,
+                                trend_context=trend_context, pass_concurrency=pass_concurrency,
+                            )
+                        else:
+                            log.info("  [시도 %d/%d] 새 디자인 생성 중... (목표: score >= %d)",
+                                     attempt, max_attempts, target_score)
+                            outcomes = [await generate_one_design(
+                                capture, min_score=min_score, max_refine=max_refine,
+                                trend_context=trend_context, pass_concurrency=pass_concurrency,
+                                target_score=target_score,
+                            )]
+
+                        reached = False
+                        # 동시에 끝난 후보가 여럿이면 점수 높은 것부터 — 목표 도달 후보는 하나만 게시
+                        for ok, design_data, score, last_review in sorted(outcomes, key=lambda o: (o[0], o[2]),
+                                                                          reverse=True):
+                            # 이번 시도가 지금까지 최고점이면 백업
+                            if ok and design_data and score > best_score:
+                                best_score  = score
+                                best_data   = design_data
+                                best_review = last_review
+
+                            if ok and score >= target_score and not reached:
+                                log.info("  [✓] 목표 달성! score=%d >= %d (시도 %d회) — 저장 중...",
+                                         score, target_score, attempt)
+                                _record_result(
+                                    last_review.get("issues", []),
+                                    score,
+                                    design_data.get("dna", {}),
+                                    success=True,
+                                )
+                                slug = await asyncio.to_thread(publish_design, design_data)
+                                log.info("  [✓] 게시 대기열 등록: https://ui-syntax.com/design/%s", slug)
+                                successes += 1
+                                reached = True
+                            elif ok and score >= target_score:
+                                # 같은 배치에서 먼저 채택된 후보가 있음 — 품질은 목표 달성이므로 성공으로 학습
+                                log.info("  [=] score=%d 도 목표 달성했지만 다른 후보 채택 — 폐기", score)
+                                _record_result(
+                                    last_review.get("issues", []),
+                                    score,
+                                    design_data.get("dna", {}),
+                                    success=True,
+                                )
+                            elif ok:
+                                log.info("  [✗] score=%d < %d — 폐기 후 재시도 (현재 최고: %d)",
+                                         score, target_score, best_score)
+                                _record_result(
+                                    last_review.get("issues", []),
+                                    score,
+                                    design_data.get("dna", {}),
+                                    success=False,
+                                )
+                            elif last_review.get("prescore_rejected"):
+                                log.info("  [✗] 사전 점수 %d — 리뷰 없이 폐기 후 재시도", score)
+                            else:
+                                log.warning("  [✗] 생성 실패 — 재시도")
+                                _record_result([], 0, {}, success=False)
+                        if reached:
+                            break
+
+                        if attempt < max_attempts:
+                            await asyncio.sleep(2)
+                    else:
+                        # ── 모든 시도 소진 — 최고점 디자인 폴백 저장 ─────────────
+                        fallback_threshold = max(target_score - 10, min_score, 60)
+                        if best_data and best_score >= fallback_threshold:
+                            log.warning(
+                                "  [폴백] %d회 시도 후 목표(%d점) 미달. 최고 %d점 디자인 저장 (임계값: %d)",
+                                max_attempts, target_score, best_score, fallback_threshold,
+                            )
+                            _record_result(
+                                best_review.get("issues", []),
+                                best_score,
+                                best_data.get("dna", {}),
+                                success=False,   # 학습: 목표 미달이므로 실패로 기록
+                            )
+                            slug = await asyncio.to_thread(publish_design, best_data)
+                            log.info("  [폴백 저장] https://ui-syntax.com/design/%s", slug)
+                            successes += 1
+                        else:
+                            log.warning(
+                                "  [포기] %d회 시도 후 목표(%d점) 미달. 최고 점수=%d < 폴백 임계값=%d — 저장 안 함",
+                                max_attempts, target_score, best_score, fallback_threshold,
+                            )
+                else:
+                    # ── 기존 단순 생성 (target_score 없으면 무조건 저장) ──────────
                     ok, design_data, score, last_review = await generate_one_design(
-                        browser, min_score=min_score, max_refine=max_refine,
-                        trend_context=trend_context,
+                        capture, min_score=min_score, max_refine=max_refine,
+                        trend_context=trend_context, pass_concurrency=pass_concurrency,
                     )
-
-                    # 이번 시도가 지금까지 최고점이면 백업
-                    if ok and design_data and score > best_score:
-                        best_score  = score
-                        best_data   = design_data
-                        best_review = last_review
-
-                    if ok and score >= target_score:
-                        log.info("  [✓] 목표 달성! score=%d >= %d (시도 %d회) — 저장 중...",
-                                 score, target_score, attempt)
+                    if ok and design_data:
                         _record_result(
                             last_review.get("issues", []),
                             score,
@@ -1477,69 +2176,43 @@ async def run_batch(
                             success=True,
                         )
                         slug = await asyncio.to_thread(publish_design, design_data)
-                        log.info("  [✓] 게시 완료: https://ui-syntax.com/design/%s", slug)
                         successes += 1
-                        break
-                    elif ok:
-                        log.info("  [✗] score=%d < %d — 폐기 후 재시도 (현재 최고: %d)",
-                                 score, target_score, best_score)
-                        _record_result(
-                            last_review.get("issues", []),
-                            score,
-                            design_data.get("dna", {}),
-                            success=False,
-                        )
-                    else:
-                        log.warning("  [✗] 생성 실패 — 재시도")
-                        _record_result([], 0, {}, success=False)
+                        log.info("[작업 완료] 최종 점수: %d | slug=%s", score, slug)
 
-                    if attempt < max_attempts:
-                        await asyncio.sleep(2)
-                else:
-                    # ── 모든 시도 소진 — 최고점 디자인 폴백 저장 ─────────────
-                    fallback_threshold = max(target_score - 10, min_score, 60)
-                    if best_data and best_score >= fallback_threshold:
-                        log.warning(
-                            "  [폴백] %d회 시도 후 목표(%d점) 미달. 최고 %d점 디자인 저장 (임계값: %d)",
-                            max_attempts, target_score, best_score, fallback_threshold,
-                        )
-                        _record_result(
-                            best_review.get("issues", []),
-                            best_score,
-                            best_data.get("dna", {}),
-                            success=False,   # 학습: 목표 미달이므로 실패로 기록
-                        )
-                        slug = await asyncio.to_thread(publish_design, best_data)
-                        log.info("  [폴백 저장] https://ui-syntax.com/design/%s", slug)
-                        successes += 1
-                    else:
-                        log.warning(
-                            "  [포기] %d회 시도 후 목표(%d점) 미달. 최고 점수=%d < 폴백 임계값=%d — 저장 안 함",
-                            max_attempts, target_score, best_score, fallback_threshold,
-                        )
-            else:
-                # ── 기존 단순 생성 (target_score 없으면 무조건 저장) ──────────
-                ok, design_data, score, last_review = await generate_one_design(
-                    browser, min_score=min_score, max_refine=max_refine,
-                    trend_context=trend_context,
-                )
-                if ok and design_data:
-                    _record_result(
-                        last_review.get("issues", []),
-                        score,
-                        design_data.get("dna", {}),
-                        success=True,
-                    )
-                    slug = await asyncio.to_thread(publish_design, design_data)
-                    successes += 1
-                    log.info("[작업 완료] 최종 점수: %d | slug=%s", score, slug)
-
-            if i < count - 1:
-                await asyncio.sleep(3)
+                if i < count - 1:
+                    await asyncio.sleep(3)
 
-        await browser.close()
 
     log.info("\n[결과] %d / %d 성공", successes, count)
+    loads = get_ollama_client(OLLAMA_BASE_URL).model_summary()
+    log.info("[ollama] 모델 로드 — 배치 전 %d회 (%.1fs) → 배치 후 %d회 (%.1fs), 모델 전환 %d회",
+             loads_before["loads"], loads_before["load_seconds"], loads["loads"], loads["load_seconds"],
+             loads["switches"] - loads_before["switches"])
+    for model, stats in loads["models"].items():
+        log.info("[ollama]   %s: 호출 %d회, 로드 %d회 (%.1fs)", model, stats["calls"], stats["loads"], stats["load_seconds"])
+    client = get_ollama_client(OLLAMA_BASE_URL)
+    for name, stats in client.stream_summary().items():
+        log.info("[ollama]   %s: 평균 %.2fs (TTFT %.2fs) × %d회", name, stats["avg_latency_s"], stats["avg_ttft_s"], stats["calls"])
+    residency = client.residency.summary()
+    log.info("[ollama] 미리 올리기 %d회 (%.1fs), 이미 상주 %d회, 생략 %d회",
+             residency["prewarms"], residency["prewarm_seconds"], residency["already_resident"], residency["skipped"])
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        await run_batch(
+            args.count,
+            min_score=args.min_score,
+            max_refine=args.max_refine,
+            target_score=args.target_score,
+            max_attempts=args.max_attempts,
+            use_trends=not args.no_trend,
+            refresh_trends_cache=args.refresh_trends,
+            phase_major=args.phase_major,
+            pass_concurrency=args.pass_concurrency,
+            candidates=args.candidates,
+        )
+    finally:
+        await shutdown_ollama_client()   # 공유 커넥션 풀 정리
 
 # ── CLI ────────────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
@@ -1559,6 +2232,15 @@ if __name__ == "__main__":
                         help="웹 트렌드 수집 비활성화 (오프라인 환경용)")
     parser.add_argument("--refresh-trends", action="store_true",
                         help="트렌드 캐시 무시하고 강제 갱신")
+    parser.add_argument("--phase-major",    action="store_true",
+                        help="패스별로 배치 전체를 처리해 모델 로드를 페이즈당 1회로 (CPU 전용 환경 권장)")
+    parser.add_argument("--section-draft",  action="store_true",
+                        help="pass2 를 브리프 섹션별 동시 호출로 생성 후 조립 (멀티 슬롯 Ollama 서버 권장)")
+    parser.add_argument("--pass-concurrency", type=int, default=PASS_CONCURRENCY,
+                        help="디자인 하나 안에서 동시에 실행할 패스 수 (1=직렬, 기본: 2 — pass0 ∥ pass1)")
+    parser.add_argument("--candidates",     type=int, default=CANDIDATES,
+                        help="--target-score 에서 동시에 생성할 후보 수 — 먼저 목표에 도달한 후보만 남기고 취소 "
+                             "(OLLAMA_NUM_PARALLEL 로 제한, 기본: 1)")
     args = parser.parse_args()
 
     # --model 인자가 지정되면 모든 패스를 해당 모델로 통일
@@ -1567,13 +2249,7 @@ if __name__ == "__main__":
         MODEL_BRIEF  = args.model
         MODEL_REVIEW = args.model
     OLLAMA_BASE_URL = args.ollama
+    if args.section_draft:
+        SECTION_DRAFT = True
 
-    asyncio.run(run_batch(
-        args.count,
-        min_score=args.min_score,
-        max_refine=args.max_refine,
-        target_score=args.target_score,
-        max_attempts=args.max_attempts,
-        use_trends=not args.no_trend,
-        refresh_trends_cache=args.refresh_trends,
-    ))
+    asyncio.run(main(args))
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+HTML Compress — 리뷰 프롬프트용 HTML 압축기 (토큰 예산 안에 문서 전체를 담음)
+
+pass3 는 html[:12000] 만 보여줘서 긴 페이지의 뒤쪽 섹션은 리뷰어가 보지 못한 채 채점됐다.
+리뷰에 필요한 정보(구조, 클래스, 스타일, 문구)는 남기고 나머지를 순서대로 줄인다.
+  1. 주석 제거, 긴 data: URI / SVG path 를 자리표시자로 교체
+  2. 공백 정리 (태그 사이 공백 제거, 연속 공백 1칸)
+  3. 두 번 이상 반복되는 긴 class 목록을 @c1, @c2 … 별칭으로 바꾸고 맨 앞에 범례를 붙임
+  4. 그래도 예산을 넘으면 긴 텍스트 노드를 줄이고,
+  5. 마지막으로 섹션마다 같은 몫만 남기고 가운데를 잘라 모든 섹션이 보이게 함
+
+사용:
+    text, stats = compress_for_review(html, budget_tokens=REVIEW_TOKEN_BUDGET)
+    log.info("%d → %d chars", stats["before"], stats["after"])
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from collections import Counter
+from typing import Dict, Tuple
+
+from html_sections import split_sections
+
+REVIEW_TOKEN_BUDGET = int(os.getenv("REVIEW_TOKEN_BUDGET", "4000"))
+CHARS_PER_TOKEN = 3.5          # HTML/Tailwind 는 영어 본문보다 토큰이 잘게 쪼개짐
+ALIAS_MIN_LENGTH = 30          # 이보다 짧은 class 목록은 별칭으로 바꿔도 이득이 없음
+TEXT_NODE_MAX = 160            # 4단계에서 텍스트 노드를 자르는 길이
+
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_DATA_URI_RE = re.compile(r"data:[\w/+.-]+;base64,[A-Za-z0-9+/=]{40,}")
+_SVG_ATTR_RE = re.compile(r"""\b(d|points)\s*=\s*(["'])[^"']{60,}\2""")
+_CLASS_RE = re.compile(r"""\bclass\s*=\s*(["'])([^"']+)\1""")
+_TEXT_NODE_RE = re.compile(r">([^<]{%d,})<" % (TEXT_NODE_MAX + 20))
+
+
+def estimate_tokens(text: str) -> int:
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+def _strip_noise(html: str) -> str:
+    html = _COMMENT_RE.sub("", html)
+    html = _DATA_URI_RE.sub("data:…", html)
+    html = _SVG_ATTR_RE.sub(lambda m: f'{m.group(1)}="…"', html)
+    html = re.sub(r">\s+<", "><", html)
+    return re.sub(r"\s+", " ", html).strip()
+
+
+def _alias_classes(html: str) -> Tuple[str, str]:
+    """반복되는 긴 class 목록 → @cN. (치환된 HTML, 범례) 반환."""
+    counts = Counter(value.strip() for _, value in _CLASS_RE.findall(html))
+    repeated = [value for value, count in counts.most_common()
+                if count >= 2 and len(value) >= ALIAS_MIN_LENGTH]
+    if not repeated:
+        return html, ""
+    aliases: Dict[str, str] = {value: f"@c{idx + 1}" for idx, value in enumerate(repeated)}
+
+    def replace(match: re.Match) -> str:
+        alias = aliases.get(match.group(2).strip())
+        return f'class="{alias}"' if alias else match.group(0)
+
+    legend = "CLASS ALIASES (class=\"@cN\" means these Tailwind classes):\n" + "\n".join(
+        f"{alias} = {value}" for value, alias in aliases.items()
+    )
+    return _CLASS_RE.sub(replace, html), legend
+
+
+def _trim_text_nodes(html: str) -> str:
+    return _TEXT_NODE_RE.sub(lambda m: f">{m.group(1)[:TEXT_NODE_MAX]}…<", html)
+
+
+def _trim_sections(html: str, budget_chars: int) -> str:
+    """섹션마다 같은 몫만 남기고 가운데를 생략 — 앞뒤(여는 태그·닫는 태그)는 보존."""
+    sections = split_sections(html)
+    if not sections:
+        return html[:budget_chars]
+    outside = len(html) - sum(s.end - s.start for s in sections)
+    share = max(200, (budget_chars - outside) // len(sections))
+    for section in sorted(sections, key=lambda s: s.start, reverse=True):
+        length = section.end - section.start
+        if length <= share:
+            continue
+        keep_head = share * 3 // 4
+        keep_tail = share - keep_head
+        body = html[section.start:section.end]
+        trimmed = f"{body[:keep_head]} …[{length - share} chars omitted]… {body[-keep_tail:]}"
+        html = html[:section.start] + trimmed + html[section.end:]
+    return html
+
+
+def compress_for_review(html: str, budget_tokens: int = REVIEW_TOKEN_BUDGET) -> Tuple[str, Dict[str, int]]:
+    """리뷰어에게 보여줄 HTML. 예산 안이면 손실 없는 단계(1~3)에서 멈춤."""
+    budget_chars = int(budget_tokens * CHARS_PER_TOKEN)
+    compact = _strip_noise(html)
+    compact, legend = _alias_classes(compact)
+    lossy = 0
+    if len(compact) + len(legend) > budget_chars:
+        compact = _trim_text_nodes(compact)
+        lossy = 1
+    if len(compact) + len(legend) > budget_chars:
+        compact = _trim_sections(compact, budget_chars - len(legend))
+        lossy = 2
+    text = f"{legend}\n\n{compact}" if legend else compact
+    return text, {"before": len(html), "after": len(text), "tokens": estimate_tokens(text), "lossy": lossy}
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+HTML Sections — 완성된 문서를 주소 지정 가능한 섹션으로 나누고, 수정된 조각을 제자리에 끼워 넣음
+
+pass4 는 이슈 2~3개를 고치려고 전체 HTML 을 보내고 전체 HTML 을 다시 받았다.
+  1. split_sections(): <style>(없으면 <head>), nav/header, 각 <section>, footer 를 위치와 함께 분리
+  2. locate(): 리뷰 이슈 문구(클래스/id/영역 이름/CSS 규칙)로 손댈 섹션만 고름
+  3. format_fragments() / parse_fragments(): <!-- SECTION:key --> 마커로 감싼 조각만 주고받음
+  4. splice(): 검증을 통과한 조각만 원래 위치에 치환 (뒤에서부터 바꿔 앞 오프셋 유지)
+  5. extract_element(): 섹션별로 따로 생성한 응답에서 요소 하나만 잘라냄 (pass2 섹션 초안)
+
+사용:
+    sections = split_sections(html)
+    targets = locate(issues, sections, html)              # None 이면 전체 문서 수정으로 폴백
+    prompt = format_fragments(html, targets)
+    fragments = parse_fragments(response, [s.key for s in targets])
+    accepted = {s.key: fragments[s.key] for s in targets if valid_fragment(s, fragments.get(s.key))}
+    html = splice(html, targets, accepted)
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from stream_stop import ElementStop, MarkerStop
+
+# 섹션 조각이 원본보다 이만큼 이상 짧아지면 잘린 응답으로 보고 폐기
+MIN_FRAGMENT_RATIO = 0.5
+
+_BLOCK_RE = re.compile(r"<(nav|header|section|footer)\b[^>]*>", re.IGNORECASE)
+_ATTR_RE = re.compile(r"""\b(id|class)\s*=\s*["']([^"']*)["']""", re.IGNORECASE)
+_HEADING_RE = re.compile(r"<h[1-3]\b[^>]*>(.*?)</h[1-3]>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SELECTOR_RE = re.compile(r"[.#]([a-zA-Z][\w-]{2,})")
+_HEX_RE = re.compile(r"[0-9a-f]{3,8}")
+_WORD_RE = re.compile(r"[a-z][a-z-]{4,}")
+# 제목에 흔한 단어 — 이슈 문구와 우연히 겹치므로 라벨 매칭에서 제외
+_LABEL_STOPWORDS = {"about", "their", "which", "there", "these", "those", "every", "where", "while",
+                    "built", "build", "better", "start", "today", "great", "first", "section"}
+_FRAGMENT_RE = re.compile(r"<!--\s*SECTION:([\w-]+)\s*-->(.*?)<!--\s*/SECTION:\1\s*-->", re.DOTALL)
+
+# 이슈 문구에 이 단어가 있으면 해당 섹션을 가리키는 것으로 봄
+_AREA_WORDS: Dict[str, tuple] = {
+    "nav": ("nav", "navbar", "navigation", "menu", "header", "logo"),
+    "footer": ("footer", "copyright"),
+    "style": ("keyframes", "@keyframes", ":root", "var(--", "font-family", "<style>", "css variable",
+              "global", "body background", "scrollbar", "font pairing"),
+}
+# 위치 단서가 없을 때 <style> 한 곳에서 고칠 수 있는 리뷰 영역
+_STYLE_AREAS = {"depth", "typography", "color", "animation", "decoration"}
+
+
+class Section(NamedTuple):
+    """문서 안의 섹션 하나 (html[start:end])"""
+    key: str
+    tag: str
+    start: int
+    end: int
+    label: str
+
+
+def _close_of(html: str, tag: str, open_end: int) -> int:
+    """open 태그 뒤에서 짝이 맞는 </tag> 의 끝 위치. 못 찾으면 -1 (잘린 문서)."""
+    depth = 1
+    for match in re.finditer(rf"<(/?){tag}\b[^>]*>", html[open_end:], re.IGNORECASE):
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            return open_end + match.end()
+    return -1
+
+
+def _label(opening: str, body: str) -> str:
+    attrs = {name.lower(): value for name, value in _ATTR_RE.findall(opening)}
+    heading = _HEADING_RE.search(body)
+    heading_text = re.sub(r"\s+", " ", _TAG_RE.sub("", heading.group(1))).strip()[:60] if heading else ""
+    # class 는 Tailwind 유틸리티(flex, relative …)가 대부분이라 라벨에서 제외 — 셀렉터 매칭으로만 사용
+    return " ".join(part for part in (attrs.get("id", ""), heading_text) if part)
+
+
+def split_sections(html: str) -> List[Section]:
+    """<style>/<head>, 최상위 nav·header·section·footer 를 문서 순서대로 반환."""
+    sections: List[Section] = []
+    style = re.search(r"<style\b[^>]*>.*?</style>", html, re.IGNORECASE | re.DOTALL)
+    head = re.search(r"<head\b[^>]*>.*?</head>", html, re.IGNORECASE | re.DOTALL)
+    if style and (not head or head.start() <= style.start() < head.end()):
+        sections.append(Section("style", "style", style.start(), style.end(), "custom CSS"))
+    elif head:
+        sections.append(Section("head", "head", head.start(), head.end(), "document head"))
+
+    counts: Dict[str, int] = {}
+    body_start = head.end() if head else 0
+    pos = body_start
+    while True:
+        match = _BLOCK_RE.search(html, pos)
+        if not match:
+            break
+        tag = match.group(1).lower()
+        end = _close_of(html, tag, match.end())
+        if end < 0:
+            pos = match.end()
+            continue
+        kind = {"header": "nav", "section": "section"}.get(tag, tag)
+        counts[kind] = counts.get(kind, 0) + 1
+        key = kind if kind != "section" and counts[kind] == 1 else f"{kind}-{counts[kind]}"
+        sections.append(Section(key, tag, match.start(), end, _label(match.group(0), html[match.end():end])))
+        pos = end
+    return sections
+
+
+def _issue_text(issue: Dict[str, Any]) -> str:
+    return " ".join(str(issue.get(field, "")) for field in ("area", "problem", "fix")).lower()
+
+
+def _mentions(text: str, word: str) -> bool:
+    """단어 경계 기준 포함 여부 ("nav" 가 "canvas" 에 걸리지 않도록)."""
+    head = r"(?<![\w-])" if word[0].isalnum() else ""
+    tail = r"(?![\w-])" if word[-1].isalnum() else ""
+    return re.search(head + re.escape(word) + tail, text) is not None
+
+
+def locate(issues: Iterable[Dict[str, Any]], sections: List[Section], html: str = "") -> Optional[List[Section]]:
+    """이슈들이 가리키는 섹션 목록 (문서 순서). 위치를 알 수 없는 이슈가 있으면 None → 전체 수정."""
+    by_key = {section.key: section for section in sections}
+    style_key = "style" if "style" in by_key else "head" if "head" in by_key else None
+    body_sections = [s for s in sections if s.tag == "section"]
+    chosen: Dict[str, Section] = {}
+    for issue in issues:
+        text = _issue_text(issue)
+        hits: List[Section] = []
+        # 1) 클래스/id 셀렉터가 그대로 들어 있는 섹션
+        for name in _SELECTOR_RE.findall(text):
+            if _HEX_RE.fullmatch(name):
+                continue   # #fff 같은 색상 값
+            hits += [s for s in sections if s.tag != "style" and name in html[s.start:s.end].lower()]
+        # 2) hero / nav / footer / CSS 전역 단어
+        if _mentions(text, "hero") and body_sections:
+            hits.append(body_sections[0])
+        for key, words in _AREA_WORDS.items():
+            target = style_key if key == "style" else key
+            if target in by_key and any(_mentions(text, word) for word in words):
+                hits.append(by_key[target])
+        # 3) 섹션 라벨(id/class/제목)의 단어가 이슈에 등장
+        if not hits:
+            for section in body_sections:
+                words = set(_WORD_RE.findall(section.label.lower())) - _LABEL_STOPWORDS
+                if words and any(_mentions(text, word) for word in words):
+                    hits.append(section)
+        # 4) 위치 단서가 없는 시각 스타일 이슈는 <style> 에서 전역으로 수정
+        if not hits and style_key and str(issue.get("area", "")).lower() in _STYLE_AREAS:
+            hits.append(by_key[style_key])
+        if not hits:
+            return None
+        for section in hits:
+            chosen[section.key] = section
+    return sorted(chosen.values(), key=lambda s: s.start)
+
+
+def format_fragments(html: str, targets: List[Section]) -> str:
+    """수정 대상 섹션만 마커로 감싸 프롬프트용 텍스트로."""
+    return "\n\n".join(
+        f"<!-- SECTION:{s.key} -->\n{html[s.start:s.end]}\n<!-- /SECTION:{s.key} -->" for s in targets
+    )
+
+
+def fragments_closed(keys: List[str]) -> MarkerStop:
+    """스트리밍 stop 조건 — 요청한 섹션의 닫는 마커가 모두 나오면 True."""
+    return MarkerStop(*(f"/SECTION:{key}" for key in keys), ignore_case=False)
+
+
+def parse_fragments(text: str, keys: Iterable[str]) -> Dict[str, str]:
+    """응답에서 요청한 key 의 조각만 추출 (```html 펜스가 섞여 있어도 무시)."""
+    wanted = set(keys)
+    cleaned = re.sub(r"```(?:html)?", "", text, flags=re.IGNORECASE)
+    return {key: body.strip() for key, body in _FRAGMENT_RE.findall(cleaned) if key in wanted}
+
+
+def valid_fragment(section: Section, fragment: Optional[str]) -> bool:
+    """같은 태그로 시작·종료하고 태그 짝이 맞으며, 원본 대비 너무 짧지 않은 조각만 채택."""
+    if not fragment:
+        return False
+    tag = section.tag
+    if not re.match(rf"<{tag}\b", fragment, re.IGNORECASE) or not re.search(rf"</{tag}>\s*$", fragment, re.IGNORECASE):
+        return False
+    opens = len(re.findall(rf"<{tag}\b", fragment, re.IGNORECASE))
+    closes = len(re.findall(rf"</{tag}>", fragment, re.IGNORECASE))
+    if opens != closes:
+        return False
+    return len(fragment) >= (section.end - section.start) * MIN_FRAGMENT_RATIO
+
+
+def splice(html: str, sections: List[Section], fragments: Dict[str, str]) -> str:
+    """fragments 에 있는 섹션만 원래 자리에 교체."""
+    for section in sorted(sections, key=lambda s: s.start, reverse=True):
+        if section.key in fragments:
+            html = html[:section.start] + fragments[section.key] + html[section.end:]
+    return html
+
+
+def extract_element(text: str, tags: Iterable[str]) -> str:
+    """응답에서 tags 중 처음 나오는 요소 하나를 닫는 태그까지 (짝이 안 맞으면 "")."""
+    match = re.search(rf"<({'|'.join(tags)})\b[^>]*>", text, re.IGNORECASE)
+    if not match:
+        return ""
+    end = _close_of(text, match.group(1).lower(), match.end())
+    return text[match.start():end] if end >= 0 else ""
+
+
+def element_closed(tags: Iterable[str]) -> ElementStop:
+    """스트리밍 stop 조건 — 요소 하나가 닫히면 True."""
+    return ElementStop(tags)
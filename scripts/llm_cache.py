@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+LLM Cache — 모델 응답을 내용 주소(해시)로 디스크에 보관하는 캐시
+
+생성이 뒤에서 실패하거나(스크린샷/업로드/DB) 같은 브리프를 다시 돌리면 Ollama/Gemini 호출을 전부 다시 냈다.
+  1. 키 = sha256(모델, 메시지 해시, temperature, seed, 나머지 옵션) — 같은 요청이면 같은 키
+  2. SQLite 한 파일에 보관. 총 크기가 LLM_CACHE_MAX_MB 를 넘으면 가장 오래 안 쓴 항목부터 제거(LRU),
+     LLM_CACHE_TTL_HOURS 가 지난 항목은 조회 시 무시하고 정리 때 삭제
+  3. 모드 (LLM_CACHE):
+       off    — 캐시 사용 안 함 (기본)
+       rw     — 적중하면 재사용, 아니면 호출 후 저장
+       replay — 적중만 허용, 없으면 ReplayMiss. 기록해 둔 배치를 LLM 없이 결정적으로 재실행(벤치마크)
+  4. 적중/실패 횟수는 summary() 와 종료 로그로 확인
+
+사용:
+    cache = get_llm_cache()
+    key = cache_key(model, messages, options=options)
+    text = await cache.fetch(key, model, lambda: client.chat(...))
+
+    # 동기 SDK (Gemini) — 스레드 안에서
+    response = cached_generate_content(get_gemini(), model=..., contents=[prompt], config={...})
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, NamedTuple, Optional
+
+log = logging.getLogger(__name__)
+
+LLM_CACHE_MODE = os.getenv("LLM_CACHE", "off").lower()
+LLM_CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", str(Path(__file__).parent / ".llm_cache.sqlite")))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "256"))
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+MODES = ("off", "rw", "replay")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key         TEXT PRIMARY KEY,
+    model       TEXT NOT NULL,
+    response    TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_lru ON responses (accessed_at);
+"""
+
+
+class ReplayMiss(RuntimeError):
+    """replay 모드에서 기록에 없는 요청"""
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
+def cache_key(model: str, messages: Any, *, temperature: Optional[float] = None, seed: Optional[int] = None,
+              options: Optional[Dict[str, Any]] = None) -> str:
+    """요청 내용 주소. temperature/seed 는 options 안에 있어도 따로 꺼내 키에 명시."""
+    options = dict(options or {})
+    temperature = options.pop("temperature", temperature)
+    seed = options.pop("seed", seed)
+    return _digest({"model": model, "messages": _digest(messages), "temperature": temperature,
+                    "seed": seed, "options": options})
+
+
+class LLMCache:
+    """SQLite 응답 캐시 (스레드 안전, 연결 하나를 락으로 공유)"""
+
+    def __init__(self, path: Path = LLM_CACHE_PATH, mode: str = LLM_CACHE_MODE,
+                 max_mb: float = LLM_CACHE_MAX_MB, ttl_hours: float = LLM_CACHE_TTL_HOURS):
+        if mode not in MODES:
+            raise ValueError(f"LLM_CACHE 는 {MODES} 중 하나여야 합니다: {mode}")
+        self.path = path
+        self.mode = mode
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttl = ttl_hours * 3600
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if mode != "off":
+            self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._evict()
+
+    @property
+    def enabled(self) -> bool:
+        return self._conn is not None
+
+    @contextmanager
+    def _db(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            yield self._conn
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._db() as conn:
+            row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] <= self.ttl:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return row[0]
+        self.misses += 1
+        return None
+
+    def put(self, key: str, model: str, response: str) -> None:
+        if self.mode != "rw":
+            return
+        now = time.time()
+        with self._db() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, len(response.encode("utf-8")), now, now),
+            )
+        self._evict()
+
+    def _evict(self) -> None:
+        """TTL 지난 항목 삭제 후, 크기 상한을 넘으면 가장 오래 안 쓴 항목부터 삭제."""
+        with self._db() as conn:
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            excess = total - self.max_bytes
+            victims = []
+            for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+                victims.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+            conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def fetch_sync(self, key: str, model: str, call: Callable[[], str]) -> str:
+        if not self.enabled:
+            return call()
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        if self.mode == "replay":
+            raise ReplayMiss(f"replay 캐시에 없는 요청 (model={model}, key={key[:12]})")
+        response = call()
+        self.put(key, model, response)
+        return response
+
+    async def fetch(self, key: str, model: str, call: Callable[[], Awaitable[str]],
+                    accept: Optional[Callable[[str], bool]] = None) -> str:
+        """accept 가 있으면 그 검사를 통과한 응답만 저장 (잘린 응답이 재시도 때 다시 나오지 않도록)."""
+        if not self.enabled:
+            return await call()
+        cached = await asyncio.to_thread(self.get, key)
+        if cached is not None:
+            return cached
+        if self.mode == "replay":
+            raise ReplayMiss(f"replay 캐시에 없는 요청 (model={model}, key={key[:12]})")
+        response = await call()
+        if accept is None or accept(response):
+            await asyncio.to_thread(self.put, key, model, response)
+        return response
+
+    def summary(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        entries = size = 0
+        if self.enabled:
+            with self._db() as conn:
+                entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"mode": self.mode, "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "entries": entries, "mb": round(size / 1024 / 1024, 1)}
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        if self.hits or self.misses:
+            s = self.summary()
+            log.info("[llm-cache] %s — 적중 %d / 실패 %d (적중률 %s), %d개 %.1fMB",
+                     s["mode"], s["hits"], s["misses"], s["hit_rate"], s["entries"], s["mb"])
+        with self._lock:
+            self._conn.close()
+            self._conn = None
+
+
+class CachedResponse(NamedTuple):
+    """캐시에서 꺼낸 Gemini 응답 (호출자는 .text 만 사용)"""
+    text: str
+
+
+def cached_generate_content(client: Any, *, model: str, contents: Any,
+                            config: Optional[Dict[str, Any]] = None, attempt: int = 0) -> CachedResponse:
+    """genai Client.models.generate_content 의 캐시 래퍼 (동기 — asyncio.to_thread 로 호출).
+
+    attempt 는 키에 포함 — 같은 프롬프트의 재시도가 실패한 첫 응답을 다시 꺼내지 않도록."""
+    key = cache_key(model, contents, options={**(config or {}), "attempt": attempt})
+    text = get_llm_cache().fetch_sync(
+        key, model, lambda: client.models.generate_content(model=model, contents=contents, config=config).text,
+    )
+    return CachedResponse(text)
+
+
+# ── 프로세스 공유 인스턴스 ────────────────────────────────────────────────────
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """프로세스 전역 캐시 (최초 호출 시 LLM_CACHE 모드로 생성)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
+
+
+def shutdown_llm_cache() -> None:
+    """공유 캐시 종료 — 적중률 로그 출력."""
+    global _cache
+    with _cache_lock:
+        cache, _cache = _cache, None
+    if cache is not None:
+        cache.close()
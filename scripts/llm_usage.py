@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+LLM Usage — Ollama 응답의 토큰/시간 필드를 호출마다 기록하고 실행 단위로 집계
+
+Ollama 는 prompt_eval_count, eval_count, load_duration, prompt_eval_duration, eval_duration 을
+돌려주지만 지금까지는 message.content 만 쓰고 버렸다.
+  1. 호출마다 한 줄: 패스, 모델, 디자인 id, 개선 라운드, 프롬프트/생성 토큰, 로드/프롬프트/생성 시간
+     → LLM_USAGE_PATH (JSONL, 기본 scripts/.llm_usage.jsonl) 에 추가. 실행마다 run id 가 붙음
+  2. 디자인 id / 라운드는 usage_tags() 로 감싼 블록 안의 호출에 자동으로 붙음 (ContextVar)
+  3. report(): 모델별 tokens/s·로드 시간, 패스별 프롬프트 대 생성 비중 — 클라이언트 종료 시 로그
+  4. 조기 종료로 done 이벤트를 못 받은 호출은 estimated=True — 프롬프트 토큰은 추정치로 채우고
+     로드/프롬프트 시간 합계와 속도 계산에서는 뺌 (0 이 평균에 섞이지 않도록)
+
+사용:
+    with usage_tags(design_id=design_id):
+        with usage_tags(round=1):
+            await client.chat_stream(...)       # 기록에 design_id, round 가 붙음
+    client.usage.report()
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+log = logging.getLogger(__name__)
+
+# 빈 문자열이면 파일 기록 없이 메모리 집계만
+LLM_USAGE_PATH = os.getenv("LLM_USAGE_PATH", str(Path(__file__).parent / ".llm_usage.jsonl"))
+
+_tags: ContextVar[Dict[str, Any]] = ContextVar("llm_usage_tags", default={})
+
+
+@contextmanager
+def usage_tags(**tags: Any) -> Iterator[None]:
+    """블록 안의 LLM 호출 기록에 태그 추가 (바깥 태그와 합쳐짐)."""
+    token = _tags.set({**_tags.get(), **tags})
+    try:
+        yield
+    finally:
+        _tags.reset(token)
+
+
+def _seconds(ns: Optional[int]) -> float:
+    return round((ns or 0) / 1e9, 3)
+
+
+class UsageLedger:
+    """클라이언트 하나의 호출 기록 (메모리 + JSONL)"""
+
+    def __init__(self, path: str = LLM_USAGE_PATH):
+        self.path = Path(path) if path else None
+        self.run_id = uuid.uuid4().hex[:8]
+        self.records: List[Dict[str, Any]] = []
+        self._file = None
+
+    def record(self, model: str, pass_name: Optional[str], data: Optional[Dict[str, Any]], wall_seconds: float,
+               *, tokens: int = 0, stopped: bool = False, prompt_estimate: int = 0) -> None:
+        """data 는 Ollama 최종 응답(done 이벤트). 조기 종료로 없으면 받은 조각 수로 생성 토큰,
+        prompt_estimate(ContextSizer 추정)로 프롬프트 토큰을 채우고 estimated 로 표시."""
+        data = data or {}
+        tags = _tags.get()
+        estimated = not data.get("prompt_eval_count")
+        entry = {
+            "ts": round(time.time(), 3),
+            "run": self.run_id,
+            "pass": pass_name or "chat",
+            "model": model,
+            "design_id": tags.get("design_id"),
+            "round": tags.get("round"),
+            "prompt_tokens": data.get("prompt_eval_count") or prompt_estimate,
+            "eval_tokens": data.get("eval_count") or tokens,
+            "load_s": _seconds(data.get("load_duration")),
+            "prompt_s": _seconds(data.get("prompt_eval_duration")),
+            "eval_s": _seconds(data.get("eval_duration")),
+            "wall_s": round(wall_seconds, 3),
+            "stopped": stopped,
+            "estimated": estimated,
+        }
+        self.records.append(entry)
+        if self.path is None:
+            return
+        try:
+            if self._file is None:
+                self._file = self.path.open("a", encoding="utf-8")
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+        except OSError as exc:
+            log.warning("[usage] %s 기록 실패 — 이후 메모리 집계만: %s", self.path, exc)
+            self.path = None
+
+    @staticmethod
+    def _totals(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        prompt_tokens = sum(r["prompt_tokens"] for r in records)
+        eval_tokens = sum(r["eval_tokens"] for r in records)
+        # 추정 기록은 시간 필드가 없으므로 로드/프롬프트/생성 시간과 속도는 측정된 호출만으로 계산
+        measured = [r for r in records if not r.get("estimated")]
+        load_s = sum(r["load_s"] for r in measured)
+        prompt_s = sum(r["prompt_s"] for r in measured)
+        eval_s = sum(r["eval_s"] for r in measured)
+        return {
+            "calls": len(records),
+            "estimated": len(records) - len(measured),
+            "prompt_tokens": prompt_tokens,
+            "eval_tokens": eval_tokens,
+            "load_s": round(load_s, 1),
+            "avg_load_s": round(load_s / len(measured), 2) if measured else None,
+            "prompt_s": round(prompt_s, 1),
+            "eval_s": round(eval_s, 1),
+            "wall_s": round(sum(r["wall_s"] for r in records), 1),
+            "prompt_tok_s": round(sum(r["prompt_tokens"] for r in measured) / prompt_s, 1) if prompt_s else None,
+            "eval_tok_s": round(sum(r["eval_tokens"] for r in measured) / eval_s, 1) if eval_s else None,
+        }
+
+    def report(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """{"models": {모델: 합계}, "passes": {패스: 합계 + 실행 전체 대비 시간 비중}}"""
+        by_model: Dict[str, List[Dict[str, Any]]] = {}
+        by_pass: Dict[str, List[Dict[str, Any]]] = {}
+        for r in self.records:
+            by_model.setdefault(r["model"], []).append(r)
+            by_pass.setdefault(r["pass"], []).append(r)
+        total_wall = sum(r["wall_s"] for r in self.records) or 1.0
+        passes = {}
+        for name, records in by_pass.items():
+            totals = self._totals(records)
+            totals["share"] = round(totals["wall_s"] / total_wall, 3)
+            passes[name] = totals
+        return {"models": {m: self._totals(rs) for m, rs in by_model.items()}, "passes": passes}
+
+    def close(self) -> None:
+        if self.records:
+            report = self.report()
+            for model, t in report["models"].items():
+                log.info("[usage] %s — %d회 (추정 %d), 프롬프트 %d tok (%.1fs, %s tok/s) / 생성 %d tok (%.1fs, %s tok/s), "
+                         "로드 %.1fs (평균 %ss)",
+                         model, t["calls"], t["estimated"], t["prompt_tokens"], t["prompt_s"], t["prompt_tok_s"],
+                         t["eval_tokens"], t["eval_s"], t["eval_tok_s"], t["load_s"], t["avg_load_s"])
+            for name, t in sorted(report["passes"].items(), key=lambda item: -item[1]["wall_s"]):
+                log.info("[usage] %s — 시간 비중 %.0f%%, 프롬프트 %.1fs / 생성 %.1fs / 로드 %.1fs",
+                         name, t["share"] * 100, t["prompt_s"], t["eval_s"], t["load_s"])
+            if self.path is not None:
+                log.info("[usage] 호출 기록 %d건 → %s (run=%s)", len(self.records), self.path, self.run_id)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+"""
+Shared Ollama Client
+프로세스 전체에서 keep-alive 커넥션 풀 하나를 공유하는 비동기 Ollama 클라이언트
+
+- 호출마다 httpx.AsyncClient / requests.post 를 새로 만들지 않고 같은 커넥션을 재사용
+- 단일 OLLAMA_TIMEOUT(600s) 대신 패스별 읽기 타임아웃 (PASS_TIMEOUTS, env 로 개별 조정)
+- 연결 끊김(reset/refused)과 5xx 는 지터가 섞인 지수 백오프로 재시도, 타임아웃/4xx 는 바로 실패
+- 모든 Ollama 사용 스크립트가 공유, 종료 시 shutdown_ollama_client() 로 정리
+- chat_stream(): NDJSON 스트림을 읽다가 stop 조건(</html>, 균형 잡힌 JSON 등)이 되면 (done 이벤트를
+  잠깐 기다린 뒤) 끊어 불필요한 꼬리 토큰 생성을 막고, 패스별 TTFT / tokens/s 를 기록
+- 모델별 로드 횟수/시간과 모델 전환 횟수를 집계 (model_summary)
+- ModelResidency: 호출자가 알려준 패스 계획(plan)으로 다음 패스 모델을 현재 패스가 도는 동안
+  빈 /api/generate 요청으로 미리 올리고, 남은 사용처가 있는 모델은 keep_alive 로 고정.
+  /api/ps 를 읽어 동시에 진행 중인 다른 디자인이 곧 쓸 모델은 밀어내지 않는다
+- ContextSizer: 프롬프트 길이 + 패스별 출력 예산으로 요청마다 num_ctx 를 버킷 단위로 고르고,
+  prompt_eval_count 로 토큰 추정을 보정 (호출자가 ctx_sizer.size() 로 사용)
+- 호출마다 Ollama 의 토큰/시간 필드를 llm_usage 로 기록 (패스·모델·디자인·라운드 태그, JSONL)
+- chat/chat_stream/generate 응답은 LLM_CACHE(rw/replay) 가 켜져 있으면 llm_cache 를 거친다
+
+사용:
+    async with ollama_session():
+        client = get_ollama_client(OLLAMA_BASE_URL)
+        text = await client.chat(model, messages, options={"temperature": 0.7}, pass_name="pass2")
+
+        with client.residency.plan([CODER, BRIEF, CODER, REVIEW, CODER]):   # 이후 호출 순서
+            ...   # 각 호출이 계획을 한 칸씩 소비하며 다음 모델을 미리 올림
+
+패스별 타임아웃 조정:
+    OLLAMA_TIMEOUT_PASS2=900 python generator5_ollama.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+from context_sizer import ContextSizer
+from llm_cache import cache_key, get_llm_cache, shutdown_llm_cache
+from llm_usage import UsageLedger
+from stream_stop import StopCondition, StopScanner
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = os.getenv("OLLAMA_BASE_URL") or os.getenv("OLLAMA_API_URL") or "http://127.0.0.1:11434"
+DEFAULT_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "600"))
+CONNECT_TIMEOUT = 10.0
+MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "4"))
+MAX_RETRIES = int(os.getenv("OLLAMA_RETRIES", "3"))
+BACKOFF_BASE = 1.0      # 초
+BACKOFF_MAX = 20.0      # 초
+MODEL_LOAD_MIN_SECONDS = 0.5   # load_duration 이 이보다 길면 가중치를 새로 올린 것으로 간주
+PREWARM = os.getenv("OLLAMA_PREWARM", "1").lower() not in ("0", "false", "off")
+PIN_KEEP_ALIVE = os.getenv("OLLAMA_PIN_KEEP_ALIVE", "30m")     # 계획에 다시 쓰일 모델
+IDLE_KEEP_ALIVE = os.getenv("OLLAMA_IDLE_KEEP_ALIVE", "30s")   # 계획상 마지막 사용인 모델
+MAX_RESIDENT = int(os.getenv("OLLAMA_MAX_LOADED_MODELS", "3"))  # 서버가 동시에 올려두는 모델 수
+# stop 조건 후에도 done 이벤트(프롬프트 토큰/로드·프롬프트 시간)를 받으려고 더 읽을 조각 수 (0 = 바로 끊음)
+STOP_DRAIN_CHUNKS = int(os.getenv("OLLAMA_STOP_DRAIN", "24"))
+
+# 패스별 응답 대기 상한 (초). OLLAMA_TIMEOUT_<NAME> 으로 덮어쓰기
+PASS_TIMEOUTS: Dict[str, float] = {
+    "pass0": 300,      # CSS 토큰
+    "pass1": 180,      # 브리프 JSON
+    "pass2": 600,      # 전체 HTML 초안
+    "pass3": 300,      # 리뷰 JSON
+    "pass4": 600,      # 전체 HTML 수정
+    "designer": 600,   # generator4_pro
+    "critic": 300,
+    "refiner": 600,
+    "trend": 180,      # trend_researcher 분석
+    "describe": 60,    # add_descriptions_ollama
+    "tags": 10,        # 연결 확인
+    "prewarm": 300,    # 모델 미리 올리기 (CPU 에서 수십 GB 로드)
+}
+
+
+def pass_timeout(pass_name: Optional[str]) -> float:
+    if not pass_name:
+        return DEFAULT_TIMEOUT
+    env = os.getenv(f"OLLAMA_TIMEOUT_{pass_name.upper()}")
+    if env:
+        return float(env)
+    return float(PASS_TIMEOUTS.get(pass_name, DEFAULT_TIMEOUT))
+
+
+# ── JSON 경계 (조기 종료 조건은 stream_stop) ──────────────────────────────────
+def balanced_json_end(text: str) -> int:
+    """첫 '{' 부터 괄호가 닫히는 위치(끝 인덱스, exclusive). 아직 안 닫혔으면 -1."""
+    start = text.find("{")
+    if start < 0:
+        return -1
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return -1
+
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _retryable(exc: Exception) -> bool:
+    """연결 끊김/거부와 5xx 만 재시도 (타임아웃은 같은 시간을 다시 쓰게 되므로 제외)."""
+    if isinstance(exc, httpx.TimeoutException):
+        return False
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return False
+
+
+# ── 모델 상주 관리 ────────────────────────────────────────────────────────────
+_plan_key: ContextVar[Optional[int]] = ContextVar("ollama_plan", default=None)
+
+
+class ModelResidency:
+    """패스 계획 기반 모델 미리 올리기 + keep_alive 결정
+
+    계획은 asyncio 태스크(컨텍스트) 단위라 동시에 도는 디자인마다 따로 관리되고,
+    upcoming() 은 모든 계획의 남은 호출을 합친 수요.
+    """
+
+    def __init__(self, client: "OllamaClient", enabled: bool = PREWARM):
+        self.client = client
+        self.enabled = enabled
+        self._plans: Dict[int, List[str]] = {}
+        self._next_key = 0
+        self._active: Counter = Counter()          # 응답 대기 중인 모델
+        self._warming: Dict[str, asyncio.Task] = {}
+        self.prewarms = 0
+        self.prewarm_seconds = 0.0
+        self.already_resident = 0
+        self.skipped = 0                           # 다른 디자인이 쓸 모델을 밀어낼 수 있어 생략
+        self.failures = 0
+
+    @contextmanager
+    def plan(self, models: List[str]) -> Iterator[None]:
+        """현재 태스크가 앞으로 호출할 모델 순서를 등록 (블록을 벗어나면 해제)."""
+        key = self._next_key
+        self._next_key += 1
+        self._plans[key] = list(models)
+        token = _plan_key.set(key)
+        try:
+            yield
+        finally:
+            _plan_key.reset(token)
+            self._plans.pop(key, None)
+
+    def upcoming(self) -> Counter:
+        demand: Counter = Counter()
+        for models in self._plans.values():
+            demand.update(models)
+        return demand
+
+    def keep_alive_for(self, model: str) -> Optional[str]:
+        """계획에 다시 등장하면 길게 고정, 마지막 사용이면 짧게. 계획이 없으면 서버 기본값."""
+        if not self._plans:
+            return None
+        return PIN_KEEP_ALIVE if self.upcoming()[model] else IDLE_KEEP_ALIVE
+
+    def begin(self, model: str, options: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """호출 직전: 계획을 한 칸 소비하고, 다음에 필요한 다른 모델을 백그라운드로 올림."""
+        sizer = self.client.ctx_sizer
+        sizer.note(model, (options or {}).get("num_ctx"))
+        previous = self.client._last_model
+        if previous and previous != model and not self._active[previous]:
+            # 전환된 모델은 내려갈 수 있으므로 그 num_ctx 를 계속 고집하지 않음 (미리 올리기 예약 전에 정리)
+            sizer.release(previous)
+        self._active[model] += 1
+        plan = self._plans.get(_plan_key.get())
+        if plan is not None:
+            if model in plan:
+                plan.remove(model)
+            # 같은 모델 호출이 이어지는 동안(phase-major)은 미리 올리지 않음 — 마지막 호출 중에만
+            following = plan[0] if plan and plan[0] != model else None
+            if following and self.enabled and following not in self._warming:
+                self._warming[following] = asyncio.create_task(self._prewarm(following))
+        return self.keep_alive_for(model)
+
+    def end(self, model: str) -> None:
+        self._active[model] -= 1
+        if self._active[model] <= 0:
+            del self._active[model]
+            if self._plans and not self.upcoming()[model]:
+                # 계획상 마지막 사용 — IDLE_KEEP_ALIVE 후 내려가므로 다음 사용은 필요한 num_ctx 부터
+                self.client.ctx_sizer.release(model)
+
+    async def _prewarm(self, model: str) -> None:
+        try:
+            loaded = await self.client.ps()
+            if model in loaded:
+                # 올라가 있는 크기를 유지해야 뒤 호출이 다른 num_ctx 로 다시 올리지 않음
+                self.client.ctx_sizer.pin(model, self.client.ctx_sizer.last.get(model))
+                self.already_resident += 1
+                return
+            if len(loaded) >= MAX_RESIDENT:
+                # 올리면 하나가 밀려남 — 응답 중이거나 남은 계획에 있는 모델뿐이면 기다린다
+                demand = self.upcoming()
+                if all(self._active[m] or demand[m] for m in loaded):
+                    self.skipped += 1
+                    log.info("[ollama] %s 미리 올리기 생략 — 상주 모델 %s 모두 사용 예정", model, loaded)
+                    return
+            # 뒤 호출과 num_ctx 가 다르면 Ollama 가 다시 올리므로 같은 크기로 올리고 고정
+            num_ctx = self.client.ctx_sizer.warm_size(model)
+            t0 = time.monotonic()
+            data = await self.client.request("POST", "/api/generate", pass_name="prewarm", json={
+                "model": model, "keep_alive": self.keep_alive_for(model) or PIN_KEEP_ALIVE,
+                "options": {"num_ctx": num_ctx},
+            })
+            self.client.ctx_sizer.pin(model, num_ctx)
+            self.client._record_model(model, data.get("load_duration"), time.monotonic() - t0, call=False)
+            self.prewarms += 1
+            self.prewarm_seconds += time.monotonic() - t0
+            log.info("[ollama] %s 미리 올림 (num_ctx=%d, %.1fs)", model, num_ctx, time.monotonic() - t0)
+        except Exception as exc:
+            self.failures += 1
+            log.warning("[ollama] %s 미리 올리기 실패 (무시): %s", model, exc)
+        finally:
+            self._warming.pop(model, None)
+
+    def summary(self) -> Dict[str, Any]:
+        return {"prewarms": self.prewarms, "prewarm_seconds": round(self.prewarm_seconds, 1),
+                "already_resident": self.already_resident, "skipped": self.skipped, "failures": self.failures}
+
+    async def close(self) -> None:
+        tasks = list(self._warming.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class OllamaClient:
+    """Ollama 서버 하나에 대한 keep-alive 커넥션 풀"""
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, max_connections: int = MAX_CONNECTIONS,
+                 max_retries: int = MAX_RETRIES):
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(DEFAULT_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections,
+                                keepalive_expiry=120),
+        )
+        self.requests = 0
+        self.retries = 0
+        self.seconds = 0.0
+        self.stream_stats: Dict[str, Dict[str, float]] = {}
+        self.model_stats: Dict[str, Dict[str, float]] = {}
+        self.switches = 0
+        self._last_model: Optional[str] = None
+        self.residency = ModelResidency(self)
+        self.usage = UsageLedger()
+        self.ctx_sizer = ContextSizer()
+
+    async def request(self, method: str, path: str, *, json: Optional[Dict[str, Any]] = None,
+                      pass_name: Optional[str] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """JSON 요청 1회 (재시도 포함). 응답 JSON 반환."""
+        read_timeout = timeout if timeout is not None else pass_timeout(pass_name)
+        req_timeout = httpx.Timeout(read_timeout, connect=CONNECT_TIMEOUT)
+        attempt = 0
+        while True:
+            t0 = time.monotonic()
+            try:
+                resp = await self._client.request(method, path, json=json, timeout=req_timeout)
+                resp.raise_for_status()
+                data = resp.json()
+                self.requests += 1
+                self.seconds += time.monotonic() - t0
+                return data
+            except Exception as exc:
+                if not _retryable(exc) or attempt >= self.max_retries:
+                    raise
+                delay = _backoff(attempt)
+                attempt += 1
+                self.retries += 1
+                log.warning("[ollama] %s %s 실패 (%s) — %.1fs 후 재시도 %d/%d",
+                            method, path, exc, delay, attempt, self.max_retries)
+                await asyncio.sleep(delay)
+
+    async def _cached(self, model: str, content: Any, options: Optional[Dict[str, Any]],
+                      call: Callable[[], Awaitable[str]],
+                      accept: Optional[Callable[[str], bool]] = None, attempt: int = 0) -> str:
+        """LLM_CACHE 가 켜져 있으면 같은 요청(모델/메시지/옵션)의 기록된 응답을 재사용.
+
+        attempt 는 키에 포함 — 호출자가 응답을 거절하고 같은 요청을 재시도할 때 거절한 응답을 다시 꺼내지 않도록
+        (0 은 키에 넣지 않아 기존 기록과 호환)."""
+        cache = get_llm_cache()
+        if not cache.enabled:
+            return await call()
+        # num_ctx 는 요청마다 자동으로 정해지고 (잘리지 않는 한) 응답 내용에 영향이 없으므로 키에서 제외
+        options = {k: v for k, v in (options or {}).items() if k != "num_ctx"}
+        if attempt:
+            options["attempt"] = attempt
+        return await cache.fetch(cache_key(model, content, options=options), model, call, accept)
+
+    async def chat(self, model: str, messages: List[Dict[str, str]], *,
+                   options: Optional[Dict[str, Any]] = None, pass_name: Optional[str] = None,
+                   timeout: Optional[float] = None, attempt: int = 0) -> str:
+        """/api/chat (스트리밍 없이 전체 응답)."""
+        return await self._cached(model, messages, options,
+                                  lambda: self._chat(model, messages, options, pass_name, timeout), attempt=attempt)
+
+    async def _chat(self, model: str, messages: List[Dict[str, str]], options: Optional[Dict[str, Any]],
+                    pass_name: Optional[str], timeout: Optional[float]) -> str:
+        payload: Dict[str, Any] = {"model": model, "messages": messages, "stream": False}
+        if options:
+            payload["options"] = options
+        keep_alive = self.residency.begin(model, options)
+        if keep_alive:
+            payload["keep_alive"] = keep_alive
+        t0 = time.monotonic()
+        try:
+            data = await self.request("POST", "/api/chat", json=payload, pass_name=pass_name, timeout=timeout)
+        finally:
+            self.residency.end(model)
+        elapsed = time.monotonic() - t0
+        self._record_model(model, data.get("load_duration"), elapsed)
+        self.usage.record(model, pass_name, data, elapsed)
+        self.ctx_sizer.observe(model, messages, (options or {}).get("num_ctx"), data.get("prompt_eval_count"))
+        self._record_stream(pass_name or "chat", elapsed, data.get("eval_count") or 0,
+                            (data.get("eval_duration") or 0) / 1e9, False, elapsed)
+        return data["message"]["content"].strip()
+
+    async def chat_stream(self, model: str, messages: List[Dict[str, str]], *,
+                          options: Optional[Dict[str, Any]] = None, pass_name: Optional[str] = None,
+                          timeout: Optional[float] = None,
+                          stop: Optional[Callable[[str], bool]] = None, attempt: int = 0) -> str:
+        """/api/chat 스트리밍. stop(버퍼)가 True 가 되면 그때까지의 버퍼 반환 — 이후 STOP_DRAIN_CHUNKS 조각
+        안에 done 이벤트가 오면 그 토큰/시간 지표를 기록하고, 아니면 연결을 끊어 생성을 중단.
+
+        재시도는 첫 토큰을 받기 전의 연결 오류/5xx 에만 적용.
+        """
+        # stop 조건을 만족한(완결된) 응답만 캐시에 저장
+        return await self._cached(model, messages, options,
+                                  lambda: self._chat_stream(model, messages, options, pass_name, timeout, stop),
+                                  accept=stop, attempt=attempt)
+
+    async def _chat_stream(self, model: str, messages: List[Dict[str, str]], options: Optional[Dict[str, Any]],
+                           pass_name: Optional[str], timeout: Optional[float],
+                           stop: Optional[Callable[[str], bool]]) -> str:
+        payload: Dict[str, Any] = {"model": model, "messages": messages, "stream": True}
+        if options:
+            payload["options"] = options
+        keep_alive = self.residency.begin(model, options)
+        if keep_alive:
+            payload["keep_alive"] = keep_alive
+        try:
+            return await self._stream(model, payload, pass_name, timeout, stop)
+        finally:
+            self.residency.end(model)
+
+    async def _stream(self, model: str, payload: Dict[str, Any], pass_name: Optional[str],
+                      timeout: Optional[float], stop: Optional[Callable[[str], bool]]) -> str:
+        read_timeout = timeout if timeout is not None else pass_timeout(pass_name)
+        req_timeout = httpx.Timeout(read_timeout, connect=CONNECT_TIMEOUT)
+        attempt = 0
+        while True:
+            t0 = time.monotonic()
+            parts: List[str] = []
+            first_at: Optional[float] = None
+            chunks = 0
+            eval_count = eval_seconds = load_ns = None
+            final: Optional[Dict[str, Any]] = None
+            stopped = False
+            drained = 0
+            # StopCondition 이면 새 조각만 보는 증분 검사, 일반 함수면 닫는 문자가 든 조각에서 버퍼 전체 검사
+            scanner = stop.scanner() if isinstance(stop, StopCondition) else None
+            try:
+                async with self._client.stream("POST", "/api/chat", json=payload, timeout=req_timeout) as resp:
+                    resp.raise_for_status()
+                    async for line in resp.aiter_lines():
+                        if not line.strip():
+                            continue
+                        event = json.loads(line)
+                        if event.get("error"):
+                            raise RuntimeError(f"ollama: {event['error']}")
+                        piece = (event.get("message") or {}).get("content", "")
+                        if stopped and not event.get("done"):
+                            # 종료 조건 이후 꼬리는 버리고 done 이벤트만 기다림 — 길어지면 끊음
+                            drained += 1
+                            if drained >= STOP_DRAIN_CHUNKS:
+                                break
+                            continue
+                        if piece and not stopped:
+                            if first_at is None:
+                                first_at = time.monotonic()
+                            parts.append(piece)
+                            chunks += 1
+                        if event.get("done"):
+                            final = event
+                            eval_count = event.get("eval_count")
+                            eval_seconds = (event.get("eval_duration") or 0) / 1e9 or None
+                            load_ns = event.get("load_duration")
+                            break
+                        if piece and stop and self._stop_hit(scanner, stop, piece, parts):
+                            stopped = True
+                            if STOP_DRAIN_CHUNKS <= 0:
+                                break
+            except Exception as exc:
+                if first_at is not None or not _retryable(exc) or attempt >= self.max_retries:
+                    raise
+                delay = _backoff(attempt)
+                attempt += 1
+                self.retries += 1
+                log.warning("[ollama] stream %s 실패 (%s) — %.1fs 후 재시도 %d/%d",
+                            pass_name or "chat", exc, delay, attempt, self.max_retries)
+                await asyncio.sleep(delay)
+                continue
+
+            finished = time.monotonic()
+            self.requests += 1
+            self.seconds += finished - t0
+            tokens = eval_count or chunks + drained
+            gen_seconds = eval_seconds or (finished - first_at if first_at else 0.0)
+            ttft = (first_at - t0) if first_at else finished - t0
+            self._record_stream(pass_name or "chat", ttft, tokens, gen_seconds, stopped, finished - t0)
+            self._record_model(model, load_ns, ttft)
+            self.usage.record(model, pass_name, final, finished - t0, tokens=tokens, stopped=stopped,
+                              prompt_estimate=self.ctx_sizer.estimate(model, payload["messages"]))
+            text = "".join(parts).strip()
+            self.ctx_sizer.observe(model, payload["messages"], payload.get("options", {}).get("num_ctx"),
+                                   (final or {}).get("prompt_eval_count"),
+                                   output_chars=len(text), output_tokens=chunks)
+            log.info("[ollama] %s ← TTFT %.1fs, %d tok, %.1f tok/s%s", pass_name or "chat", ttft, tokens,
+                     tokens / gen_seconds if gen_seconds else 0.0, " (조기 종료)" if stopped else "")
+            return text
+
+    @staticmethod
+    def _stop_hit(scanner: Optional[StopScanner], stop: Callable[[str], bool], piece: str,
+                  parts: List[str]) -> bool:
+        if scanner is not None:
+            return scanner.feed(piece)
+        return (">" in piece or "}" in piece) and stop("".join(parts))
+
+    def _record_model(self, model: str, load_ns: Optional[int], fallback_seconds: float, call: bool = True) -> None:
+        """모델 로드 집계. load_duration 을 모르면(조기 종료) 모델이 바뀐 호출의 TTFT 를 로드로 본다.
+
+        call=False 는 미리 올리기 — 로드만 집계하고 호출 수/모델 전환에는 넣지 않음."""
+        switched = call and self._last_model is not None and model != self._last_model
+        self.switches += int(switched)
+        if call:
+            self._last_model = model
+        if load_ns is not None:
+            load_seconds = load_ns / 1e9
+            loaded = load_seconds >= MODEL_LOAD_MIN_SECONDS
+        else:
+            loaded = switched or model not in self.model_stats
+            load_seconds = fallback_seconds if loaded else 0.0
+        stats = self.model_stats.setdefault(model, {"calls": 0, "loads": 0, "load_seconds": 0.0})
+        stats["calls"] += int(call)
+        if loaded:
+            stats["loads"] += 1
+            stats["load_seconds"] += load_seconds
+
+    def model_summary(self) -> Dict[str, Any]:
+        """모델 전환 횟수 + 모델별 호출/로드 횟수/로드 시간."""
+        return {
+            "switches": self.switches,
+            "loads": sum(int(s["loads"]) for s in self.model_stats.values()),
+            "load_seconds": round(sum(s["load_seconds"] for s in self.model_stats.values()), 1),
+            "models": {m: {"calls": int(s["calls"]), "loads": int(s["loads"]),
+                           "load_seconds": round(s["load_seconds"], 1)}
+                       for m, s in self.model_stats.items()},
+        }
+
+    def _record_stream(self, name: str, ttft: float, tokens: int, gen_seconds: float, stopped: bool,
+                       seconds: float) -> None:
+        stats = self.stream_stats.setdefault(
+            name, {"calls": 0, "ttft": 0.0, "tokens": 0, "gen_seconds": 0.0, "early_stops": 0, "seconds": 0.0})
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        stats["ttft"] += ttft
+        stats["tokens"] += tokens
+        stats["gen_seconds"] += gen_seconds
+        stats["early_stops"] += int(stopped)
+
+    def stream_summary(self) -> Dict[str, Dict[str, float]]:
+        """패스별 평균 지연 / TTFT / tokens/s / 조기 종료 횟수."""
+        return {
+            name: {
+                "calls": s["calls"],
+                "avg_latency_s": round(s["seconds"] / s["calls"], 2),
+                "avg_ttft_s": round(s["ttft"] / s["calls"], 2),
+                "tokens_per_s": round(s["tokens"] / s["gen_seconds"], 1) if s["gen_seconds"] else None,
+                "early_stops": s["early_stops"],
+            }
+            for name, s in self.stream_stats.items()
+        }
+
+    async def generate(self, model: str, prompt: str, *,
+                       options: Optional[Dict[str, Any]] = None, pass_name: Optional[str] = None,
+                       timeout: Optional[float] = None, attempt: int = 0) -> str:
+        """/api/generate (스트리밍 없이 전체 응답)."""
+        return await self._cached(model, prompt, options,
+                                  lambda: self._generate(model, prompt, options, pass_name, timeout), attempt=attempt)
+
+    async def _generate(self, model: str, prompt: str, options: Optional[Dict[str, Any]],
+                        pass_name: Optional[str], timeout: Optional[float]) -> str:
+        payload: Dict[str, Any] = {"model": model, "prompt": prompt, "stream": False}
+        if options:
+            payload["options"] = options
+        keep_alive = self.residency.begin(model, options)
+        if keep_alive:
+            payload["keep_alive"] = keep_alive
+        t0 = time.monotonic()
+        try:
+            data = await self.request("POST", "/api/generate", json=payload, pass_name=pass_name, timeout=timeout)
+        finally:
+            self.residency.end(model)
+        elapsed = time.monotonic() - t0
+        self._record_model(model, data.get("load_duration"), elapsed)
+        self.usage.record(model, pass_name, data, elapsed)
+        self.ctx_sizer.observe(model, prompt, (options or {}).get("num_ctx"), data.get("prompt_eval_count"))
+        return data.get("response", "").strip()
+
+    async def tags(self) -> List[str]:
+        """설치된 모델 이름 목록 (/api/tags)."""
+        data = await self.request("GET", "/api/tags", pass_name="tags")
+        return [m["name"] for m in data.get("models", [])]
+
+    async def ps(self) -> List[str]:
+        """현재 메모리에 올라와 있는 모델 이름 목록 (/api/ps)."""
+        data = await self.request("GET", "/api/ps", pass_name="tags")
+        return [m.get("name") or m.get("model") for m in data.get("models", [])]
+
+    async def close(self) -> None:
+        await self.residency.close()
+        await self._client.aclose()
+        self.usage.close()
+        if self.requests:
+            log.info("[ollama] 종료 — %d회 호출, 재시도 %d회, 평균 %.1fs/회",
+                     self.requests, self.retries, self.seconds / self.requests)
+        for name, stats in self.stream_summary().items():
+            log.info("[ollama] %s — %d회, 평균 %.2fs (TTFT %.2fs), %s tok/s, 조기 종료 %d회",
+                     name, stats["calls"], stats["avg_latency_s"], stats["avg_ttft_s"], stats["tokens_per_s"],
+                     stats["early_stops"])
+        if self.model_stats:
+            summary = self.model_summary()
+            log.info("[ollama] 모델 전환 %d회, 로드 %d회 (%.1fs)",
+                     summary["switches"], summary["loads"], summary["load_seconds"])
+        sizing = self.ctx_sizer.summary()
+        if sizing["sized"]:
+            log.info("[num_ctx] 모델별 컨텍스트 %s, 고정 상한 대비 %d 토큰 절약, 잘림 경고 %d회, 글자/토큰 %s",
+                     sizing["resident"], sizing["saved_tokens"], sizing["truncations"], sizing["ratios"])
+        residency = self.residency.summary()
+        if any(residency.values()):
+            log.info("[ollama] 미리 올리기 %d회 (%.1fs), 이미 상주 %d회, 밀어내기 방지로 생략 %d회, 실패 %d회",
+                     residency["prewarms"], residency["prewarm_seconds"], residency["already_resident"],
+                     residency["skipped"], residency["failures"])
+
+
+# ── 프로세스 공유 인스턴스 ────────────────────────────────────────────────────
+_clients: Dict[str, OllamaClient] = {}
+
+
+def get_ollama_client(base_url: Optional[str] = None) -> OllamaClient:
+    """서버 URL 별 프로세스 전역 클라이언트 (최초 호출 시 생성)."""
+    key = (base_url or DEFAULT_BASE_URL).rstrip("/")
+    if key not in _clients:
+        _clients[key] = OllamaClient(key)
+    return _clients[key]
+
+
+async def shutdown_ollama_client() -> None:
+    """모든 공유 클라이언트와 LLM 응답 캐시 종료 — 각 엔트리포인트의 종료 훅에서 호출."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.close()
+    shutdown_llm_cache()
+
+
+@asynccontextmanager
+async def ollama_session() -> AsyncIterator[None]:
+    """블록이 끝나면 공유 클라이언트를 정리 (클라이언트는 get_ollama_client 로 지연 생성)."""
+    try:
+        yield
+    finally:
+        await shutdown_ollama_client()
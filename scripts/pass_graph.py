@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Pass Graph — 패스 간 입력 의존성을 작은 DAG 로 표현하고, 준비된 노드를 동시에 실행
+
+generate_one_design 의 패스들은 모두 앞 패스 결과를 쓰는 게 아니다.
+  pass0(CSS 시스템) 과 pass1(브리프) 는 서로의 출력을 쓰지 않으므로 함께 돌릴 수 있고,
+  pass2 는 둘 다 끝나야 시작한다.
+  1. 노드 = (이름, 비동기 함수, 입력 노드 이름들). 함수는 입력 노드 결과를 같은 이름의 키워드 인자로 받음
+  2. 입력이 모두 끝난 노드를 concurrency 개까지 바로 시작
+  3. 노드 하나가 실패하면 실행 중인 나머지를 취소하고 그 예외를 그대로 올림
+  4. 입력 노드는 먼저 add 되어 있어야 하므로 순환이 생길 수 없음
+
+사용:
+    graph = PassGraph(concurrency=2)
+    graph.add("css", lambda: pass0_css_system(dna))
+    graph.add("brief", lambda: pass1_brief(...))
+    graph.add("draft", lambda css, brief: pass2_html_draft(brief, ..., css_system=css), "css", "brief")
+    results = await graph.run()          # {"css": ..., "brief": ..., "draft": ...}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+log = logging.getLogger(__name__)
+
+PASS_CONCURRENCY = int(os.getenv("PASS_CONCURRENCY", "2"))
+
+
+class PassGraph:
+    """패스 노드 DAG + 의존성 순서 실행기"""
+
+    def __init__(self, concurrency: int = PASS_CONCURRENCY):
+        self.concurrency = max(1, concurrency)
+        self._nodes: Dict[str, Tuple[Callable[..., Awaitable[Any]], Tuple[str, ...]]] = {}
+        self.timings: Dict[str, float] = {}
+
+    def add(self, name: str, fn: Callable[..., Awaitable[Any]], *deps: str) -> None:
+        """노드 추가. deps 는 이미 추가된 노드여야 함."""
+        if name in self._nodes:
+            raise ValueError(f"pass graph: 중복 노드 {name}")
+        missing = [dep for dep in deps if dep not in self._nodes]
+        if missing:
+            raise ValueError(f"pass graph: {name} 의 입력 노드 없음 {missing}")
+        self._nodes[name] = (fn, deps)
+
+    async def _run_node(self, name: str, results: Dict[str, Any]) -> Any:
+        fn, deps = self._nodes[name]
+        t0 = time.monotonic()
+        try:
+            return await fn(**{dep: results[dep] for dep in deps})
+        finally:
+            self.timings[name] = time.monotonic() - t0
+
+    async def run(self) -> Dict[str, Any]:
+        """모든 노드를 실행하고 {노드 이름: 결과} 반환."""
+        results: Dict[str, Any] = {}
+        pending: List[str] = list(self._nodes)
+        running: Dict[asyncio.Task, str] = {}
+        try:
+            while pending or running:
+                ready = [name for name in pending if all(dep in results for dep in self._nodes[name][1])]
+                for name in ready[:self.concurrency - len(running)]:
+                    pending.remove(name)
+                    running[asyncio.create_task(self._run_node(name, results))] = name
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    results[running.pop(task)] = task.result()
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+        return results
+
+    def critical_path(self) -> float:
+        """노드 소요 시간 기준 가장 긴 의존 경로 (직렬 실행 합계와 비교용)."""
+        longest: Dict[str, float] = {}
+        for name, (_, deps) in self._nodes.items():
+            longest[name] = self.timings.get(name, 0.0) + max((longest[dep] for dep in deps), default=0.0)
+        return max(longest.values(), default=0.0)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Static Pre-Scorer — LLM 리뷰 전에 HTML 정적 특징만으로 리뷰 점수를 예측
+
+눈에 띄게 약한 초안(그라디언트·애니메이션·브레이크포인트 없음, 섹션 부족)도 매번 pass3 전체 리뷰를 거쳤다.
+  1. extract_features(): @keyframes, transition, sm:/md:/lg: 브레이크포인트, 그라디언트, 그림자,
+     폰트 패밀리, 섹션 수를 센다 (정규식만, 수 ms)
+  2. 보정 데이터: pass3 첫 리뷰마다 (특징, 리뷰 점수) 를 학습 메모리(state_store) 의 "prescore" 에 누적
+  3. 표본이 MIN_SAMPLES 이상이면 릿지 선형 회귀로 적합, 그 전에는 style_stats 의 스타일 평균 점수를
+     기준값으로 한 규칙 기반 감점 모델 사용
+  4. 예측 ± 오차 폭(잔차 RMSE, 최소 GAP)으로 판정 — 목표보다 한참 낮으면 리뷰 없이 폐기,
+     한참 높으면 개선 루프 생략
+
+사용:
+    scorer = PreScorer(_load_lessons())
+    predicted = scorer.predict(html, style)
+    if scorer.clearly_below(predicted, target_score): ...
+    record_sample(lessons, extract_features(html), review_score)   # 리뷰 후 보정 표본 추가
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+FEATURES = ("keyframes", "transitions", "breakpoints", "gradients", "shadows", "font_families", "sections")
+# 특징별 포화 상한 — 이보다 많아도 점수에 더 기여하지 않음
+FEATURE_CAPS: Dict[str, float] = {
+    "keyframes": 4, "transitions": 20, "breakpoints": 40, "gradients": 10,
+    "shadows": 15, "font_families": 3, "sections": 8,
+}
+MIN_SAMPLES = 12          # 이 수 이상 쌓이면 회귀로 보정
+MAX_SAMPLES = 300
+RIDGE = 1.0
+PRIOR_RMSE = 12.0         # 보정 전 오차 폭
+GAP = float(os.getenv("PRESCORE_GAP", "12"))   # 판정 최소 여유 (점)
+DEFAULT_BASE = 70.0
+
+_FONT_RE = re.compile(r"font-family\s*:\s*['\"]?([A-Za-z][\w ]+)|family=([A-Za-z+]+)", re.IGNORECASE)
+
+
+def extract_features(html: str) -> Dict[str, float]:
+    lower = html.lower()
+    fonts = {(a or b).replace("+", " ").strip().lower() for a, b in _FONT_RE.findall(html)}
+    fonts -= {"inherit", "sans-serif", "serif", "monospace", "system-ui", "var"}
+    return {
+        "keyframes": len(re.findall(r"@keyframes\b", lower)),
+        "transitions": len(re.findall(r"\btransition\b|\btransition-", lower)),
+        "breakpoints": len(re.findall(r"[\s\"'](?:sm|md|lg|xl):", lower)),
+        "gradients": len(re.findall(r"gradient\(|\bbg-gradient-", lower)),
+        "shadows": len(re.findall(r"box-shadow|\bshadow(?:-\w+)?\b|drop-shadow", lower)),
+        "font_families": len(fonts),
+        "sections": len(re.findall(r"<(?:section|header|nav|footer)\b", lower)),
+    }
+
+
+def _vector(features: Dict[str, float]) -> List[float]:
+    """[1, 포화 정규화된 특징…] — 0~1 범위."""
+    return [1.0] + [min(float(features.get(name, 0)), FEATURE_CAPS[name]) / FEATURE_CAPS[name] for name in FEATURES]
+
+
+def _solve(matrix: List[List[float]], rhs: List[float]) -> List[float]:
+    """가우스 소거 (작은 정규방정식용)."""
+    n = len(rhs)
+    aug = [row[:] + [rhs[i]] for i, row in enumerate(matrix)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(aug[r][col]))
+        aug[col], aug[pivot] = aug[pivot], aug[col]
+        if abs(aug[col][col]) < 1e-12:
+            continue
+        for r in range(n):
+            if r != col:
+                factor = aug[r][col] / aug[col][col]
+                aug[r] = [a - factor * b for a, b in zip(aug[r], aug[col])]
+    return [aug[i][n] / aug[i][i] if abs(aug[i][i]) > 1e-12 else 0.0 for i in range(n)]
+
+
+def record_sample(lessons: Dict[str, Any], features: Dict[str, float], score: int) -> None:
+    """리뷰 점수 하나를 보정 표본으로 추가 (저장은 호출자가)."""
+    samples = lessons.setdefault("prescore", {}).setdefault("samples", [])
+    samples.append({"features": features, "score": int(score)})
+    del samples[:-MAX_SAMPLES]
+
+
+class PreScorer:
+    """lessons 데이터로 보정된 정적 점수 예측기"""
+
+    def __init__(self, lessons: Dict[str, Any]):
+        self.style_stats: Dict[str, Dict[str, Any]] = lessons.get("style_stats", {}) or {}
+        self.samples: List[Dict[str, Any]] = (lessons.get("prescore", {}) or {}).get("samples", [])
+        self.weights: Optional[List[float]] = None
+        self.rmse = PRIOR_RMSE
+        total = sum(s.get("total_score", 0) for s in self.style_stats.values())
+        attempts = sum(s.get("attempts", 0) for s in self.style_stats.values())
+        self.base = total / attempts if attempts else DEFAULT_BASE
+        if len(self.samples) >= MIN_SAMPLES:
+            self._fit()
+
+    @property
+    def calibrated(self) -> bool:
+        return self.weights is not None
+
+    def _fit(self) -> None:
+        rows = [_vector(s["features"]) for s in self.samples]
+        targets = [float(s["score"]) for s in self.samples]
+        k = len(rows[0])
+        gram = [[sum(r[i] * r[j] for r in rows) + (RIDGE if i == j and i > 0 else 0.0) for j in range(k)]
+                for i in range(k)]
+        rhs = [sum(r[i] * t for r, t in zip(rows, targets)) for i in range(k)]
+        self.weights = _solve(gram, rhs)
+        errors = [self._linear(r) - t for r, t in zip(rows, targets)]
+        self.rmse = max(4.0, (sum(e * e for e in errors) / len(errors)) ** 0.5)
+
+    def _linear(self, vector: List[float]) -> float:
+        return sum(w * x for w, x in zip(self.weights or [], vector))
+
+    def _prior(self, features: Dict[str, float], style: str) -> float:
+        """보정 전 규칙 기반 모델 — 스타일 평균에서 빠진 요소만큼 감점."""
+        stats = self.style_stats.get(style) or {}
+        base = float(stats.get("avg_score") or self.base)
+        penalty = 0.0
+        penalty += 6 if features["keyframes"] == 0 else 0
+        penalty += 6 if features["breakpoints"] < 3 else 0
+        penalty += 5 if features["gradients"] == 0 else 0
+        penalty += 4 if features["shadows"] == 0 else 0
+        penalty += 4 if features["transitions"] == 0 else 0
+        penalty += 3 if features["font_families"] < 2 else 0
+        penalty += 2 * max(0, 5 - features["sections"])
+        return base - penalty
+
+    def predict(self, html: str, style: str = "") -> float:
+        features = extract_features(html)
+        if self.calibrated:
+            return max(0.0, min(100.0, self._linear(_vector(features))))
+        return max(0.0, min(100.0, self._prior(features, style)))
+
+    @property
+    def margin(self) -> float:
+        return max(GAP, 1.5 * self.rmse)
+
+    def clearly_below(self, predicted: float, threshold: int) -> bool:
+        return threshold > 0 and predicted + self.margin < threshold
+
+    def clearly_above(self, predicted: float, threshold: int) -> bool:
+        return threshold > 0 and predicted - self.margin >= threshold
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Publish Outbox — 생성 결과를 로컬에 먼저 보관하고 별도 워커가 Supabase 로 게시
+
+생성(LLM 수 분~수십 분)과 게시(Storage 업로드 + designs insert)를 분리:
+  1. 생성기는 HTML/스크린샷/레코드를 SQLite outbox 에 넣고 바로 다음 작업으로 진행
+  2. 드레인 워커가 업로드 → 배치 upsert → 후처리 훅(IndexNow, 신청 완료 등) 실행
+  3. 실패 시 지수 백오프 + 지터로 재시도, MAX_ATTEMPTS 초과 시 'dead' 로 보존
+  4. 프로세스가 죽어도 outbox 가 남아 있어 다음 실행(또는 이 스크립트 단독 실행)에서 이어서 게시
+
+업로드는 upsert 옵션, insert 는 id 기준 upsert 라서 중간에 끊긴 게시를 다시 실행해도 중복이 생기지 않는다.
+slug 유니크 충돌은 SlugAllocator 로 새 slug 를 받아 바로 재시도한다 (slugs= 를 넘긴 경우).
+
+단독 실행 (남은 항목 게시):
+    python publish_outbox.py               # 모든 생성기의 pending 항목 게시
+    python publish_outbox.py --status      # 상태별 개수만 출력
+    python publish_outbox.py --retry-dead  # dead 항목을 pending 으로 되돌린 뒤 게시
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from slug_allocator import SlugAllocator, is_slug_conflict
+
+log = logging.getLogger(__name__)
+
+OUTBOX_PATH = Path(os.getenv("PUBLISH_OUTBOX_PATH", str(Path(__file__).parent / ".publish_outbox.sqlite")))
+BATCH_SIZE = 10
+FLUSH_INTERVAL = 3.0    # 초 (BATCH_SIZE 에 못 미쳐도 가장 오래 기다린 행이 이 시간을 넘기면 게시)
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 5.0      # 초
+BACKOFF_MAX = 600.0     # 초
+POLL_INTERVAL = 5.0     # 초 (새 항목 알림이 없을 때 재확인 주기)
+FLUSH_TIMEOUT = 120.0   # 종료 시 남은 항목 게시를 기다리는 최대 시간
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    seq             INTEGER PRIMARY KEY AUTOINCREMENT,
+    id              TEXT NOT NULL UNIQUE,
+    source          TEXT NOT NULL,
+    table_name      TEXT NOT NULL,
+    bucket          TEXT NOT NULL,
+    image_path      TEXT NOT NULL,
+    record          TEXT NOT NULL,
+    meta            TEXT NOT NULL DEFAULT '{}',
+    screenshot      BLOB,
+    image_url       TEXT,
+    status          TEXT NOT NULL DEFAULT 'pending',
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error      TEXT,
+    created_at      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, source, next_attempt_at);
+"""
+
+OutboxHook = Callable[[Dict[str, Any]], None]
+
+# (table, column) → 존재 여부. 선택 컬럼은 프로세스당 한 번만 조회
+_COLUMN_CACHE: Dict[tuple, bool] = {}
+
+
+@contextmanager
+def _db(path: Path) -> Iterator[sqlite3.Connection]:
+    """짧게 열고 닫는 연결 (생성기 스레드/이벤트 루프 어디서 호출해도 안전)."""
+    conn = sqlite3.connect(str(path), timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _backoff(attempts: int) -> float:
+    delay = min(BACKOFF_BASE * (2 ** max(0, attempts - 1)), BACKOFF_MAX)
+    return delay * (0.5 + random.random())
+
+
+class PublishOutbox:
+    """SQLite outbox + 드레인 워커.
+
+    source     : 생성기 이름. 워커는 자기 source 항목만 게시해 훅이 항상 같은 생성기에서 실행됨
+                 (None 이면 모든 source — 단독 실행용, 훅 없음)
+    client     : Supabase 클라이언트를 돌려주는 함수 (생성기별 get_supabase 재사용)
+    optional_columns : 스키마에 없을 수 있는 컬럼. 첫 게시 전에 한 번 조회해 없으면 모든 행에서 제외
+    batch_size / flush_interval : 행 수가 batch_size 에 차거나 가장 오래된 행이
+                 flush_interval 초를 기다리면 한 번의 다중 행 upsert 로 게시
+    slugs      : slug 충돌(23505) 시 새 slug 를 받아올 할당기 (없으면 일반 실패로 재시도)
+    """
+
+    def __init__(
+        self,
+        source: Optional[str],
+        client: Callable[[], Any],
+        *,
+        path: Path = OUTBOX_PATH,
+        on_published: Optional[OutboxHook] = None,
+        on_dead: Optional[OutboxHook] = None,
+        optional_columns: Sequence[str] = (),
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        upload_concurrency: int = 2,
+        max_attempts: int = MAX_ATTEMPTS,
+        slugs: Optional[SlugAllocator] = None,
+    ):
+        self.source = source
+        self.client = client
+        self.path = Path(path)
+        self.on_published = on_published
+        self.on_dead = on_dead
+        self.optional_columns = list(optional_columns)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.upload_slots = asyncio.Semaphore(max(1, upload_concurrency))
+        self.max_attempts = max_attempts
+        self.slugs = slugs
+        self.published = 0
+        self.failed_attempts = 0
+        self.dead = 0
+        self._wakeup = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        with _db(self.path) as conn:
+            conn.executescript(_SCHEMA)
+
+    # ── 적재 (생성기 쪽) ─────────────────────────────────────────────────────
+    def enqueue(
+        self,
+        record: Dict[str, Any],
+        screenshot: bytes,
+        *,
+        bucket: str,
+        image_path: str,
+        table: str = "designs",
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """게시할 디자인을 outbox 에 저장하고 id 반환. 스레드에서 호출해도 안전."""
+        record = dict(record)
+        record.setdefault("id", str(uuid.uuid4()))
+        record.pop("image_url", None)
+        with _db(self.path) as conn:
+            conn.execute(
+                "INSERT INTO outbox (id, source, table_name, bucket, image_path, record, meta, screenshot, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record["id"], self.source or "manual", table, bucket, image_path,
+                    json.dumps(record, ensure_ascii=False, default=str),
+                    json.dumps(meta or {}, ensure_ascii=False, default=str),
+                    sqlite3.Binary(screenshot), time.time(),
+                ),
+            )
+        log.info("[outbox] 적재: %s (%s)", record.get("title", record["id"]), record["id"])
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return record["id"]
+
+    # ── 조회 ──────────────────────────────────────────────────────────────
+    def _source_clause(self) -> tuple:
+        return ("AND source = ?", (self.source,)) if self.source else ("", ())
+
+    def _due_rows(self) -> List[sqlite3.Row]:
+        clause, args = self._source_clause()
+        with _db(self.path) as conn:
+            return conn.execute(
+                f"SELECT * FROM outbox WHERE status = 'pending' {clause} AND next_attempt_at <= ?"
+                " ORDER BY seq LIMIT ?",
+                (*args, time.time(), self.batch_size),
+            ).fetchall()
+
+    def counts(self) -> Dict[str, int]:
+        clause, args = self._source_clause()
+        with _db(self.path) as conn:
+            rows = conn.execute(
+                f"SELECT status, COUNT(*) FROM outbox WHERE 1 = 1 {clause} GROUP BY status", args
+            ).fetchall()
+        return {status: count for status, count in rows}
+
+    def retry_dead(self) -> int:
+        clause, args = self._source_clause()
+        with _db(self.path) as conn:
+            cur = conn.execute(
+                f"UPDATE outbox SET status = 'pending', attempts = 0, next_attempt_at = 0"
+                f" WHERE status = 'dead' {clause}", args
+            )
+            return cur.rowcount
+
+    # ── 상태 갱신 ─────────────────────────────────────────────────────────
+    def _entry(self, row: sqlite3.Row, image_url: Optional[str] = None) -> Dict[str, Any]:
+        record = json.loads(row["record"])
+        url = image_url or row["image_url"]
+        if url:
+            record["image_url"] = url
+        return {
+            "id": row["id"],
+            "source": row["source"],
+            "record": record,
+            "meta": json.loads(row["meta"] or "{}"),
+            "image_url": url,
+            "attempts": row["attempts"],
+        }
+
+    async def _run_hook(self, hook: Optional[OutboxHook], entry: Dict[str, Any]) -> None:
+        if hook is None:
+            return
+        try:
+            await asyncio.to_thread(hook, entry)
+        except Exception as exc:
+            log.warning("[outbox] 후처리 훅 실패 (%s): %s", entry["id"], exc)
+
+    async def _retry_later(self, row: sqlite3.Row, error: Exception) -> None:
+        attempts = row["attempts"] + 1
+        self.failed_attempts += 1
+        dead = attempts >= self.max_attempts
+        with _db(self.path) as conn:
+            conn.execute(
+                "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ?, status = ? WHERE id = ?",
+                (attempts, time.time() + _backoff(attempts), str(error)[:500],
+                 "dead" if dead else "pending", row["id"]),
+            )
+        if dead:
+            self.dead += 1
+            log.error("[outbox] 게시 포기 (%d회 실패): %s — %s", attempts, row["id"], error)
+            await self._run_hook(self.on_dead, self._entry(row))
+        else:
+            log.warning("[outbox] 게시 실패 (%d/%d), 재시도 예정: %s — %s",
+                        attempts, self.max_attempts, row["id"], error)
+
+    async def _reslug(self, row: sqlite3.Row, record: Dict[str, Any]) -> None:
+        """slug 충돌 → 새 slug 로 레코드를 고쳐 바로 재시도 (시도 횟수는 소모)."""
+        slug = await asyncio.to_thread(self.slugs.reallocate, record["slug"])
+        stored = json.loads(row["record"])
+        stored["slug"] = slug
+        with _db(self.path) as conn:
+            conn.execute(
+                "UPDATE outbox SET record = ?, attempts = attempts + 1, next_attempt_at = 0 WHERE id = ?",
+                (json.dumps(stored, ensure_ascii=False, default=str), row["id"]),
+            )
+
+    async def _failed(self, row: sqlite3.Row, record: Dict[str, Any], exc: Exception) -> None:
+        if (self.slugs is not None and record.get("slug") and is_slug_conflict(exc)
+                and row["attempts"] + 1 < self.max_attempts):
+            try:
+                await self._reslug(row, record)
+                return
+            except Exception as slug_exc:
+                exc = slug_exc
+        await self._retry_later(row, exc)
+
+    # ── 게시 ──────────────────────────────────────────────────────────────
+    def _upload_sync(self, row: sqlite3.Row) -> str:
+        storage = self.client().storage.from_(row["bucket"])
+        # 재시도 시 같은 경로에 덮어쓰기 (이전 시도가 업로드까지만 성공한 경우)
+        storage.upload(row["image_path"], bytes(row["screenshot"]),
+                       {"content-type": "image/png", "upsert": "true"})
+        return storage.get_public_url(row["image_path"])
+
+    async def _upload(self, row: sqlite3.Row) -> Optional[str]:
+        if row["image_url"]:
+            return row["image_url"]
+        async with self.upload_slots:
+            try:
+                url = await asyncio.to_thread(self._upload_sync, row)
+            except Exception as exc:
+                await self._retry_later(row, exc)
+                return None
+        with _db(self.path) as conn:
+            conn.execute("UPDATE outbox SET image_url = ? WHERE id = ?", (url, row["id"]))
+        return url
+
+    def _missing_columns(self, table: str) -> set:
+        """선택 컬럼 존재 여부를 (프로세스당 한 번) 조회해 없는 컬럼 집합 반환."""
+        missing = set()
+        for column in self.optional_columns:
+            key = (table, column)
+            if key not in _COLUMN_CACHE:
+                try:
+                    self.client().table(table).select(column).limit(1).execute()
+                    _COLUMN_CACHE[key] = True
+                except Exception as exc:
+                    # 42703 = undefined_column. 네트워크 오류 등은 그대로 올려 재시도
+                    if getattr(exc, "code", None) != "42703" and "does not exist" not in str(exc):
+                        raise
+                    _COLUMN_CACHE[key] = False
+                    log.info("[outbox] %s.%s 컬럼 없음 — 저장 시 제외", table, column)
+            if not _COLUMN_CACHE[key]:
+                missing.add(column)
+        return missing
+
+    def _upsert_sync(self, table: str, records: List[Dict[str, Any]]) -> None:
+        missing = self._missing_columns(table)
+        # PostgREST 다중 행 upsert 는 행마다 같은 컬럼을 기대함 (빠진 컬럼은 null 로 덮이거나 요청 거부)
+        # → 키 구성이 같은 행끼리 묶어서 보냄 (null 로 채우면 컬럼 기본값까지 덮으므로 묶음 분리)
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for rec in records:
+            row = {k: v for k, v in rec.items() if k not in missing}
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        for payload in groups.values():
+            # id 기준 upsert — 크래시 후 같은 항목을 다시 게시해도 행이 늘지 않음
+            self.client().table(table).upsert(payload, on_conflict="id").execute()
+
+    async def _upsert(self, table: str, records: List[Dict[str, Any]]) -> None:
+        await asyncio.to_thread(self._upsert_sync, table, records)
+
+    async def _mark_published(self, rows: List[sqlite3.Row], urls: Dict[str, str]) -> None:
+        with _db(self.path) as conn:
+            conn.executemany("DELETE FROM outbox WHERE id = ?", [(row["id"],) for row in rows])
+        for row in rows:
+            self.published += 1
+            await self._run_hook(self.on_published, self._entry(row, urls[row["id"]]))
+
+    async def drain_once(self) -> int:
+        """기한이 된 항목을 최대 batch_size 개 게시. 처리(성공/실패)한 항목 수 반환."""
+        rows = self._due_rows()
+        if not rows:
+            return 0
+        urls = await asyncio.gather(*(self._upload(row) for row in rows))
+        ready = [(row, url) for row, url in zip(rows, urls) if url]
+
+        by_table: Dict[str, List[tuple]] = {}
+        for row, url in ready:
+            by_table.setdefault(row["table_name"], []).append((row, url))
+        for table, items in by_table.items():
+            records = [self._entry(row, url)["record"] for row, url in items]
+            url_map = {row["id"]: url for row, url in items}
+            try:
+                await self._upsert(table, records)
+            except Exception as exc:
+                if len(items) == 1:
+                    await self._failed(items[0][0], records[0], exc)
+                    continue
+                # 배치 실패 → 한 건씩 다시 시도해 문제 행만 격리
+                log.warning("[outbox] 배치 upsert 실패, 개별 재시도: %s", exc)
+                for (row, url), record in zip(items, records):
+                    try:
+                        await self._upsert(table, [record])
+                    except Exception as row_exc:
+                        await self._failed(row, record, row_exc)
+                        continue
+                    await self._mark_published([row], url_map)
+                continue
+            await self._mark_published([row for row, _ in items], url_map)
+            log.info("[outbox] 게시 완료 %d건 (%s)", len(items), table)
+        return len(rows)
+
+    def _flush_at(self) -> Optional[float]:
+        """다음 배치를 게시할 시각 (게시할 항목이 없으면 None)."""
+        clause, args = self._source_clause()
+        now = time.time()
+        with _db(self.path) as conn:
+            ready, oldest = conn.execute(
+                f"SELECT COUNT(*), MIN(MAX(created_at, next_attempt_at)) FROM outbox"
+                f" WHERE status = 'pending' {clause} AND next_attempt_at <= ?",
+                (*args, now),
+            ).fetchone()
+            upcoming = conn.execute(
+                f"SELECT MIN(next_attempt_at) FROM outbox"
+                f" WHERE status = 'pending' {clause} AND next_attempt_at > ?",
+                (*args, now),
+            ).fetchone()[0]
+        if ready:
+            if ready >= self.batch_size or self._closing:
+                return now
+            flush_at = oldest + self.flush_interval
+            return min(flush_at, upcoming) if upcoming is not None else flush_at
+        return upcoming
+
+    async def _run(self) -> None:
+        deadline: Optional[float] = None
+        while True:
+            self._wakeup.clear()
+            flush_at = self._flush_at()
+            now = time.time()
+            if flush_at is not None and flush_at <= now:
+                try:
+                    await self.drain_once()
+                except Exception as exc:
+                    log.error("[outbox] 드레인 오류: %s", exc)
+                    await asyncio.sleep(POLL_INTERVAL)
+                continue
+            if self._closing:
+                deadline = deadline or now + FLUSH_TIMEOUT
+                if flush_at is None or flush_at > deadline:
+                    break
+            wait = POLL_INTERVAL if flush_at is None else min(flush_at - now, POLL_INTERVAL)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    # ── 워커 수명 ─────────────────────────────────────────────────────────
+    def start(self) -> asyncio.Task:
+        """백그라운드 드레인 워커 시작 (이전 실행에서 남은 항목부터 게시)."""
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def close(self) -> Dict[str, int]:
+        """남은 항목을 FLUSH_TIMEOUT 안에서 최대한 게시한 뒤 워커 종료. 남은 항목은 다음 실행으로."""
+        self._closing = True
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        self._loop = None
+        counts = self.counts()
+        log.info("[outbox] 종료 — 게시 %d건, 실패 시도 %d회, dead %d건, 남은 상태 %s",
+                 self.published, self.failed_attempts, self.dead, counts)
+        return counts
+
+    async def __aenter__(self) -> "PublishOutbox":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+# ── CLI: 남은 항목 게시 ────────────────────────────────────────────────────────
+def _cli_client() -> Callable[[], Any]:
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    load_dotenv()
+    url = (os.getenv("SUPABASE_URL") or os.getenv("NEXT_PUBLIC_SUPABASE_URL") or "").strip().rstrip("/")
+    key = (os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY") or "").strip()
+    if not url or not key:
+        raise SystemExit("SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY 가 필요합니다.")
+    if not url.startswith("http"):
+        url = "https://" + url
+    client = create_client(url, key)
+    return lambda: client
+
+
+async def _drain_all(retry_dead: bool, optional_columns: Iterable[str]) -> None:
+    outbox = PublishOutbox(None, _cli_client(), optional_columns=list(optional_columns))
+    if retry_dead:
+        log.info("[outbox] dead → pending: %d건", outbox.retry_dead())
+    outbox.start()
+    await outbox.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s",
+                        datefmt="%Y-%m-%d %H:%M:%S")
+    parser = argparse.ArgumentParser(description="Publish outbox 드레인")
+    parser.add_argument("--status", action="store_true", help="상태별 항목 수만 출력")
+    parser.add_argument("--retry-dead", action="store_true", help="dead 항목을 다시 시도")
+    args = parser.parse_args()
+
+    if args.status:
+        with _db(OUTBOX_PATH) as conn:
+            conn.executescript(_SCHEMA)
+            for source, status, count in conn.execute(
+                "SELECT source, status, COUNT(*) FROM outbox GROUP BY source, status ORDER BY source"
+            ):
+                print(f"{source:<24} {status:<8} {count}")
+    else:
+        asyncio.run(_drain_all(args.retry_dead, ["quality_score"]))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Refine Budget — 과거 라운드별 점수 상승으로 개선 루프를 계속할지 결정
+
+개선 루프는 점수가 정체·하락해도 min_score 를 넘거나 이슈가 없을 때까지 max_refine 회를 다 썼다.
+  1. 라운드(pass4 수정 + 뒤따르는 pass3 리뷰)마다 점수 변화와 소요 시간을 기록
+     → 학습 메모리(state_store) 의 "refine_stats" 에 전체 / 카테고리별 / 스타일별로 누적
+  2. 다음 라운드의 기대 상승 = 사전값 → 전체 → 카테고리 → 스타일 순으로 표본 수만큼 당겨지는 평균
+     (이번 디자인의 직전 라운드 결과도 절반 비중으로 반영)
+  3. 기대 상승 / 기대 소요 시간(분)이 REFINE_MIN_GAIN_PER_MIN 미만이면 중단
+  4. 호출자는 라운드 중 가장 높은 점수의 HTML 을 채택 (마지막 결과가 아니라)
+
+사용:
+    budget = RefineBudget(_load_lessons(), style, category)
+    if not budget.should_continue(round_idx, last_delta): break
+    budget.observe(round_idx, delta, seconds)
+    budget.save(lessons)          # 디자인 종료 시 한 번
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+REFINE_MIN_GAIN_PER_MIN = float(os.getenv("REFINE_MIN_GAIN_PER_MIN", "1.0"))
+PRIOR_GAIN = 3.0          # 기록이 없을 때 한 라운드 기대 상승 (점)
+PRIOR_SECONDS = 180.0     # 기록이 없을 때 한 라운드 기대 소요 (초)
+PRIOR_WEIGHT = 3.0        # 상위 단계 평균을 표본 몇 개만큼 믿을지
+MAX_ROUND = 4             # 이 이후 라운드는 같은 칸에 합산
+
+
+def _round_key(round_idx: int) -> str:
+    return str(min(round_idx, MAX_ROUND))
+
+
+class RefineBudget:
+    """디자인 하나의 개선 루프 예산"""
+
+    def __init__(self, lessons: Dict[str, Any], style: str, category: str,
+                 min_gain_per_min: float = REFINE_MIN_GAIN_PER_MIN):
+        self.stats: Dict[str, Dict[str, Dict[str, float]]] = lessons.get("refine_stats", {}) or {}
+        self.scopes = ["all", f"category:{category}", f"style:{style}"]
+        self.min_gain_per_min = min_gain_per_min
+        self.rounds: List[Tuple[int, float, float]] = []   # (라운드, 점수 변화, 초)
+        self.last_estimate: Tuple[float, float] = (PRIOR_GAIN, PRIOR_SECONDS)
+
+    def expected(self, round_idx: int) -> Tuple[float, float]:
+        """(기대 점수 상승, 기대 소요 초) — 넓은 범위부터 좁은 범위로 축소 추정."""
+        gain, seconds = PRIOR_GAIN, PRIOR_SECONDS
+        key = _round_key(round_idx)
+        for scope in self.scopes:
+            cell = self.stats.get(scope, {}).get(key)
+            if not cell or not cell.get("n"):
+                continue
+            n = cell["n"]
+            gain = (PRIOR_WEIGHT * gain + cell["gain"]) / (PRIOR_WEIGHT + n)
+            seconds = (PRIOR_WEIGHT * seconds + cell["seconds"]) / (PRIOR_WEIGHT + n)
+        return gain, seconds
+
+    def should_continue(self, round_idx: int, last_delta: Optional[float] = None) -> bool:
+        gain, seconds = self.expected(round_idx)
+        if last_delta is not None:
+            gain = 0.5 * gain + 0.5 * last_delta
+        self.last_estimate = (gain, seconds)
+        return gain / max(seconds / 60.0, 1e-6) >= self.min_gain_per_min
+
+    def observe(self, round_idx: int, delta: float, seconds: float) -> None:
+        self.rounds.append((round_idx, float(delta), float(seconds)))
+
+    def save(self, lessons: Dict[str, Any]) -> None:
+        """이번 디자인의 라운드 기록을 lessons 에 합산 (저장은 호출자가)."""
+        stats = lessons.setdefault("refine_stats", {})
+        for round_idx, delta, seconds in self.rounds:
+            for scope in self.scopes:
+                cell = stats.setdefault(scope, {}).setdefault(_round_key(round_idx),
+                                                             {"n": 0, "gain": 0.0, "seconds": 0.0})
+                cell["n"] += 1
+                cell["gain"] += delta
+                cell["seconds"] += seconds
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Slug Allocator — prefix 단위 일괄 조회로 고유 slug 를 할당
+
+기존 방식은 후보 suffix 마다 `eq("slug", candidate)` 를 한 번씩 조회했다.
+  1. base slug 로 시작하는 기존 slug 를 `like(base%)` 한 번으로 모두 가져와 캐시
+  2. 다음 빈 suffix(base, base-2, base-3 …)는 메모리에서 결정
+  3. 할당한 slug 는 바로 예약해 같은 배치 안에서 겹치지 않음
+  4. 다른 작성자와의 경합은 사전 확인 대신 insert 충돌(23505)을 재할당 신호로 처리
+     → PublishOutbox(slugs=...) 가 충돌 시 reallocate() 로 새 slug 를 받아 재시도
+
+사용:
+    slugs = SlugAllocator(get_supabase)
+    slug = slugs.allocate(slugify(title))      # base 가 캐시에 없을 때만 1회 조회
+    slugs.prefetch("landing-page-design-")     # 공통 prefix 를 미리 받아두면 이후 0회
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, Set
+
+log = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+_SUFFIX_RE = re.compile(r"-\d+$")
+
+
+def is_slug_conflict(exc: Exception) -> bool:
+    """slug 유니크 제약 위반(23505) 여부."""
+    text = str(exc)
+    code = getattr(exc, "code", None)
+    return (code == "23505" or "23505" in text or "duplicate key" in text) and "slug" in text
+
+
+class SlugAllocator:
+    """테이블 하나의 slug 컬럼에 대한 prefix 캐시 + 배치 내 예약"""
+
+    def __init__(self, client: Callable[[], Any], table: str = "designs", column: str = "slug"):
+        self.client = client
+        self.table = table
+        self.column = column
+        self.queries = 0
+        self._taken: Set[str] = set()
+        self._prefixes: Set[str] = set()
+        self._bases: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    # ── 캐시 ──────────────────────────────────────────────────────────────
+    def _covered(self, base: str) -> bool:
+        return any(base.startswith(prefix) for prefix in self._prefixes)
+
+    def _fetch(self, prefix: str) -> Set[str]:
+        found: Set[str] = set()
+        start = 0
+        while True:
+            query = self.client().table(self.table).select(self.column)
+            if prefix:
+                query = query.like(self.column, f"{prefix}%")
+            rows = query.range(start, start + PAGE_SIZE - 1).execute().data or []
+            self.queries += 1
+            found.update(row[self.column] for row in rows if row.get(self.column))
+            if len(rows) < PAGE_SIZE:
+                return found
+            start += PAGE_SIZE
+
+    def prefetch(self, prefix: str) -> None:
+        """prefix 로 시작하는 기존 slug 를 한 번에 받아 캐시 (이미 덮인 prefix 면 생략)."""
+        with self._lock:
+            if self._covered(prefix):
+                return
+            self._taken.update(self._fetch(prefix))
+            self._prefixes.add(prefix)
+
+    def seed(self, slugs: Iterable[str], prefix: str = "") -> None:
+        """호출자가 이미 아는 slug 목록으로 캐시를 채움. prefix 아래 slug 가 모두 들어 있다고 간주."""
+        with self._lock:
+            self._taken.update(slug for slug in slugs if slug)
+            self._prefixes.add(prefix)
+
+    # ── 할당 ──────────────────────────────────────────────────────────────
+    def _next_free(self, base: str) -> str:
+        candidate = base
+        suffix = 2
+        while candidate in self._taken:
+            candidate = f"{base}-{suffix}"
+            suffix += 1
+        self._taken.add(candidate)
+        self._bases[candidate] = base
+        return candidate
+
+    def allocate(self, base: str) -> str:
+        """base(이미 slugify 된 값)에서 다음 빈 slug 를 골라 예약."""
+        base = base or "design"
+        with self._lock:
+            if not self._covered(base):
+                self._taken.update(self._fetch(base))
+                self._prefixes.add(base)
+            return self._next_free(base)
+
+    def reallocate(self, slug: str) -> str:
+        """insert 충돌 시 호출. base 를 다시 조회해 다른 작성자가 쓴 slug 까지 반영한 뒤 재할당."""
+        with self._lock:
+            base = self._bases.get(slug) or _SUFFIX_RE.sub("", slug) or "design"
+            self._taken.add(slug)
+            self._taken.update(self._fetch(base))
+            candidate = self._next_free(base)
+        log.info("[slug] 충돌 %s → %s", slug, candidate)
+        return candidate
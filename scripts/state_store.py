@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Generator State Store — 생성 히스토리 / 학습 메모리 / 스타일 통계 / 트렌드 캐시를 SQLite(WAL) 하나로
+
+기존에는 .generator_history.json, .generator_lessons.json, .trends_cache.json 을 호출마다 통째로
+읽고 다시 써서, 느리고 두 실행기가 동시에 돌면 서로의 기록을 덮어썼다.
+  1. 히스토리: 행 추가만. "최근 K개 DNA" 는 id 역순 인덱스 조회
+  2. 교훈(fixes): 키별 UPSERT 로 count/last_seen/심각도만 갱신. "심각도 × 빈도 상위 N개" 는
+     (sev_rank, count) 인덱스로 정렬된 조회 — 전체를 읽어 정렬하지 않음
+  3. 통계 카운터 / 스타일별 점수: 한 줄 UPDATE 로 증가
+  4. 나머지 문서(트렌드 캐시, prescore 표본, refine_stats): 이름 → JSON 행. edit_lessons() 는
+     BEGIN IMMEDIATE 트랜잭션 안에서 읽고-고치고-쓰기 (프로세스 간에도 원자적)
+  5. 처음 열 때 기존 JSON 파일이 있으면 한 번만 가져옴 (meta.migrated_json 표시)
+
+사용:
+    store = get_state_store()
+    store.add_history({...}); store.recent_history(8)
+    store.record_result(issues, score, style, success=False)
+    store.top_fixes(6)
+    with store.edit_lessons() as lessons:        # prescore / refine_stats 같은 문서 갱신
+        record_sample(lessons, features, score)
+
+상태 확인:
+    python state_store.py
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+log = logging.getLogger(__name__)
+
+_HERE = Path(__file__).parent
+STATE_PATH = Path(os.getenv("GENERATOR_STATE_PATH", str(_HERE / ".generator_state.sqlite")))
+HISTORY_JSON = _HERE / ".generator_history.json"
+LESSONS_JSON = _HERE / ".generator_lessons.json"
+TRENDS_JSON = _HERE / ".trends_cache.json"
+
+HISTORY_KEEP = 500       # 다양성 샘플링에 쓸 수 있도록 JSON(20개)보다 길게 보관
+LESSONS_MAX = 200        # 저장할 최대 이슈 키 수 (count 낮고 오래된 것부터 정리)
+SEVERITY_RANK = {"minor": 0, "major": 1, "critical": 2}
+# lessons() 가 돌려주는 dict 에서 fixes/stats/style_stats 외에 문서 행으로 보관하는 키
+LESSON_DOCS = ("prescore", "refine_stats")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts       TEXT NOT NULL,
+    style    TEXT NOT NULL DEFAULT '',
+    category TEXT NOT NULL DEFAULT '',
+    entry    TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fixes (
+    key       TEXT PRIMARY KEY,
+    area      TEXT NOT NULL,
+    severity  TEXT NOT NULL,
+    sev_rank  INTEGER NOT NULL,
+    fix       TEXT NOT NULL,
+    count     INTEGER NOT NULL DEFAULT 0,
+    last_seen TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_fixes_rank ON fixes (sev_rank DESC, count DESC);
+CREATE INDEX IF NOT EXISTS idx_fixes_count ON fixes (count);
+CREATE TABLE IF NOT EXISTS counters (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS style_stats (
+    style       TEXT PRIMARY KEY,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    total_score INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS docs (
+    name       TEXT PRIMARY KEY,
+    value      TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name  TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _read_json(path: Path) -> Any:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+
+class StateStore:
+    """생성기 상태 SQLite 저장소 (연결은 작업마다 짧게 열고 닫음 — 스레드/프로세스 안전)"""
+
+    def __init__(self, path: Path = STATE_PATH, migrate: bool = True):
+        self.path = Path(path)
+        with self._db() as conn:
+            conn.executescript(_SCHEMA)
+        if migrate:
+            self._migrate_json()
+
+    @contextmanager
+    def _db(self, write: bool = False) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not write:
+                yield conn
+                return
+            # 쓰기는 시작부터 잠금을 잡아 읽고-고치고-쓰기 사이에 다른 실행기가 끼지 못하게
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    # ── 히스토리 ──────────────────────────────────────────────────────────────
+    def add_history(self, entry: Dict[str, Any]) -> None:
+        with self._db(write=True) as conn:
+            self._insert_history(conn, entry)
+            conn.execute("DELETE FROM history WHERE id <= (SELECT MAX(id) FROM history) - ?", (HISTORY_KEEP,))
+
+    @staticmethod
+    def _insert_history(conn: sqlite3.Connection, entry: Dict[str, Any]) -> None:
+        conn.execute(
+            "INSERT INTO history (ts, style, category, entry) VALUES (?, ?, ?, ?)",
+            (entry.get("ts") or datetime.utcnow().isoformat(), entry.get("style", ""),
+             entry.get("category", ""), json.dumps(entry, ensure_ascii=False)),
+        )
+
+    def recent_history(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """최근 것부터 limit 개."""
+        with self._db() as conn:
+            rows = conn.execute("SELECT entry FROM history ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [json.loads(row["entry"]) for row in rows]
+
+    # ── 학습 메모리 ───────────────────────────────────────────────────────────
+    def record_result(self, issues: List[Dict[str, Any]], score: int, style: str, success: bool) -> Dict[str, int]:
+        """통계 카운터 증가, 실패 이슈 UPSERT, 스타일 점수 누적 — 한 트랜잭션. 갱신된 통계 반환."""
+        now = datetime.utcnow().isoformat()
+        with self._db(write=True) as conn:
+            for name, delta in (("attempts", 1), ("successes", int(success)), ("failures", int(not success))):
+                conn.execute(
+                    "INSERT INTO counters (name, value) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    (name, delta),
+                )
+            if not success:
+                for issue in issues:
+                    fix_text = issue.get("fix", "").strip()
+                    if fix_text:
+                        self._upsert_fix(conn, issue.get("area", "general"), issue.get("severity", "minor"),
+                                         fix_text, 1, now)
+                self._prune_fixes(conn)
+            if style:
+                conn.execute(
+                    "INSERT INTO style_stats (style, attempts, total_score) VALUES (?, 1, ?) "
+                    "ON CONFLICT(style) DO UPDATE SET attempts = attempts + 1, "
+                    "total_score = total_score + excluded.total_score",
+                    (style, score),
+                )
+            stats = self._stats(conn)
+            stats["fixes"] = conn.execute("SELECT COUNT(*) FROM fixes").fetchone()[0]
+        return stats
+
+    @staticmethod
+    def _upsert_fix(conn: sqlite3.Connection, area: str, severity: str, fix_text: str, count: int,
+                    last_seen: str) -> None:
+        # 심각도는 올라가기만 함 (minor → major → critical)
+        conn.execute(
+            "INSERT INTO fixes (key, area, severity, sev_rank, fix, count, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET count = count + excluded.count, last_seen = excluded.last_seen, "
+            "severity = CASE WHEN excluded.sev_rank > sev_rank THEN excluded.severity ELSE severity END, "
+            "sev_rank = MAX(sev_rank, excluded.sev_rank)",
+            (f"{area}:{fix_text[:60]}", area, severity, SEVERITY_RANK.get(severity, 0), fix_text, count, last_seen),
+        )
+
+    @staticmethod
+    def _prune_fixes(conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "DELETE FROM fixes WHERE key IN (SELECT key FROM fixes ORDER BY count, last_seen LIMIT "
+            "MAX(0, (SELECT COUNT(*) FROM fixes) - ?))",
+            (LESSONS_MAX,),
+        )
+
+    def top_fixes(self, limit: int) -> List[Dict[str, Any]]:
+        """심각도 우선, 같은 심각도 안에서는 빈도순 상위 limit 개."""
+        with self._db() as conn:
+            rows = conn.execute(
+                "SELECT area, severity, fix, count, last_seen FROM fixes "
+                "ORDER BY sev_rank DESC, count DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _stats(conn: sqlite3.Connection) -> Dict[str, int]:
+        stats = {"attempts": 0, "failures": 0, "successes": 0}
+        stats.update({row["name"]: row["value"] for row in conn.execute("SELECT name, value FROM counters")})
+        return stats
+
+    def stats(self) -> Dict[str, int]:
+        with self._db() as conn:
+            return self._stats(conn)
+
+    def lessons(self) -> Dict[str, Any]:
+        """기존 .generator_lessons.json 과 같은 모양의 스냅샷 (읽기 전용 용도)."""
+        with self._db() as conn:
+            return self._lessons(conn)
+
+    def _lessons(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        lessons: Dict[str, Any] = {
+            "stats": self._stats(conn),
+            "fixes": {
+                row["key"]: {"area": row["area"], "severity": row["severity"], "fix": row["fix"],
+                             "count": row["count"], "last_seen": row["last_seen"]}
+                for row in conn.execute("SELECT * FROM fixes")
+            },
+            "style_stats": {
+                row["style"]: {"attempts": row["attempts"], "total_score": row["total_score"],
+                               "avg_score": row["total_score"] // max(row["attempts"], 1)}
+                for row in conn.execute("SELECT * FROM style_stats")
+            },
+        }
+        for name in LESSON_DOCS:
+            doc = self._get_doc(conn, name)
+            if doc is not None:
+                lessons[name] = doc
+        return lessons
+
+    @contextmanager
+    def edit_lessons(self) -> Iterator[Dict[str, Any]]:
+        """lessons 스냅샷을 고친 뒤 LESSON_DOCS 문서만 되돌려 씀 (fixes/stats 는 record_result 로만)."""
+        with self._db(write=True) as conn:
+            lessons = self._lessons(conn)
+            yield lessons
+            for name in LESSON_DOCS:
+                if name in lessons:
+                    self._put_doc(conn, name, lessons[name])
+
+    # ── 문서 (트렌드 캐시 등) ─────────────────────────────────────────────────
+    @staticmethod
+    def _get_doc(conn: sqlite3.Connection, name: str) -> Optional[Any]:
+        row = conn.execute("SELECT value FROM docs WHERE name = ?", (name,)).fetchone()
+        return json.loads(row["value"]) if row else None
+
+    @staticmethod
+    def _put_doc(conn: sqlite3.Connection, name: str, value: Any, updated_at: Optional[float] = None) -> None:
+        conn.execute(
+            "INSERT INTO docs (name, value, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+            (name, json.dumps(value, ensure_ascii=False), updated_at or time.time()),
+        )
+
+    def get_doc(self, name: str) -> Optional[tuple]:
+        """(값, 갱신 시각) 또는 None."""
+        with self._db() as conn:
+            row = conn.execute("SELECT value, updated_at FROM docs WHERE name = ?", (name,)).fetchone()
+        return (json.loads(row["value"]), row["updated_at"]) if row else None
+
+    def put_doc(self, name: str, value: Any) -> None:
+        with self._db(write=True) as conn:
+            self._put_doc(conn, name, value)
+
+    # ── JSON 마이그레이션 ─────────────────────────────────────────────────────
+    def _migrate_json(self) -> None:
+        """기존 JSON 파일을 한 번만 가져옴. 이미 가져왔으면 아무것도 하지 않음."""
+        with self._db(write=True) as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE name = 'migrated_json'").fetchone():
+                return
+            imported = []
+            history = _read_json(HISTORY_JSON)
+            if isinstance(history, list):
+                for entry in reversed(history):   # 파일은 최신이 앞
+                    self._insert_history(conn, entry)
+                imported.append(f"history {len(history)}")
+            lessons = _read_json(LESSONS_JSON)
+            if isinstance(lessons, dict):
+                for name, value in (lessons.get("stats") or {}).items():
+                    conn.execute("INSERT OR REPLACE INTO counters (name, value) VALUES (?, ?)", (name, int(value)))
+                for fix in (lessons.get("fixes") or {}).values():
+                    self._upsert_fix(conn, fix.get("area", "general"), fix.get("severity", "minor"),
+                                     fix.get("fix", ""), int(fix.get("count", 0)), fix.get("last_seen", ""))
+                for style, s in (lessons.get("style_stats") or {}).items():
+                    conn.execute("INSERT OR REPLACE INTO style_stats (style, attempts, total_score) VALUES (?, ?, ?)",
+                                 (style, int(s.get("attempts", 0)), int(s.get("total_score", 0))))
+                for name in LESSON_DOCS:
+                    if name in lessons:
+                        self._put_doc(conn, name, lessons[name])
+                imported.append(f"fixes {len(lessons.get('fixes') or {})}")
+            trends = _read_json(TRENDS_JSON)
+            if isinstance(trends, dict) and trends.get("trends"):
+                self._put_doc(conn, "trends", trends["trends"], trends.get("fetched_at"))
+                imported.append("trends")
+            conn.execute("INSERT INTO meta (name, value) VALUES ('migrated_json', ?)", (datetime.utcnow().isoformat(),))
+        if imported:
+            log.info("[state] JSON 상태 파일 가져옴 → %s (%s)", self.path.name, ", ".join(imported))
+
+    def status(self) -> Dict[str, Any]:
+        with self._db() as conn:
+            counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                      for table in ("history", "fixes", "style_stats", "docs")}
+            return {"path": str(self.path), **counts, "stats": self._stats(conn)}
+
+
+# ── 프로세스 공유 인스턴스 ────────────────────────────────────────────────────
+_stores: Dict[str, StateStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_state_store(path: Optional[Path] = None) -> StateStore:
+    """경로별 공유 저장소 (최초 호출 시 스키마 생성 + JSON 마이그레이션)."""
+    key = str(path or STATE_PATH)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = StateStore(Path(key))
+        return _stores[key]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    print(json.dumps(get_state_store().status(), indent=2, ensure_ascii=False))
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Stream Stop — 스트리밍 조기 종료 조건을 새로 들어온 조각만 보고 판단
+
+stop(버퍼) 를 닫는 문자가 든 조각마다 다시 부르면 매번 버퍼 전체를 합치고 처음부터 훑어서,
+10~20k 글자 초안 하나가 O(n²) 이 됐다.
+  1. StopCondition: 호출하면 전체 텍스트 검사 (캐시 accept 등), scanner() 는 조각 단위 증분 검사기
+  2. MarkerStop: 표식 문자열이 모두 나왔는지 — 조각 + 직전 꼬리(표식 길이 - 1)만 검사
+  3. JsonStop: <think> 블록 밖 첫 '{' 의 괄호가 닫혔는지 — 글자마다 상태 기계 한 번
+  4. ElementStop: tags 중 처음 나온 요소가 짝 맞게 닫혔는지 — 아직 안 본 꼬리만 정규식으로 검사
+
+사용:
+    scanner = html_closed.scanner()
+    for piece in stream:
+        if scanner.feed(piece):
+            break
+    html_closed(full_text)   # 전체 검사도 같은 결과
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Iterable
+
+
+class StopScanner:
+    """스트림 하나에 대한 증분 검사기"""
+
+    def feed(self, piece: str) -> bool:
+        raise NotImplementedError
+
+
+class StopCondition:
+    """스트리밍 stop 조건 (호출 = 전체 텍스트 검사)"""
+
+    def scanner(self) -> StopScanner:
+        raise NotImplementedError
+
+    def __call__(self, text: str) -> bool:
+        return self.scanner().feed(text)
+
+
+class _MarkerScanner(StopScanner):
+    def __init__(self, markers: Iterable[str], ignore_case: bool):
+        self.ignore_case = ignore_case
+        self.pending = {m.lower() if ignore_case else m for m in markers}
+        self.keep = max((len(m) for m in self.pending), default=1) - 1
+        self.tail = ""
+
+    def feed(self, piece: str) -> bool:
+        window = self.tail + (piece.lower() if self.ignore_case else piece)
+        self.pending = {m for m in self.pending if m not in window}
+        self.tail = window[-self.keep:] if self.keep else ""
+        return not self.pending
+
+
+class MarkerStop(StopCondition):
+    """markers 가 모두 나오면 종료"""
+
+    def __init__(self, *markers: str, ignore_case: bool = True):
+        self.markers = markers
+        self.ignore_case = ignore_case
+
+    def scanner(self) -> StopScanner:
+        return _MarkerScanner(self.markers, self.ignore_case)
+
+
+class _JsonScanner(StopScanner):
+    def __init__(self):
+        self.window = ""        # 마지막 8글자 (<think>/</think> 감지)
+        self.thinking = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, piece: str) -> bool:
+        for ch in piece:
+            self.window = (self.window + ch.lower())[-8:]
+            if self.window.endswith("<think>"):
+                self.thinking = True
+                self._reset()
+                continue
+            if self.thinking:
+                if self.window.endswith("</think>"):
+                    self.thinking = False
+                    self._reset()
+                continue
+            if self.depth == 0:
+                self.depth = int(ch == "{")
+            elif self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+            elif ch == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
+
+class JsonStop(StopCondition):
+    """추론 모델의 <think> 블록 이후 첫 JSON 객체가 닫히면 종료"""
+
+    def scanner(self) -> StopScanner:
+        return _JsonScanner()
+
+
+class _ElementScanner(StopScanner):
+    def __init__(self, tags: Iterable[str]):
+        self.open_re = re.compile(rf"<({'|'.join(tags)})\b[^>]*>", re.IGNORECASE)
+        self.tag_re = None
+        self.depth = 0
+        self.buffer = ""        # 아직 판단하지 못한 꼬리 (미완성 태그 포함)
+
+    def feed(self, piece: str) -> bool:
+        text = self.buffer + piece
+        pos = 0
+        if self.tag_re is None:
+            match = self.open_re.search(text)
+            if not match:
+                self.buffer = self._tail(text, 0)
+                return False
+            self.tag_re = re.compile(rf"<(/?){match.group(1).lower()}\b[^>]*>", re.IGNORECASE)
+            self.depth = 1
+            pos = match.end()
+        for match in self.tag_re.finditer(text, pos):
+            self.depth += -1 if match.group(1) else 1
+            pos = match.end()
+            if self.depth == 0:
+                return True
+        self.buffer = self._tail(text, pos)
+        return False
+
+    @staticmethod
+    def _tail(text: str, pos: int) -> str:
+        """마지막 '<' 부터만 남김 — 조각 경계에 걸린 태그를 다음 조각과 이어서 검사."""
+        cut = text.rfind("<", pos)
+        return text[cut:] if cut >= 0 else ""
+
+
+class ElementStop(StopCondition):
+    """tags 중 처음 나온 요소 하나가 짝 맞게 닫히면 종료"""
+
+    def __init__(self, tags: Iterable[str]):
+        self.tags = tuple(tags)
+
+    def scanner(self) -> StopScanner:
+        return _ElementScanner(self.tags)
+
+
+html_closed = MarkerStop("</html>")
+style_closed = MarkerStop("</style>")
+json_closed = JsonStop()
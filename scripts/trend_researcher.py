@@ -10,7 +10,7 @@ Sources:
   - CSS-Tricks RSS    (CSS 기법 최신 동향)
   - Smashing Magazine RSS (UX/UI 아티클)
 
-Cache: scripts/.trends_cache.json (기본 24시간 TTL)
+Cache: state_store 의 "trends" 문서 (기본 24시간 TTL, 기존 .trends_cache.json 은 처음 한 번 가져옴)
 """
 
 from __future__ import annotations
@@ -21,17 +21,20 @@ import logging
 import re
 import time
 import urllib.parse
-from pathlib import Path
 from typing import Dict, List, Optional
 
 import httpx
 
+from ollama_client import get_ollama_client, ollama_session
+from state_store import get_state_store
+from stream_stop import json_closed
+
 log = logging.getLogger(__name__)
 
-TRENDS_CACHE_FILE = Path(__file__).parent / ".trends_cache.json"
+TRENDS_CACHE_DOC  = "trends"
 TRENDS_CACHE_TTL  = 24 * 3600   # 초 단위 (24시간)
 FETCH_TIMEOUT     = 12          # 소스 페이지 fetch 타임아웃 (초)
-OLLAMA_TIMEOUT    = 180         # Ollama 분석 타임아웃 (초)
+# Ollama 분석 타임아웃은 ollama_client.PASS_TIMEOUTS["trend"] (180초)
 
 _HEADERS = {
     "User-Agent": (
@@ -189,17 +192,9 @@ async def _analyze_with_ollama(
     """Ollama로 트렌드 분석 → 구조화된 dict 반환"""
     prompt = _ANALYSIS_PROMPT.format(text=combined_text[:9000])
     try:
-        async with httpx.AsyncClient(timeout=OLLAMA_TIMEOUT) as c:
-            r = await c.post(
-                f"{ollama_url.rstrip('/')}/api/chat",
-                json={
-                    "model":   model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "stream":   False,
-                },
-            )
-            r.raise_for_status()
-            raw_text: str = r.json()["message"]["content"]
+        raw_text = await get_ollama_client(ollama_url).chat_stream(
+            model, [{"role": "user", "content": prompt}], pass_name="trend", stop=json_closed,
+        )
 
         m = re.search(r"\{[\s\S]+\}", raw_text)
         if m:
@@ -252,11 +247,8 @@ async def refresh_trends(ollama_url: str, model: str) -> Dict:
 
     # 캐시 저장
     try:
-        TRENDS_CACHE_FILE.write_text(
-            json.dumps({"fetched_at": time.time(), "trends": trends}, indent=2, ensure_ascii=False),
-            encoding="utf-8",
-        )
-        log.info("[trend] 캐시 저장: %s", TRENDS_CACHE_FILE.name)
+        get_state_store().put_doc(TRENDS_CACHE_DOC, trends)
+        log.info("[trend] 캐시 저장: %s", TRENDS_CACHE_DOC)
     except Exception as exc:
         log.warning("[trend] 캐시 저장 실패: %s", exc)
 
@@ -264,13 +256,16 @@ async def refresh_trends(ollama_url: str, model: str) -> Dict:
 
 
 def load_cached_trends() -> Optional[Dict]:
-    """캐시 로드. TTL 초과 또는 파일 없으면 None."""
+    """캐시 로드. TTL 초과 또는 캐시 없으면 None."""
     try:
-        data = json.loads(TRENDS_CACHE_FILE.read_text(encoding="utf-8"))
-        age  = time.time() - data.get("fetched_at", 0)
+        cached = get_state_store().get_doc(TRENDS_CACHE_DOC)
+        if cached is None:
+            return None
+        trends, fetched_at = cached
+        age = time.time() - fetched_at
         if age < TRENDS_CACHE_TTL:
             log.info("[trend] 캐시 사용 (%.1f시간 전 수집)", age / 3600)
-            return data.get("trends") or {}
+            return trends or {}
     except Exception:
         pass
     return None
@@ -338,7 +333,11 @@ if __name__ == "__main__":
     ap.add_argument("--force",   action="store_true", help="캐시 무시하고 강제 갱신")
     args = ap.parse_args()
 
-    result = asyncio.run(get_trends(args.ollama, args.model, force_refresh=args.force))
+    async def _main() -> Dict:
+        async with ollama_session():
+            return await get_trends(args.ollama, args.model, force_refresh=args.force)
+
+    result = asyncio.run(_main())
     print("\n=== 트렌드 분석 결과 ===")
     print(json.dumps(result, indent=2, ensure_ascii=False))
     print("\n=== 프롬프트 블록 미리보기 ===")
@@ -0,0 +1,14 @@
+-- ── designs.color_variations 컬럼 추가 ──────────────────────────────
+-- automation/design_generator_final.py 가 문서를 한 번 렌더링해 code 에 기본 팔레트로 저장하고,
+-- 나머지 팔레트는 문서 사본 없이 색상만 저장합니다.
+-- code 의 팔레트 색상은 CSS 사용자 정의 속성으로만 참조됩니다:
+--   <style> :root { --palette-primary: #667eea; --palette-primary-20: #667eea20; ... }  (본문은 var(--palette-primary))
+-- 형식: {"base": "Purple Dream",
+--        "palettes": [{"name": "Purple Dream", "colors": {"primary": "#...", "secondary": "#...", "accent": "#..."}}]}
+-- 변형 = code 의 --palette-<slot>[-<alpha>] 선언 값만 해당 팔레트 색상(+알파 접미사)으로 교체
+--        (lib/palette.ts applyPalette, 디자인 상세 페이지 팔레트 선택)
+
+ALTER TABLE public.designs
+  ADD COLUMN IF NOT EXISTS color_variations JSONB;
+
+COMMENT ON COLUMN public.designs.color_variations IS 'Base palette name and the palettes that can replace the --palette-* custom properties declared in code';
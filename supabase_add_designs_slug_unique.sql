@@ -0,0 +1,16 @@
+-- ── designs.slug 유니크 인덱스 ───────────────────────────────────────
+-- 생성기의 SlugAllocator 는 slug 를 사전 확인하지 않고 insert 충돌(23505)을
+-- 재할당 신호로 사용합니다. 동시에 도는 생성기끼리 같은 slug 를 쓰지 않도록
+-- designs.slug 에 유니크 인덱스를 겁니다.
+
+-- 1) 기존 중복 확인 (결과가 있으면 인덱스 생성 전에 뒤쪽 행의 slug 를 정리)
+SELECT slug, COUNT(*) AS rows
+FROM public.designs
+WHERE slug IS NOT NULL
+GROUP BY slug
+HAVING COUNT(*) > 1;
+
+-- 2) 유니크 인덱스 (slug 가 없는 예전 행은 제외)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_designs_slug_unique
+  ON public.designs (slug)
+  WHERE slug IS NOT NULL;
@@ -0,0 +1,33 @@
+-- ── designs.structure_hash / spec_hash 컬럼 추가 ─────────────────────
+-- automation/design_generator_final.py 가 시작 시 code 전체를 내려받지 않고
+-- 구조 해시만 증분 동기화할 수 있도록 저장합니다.
+--   structure_hash: 모든 행 공통 — get_structure_hash(code) (색상 제외 DOM/레이아웃 해시)
+--   spec_hash:      내장 조합 디자인만 — section_composer.spec_hash(spec) (조합 스펙 JSON 의 md5)
+-- 기존 행은 `python design_generator_final.py --backfill-hashes` 로 한 번 채웁니다.
+
+ALTER TABLE public.designs
+  ADD COLUMN IF NOT EXISTS structure_hash TEXT;
+
+ALTER TABLE public.designs
+  ADD COLUMN IF NOT EXISTS spec_hash TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_designs_structure_hash
+  ON public.designs (structure_hash);
+
+CREATE INDEX IF NOT EXISTS idx_designs_spec_hash
+  ON public.designs (spec_hash);
+
+-- 증분 동기화 (created_at, id 워터마크) 용 정렬 인덱스
+CREATE INDEX IF NOT EXISTS idx_designs_created_at_id
+  ON public.designs (created_at, id);
+
+-- 이전 버전이 structure_hash 에 스펙 해시를 넣은 내장 조합 행 ("Layout: lead + blocks") 정리:
+-- 스펙 해시는 spec_hash 로 옮기고 structure_hash 는 비워서 --backfill-hashes 가 code 로 다시 계산
+UPDATE public.designs
+  SET spec_hash = structure_hash, structure_hash = NULL
+  WHERE spec_hash IS NULL
+    AND structure_hash IS NOT NULL
+    AND prompt LIKE 'Structure #% | Layout: % + %';
+
+COMMENT ON COLUMN public.designs.structure_hash IS 'Color-agnostic DOM/layout hash of code (get_structure_hash) for every row; used by the automation generator to skip duplicate structures';
+COMMENT ON COLUMN public.designs.spec_hash IS 'Built-in composer only: md5 of the composition spec JSON (section_composer.spec_hash); null for external/legacy rows';
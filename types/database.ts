@@ -1,3 +1,5 @@
+import type { ColorVariations } from '@/lib/palette';
+
 export type Design = {
   id: string;
   title: string;
@@ -15,6 +17,7 @@ export type Design = {
   views?: number | null;
   slug?: string | null;
   colors?: string[] | null;
+  color_variations?: ColorVariations | null;
   tags?: string[] | null;
   status: 'published' | 'archived';
   strategy_notes?: string | null;
@@ -120,6 +123,7 @@ export type Database = {
           likes?: number | null;
           views?: number | null;
           colors?: string[] | null;
+          color_variations?: ColorVariations | null;
           tags?: string[] | null;
           status?: 'published' | 'archived';
           strategy_notes?: string | null;
@@ -144,6 +148,7 @@ export type Database = {
           likes?: number | null;
           views?: number | null;
           colors?: string[] | null;
+          color_variations?: ColorVariations | null;
           tags?: string[] | null;
           status?: 'published' | 'archived';
           strategy_notes?: string | null;